@@ -53,4 +53,16 @@ except ImportError:
     from lmdb.cffi import __all__
     from lmdb.cffi import __doc__
 
+__all__ = __all__ + ['Writer']
+
+
+def __getattr__(name):
+    # Writer is imported on first use, like the helpers behind
+    # Environment.compact_to() and backup(), since it pulls in threading and
+    # concurrent.futures.
+    if name == 'Writer':
+        from lmdb._writer import Writer
+        return Writer
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
+
 __version__ = '2.3.0'
@@ -1,5 +1,7 @@
-from collections.abc import Iterable
-from typing import ClassVar, Final, Iterator, Literal, final, overload, type_check_only
+import array
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future
+from typing import Any, ClassVar, Final, Iterator, Literal, final, overload, type_check_only
 
 from _typeshed import StrOrBytesPath
 from typing_extensions import Buffer, Generic, Self, TypedDict, TypeVar
@@ -37,6 +39,14 @@ class _InfoDict(TypedDict):
     max_readers: int
     num_readers: int
 
+@type_check_only
+class _FreelistStatDict(TypedDict):
+    entries: int
+    free_pages: int
+    pending_pages: int
+    pending: dict[int, int]
+    largest_run: int
+
 @type_check_only
 class _EnvFlagsDict(TypedDict):
     subdir: bool
@@ -187,6 +197,9 @@ class Environment:
         max_dbs: int = 0,
         max_spare_txns: int = 1,
         lock: bool = True,
+        auto_grow: bool = False,
+        grow_step: int = 0,
+        max_map_size: int = 0,
     ) -> Self: ...
     def __enter__(self) -> Self: ...
     def __exit__(self, *args: object) -> None: ...
@@ -198,13 +211,26 @@ class Environment:
     def copyfd(
         self, fd: int, compact: bool = False, txn: Transaction | None = None
     ) -> None: ...
+    def compact_to(self, path: str, swap: bool = True) -> None: ...
+    def backup(
+        self,
+        dest: str | int,
+        compact: bool = False,
+        rate_limit_bytes: float | None = None,
+        progress: Callable[[int], object] | None = None,
+    ) -> int: ...
     def sync(self, force: bool = False) -> None: ...
     def stat(self) -> _StatDict: ...
     def info(self) -> _InfoDict: ...
     def flags(self) -> _EnvFlagsDict: ...
     def max_key_size(self) -> int: ...
     def max_readers(self) -> int: ...
+    def reader(
+        self, max_age_ms: int = 100, max_txns: int | None = None
+    ) -> Transaction[bytes]: ...
     def readers(self) -> str: ...
+    def reader_slots(self) -> list[tuple[int, int, int | None, int | None]]: ...
+    def freelist_stat(self) -> _FreelistStatDict: ...
     def reader_check(self) -> int: ...
     def set_mapsize(self, map_size: int) -> None: ...
     def open_db(
@@ -251,6 +277,20 @@ class Environment:
         *,
         buffers: Literal[True],
     ) -> Transaction[memoryview]: ...
+    def bulk_load(
+        self,
+        items: Iterable[tuple[Buffer, Buffer]],
+        db: _Database | None = None,
+        presorted: bool = True,
+        txn_bytes: int = 67108864,
+        grow_factor: float = 2.0,
+    ) -> tuple[int, int]: ...
+    def run_write(
+        self, fn: Callable[[Transaction[bytes]], _T], db: _Database | None = None
+    ) -> _T: ...
+    def writer(
+        self, max_batch: int = 1000, max_delay_ms: float = 0, db: _Database | None = None
+    ) -> Writer: ...
 
 open = Environment
 
@@ -310,6 +350,23 @@ class Transaction(Generic[_VT_co]):
         self, key: Buffer, default: _T, db: _Database | None = None
     ) -> _VT_co | _T: ...
 
+    #
+    @overload
+    def getmany(
+        self,
+        keys: Iterable[Buffer],
+        db: _Database | None = None,
+        default: None = None,
+    ) -> list[_VT_co | None]: ...
+    @overload
+    def getmany(
+        self, keys: Iterable[Buffer], db: _Database | None, default: _T
+    ) -> list[_VT_co | _T]: ...
+    @overload
+    def getmany(
+        self, keys: Iterable[Buffer], db: _Database | None = None, *, default: _T
+    ) -> list[_VT_co | _T]: ...
+
     #
     def put(
         self,
@@ -320,6 +377,37 @@ class Transaction(Generic[_VT_co]):
         append: bool = False,
         db: _Database | None = None,
     ) -> bool: ...
+    def reserve(
+        self,
+        key: Buffer,
+        size: int,
+        overwrite: bool = True,
+        append: bool = False,
+        db: _Database | None = None,
+    ) -> memoryview | None: ...
+    def putmany(
+        self,
+        items: Iterable[tuple[Buffer, Buffer]],
+        db: _Database | None = None,
+        dupdata: bool = True,
+        overwrite: bool = True,
+        append: bool = False,
+    ) -> tuple[int, int]: ...
+    def incr(
+        self,
+        key: Buffer,
+        delta: int = 1,
+        db: _Database | None = None,
+        width: int = 8,
+        signed: bool = True,
+    ) -> int: ...
+    def incrmany(
+        self,
+        pairs: Iterable[tuple[Buffer, int]],
+        db: _Database | None = None,
+        width: int = 8,
+        signed: bool = True,
+    ) -> list[int]: ...
     def replace(
         self, key: Buffer, value: Buffer, db: _Database | None = None
     ) -> _VT_co | None: ...
@@ -327,6 +415,13 @@ class Transaction(Generic[_VT_co]):
     def delete(
         self, key: Buffer, value: Buffer = b"", db: _Database | None = None
     ) -> bool: ...
+    def delete_range(
+        self,
+        start: Buffer | None = None,
+        stop: Buffer | None = None,
+        db: _Database | None = None,
+        inclusive: bool = False,
+    ) -> int: ...
     def cursor(self, db: _Database | None = None) -> Cursor[_VT_co]: ...
 
 @final
@@ -374,7 +469,19 @@ class Cursor(Generic[_VT_co]):
         dupfixed_bytes: int | None = None,
         keyfixed: Literal[False] = False,
         values: Literal[True] = True,
+        dtype: None = None,
     ) -> list[tuple[_VT_co, _VT_co]]: ...
+    @overload  # dtype given
+    def getmulti(
+        self,
+        keys: Iterable[Buffer],
+        dupdata: bool = False,
+        dupfixed_bytes: int | None = None,
+        keyfixed: Literal[False] = False,
+        values: Literal[True] = True,
+        *,
+        dtype: str,
+    ) -> list[tuple[_VT_co, int | float]]: ...
     @overload  # keyfixed=False (default), values=False
     def getmulti(
         self,
@@ -384,6 +491,7 @@ class Cursor(Generic[_VT_co]):
         keyfixed: Literal[False] = False,
         *,
         values: Literal[False],
+        dtype: str | None = None,
     ) -> list[_VT_co]: ...
     @overload  # keyfixed=True  (positional)
     def getmulti(
@@ -393,6 +501,7 @@ class Cursor(Generic[_VT_co]):
         dupfixed_bytes: int,
         keyfixed: Literal[True],
         values: bool = True,
+        dtype: None = None,
     ) -> memoryview: ...
     @overload  # keyfixed=True  (keyword)
     def getmulti(
@@ -403,6 +512,7 @@ class Cursor(Generic[_VT_co]):
         dupfixed_bytes: int,
         keyfixed: Literal[True],
         values: bool = True,
+        dtype: None = None,
     ) -> memoryview: ...
 
     #
@@ -414,6 +524,13 @@ class Cursor(Generic[_VT_co]):
         overwrite: bool = True,
         append: bool = False,
     ) -> bool: ...
+    def reserve(
+        self,
+        key: Buffer,
+        size: int,
+        overwrite: bool = True,
+        append: bool = False,
+    ) -> memoryview | None: ...
     def putmulti(
         self,
         items: Iterable[tuple[Buffer, Buffer]],
@@ -421,44 +538,123 @@ class Cursor(Generic[_VT_co]):
         overwrite: bool = True,
         append: bool = False,
     ) -> tuple[int, int]: ...
+    def putmulti_columns(
+        self,
+        keys: Buffer,
+        key_offsets: Buffer | None = None,
+        values: Buffer | None = None,
+        value_offsets: Buffer | None = None,
+        key_size: int = 0,
+        value_size: int = 0,
+        dupdata: bool = True,
+        overwrite: bool = True,
+        append: bool = False,
+    ) -> tuple[int, int]: ...
+    def putmulti_dupfixed(
+        self, key: Buffer, values: Buffer, item_size: int
+    ) -> int: ...
     def delete(self, dupdata: bool = False) -> bool: ...
+    def deletemulti(
+        self,
+        keys: Iterable[Buffer | tuple[Buffer, Buffer]],
+        dupdata: bool = False,
+    ) -> tuple[int, int]: ...
     def replace(self, key: Buffer, val: Buffer) -> _VT_co | None: ...
     def pop(self, key: Buffer) -> _VT_co | None: ...
     def count(self) -> int: ...
+    def values_array(self, dtype: str) -> array.array[Any]: ...
+    def count_range(
+        self,
+        start: Buffer | None = None,
+        stop: Buffer | None = None,
+        dup: bool = True,
+    ) -> int: ...
+    def export_columns(
+        self,
+        start: Buffer | None = None,
+        stop: Buffer | None = None,
+        limit: int | None = None,
+    ) -> tuple[memoryview, memoryview, memoryview, memoryview]: ...
 
     # Iteration
 
     #
     @overload
     def iternext(
-        self, keys: Literal[True] = True, values: Literal[True] = True
+        self,
+        keys: Literal[True] = True,
+        values: Literal[True] = True,
+        stop: Buffer | None = None,
+        inclusive: bool = False,
+        limit: int | None = None,
     ) -> Iterator[tuple[_VT_co, _VT_co]]: ...
     @overload
     def iternext(
-        self, keys: Literal[True] = True, *, values: Literal[False]
+        self,
+        keys: Literal[True] = True,
+        *,
+        values: Literal[False],
+        stop: Buffer | None = None,
+        inclusive: bool = False,
+        limit: int | None = None,
     ) -> Iterator[_VT_co]: ...
     @overload
     def iternext(
-        self, keys: Literal[True], values: Literal[False]
+        self,
+        keys: Literal[True],
+        values: Literal[False],
+        stop: Buffer | None = None,
+        inclusive: bool = False,
+        limit: int | None = None,
     ) -> Iterator[_VT_co]: ...
     @overload
     def iternext(
-        self, keys: Literal[False], values: Literal[True] = True
+        self,
+        keys: Literal[False],
+        values: Literal[True] = True,
+        stop: Buffer | None = None,
+        inclusive: bool = False,
+        limit: int | None = None,
     ) -> Iterator[_VT_co]: ...
 
     # keep in sync with `iternext`
     @overload
     def iternext_dup(
-        self, keys: Literal[True], values: Literal[True] = True
+        self,
+        keys: Literal[True],
+        values: Literal[True] = True,
+        dtype: None = None,
     ) -> Iterator[tuple[_VT_co, _VT_co]]: ...
     @overload
     def iternext_dup(
-        self, keys: Literal[True], values: Literal[False]
+        self,
+        keys: Literal[True],
+        values: Literal[False],
+        dtype: str | None = None,
     ) -> Iterator[_VT_co]: ...
     @overload
     def iternext_dup(
-        self, keys: Literal[False] = False, values: Literal[True] = True
+        self,
+        keys: Literal[False] = False,
+        values: Literal[True] = True,
+        dtype: None = None,
     ) -> Iterator[_VT_co]: ...
+    @overload
+    def iternext_dup(
+        self,
+        keys: Literal[True],
+        values: Literal[True] = True,
+        *,
+        dtype: str,
+    ) -> Iterator[tuple[_VT_co, int | float]]: ...
+    @overload
+    def iternext_dup(
+        self,
+        keys: Literal[False] = False,
+        values: Literal[True] = True,
+        *,
+        dtype: str,
+    ) -> Iterator[int | float]: ...
 
     # keep in sync with `iternext`
     @overload
@@ -478,37 +674,117 @@ class Cursor(Generic[_VT_co]):
         self, keys: Literal[False], values: Literal[True]
     ) -> Iterator[_VT_co]: ...
 
+    @overload
+    def iterprefix(
+        self,
+        prefix: Buffer,
+        keys: Literal[True] = True,
+        values: Literal[True] = True,
+        reverse: bool = False,
+    ) -> Iterator[tuple[_VT_co, _VT_co]]: ...
+    @overload
+    def iterprefix(
+        self,
+        prefix: Buffer,
+        keys: Literal[True] = True,
+        *,
+        values: Literal[False],
+        reverse: bool = False,
+    ) -> Iterator[_VT_co]: ...
+    @overload
+    def iterprefix(
+        self,
+        prefix: Buffer,
+        keys: Literal[True],
+        values: Literal[False],
+        reverse: bool = False,
+    ) -> Iterator[_VT_co]: ...
+    @overload
+    def iterprefix(
+        self,
+        prefix: Buffer,
+        keys: Literal[False],
+        values: Literal[True] = True,
+        reverse: bool = False,
+    ) -> Iterator[_VT_co]: ...
+
     # keep in sync with `iternext`
     @overload
     def iterprev(
-        self, keys: Literal[True] = True, values: Literal[True] = True
+        self,
+        keys: Literal[True] = True,
+        values: Literal[True] = True,
+        stop: Buffer | None = None,
+        inclusive: bool = False,
+        limit: int | None = None,
     ) -> Iterator[tuple[_VT_co, _VT_co]]: ...
     @overload
     def iterprev(
-        self, keys: Literal[True] = True, *, values: Literal[False]
+        self,
+        keys: Literal[True] = True,
+        *,
+        values: Literal[False],
+        stop: Buffer | None = None,
+        inclusive: bool = False,
+        limit: int | None = None,
     ) -> Iterator[_VT_co]: ...
     @overload
     def iterprev(
-        self, keys: Literal[True], values: Literal[False]
+        self,
+        keys: Literal[True],
+        values: Literal[False],
+        stop: Buffer | None = None,
+        inclusive: bool = False,
+        limit: int | None = None,
     ) -> Iterator[_VT_co]: ...
     @overload
     def iterprev(
-        self, keys: Literal[False], values: Literal[True] = True
+        self,
+        keys: Literal[False],
+        values: Literal[True] = True,
+        stop: Buffer | None = None,
+        inclusive: bool = False,
+        limit: int | None = None,
     ) -> Iterator[_VT_co]: ...
 
     # keep in sync with `iternext`
     @overload
     def iterprev_dup(
-        self, keys: Literal[True], values: Literal[True] = True
+        self,
+        keys: Literal[True],
+        values: Literal[True] = True,
+        dtype: None = None,
     ) -> Iterator[tuple[_VT_co, _VT_co]]: ...
     @overload
     def iterprev_dup(
-        self, keys: Literal[True], values: Literal[False]
+        self,
+        keys: Literal[True],
+        values: Literal[False],
+        dtype: str | None = None,
     ) -> Iterator[_VT_co]: ...
     @overload
     def iterprev_dup(
-        self, keys: Literal[False] = False, values: Literal[True] = True
+        self,
+        keys: Literal[False] = False,
+        values: Literal[True] = True,
+        dtype: None = None,
     ) -> Iterator[_VT_co]: ...
+    @overload
+    def iterprev_dup(
+        self,
+        keys: Literal[True],
+        values: Literal[True] = True,
+        *,
+        dtype: str,
+    ) -> Iterator[tuple[_VT_co, int | float]]: ...
+    @overload
+    def iterprev_dup(
+        self,
+        keys: Literal[False] = False,
+        values: Literal[True] = True,
+        *,
+        dtype: str,
+    ) -> Iterator[int | float]: ...
 
     # keep in sync with `iternext`
     @overload
@@ -528,15 +804,151 @@ class Cursor(Generic[_VT_co]):
         self, keys: Literal[False], values: Literal[True]
     ) -> Iterator[_VT_co]: ...
 
+    #
+    @overload
+    def iternext_batches(
+        self, n: int, keys: Literal[True] = True, values: Literal[True] = True
+    ) -> Iterator[list[tuple[_VT_co, _VT_co]]]: ...
+    @overload
+    def iternext_batches(
+        self, n: int, keys: Literal[True] = True, *, values: Literal[False]
+    ) -> Iterator[list[_VT_co]]: ...
+    @overload
+    def iternext_batches(
+        self, n: int, keys: Literal[True], values: Literal[False]
+    ) -> Iterator[list[_VT_co]]: ...
+    @overload
+    def iternext_batches(
+        self, n: int, keys: Literal[False], values: Literal[True] = True
+    ) -> Iterator[list[_VT_co]]: ...
+
+    # keep in sync with `iternext_batches`
+    @overload
+    def iternext_dup_batches(
+        self, n: int, keys: Literal[True], values: Literal[True] = True
+    ) -> Iterator[list[tuple[_VT_co, _VT_co]]]: ...
+    @overload
+    def iternext_dup_batches(
+        self, n: int, keys: Literal[True], values: Literal[False]
+    ) -> Iterator[list[_VT_co]]: ...
+    @overload
+    def iternext_dup_batches(
+        self, n: int, keys: Literal[False] = False, values: Literal[True] = True
+    ) -> Iterator[list[_VT_co]]: ...
+
+    # keep in sync with `iternext_batches`
+    @overload
+    def iternext_nodup_batches(
+        self, n: int, keys: Literal[True] = True, *, values: Literal[True]
+    ) -> Iterator[list[tuple[_VT_co, _VT_co]]]: ...
+    @overload
+    def iternext_nodup_batches(
+        self, n: int, keys: Literal[True], values: Literal[True]
+    ) -> Iterator[list[tuple[_VT_co, _VT_co]]]: ...
+    @overload
+    def iternext_nodup_batches(
+        self, n: int, keys: Literal[True] = True, values: Literal[False] = False
+    ) -> Iterator[list[_VT_co]]: ...
+    @overload
+    def iternext_nodup_batches(
+        self, n: int, keys: Literal[False], values: Literal[True]
+    ) -> Iterator[list[_VT_co]]: ...
+
+    # keep in sync with `iternext_batches`
+    @overload
+    def iterprev_batches(
+        self, n: int, keys: Literal[True] = True, values: Literal[True] = True
+    ) -> Iterator[list[tuple[_VT_co, _VT_co]]]: ...
+    @overload
+    def iterprev_batches(
+        self, n: int, keys: Literal[True] = True, *, values: Literal[False]
+    ) -> Iterator[list[_VT_co]]: ...
+    @overload
+    def iterprev_batches(
+        self, n: int, keys: Literal[True], values: Literal[False]
+    ) -> Iterator[list[_VT_co]]: ...
+    @overload
+    def iterprev_batches(
+        self, n: int, keys: Literal[False], values: Literal[True] = True
+    ) -> Iterator[list[_VT_co]]: ...
+
+    # keep in sync with `iternext_batches`
+    @overload
+    def iterprev_dup_batches(
+        self, n: int, keys: Literal[True], values: Literal[True] = True
+    ) -> Iterator[list[tuple[_VT_co, _VT_co]]]: ...
+    @overload
+    def iterprev_dup_batches(
+        self, n: int, keys: Literal[True], values: Literal[False]
+    ) -> Iterator[list[_VT_co]]: ...
+    @overload
+    def iterprev_dup_batches(
+        self, n: int, keys: Literal[False] = False, values: Literal[True] = True
+    ) -> Iterator[list[_VT_co]]: ...
+
+    # keep in sync with `iternext_batches`
+    @overload
+    def iterprev_nodup_batches(
+        self, n: int, keys: Literal[True] = True, *, values: Literal[True]
+    ) -> Iterator[list[tuple[_VT_co, _VT_co]]]: ...
+    @overload
+    def iterprev_nodup_batches(
+        self, n: int, keys: Literal[True], values: Literal[True]
+    ) -> Iterator[list[tuple[_VT_co, _VT_co]]]: ...
+    @overload
+    def iterprev_nodup_batches(
+        self, n: int, keys: Literal[True] = True, values: Literal[False] = False
+    ) -> Iterator[list[_VT_co]]: ...
+    @overload
+    def iterprev_nodup_batches(
+        self, n: int, keys: Literal[False], values: Literal[True]
+    ) -> Iterator[list[_VT_co]]: ...
+
     #
     def _iter_from(
-        self, k: Buffer, reverse: bool
+        self,
+        k: Buffer,
+        reverse: bool,
+        stop: Buffer | None = None,
+        inclusive: bool = False,
+        limit: int | None = None,
     ) -> Iterator[tuple[_VT_co, _VT_co]]: ...
 
+class Writer:
+    env: Environment
+
+    def __init__(
+        self,
+        env: Environment,
+        max_batch: int = 1000,
+        max_delay_ms: float = 0,
+        db: _Database | None = None,
+    ) -> None: ...
+    def __enter__(self) -> Self: ...
+    def __exit__(self, _1: object, _2: object, _3: object) -> None: ...
+    def put(
+        self,
+        key: Buffer,
+        value: Buffer,
+        dupdata: bool = True,
+        overwrite: bool = True,
+        append: bool = False,
+        db: _Database | None = None,
+    ) -> Future[bool]: ...
+    def replace(
+        self, key: Buffer, value: Buffer, db: _Database | None = None
+    ) -> Future[bytes | None]: ...
+    def delete(
+        self, key: Buffer, value: Buffer = b"", db: _Database | None = None
+    ) -> Future[bool]: ...
+    def flush(self) -> None: ...
+    def close(self) -> None: ...
+
 __all__ = [
     "Cursor",
     "Environment",
     "Transaction",
+    "Writer",
     "_Database",
     "enable_drop_gil",
     "version",
@@ -0,0 +1,175 @@
+# Copyright 2013-2025 The py-lmdb authors, all rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted only as authorized by the OpenLDAP
+# Public License.
+#
+# A copy of this license is available in the file LICENSE in the
+# top-level directory of the distribution or, alternatively, at
+# <http://www.OpenLDAP.org/license.html>.
+#
+# OpenLDAP is a registered trademark of the OpenLDAP Foundation.
+#
+# Individual files and/or contributed packages may be copyright by
+# other parties and/or subject to additional restrictions.
+#
+# This work also contains materials derived from public sources.
+#
+# Additional information about OpenLDAP can be obtained at
+# <http://www.openldap.org/>.
+
+"""
+Copy helpers shared by the CPython and CFFI implementations of
+:py:meth:`lmdb.Environment.compact_to` and :py:meth:`lmdb.Environment.backup`.
+"""
+
+import os
+import shutil
+import sys
+import threading
+import time
+
+import lmdb
+
+
+def data_path(env, path):
+    """Return the data file written by :py:meth:`Environment.copy` to `path`
+    for `env`, or that of `env` itself if `path` is ``None``."""
+    if path is None:
+        path = env.path()
+    if env.flags()['subdir']:
+        return os.path.join(path, 'data.mdb')
+    return path
+
+
+def _fsync(path):
+    """Flush the file or directory `path` to disk. Directories cannot be
+    opened on Windows, so they are skipped there."""
+    if not os.path.isdir(path):
+        flags = os.O_RDWR | getattr(os, 'O_BINARY', 0)
+    elif sys.platform == 'win32':
+        return
+    else:
+        flags = os.O_RDONLY
+    fd = os.open(path, flags)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def compact_to(env, path, swap=True):
+    if not swap:
+        env.copy(path, compact=True)
+        return
+
+    src = data_path(env, path)
+    dst = data_path(env, None)
+    env_path = env.path()
+    subdir = env.flags()['subdir']
+    # Holding the write lock keeps writers from committing to the old file
+    # after the copy's snapshot. The compacting copy reads through its own
+    # read transaction and never takes the lock, so readers and the copy
+    # proceed while writers wait.
+    txn = env.begin(write=True)
+    snapshot = txn.id() - 1
+    try:
+        env.copy(path, compact=True)
+        shutil.copymode(dst, src)
+    finally:
+        # Nothing was written, so commit() ends the transaction without
+        # writing a meta page, and unlike abort() does not wait for writers
+        # queued on the lock.
+        txn.commit()
+    env.close()
+
+    # A writer queued on the lock may have committed between the commit
+    # above and close(). Swapping would discard its write, so check the old
+    # file's last transaction without taking the lock.
+    old = type(env)(env_path, subdir=subdir, readonly=True, lock=False)
+    try:
+        last_txnid = old.info()['last_txnid']
+    finally:
+        old.close()
+    if last_txnid != snapshot:
+        raise lmdb.Error('compact_to(): environment was written to during '
+                         'compaction; compacted copy left at %r' % (src,))
+    # LMDB does not sync the copy. Flush it before the rename makes it the
+    # data file, then flush the directories so the rename itself survives a
+    # crash.
+    _fsync(src)
+    os.replace(src, dst)
+    dirs = {os.path.dirname(os.path.abspath(p)) for p in (src, dst)}
+    for d in sorted(dirs):
+        _fsync(d)
+
+
+#: Largest read from the backup pipe.
+BACKUP_CHUNK = 1 << 20
+
+
+def _write_all(fd, buf):
+    view = memoryview(buf)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def backup(env, dest, compact=False, rate_limit_bytes=None, progress=None):
+    if rate_limit_bytes is not None and rate_limit_bytes <= 0:
+        raise ValueError('rate_limit_bytes must be positive')
+    path = None
+    if isinstance(dest, int):
+        fd = dest
+    else:
+        path = data_path(env, dest)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL |
+                     getattr(os, 'O_BINARY', 0), 0o666)
+
+    # copyfd() runs on its own thread, writing into a pipe drained here. The
+    # pipe's small buffer makes the copy wait whenever writing is throttled,
+    # so its reads from the environment are paced too.
+    errors = []
+    copied = 0
+    done = False
+    rfd, wfd = os.pipe()
+
+    def run():
+        try:
+            env.copyfd(wfd, compact=compact)
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            os.close(wfd)
+
+    thread = threading.Thread(target=run, name='lmdb-backup', daemon=True)
+    try:
+        thread.start()
+        start = time.monotonic()
+        while True:
+            buf = os.read(rfd, BACKUP_CHUNK)
+            if not buf:
+                break
+            _write_all(fd, buf)
+            copied += len(buf)
+            if progress is not None:
+                progress(copied)
+            if rate_limit_bytes is not None:
+                delay = start + copied / rate_limit_bytes - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+        done = True
+    finally:
+        # If we stopped early, closing the read end fails the copy's next
+        # write with EPIPE, ending the thread.
+        os.close(rfd)
+        if thread.ident is not None:
+            thread.join()
+        else:
+            os.close(wfd)
+        if path is not None:
+            os.close(fd)
+            if not done or errors:
+                os.unlink(path)
+    if errors:
+        raise errors[0]
+    return copied
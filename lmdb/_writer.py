@@ -0,0 +1,214 @@
+# Copyright 2013-2025 The py-lmdb authors, all rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted only as authorized by the OpenLDAP
+# Public License.
+#
+# A copy of this license is available in the file LICENSE in the
+# top-level directory of the distribution or, alternatively, at
+# <http://www.OpenLDAP.org/license.html>.
+#
+# OpenLDAP is a registered trademark of the OpenLDAP Foundation.
+#
+# Individual files and/or contributed packages may be copyright by
+# other parties and/or subject to additional restrictions.
+#
+# This work also contains materials derived from public sources.
+#
+# Additional information about OpenLDAP can be obtained at
+# <http://www.openldap.org/>.
+
+"""
+Group-commit writer shared by the CPython and CFFI implementations of
+:py:meth:`lmdb.Environment.writer`.
+"""
+
+import atexit
+import collections
+import operator
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+
+
+#: Writers not yet closed. Their threads are daemons, so that a forgotten
+#: writer cannot keep the interpreter alive, and _close_all() writes their
+#: pending requests at exit instead.
+_open_writers: 'weakref.WeakSet[Writer]' = weakref.WeakSet()
+
+
+def _close_all():
+    for writer in list(_open_writers):
+        writer.close()
+
+
+atexit.register(_close_all)
+
+
+class Writer:
+    """
+    Background thread writing requests from any number of threads, folding
+    each batch of pending requests into a single write transaction. Created
+    by :py:meth:`Environment.writer`.
+
+    Each request method returns a :py:class:`concurrent.futures.Future`,
+    resolved with the result of the equivalent :py:class:`Transaction`
+    method once the transaction holding it has been committed. Requests are
+    applied in submission order. If a request raises, its future receives the
+    exception and the rest of its batch is retried without it. If the commit
+    fails, every future in the batch receives the exception.
+
+    Since the batch may be retried, key and value buffers must not be
+    modified until the request's future is done. With `auto_grow=True`,
+    batches failing with :py:class:`MapFullError` are retried as by
+    :py:meth:`Environment.run_write`.
+
+    Supports the context manager protocol, calling :py:meth:`close` on exit.
+    Writers still open when the interpreter exits are closed then, writing
+    their pending requests.
+
+        `max_batch`:
+            Maximum number of requests written by one transaction.
+
+        `max_delay_ms`:
+            Milliseconds to wait for more requests after the first request of
+            a batch arrives, trading latency for larger batches. If 0, a batch
+            holds whatever requests arrived while the previous one was being
+            committed.
+
+        `db`:
+            Named database used by requests that do not specify one. If
+            unspecified, defaults to the main database.
+
+    ::
+
+        >>> with env.writer(max_batch=512) as writer:
+        ...     futures = [writer.put(b'%d' % i, b'value') for i in range(100)]
+        >>> all(f.result() for f in futures)
+        True
+    """
+    def __init__(self, env, max_batch=1000, max_delay_ms=0, db=None):
+        if max_batch < 1:
+            raise ValueError("max_batch must be positive")
+        if max_delay_ms < 0:
+            raise ValueError("max_delay_ms must not be negative")
+        self.env = env
+        self._db = db
+        self._max_batch = max_batch
+        self._max_delay = max_delay_ms / 1000.0
+        self._queue = collections.deque()
+        self._cond = threading.Condition()
+        self._closing = False
+        self._thread = threading.Thread(target=self._run,
+                                        name='lmdb-writer', daemon=True)
+        self._thread.start()
+        _open_writers.add(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, _1, _2, _3):
+        self.close()
+
+    def _submit(self, fn):
+        future = Future()
+        with self._cond:
+            if self._closing:
+                raise RuntimeError("writer is closed")
+            self._queue.append((future, fn))
+            self._cond.notify()
+        return future
+
+    def put(self, key, value, dupdata=True, overwrite=True, append=False,
+            db=None):
+        """Queue :py:meth:`Transaction.put`, returning a future resolved with
+        its result."""
+        return self._submit(operator.methodcaller(
+            'put', key, value, dupdata=dupdata, overwrite=overwrite,
+            append=append, db=db))
+
+    def replace(self, key, value, db=None):
+        """Queue :py:meth:`Transaction.replace`, returning a future resolved
+        with the previous value, or ``None``."""
+        return self._submit(operator.methodcaller(
+            'replace', key, value, db=db))
+
+    def delete(self, key, value=b'', db=None):
+        """Queue :py:meth:`Transaction.delete`, returning a future resolved
+        with its result."""
+        return self._submit(operator.methodcaller(
+            'delete', key, value, db=db))
+
+    def flush(self):
+        """Block until every request submitted before the call has been
+        committed or failed."""
+        self._submit(lambda txn: None).result()
+
+    def close(self):
+        """Write any pending requests and stop the background thread. Repeat
+        calls to :py:meth:`close` have no effect. Requests submitted after
+        closing raise :py:exc:`RuntimeError`."""
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+        _open_writers.discard(self)
+
+    def _next_batch(self):
+        """Wait for requests and dequeue up to `max_batch` of them, or return
+        ``None`` once closed and drained."""
+        with self._cond:
+            while not (self._queue or self._closing):
+                self._cond.wait()
+            if self._max_delay:
+                deadline = time.monotonic() + self._max_delay
+                while (len(self._queue) < self._max_batch and
+                       not self._closing):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            if not self._queue:
+                return None
+            n = min(len(self._queue), self._max_batch)
+            return [self._queue.popleft() for _ in range(n)]
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            self._write(batch)
+
+    def _write(self, batch):
+        batch = [req for req in batch if req[0].set_running_or_notify_cancel()]
+        while batch:
+            failed = []
+
+            def apply(txn):
+                del failed[:]
+                results = []
+                for i, (_, fn) in enumerate(batch):
+                    try:
+                        results.append(fn(txn))
+                    except BaseException:
+                        failed.append(i)
+                        raise
+                return results
+
+            try:
+                results = self.env.run_write(apply, db=self._db)
+            except BaseException as e:
+                if not failed:
+                    # The transaction could not begin or commit.
+                    for future, _ in batch:
+                        future.set_exception(e)
+                    return
+                future, _ = batch.pop(failed[0])
+                future.set_exception(e)
+                continue
+            for (future, _), result in zip(batch, results):
+                future.set_result(result)
+            return
@@ -145,13 +145,14 @@ class AsyncEnvironment:
     closed on exit.
     """
 
-    __slots__ = ('_env', '_executor')
+    __slots__ = ('_env', '_executor', '_reader')
 
     _WRAPS = '_env'
 
     def __init__(self, env, executor=None):
         self._env = env
         self._executor = executor
+        self._reader = None
 
     # -- context manager --------------------------------------------------
 
@@ -202,22 +203,44 @@ class AsyncEnvironment:
                 txn, executor, owns_executor=private is not None)
         return _AsyncContextWrapper(_begin())
 
+    def reader(self, *args, **kwargs):
+        """Return the event loop thread's cached read transaction as an
+        :py:class:`AsyncTransaction`.
+
+        Accepts the same arguments as :py:meth:`lmdb.Environment.reader`, and
+        is called directly, since a cache hit does no I/O. The same wrapper is
+        returned for as long as the underlying transaction is reused, so its
+        lock keeps serializing operations on it.
+        """
+        txn = self._env.reader(*args, **kwargs)
+        wrapper = self._reader
+        if wrapper is None or wrapper._txn is not txn:
+            wrapper = self._reader = AsyncTransaction(txn, self._executor)
+        return wrapper
+
     # -- proxied methods --------------------------------------------------
 
     path = _sync_method(Environment.path)
     max_key_size = _sync_method(Environment.max_key_size)
     max_readers = _sync_method(Environment.max_readers)
     flags = _sync_method(Environment.flags)
+    writer = _sync_method(Environment.writer)
 
     stat = _async_method(Environment.stat)
     info = _async_method(Environment.info)
     close = _async_method(Environment.close)
     copy = _async_method(Environment.copy)
     copyfd = _async_method(Environment.copyfd)
+    compact_to = _async_method(Environment.compact_to)
+    backup = _async_method(Environment.backup)
     sync = _async_method(Environment.sync)
     readers = _async_method(Environment.readers)
+    reader_slots = _async_method(Environment.reader_slots)
+    freelist_stat = _async_method(Environment.freelist_stat)
     reader_check = _async_method(Environment.reader_check)
     set_mapsize = _async_method(Environment.set_mapsize)
+    bulk_load = _async_method(Environment.bulk_load)
+    run_write = _async_method(Environment.run_write)
     open_db = _async_method(Environment.open_db)
     dbs = _async_method(Environment.dbs)
 
@@ -316,10 +339,16 @@ class AsyncTransaction:
     stat = _async_method_locked(Transaction.stat)
     drop = _async_method_locked(Transaction.drop)
     get = _async_method_locked(Transaction.get)
+    getmany = _async_method_locked(Transaction.getmany)
     put = _async_method_locked(Transaction.put)
+    reserve = _async_method_locked(Transaction.reserve)
+    incr = _async_method_locked(Transaction.incr)
+    incrmany = _async_method_locked(Transaction.incrmany)
+    putmany = _async_method_locked(Transaction.putmany)
     replace = _async_method_locked(Transaction.replace)
     pop = _async_method_locked(Transaction.pop)
     delete = _async_method_locked(Transaction.delete)
+    delete_range = _async_method_locked(Transaction.delete_range)
 
     async def commit(self):
         """Commit the transaction and release its executor if privately owned."""
@@ -409,20 +438,34 @@ class AsyncCursor:
     set_range = _async_method_locked(Cursor.set_range)
     set_range_dup = _async_method_locked(Cursor.set_range_dup)
     delete = _async_method_locked(Cursor.delete)
+    deletemulti = _async_method_locked(Cursor.deletemulti)
     count = _async_method_locked(Cursor.count)
+    count_range = _async_method_locked(Cursor.count_range)
+    export_columns = _async_method_locked(Cursor.export_columns)
     put = _async_method_locked(Cursor.put)
+    reserve = _async_method_locked(Cursor.reserve)
     putmulti = _async_method_locked(Cursor.putmulti)
+    putmulti_columns = _async_method_locked(Cursor.putmulti_columns)
+    putmulti_dupfixed = _async_method_locked(Cursor.putmulti_dupfixed)
     replace = _async_method_locked(Cursor.replace)
     pop = _async_method_locked(Cursor.pop)
     get = _async_method_locked(Cursor.get)
     getmulti = _async_method_locked(Cursor.getmulti)
+    values_array = _async_method_locked(Cursor.values_array)
 
     iternext = _collect_locked(Cursor.iternext)
     iternext_dup = _collect_locked(Cursor.iternext_dup)
     iternext_nodup = _collect_locked(Cursor.iternext_nodup)
+    iterprefix = _collect_locked(Cursor.iterprefix)
     iterprev = _collect_locked(Cursor.iterprev)
     iterprev_dup = _collect_locked(Cursor.iterprev_dup)
     iterprev_nodup = _collect_locked(Cursor.iterprev_nodup)
+    iternext_batches = _collect_locked(Cursor.iternext_batches)
+    iternext_dup_batches = _collect_locked(Cursor.iternext_dup_batches)
+    iternext_nodup_batches = _collect_locked(Cursor.iternext_nodup_batches)
+    iterprev_batches = _collect_locked(Cursor.iterprev_batches)
+    iterprev_dup_batches = _collect_locked(Cursor.iterprev_dup_batches)
+    iterprev_nodup_batches = _collect_locked(Cursor.iterprev_nodup_batches)
 
     # -- attribute fallback -----------------------------------------------
 
@@ -1,5 +1,6 @@
+import array
 import asyncio
-from collections.abc import Awaitable, Generator, Iterable
+from collections.abc import Awaitable, Callable, Generator, Iterable
 from concurrent.futures import Executor
 from types import TracebackType
 from typing import Any, Final, Literal, overload
@@ -11,13 +12,16 @@ from . import (
     Cursor,
     Environment,
     Transaction,
+    Writer,
     _Database,
     _EnvFlagsDict,
+    _FreelistStatDict,
     _InfoDict,
     _StatDict,
 )
 
 _DefaultT = TypeVar("_DefaultT", default=None)
+_T = TypeVar("_T")
 _T_co = TypeVar("_T_co", covariant=True)
 _VT = TypeVar("_VT", bound=bytes | memoryview)
 _VT_co = TypeVar(
@@ -50,10 +54,11 @@ class _AsyncContextWrapper(Generic[_T_co]):
     ) -> None: ...
 
 class AsyncEnvironment:
-    __slots__ = "_env", "_executor"
+    __slots__ = "_env", "_executor", "_reader"
 
     _env: Final[Environment]
     _executor: Final[Executor | None]
+    _reader: AsyncTransaction[bytes] | None
 
     def __init__(self, env: Environment, executor: Executor | None = None) -> None: ...
     async def __aenter__(self) -> Self: ...
@@ -85,6 +90,9 @@ class AsyncEnvironment:
         *,
         buffers: Literal[True],
     ) -> _AsyncContextWrapper[AsyncTransaction[memoryview]]: ...
+    def reader(
+        self, max_age_ms: int = 100, max_txns: int | None = None
+    ) -> AsyncTransaction[bytes]: ...
 
     # proxied sync methods
 
@@ -92,6 +100,9 @@ class AsyncEnvironment:
     def max_key_size(self) -> int: ...
     def max_readers(self) -> int: ...
     def flags(self) -> _EnvFlagsDict: ...
+    def writer(
+        self, max_batch: int = 1000, max_delay_ms: float = 0, db: _Database | None = None
+    ) -> Writer: ...
 
     # proxied async methods
 
@@ -104,10 +115,31 @@ class AsyncEnvironment:
     async def copyfd(
         self, fd: int, compact: bool = False, txn: Transaction | None = None
     ) -> None: ...
+    async def compact_to(self, path: str, swap: bool = True) -> None: ...
+    async def backup(
+        self,
+        dest: str | int,
+        compact: bool = False,
+        rate_limit_bytes: float | None = None,
+        progress: Callable[[int], object] | None = None,
+    ) -> int: ...
     async def sync(self, force: bool = False) -> None: ...
     async def readers(self) -> str: ...
+    async def reader_slots(self) -> list[tuple[int, int, int | None, int | None]]: ...
+    async def freelist_stat(self) -> _FreelistStatDict: ...
     async def reader_check(self) -> int: ...
     async def set_mapsize(self, map_size: int) -> None: ...
+    async def bulk_load(
+        self,
+        items: Iterable[tuple[Buffer, Buffer]],
+        db: _Database | None = None,
+        presorted: bool = True,
+        txn_bytes: int = 67108864,
+        grow_factor: float = 2.0,
+    ) -> tuple[int, int]: ...
+    async def run_write(
+        self, fn: Callable[[Transaction[bytes]], _T], db: _Database | None = None
+    ) -> _T: ...
     async def open_db(
         self,
         key: bytes | None = None,
@@ -167,6 +199,12 @@ class AsyncTransaction(Generic[_VT_co]):
     async def get(
         self, key: Buffer, default: _DefaultT | None = None, db: _Database | None = None
     ) -> _VT_co | _DefaultT: ...
+    async def getmany(
+        self,
+        keys: Iterable[Buffer],
+        db: _Database | None = None,
+        default: _DefaultT | None = None,
+    ) -> list[_VT_co | _DefaultT]: ...
 
     #
     async def put(
@@ -178,6 +216,37 @@ class AsyncTransaction(Generic[_VT_co]):
         append: bool = False,
         db: _Database | None = None,
     ) -> bool: ...
+    async def reserve(
+        self,
+        key: Buffer,
+        size: int,
+        overwrite: bool = True,
+        append: bool = False,
+        db: _Database | None = None,
+    ) -> memoryview | None: ...
+    async def putmany(
+        self,
+        items: Iterable[tuple[Buffer, Buffer]],
+        db: _Database | None = None,
+        dupdata: bool = True,
+        overwrite: bool = True,
+        append: bool = False,
+    ) -> tuple[int, int]: ...
+    async def incr(
+        self,
+        key: Buffer,
+        delta: int = 1,
+        db: _Database | None = None,
+        width: int = 8,
+        signed: bool = True,
+    ) -> int: ...
+    async def incrmany(
+        self,
+        pairs: Iterable[tuple[Buffer, int]],
+        db: _Database | None = None,
+        width: int = 8,
+        signed: bool = True,
+    ) -> list[int]: ...
     async def replace(
         self, key: Buffer, value: Buffer, db: _Database | None = None
     ) -> _VT_co | None: ...
@@ -185,6 +254,13 @@ class AsyncTransaction(Generic[_VT_co]):
     async def delete(
         self, key: Buffer, value: Buffer = b"", db: _Database | None = None
     ) -> bool: ...
+    async def delete_range(
+        self,
+        start: Buffer | None = None,
+        stop: Buffer | None = None,
+        db: _Database | None = None,
+        inclusive: bool = False,
+    ) -> int: ...
 
 class AsyncCursor(Generic[_VT_co]):
     __slots__ = "_cursor", "_executor", "_lock"
@@ -211,30 +287,76 @@ class AsyncCursor(Generic[_VT_co]):
     #
     @overload
     async def iternext(
-        self, *, keys: Literal[True] = True, values: Literal[True] = True
+        self,
+        *,
+        keys: Literal[True] = True,
+        values: Literal[True] = True,
+        stop: Buffer | None = None,
+        inclusive: bool = False,
+        limit: int | None = None,
     ) -> list[tuple[_VT_co, _VT_co]]: ...
     @overload
     async def iternext(
-        self, *, keys: Literal[True] = True, values: Literal[False]
+        self,
+        *,
+        keys: Literal[True] = True,
+        values: Literal[False],
+        stop: Buffer | None = None,
+        inclusive: bool = False,
+        limit: int | None = None,
     ) -> list[_VT_co]: ...
     @overload
     async def iternext(
-        self, *, keys: Literal[False], values: Literal[True] = True
+        self,
+        *,
+        keys: Literal[False],
+        values: Literal[True] = True,
+        stop: Buffer | None = None,
+        inclusive: bool = False,
+        limit: int | None = None,
     ) -> list[_VT_co]: ...
 
     # keep in sync with `iternext`
     @overload
     async def iternext_dup(
-        self, *, keys: Literal[True], values: Literal[True] = True
+        self,
+        *,
+        keys: Literal[True],
+        values: Literal[True] = True,
+        dtype: None = None,
     ) -> list[tuple[_VT_co, _VT_co]]: ...
     @overload
     async def iternext_dup(
-        self, *, keys: Literal[True], values: Literal[False]
+        self,
+        *,
+        keys: Literal[True],
+        values: Literal[False],
+        dtype: str | None = None,
     ) -> list[_VT_co]: ...
     @overload
     async def iternext_dup(
-        self, *, keys: Literal[False] = False, values: Literal[True] = True
+        self,
+        *,
+        keys: Literal[False] = False,
+        values: Literal[True] = True,
+        dtype: None = None,
     ) -> list[_VT_co]: ...
+    @overload
+    async def iternext_dup(
+        self,
+        *,
+        keys: Literal[True],
+        values: Literal[True] = True,
+        dtype: str,
+    ) -> list[tuple[_VT_co, int | float]]: ...
+    @overload
+    async def iternext_dup(
+        self,
+        *,
+        keys: Literal[False] = False,
+        values: Literal[True] = True,
+        dtype: str,
+    ) -> list[int | float]: ...
 
     # keep in sync with `iternext`
     @overload
@@ -250,33 +372,107 @@ class AsyncCursor(Generic[_VT_co]):
         self, *, keys: Literal[False], values: Literal[True]
     ) -> list[_VT_co]: ...
 
+    @overload
+    async def iterprefix(
+        self,
+        prefix: Buffer,
+        *,
+        keys: Literal[True] = True,
+        values: Literal[True] = True,
+        reverse: bool = False,
+    ) -> list[tuple[_VT_co, _VT_co]]: ...
+    @overload
+    async def iterprefix(
+        self,
+        prefix: Buffer,
+        *,
+        keys: Literal[True] = True,
+        values: Literal[False],
+        reverse: bool = False,
+    ) -> list[_VT_co]: ...
+    @overload
+    async def iterprefix(
+        self,
+        prefix: Buffer,
+        *,
+        keys: Literal[False],
+        values: Literal[True] = True,
+        reverse: bool = False,
+    ) -> list[_VT_co]: ...
+
     # keep in sync with `iternext`
     @overload
     async def iterprev(
-        self, *, keys: Literal[True] = True, values: Literal[True] = True
+        self,
+        *,
+        keys: Literal[True] = True,
+        values: Literal[True] = True,
+        stop: Buffer | None = None,
+        inclusive: bool = False,
+        limit: int | None = None,
     ) -> list[tuple[_VT_co, _VT_co]]: ...
     @overload
     async def iterprev(
-        self, *, keys: Literal[True] = True, values: Literal[False]
+        self,
+        *,
+        keys: Literal[True] = True,
+        values: Literal[False],
+        stop: Buffer | None = None,
+        inclusive: bool = False,
+        limit: int | None = None,
     ) -> list[_VT_co]: ...
     @overload
     async def iterprev(
-        self, *, keys: Literal[False], values: Literal[True] = True
+        self,
+        *,
+        keys: Literal[False],
+        values: Literal[True] = True,
+        stop: Buffer | None = None,
+        inclusive: bool = False,
+        limit: int | None = None,
     ) -> list[_VT_co]: ...
 
     # keep in sync with `iternext`
     @overload
     async def iterprev_dup(
-        self, *, keys: Literal[True], values: Literal[True] = True
+        self,
+        *,
+        keys: Literal[True],
+        values: Literal[True] = True,
+        dtype: None = None,
     ) -> list[tuple[_VT_co, _VT_co]]: ...
     @overload
     async def iterprev_dup(
-        self, *, keys: Literal[True], values: Literal[False]
+        self,
+        *,
+        keys: Literal[True],
+        values: Literal[False],
+        dtype: str | None = None,
     ) -> list[_VT_co]: ...
     @overload
     async def iterprev_dup(
-        self, *, keys: Literal[False] = False, values: Literal[True] = True
+        self,
+        *,
+        keys: Literal[False] = False,
+        values: Literal[True] = True,
+        dtype: None = None,
     ) -> list[_VT_co]: ...
+    @overload
+    async def iterprev_dup(
+        self,
+        *,
+        keys: Literal[True],
+        values: Literal[True] = True,
+        dtype: str,
+    ) -> list[tuple[_VT_co, int | float]]: ...
+    @overload
+    async def iterprev_dup(
+        self,
+        *,
+        keys: Literal[False] = False,
+        values: Literal[True] = True,
+        dtype: str,
+    ) -> list[int | float]: ...
 
     # keep in sync with `iternext`
     @overload
@@ -292,6 +488,90 @@ class AsyncCursor(Generic[_VT_co]):
         self, *, keys: Literal[False], values: Literal[True]
     ) -> list[_VT_co]: ...
 
+    #
+    @overload
+    async def iternext_batches(
+        self, n: int, *, keys: Literal[True] = True, values: Literal[True] = True
+    ) -> list[list[tuple[_VT_co, _VT_co]]]: ...
+    @overload
+    async def iternext_batches(
+        self, n: int, *, keys: Literal[True] = True, values: Literal[False]
+    ) -> list[list[_VT_co]]: ...
+    @overload
+    async def iternext_batches(
+        self, n: int, *, keys: Literal[False], values: Literal[True] = True
+    ) -> list[list[_VT_co]]: ...
+
+    # keep in sync with `iternext_batches`
+    @overload
+    async def iternext_dup_batches(
+        self, n: int, *, keys: Literal[True], values: Literal[True] = True
+    ) -> list[list[tuple[_VT_co, _VT_co]]]: ...
+    @overload
+    async def iternext_dup_batches(
+        self, n: int, *, keys: Literal[True], values: Literal[False]
+    ) -> list[list[_VT_co]]: ...
+    @overload
+    async def iternext_dup_batches(
+        self, n: int, *, keys: Literal[False] = False, values: Literal[True] = True
+    ) -> list[list[_VT_co]]: ...
+
+    # keep in sync with `iternext_batches`
+    @overload
+    async def iternext_nodup_batches(
+        self, n: int, *, keys: Literal[True] = True, values: Literal[True]
+    ) -> list[list[tuple[_VT_co, _VT_co]]]: ...
+    @overload
+    async def iternext_nodup_batches(
+        self, n: int, *, keys: Literal[True] = True, values: Literal[False] = False
+    ) -> list[list[_VT_co]]: ...
+    @overload
+    async def iternext_nodup_batches(
+        self, n: int, *, keys: Literal[False], values: Literal[True]
+    ) -> list[list[_VT_co]]: ...
+
+    # keep in sync with `iternext_batches`
+    @overload
+    async def iterprev_batches(
+        self, n: int, *, keys: Literal[True] = True, values: Literal[True] = True
+    ) -> list[list[tuple[_VT_co, _VT_co]]]: ...
+    @overload
+    async def iterprev_batches(
+        self, n: int, *, keys: Literal[True] = True, values: Literal[False]
+    ) -> list[list[_VT_co]]: ...
+    @overload
+    async def iterprev_batches(
+        self, n: int, *, keys: Literal[False], values: Literal[True] = True
+    ) -> list[list[_VT_co]]: ...
+
+    # keep in sync with `iternext_batches`
+    @overload
+    async def iterprev_dup_batches(
+        self, n: int, *, keys: Literal[True], values: Literal[True] = True
+    ) -> list[list[tuple[_VT_co, _VT_co]]]: ...
+    @overload
+    async def iterprev_dup_batches(
+        self, n: int, *, keys: Literal[True], values: Literal[False]
+    ) -> list[list[_VT_co]]: ...
+    @overload
+    async def iterprev_dup_batches(
+        self, n: int, *, keys: Literal[False] = False, values: Literal[True] = True
+    ) -> list[list[_VT_co]]: ...
+
+    # keep in sync with `iternext_batches`
+    @overload
+    async def iterprev_nodup_batches(
+        self, n: int, *, keys: Literal[True] = True, values: Literal[True]
+    ) -> list[list[tuple[_VT_co, _VT_co]]]: ...
+    @overload
+    async def iterprev_nodup_batches(
+        self, n: int, *, keys: Literal[True] = True, values: Literal[False] = False
+    ) -> list[list[_VT_co]]: ...
+    @overload
+    async def iterprev_nodup_batches(
+        self, n: int, *, keys: Literal[False], values: Literal[True]
+    ) -> list[list[_VT_co]]: ...
+
     # proxied sync methods
 
     def key(self) -> _VT_co: ...
@@ -316,7 +596,25 @@ class AsyncCursor(Generic[_VT_co]):
     async def set_range(self, key: Buffer, /) -> bool: ...
     async def set_range_dup(self, key: Buffer, value: Buffer) -> bool: ...
     async def delete(self, dupdata: bool = False) -> bool: ...
+    async def deletemulti(
+        self,
+        keys: Iterable[Buffer | tuple[Buffer, Buffer]],
+        dupdata: bool = False,
+    ) -> tuple[int, int]: ...
     async def count(self) -> int: ...
+    async def values_array(self, dtype: str) -> array.array[Any]: ...
+    async def count_range(
+        self,
+        start: Buffer | None = None,
+        stop: Buffer | None = None,
+        dup: bool = True,
+    ) -> int: ...
+    async def export_columns(
+        self,
+        start: Buffer | None = None,
+        stop: Buffer | None = None,
+        limit: int | None = None,
+    ) -> tuple[memoryview, memoryview, memoryview, memoryview]: ...
     async def put(
         self,
         key: Buffer,
@@ -325,6 +623,13 @@ class AsyncCursor(Generic[_VT_co]):
         overwrite: bool = True,
         append: bool = False,
     ) -> bool: ...
+    async def reserve(
+        self,
+        key: Buffer,
+        size: int,
+        overwrite: bool = True,
+        append: bool = False,
+    ) -> memoryview | None: ...
     async def putmulti(
         self,
         items: Iterable[tuple[Buffer, Buffer]],
@@ -332,6 +637,21 @@ class AsyncCursor(Generic[_VT_co]):
         overwrite: bool = True,
         append: bool = False,
     ) -> tuple[int, int]: ...
+    async def putmulti_columns(
+        self,
+        keys: Buffer,
+        key_offsets: Buffer | None = None,
+        values: Buffer | None = None,
+        value_offsets: Buffer | None = None,
+        key_size: int = 0,
+        value_size: int = 0,
+        dupdata: bool = True,
+        overwrite: bool = True,
+        append: bool = False,
+    ) -> tuple[int, int]: ...
+    async def putmulti_dupfixed(
+        self, key: Buffer, values: Buffer, item_size: int
+    ) -> int: ...
     async def replace(self, key: Buffer, val: Buffer) -> _VT_co | None: ...
     async def pop(self, key: Buffer) -> _VT_co | None: ...
 
@@ -349,7 +669,19 @@ class AsyncCursor(Generic[_VT_co]):
         dupfixed_bytes: int | None = None,
         keyfixed: Literal[False] = False,
         values: Literal[True] = True,
+        dtype: None = None,
     ) -> list[tuple[_VT_co, _VT_co]]: ...
+    @overload  # dtype given
+    async def getmulti(
+        self,
+        keys: Iterable[Buffer],
+        dupdata: bool = False,
+        dupfixed_bytes: int | None = None,
+        keyfixed: Literal[False] = False,
+        values: Literal[True] = True,
+        *,
+        dtype: str,
+    ) -> list[tuple[_VT_co, int | float]]: ...
     @overload  # keyfixed=False (default), values=False
     async def getmulti(
         self,
@@ -359,6 +691,7 @@ class AsyncCursor(Generic[_VT_co]):
         keyfixed: Literal[False] = False,
         *,
         values: Literal[False],
+        dtype: str | None = None,
     ) -> list[_VT_co]: ...
     @overload  # keyfixed=True  (positional)
     async def getmulti(
@@ -368,6 +701,7 @@ class AsyncCursor(Generic[_VT_co]):
         dupfixed_bytes: int,
         keyfixed: Literal[True],
         values: bool = True,
+        dtype: None = None,
     ) -> memoryview: ...
     @overload  # keyfixed=True  (keyword)
     async def getmulti(
@@ -378,4 +712,5 @@ class AsyncCursor(Generic[_VT_co]):
         dupfixed_bytes: int,
         keyfixed: Literal[True],
         values: bool = True,
+        dtype: None = None,
     ) -> memoryview: ...
@@ -26,13 +26,20 @@ CPython/CFFI wrapper for OpenLDAP's "Lightning" MDB database.
 Please see https://lmdb.readthedocs.io/
 """
 
+import array
 import errno
+import gc
 import inspect
+import operator
 import os
 import sys
 import threading
+import time
+import weakref
 
 is_win32 = sys.platform == 'win32'
+# Whether objects are freed as soon as they become unreachable.
+_REFCOUNTED = sys.implementation.name == 'cpython'
 if is_win32:
     import msvcrt
 
@@ -243,11 +250,13 @@ _CFFI_CDEF = '''
     #define MDB_APPENDDUP ...
     #define MDB_CP_COMPACT ...
     #define MDB_CREATE ...
+    #define MDB_CURRENT ...
     #define MDB_DUPFIXED ...
     #define MDB_DUPSORT ...
     #define MDB_INTEGERDUP ...
     #define MDB_INTEGERKEY ...
     #define MDB_MAPASYNC ...
+    #define MDB_MULTIPLE ...
     #define MDB_NODUPDATA ...
     #define MDB_NOLOCK ...
     #define MDB_NOMEMINIT ...
@@ -258,6 +267,7 @@ _CFFI_CDEF = '''
     #define MDB_NOSYNC ...
     #define MDB_NOTLS ...
     #define MDB_RDONLY ...
+    #define MDB_RESERVE ...
     #define MDB_REVERSEKEY ...
     #define MDB_WRITEMAP ...
 
@@ -280,6 +290,18 @@ _CFFI_CDEF = '''
     static int pymdb_cursor_put(MDB_cursor *cursor,
                                 char *key_s, size_t keylen,
                                 char *val_s, size_t vallen, int flags);
+    static int pymdb_cursor_put_multiple(MDB_cursor *cursor,
+                                         char *key_s, size_t keylen,
+                                         char *vals_s, size_t item_size,
+                                         size_t *count);
+    static int pymdb_reserve(MDB_txn *txn, MDB_dbi dbi,
+                             char *key_s, size_t keylen,
+                             MDB_val *val, unsigned int flags);
+    static int pymdb_cursor_reserve(MDB_cursor *cursor,
+                                    char *key_s, size_t keylen,
+                                    MDB_val *val, unsigned int flags);
+    static int pymdb_cmp_bound(MDB_txn *txn, MDB_dbi dbi, unsigned int flags,
+                               MDB_val *key, char *bound_s, size_t bound_len);
 
     // Prefaults a range
     static void preload(int rc, void *x, size_t size);
@@ -350,6 +372,51 @@ _CFFI_VERIFY = '''
         return mdb_cursor_put(cursor, &tmpkey, &tmpval, flags);
     }
 
+    // Store `*count` fixed-size duplicates of a key with MDB_MULTIPLE,
+    // updating `*count` to the number stored.
+    static int pymdb_cursor_put_multiple(MDB_cursor *cursor,
+                                         char *key_s, size_t keylen,
+                                         char *vals_s, size_t item_size,
+                                         size_t *count)
+    {
+        MDB_val tmpkey = {keylen, key_s};
+        MDB_val data[2] = {{item_size, vals_s}, {*count, NULL}};
+        int rc = mdb_cursor_put(cursor, &tmpkey, data, MDB_MULTIPLE);
+        *count = data[1].mv_size;
+        return rc;
+    }
+
+    // Reserve `val->mv_size` bytes for a key with MDB_RESERVE, setting
+    // `val->mv_data` to the space reserved.
+    static int pymdb_reserve(MDB_txn *txn, MDB_dbi dbi,
+                             char *key_s, size_t keylen,
+                             MDB_val *val, unsigned int flags)
+    {
+        MDB_val key = {keylen, key_s};
+        return mdb_put(txn, dbi, &key, val, flags | MDB_RESERVE);
+    }
+
+    static int pymdb_cursor_reserve(MDB_cursor *cursor,
+                                    char *key_s, size_t keylen,
+                                    MDB_val *val, unsigned int flags)
+    {
+        MDB_val tmpkey = {keylen, key_s};
+        return mdb_cursor_put(cursor, &tmpkey, val, flags | MDB_RESERVE);
+    }
+
+    // Compare a stored key against a range bound with the database's
+    // comparator. The MDB_INTEGERKEY comparator assumes equal widths, so
+    // differing widths are ordered by width instead.
+    static int pymdb_cmp_bound(MDB_txn *txn, MDB_dbi dbi, unsigned int flags,
+                               MDB_val *key, char *bound_s, size_t bound_len)
+    {
+        MDB_val bound = {bound_len, bound_s};
+        if((flags & MDB_INTEGERKEY) && key->mv_size != bound_len) {
+            return (key->mv_size < bound_len) ? -1 : 1;
+        }
+        return mdb_cmp(txn, dbi, key, &bound);
+    }
+
 '''
 
 if not lmdb._reading_docs():
@@ -557,6 +624,62 @@ def _mvstr(mv):
 def preload(mv):
     _lib.preload(0, mv.mv_data, mv.mv_size)
 
+_DTYPES = 'bBhHiIlLqQfd'
+
+def _check_dtype(dtype):
+    """Raise :py:exc:`ValueError` unless `dtype` is an :py:mod:`array`
+    numeric typecode, returning its item size."""
+    if not (isinstance(dtype, str) and len(dtype) == 1 and dtype in _DTYPES):
+        raise ValueError("dtype must be one of %r" % (_DTYPES,))
+    return array.array(dtype).itemsize
+
+def _mvdtype(mv, dtype, itemsize):
+    """Decode MDB_val cdata `mv` as a single number of typecode `dtype`."""
+    if mv.mv_size != itemsize:
+        raise _error("dtype", _lib.MDB_BAD_VALSIZE)
+    return memoryview(_mvbuf(mv)).cast(dtype)[0]
+
+def _key_size_ok(env, db_flags, size, width=0):
+    """Return ``True`` if a caller-supplied key of `size` bytes may be
+    compared with stored keys: it is non-empty, no longer than the maximum
+    key size, and on `integerkey=True` databases an unsigned int or
+    ``size_t`` of `width` bytes, if given."""
+    if not size or size > env.max_key_size():
+        return False
+    if db_flags & _lib.MDB_INTEGERKEY:
+        if size not in (_ffi.sizeof('unsigned int'), _ffi.sizeof('size_t')):
+            return False
+        if width and size != width:
+            return False
+    return True
+
+def _column(data, offsets, size, name):
+    """Return `(ptr, bounds)` for one column of
+    :py:meth:`Cursor.putmulti_columns`, where `ptr` points into the `data`
+    buffer and element `i` spans ``bounds[i]:bounds[i+1]``."""
+    if (offsets is None) == (not size):
+        raise TypeError("exactly one of '%s_offsets' and '%s_size' required"
+                        % (name, name))
+    mv = memoryview(data).cast('B')
+    ptr = _ffi.from_buffer(mv)
+    if size:
+        if len(mv) % size:
+            raise ValueError("%s buffer length is not a multiple of %s_size"
+                             % (name, name))
+        return ptr, range(0, len(mv) + 1, size)
+    offs = memoryview(offsets)
+    if (offs.format.lstrip('@=<') not in ('i', 'I', 'l', 'L', 'q', 'Q') or
+            offs.itemsize not in (4, 8) or offs.ndim != 1 or not len(offs)):
+        raise ValueError("%s_offsets must be a non-empty int32 or int64 buffer"
+                         % (name,))
+    bounds = offs.tolist()
+    prev = 0
+    for i, off in enumerate(bounds):
+        if off < prev or off > len(mv):
+            raise ValueError("%s_offsets element #%d out of range" % (name, i))
+        prev = off
+    return ptr, bounds
+
 def enable_drop_gil():
     """Deprecated."""
 
@@ -715,14 +838,39 @@ class Environment:
             and must ensure that no readers are using old transactions while a
             writer is active. The simplest approach is to use an exclusive lock
             so that no readers may be active at all when a writer begins.
+
+        `auto_grow`:
+            If ``True``, when the write transaction of :py:meth:`run_write`
+            fails with :py:class:`MapFullError`, the map is grown using
+            :py:meth:`set_mapsize` once the transaction has been aborted, and
+            the transaction is retried. Like :py:meth:`set_mapsize`, growing
+            invalidates every other open transaction, cursor and iterator on
+            the environment. Transactions from :py:meth:`begin` never grow
+            the map: ending them leaves other transactions untouched.
+
+        `grow_step`:
+            Number of bytes added to the map by each growth when
+            `auto_grow=True`. If 0, the map size is doubled.
+
+        `max_map_size`:
+            If nonzero, `auto_grow` never grows the map beyond this size; once
+            it is reached, :py:class:`MapFullError` is left to the caller.
     """
     def __init__(self, path, map_size=10485760, subdir=True,
                  readonly=False, metasync=True, sync=True, map_async=False,
                  mode=O_0755, create=True, readahead=True, writemap=False,
                  meminit=True, max_readers=126, max_dbs=0, max_spare_txns=1,
-                 lock=True):
+                 lock=True, auto_grow=False, grow_step=0, max_map_size=0):
         self._max_spare_txns = max_spare_txns
         self._spare_txns = []
+        self._readers = None
+        self._auto_grow = auto_grow
+        self._grow_step = grow_step
+        self._max_map_size = max_map_size
+        self._map_full = False
+        # Transactions whose last reserve() buffer is still alive; see
+        # _check_reserved().
+        self._reserved_txns = set()
 
         envpp = _ffi.new('MDB_env **')
 
@@ -738,6 +886,13 @@ class Environment:
         # close() on another thread can block (no polling) until the
         # robust write mutex is unlocked on its owning thread.  #465.
         self._write_txn_cond = threading.Condition()
+        # Long C calls that run without _close_lock, such as a copy, count
+        # themselves here so close() and set_mapsize() wait for them, like
+        # active_ops in cpython.c. While _draining is set, new ones are
+        # refused.
+        self._active_ops = 0
+        self._draining = False
+        self._active_ops_cond = threading.Condition(self._close_lock)
 
         self.set_mapsize(map_size)
 
@@ -850,6 +1005,7 @@ class Environment:
             raise Error("Cannot set_mapsize while a write transaction is active")
 
         with self._close_lock:
+            self._drain_ops()
             if self._env is _invalid:
                 raise Error("environment is closed")
 
@@ -909,6 +1065,67 @@ class Environment:
 
             self._spare_txns = []
 
+    def _grow_map(self):
+        """Called by run_write() once its write transaction has ended: grow
+        the map if an operation in it failed with MDB_MAP_FULL and
+        `auto_grow` is enabled."""
+        if not self._map_full:
+            return
+        self._map_full = False
+        if not (self._auto_grow and self._env):
+            return
+        size = self.info()['map_size']
+        if self._grow_step:
+            new_size = size + self._grow_step
+        else:
+            new_size = size * 2
+        if self._max_map_size:
+            new_size = min(new_size, self._max_map_size)
+        if new_size > size:
+            self.set_mapsize(new_size)
+
+    def _check_reserved(self):
+        """Release the :py:meth:`Transaction.reserve` view of every
+        transaction, failing with BufferError while a buffer derived from one
+        is still alive, since changing or ending its transaction would move
+        or free the memory it points to."""
+        for txn in list(self._reserved_txns):
+            txn._release_reserved()
+        if self._reserved_txns and not _REFCOUNTED:
+            # Dead buffers are only finalized by a collection.
+            gc.collect()
+        if self._reserved_txns:
+            raise BufferError('A buffer derived from a reserve() view is '
+                              'still in use')
+
+    def _begin_op(self):
+        """Register a C call that runs without holding _close_lock, failing
+        if the environment is closed or being closed or resized."""
+        with self._close_lock:
+            if not self._env:
+                raise Error("environment is closed")
+            if self._draining:
+                raise _error("environment is being closed or resized",
+                             _lib.EINVAL)
+            self._active_ops += 1
+
+    def _end_op(self):
+        with self._close_lock:
+            self._active_ops -= 1
+            if not self._active_ops:
+                self._active_ops_cond.notify_all()
+
+    def _drain_ops(self):
+        """With _close_lock held, wait for calls registered by _begin_op() to
+        finish, refusing new ones meanwhile."""
+        if self._active_ops:
+            self._draining = True
+            try:
+                while self._active_ops:
+                    self._active_ops_cond.wait()
+            finally:
+                self._draining = False
+
     def close(self):
         """Close the environment, invalidating any open iterators, cursors, and
         transactions. Repeat calls to :py:meth:`close` have no effect.
@@ -917,6 +1134,8 @@ class Environment:
         <http://lmdb.tech/doc/group__mdb.html#ga4366c43ada8874588b6a62fbda2d1e95>`_
         """
         if self._env:
+            if self._reserved_txns:
+                self._check_reserved()
             # Issue #465: LMDB requires all transactions closed before
             # mdb_env_close, and a write transaction belongs to the OS
             # thread that began it (MDB_NOTLS).  On Linux its robust
@@ -938,6 +1157,7 @@ class Environment:
                     self._write_txn_cond.wait()
 
             with self._close_lock:
+                self._drain_ops()
                 if not self._env:
                     return
 
@@ -991,6 +1211,9 @@ class Environment:
                     self._dbs.clear()
                 self._dbs = None
                 self._db = None
+                # Cached reader() transactions hold references to the
+                # environment.
+                self._readers = None
 
                 env = self._env
                 self._env = _invalid
@@ -1042,9 +1265,12 @@ class Environment:
             raise TypeError("txn argument only compatible with compact=True")
 
         encoded = path.encode(sys.getfilesystemencoding())
-        # Hold _close_lock so close() or set_mapsize() cannot free/remap the
-        # environment while the copy is reading it.  Issue #475.
-        with self._close_lock:
+        # A copy may run for minutes, so rather than holding _close_lock,
+        # which would stall every other operation, register it so close() or
+        # set_mapsize() waits for it before freeing or remapping the
+        # environment.  Issue #475.
+        self._begin_op()
+        try:
             if _have_patched_lmdb:
                 rc = _lib.mdb_env_copy3(self._env, encoded, flags, txn._txn if txn else _ffi.NULL)
                 if rc:
@@ -1053,6 +1279,8 @@ class Environment:
                 rc = _lib.mdb_env_copy2(self._env, encoded, flags)
                 if rc:
                     raise _error("mdb_env_copy2", rc)
+        finally:
+            self._end_op()
 
     def copyfd(self, fd, compact=False, txn=None):
         """Copy a consistent version of the environment to file descriptor
@@ -1083,9 +1311,12 @@ class Environment:
         if txn and not flags:
             raise TypeError("txn argument only compatible with compact=True")
 
-        # Hold _close_lock so close() or set_mapsize() cannot free/remap the
-        # environment while the copy is reading it.  Issue #475.
-        with self._close_lock:
+        # A copy may run for minutes, so rather than holding _close_lock,
+        # which would stall every other operation, register it so close() or
+        # set_mapsize() waits for it before freeing or remapping the
+        # environment.  Issue #475.
+        self._begin_op()
+        try:
             if _have_patched_lmdb:
                 rc = _lib.mdb_env_copyfd3(self._env, fd, flags, txn._txn if txn else _ffi.NULL)
                 if rc:
@@ -1094,6 +1325,87 @@ class Environment:
                 rc = _lib.mdb_env_copyfd2(self._env, fd, flags)
                 if rc:
                     raise _error("mdb_env_copyfd2", rc)
+        finally:
+            self._end_op()
+
+    def compact_to(self, path, swap=True):
+        """Write a compacted copy of the environment to `path`, as by
+        ``copy(path, compact=True)``, and unless `swap` is ``False``, replace
+        the environment's data file with it.
+
+        When swapping, `path` is scratch space on the same filesystem as the
+        environment: a directory for environments opened with
+        ``subdir=True``, otherwise a file name. Readers continue while the
+        copy is written, and writers wait for it, since the write lock is
+        held throughout. The copy is then flushed to disk and atomically
+        renamed over the data file, and the environment is closed, so that
+        its transactions, cursors and databases raise :py:exc:`Error` and
+        users know to reopen it with :py:func:`lmdb.open`.
+
+        If a writer committed before the environment could be closed, the
+        copy is stale. It is then left at `path` and :py:exc:`Error` is
+        raised. No other process may have the environment open while
+        swapping, since it would keep using the old data file.
+
+        ::
+
+            >>> env.compact_to('/srv/db/compact.tmp')
+            >>> env = lmdb.open('/srv/db')
+        """
+        from lmdb._copy import compact_to
+        compact_to(self, path, swap)
+
+    def backup(self, dest, compact=False, rate_limit_bytes=None,
+               progress=None):
+        """Stream a consistent copy of the environment to `dest` at a bounded
+        rate, returning the number of bytes written. Unlike :py:meth:`copy`,
+        which reads and writes as fast as the disks allow, this keeps a
+        backup of a large environment from starving concurrent readers of
+        I/O.
+
+        The copy is written by :py:meth:`copyfd` on a background thread into
+        a pipe, which the calling thread drains into `dest`, pausing as
+        needed to hold the average rate to `rate_limit_bytes`. Since the pipe
+        buffers little, the copy's reads are paced as well. If the copy
+        fails, or `progress` raises, the copy is stopped, a partially written
+        file is removed and the exception is raised.
+
+        The copy reads through one read transaction lasting the whole backup.
+        Like any long-lived reader, it pins the pages writers free meanwhile,
+        so the data file grows rather than reusing them until the backup
+        ends: a low `rate_limit_bytes` on a busy environment trades I/O for
+        disk space. Other readers and writers proceed, but :py:meth:`close`
+        and :py:meth:`set_mapsize` wait for the copy to finish.
+
+            `dest`:
+                Destination directory as for :py:meth:`copy`, or file name
+                for environments opened with ``subdir=False``. The data file
+                must not already exist. Alternatively an open file descriptor
+                to write to, as for :py:meth:`copyfd`, which is not closed.
+
+            `compact`:
+                If ``True``, perform compaction while copying, as for
+                :py:meth:`copy`.
+
+            `rate_limit_bytes`:
+                Maximum average bytes written per second, or ``None`` for no
+                limit.
+
+            `progress`:
+                If not ``None``, called from the calling thread with the
+                number of bytes written so far after each write. It should
+                return quickly, and must not close or resize the environment,
+                since that waits for the copy, which waits for this thread.
+
+        ::
+
+            >>> def report(n):
+            ...     print('%d MiB' % (n >> 20))
+            >>> env.backup('/backup/db', rate_limit_bytes=50 << 20,
+            ...            progress=report)
+        """
+        from lmdb._copy import backup
+        return backup(self, dest, compact, rate_limit_bytes, progress)
 
     def sync(self, force=False):
         """Flush the data buffers to disk.
@@ -1250,6 +1562,143 @@ class Environment:
         finally:
             del _callbacks.msg_func
 
+    def reader_slots(self):
+        """Return the active entries of the reader lock table as a list of
+        ``(pid, tid, txnid, lag)`` tuples, where `lag` is the number of write
+        transactions committed since the reader's snapshot. Long-lived
+        readers with a large `lag` stop pages freed since their snapshot from
+        being reused, growing the map.
+
+        `txnid` and `lag` are ``None`` for slots held by reset transactions,
+        such as spares kept for reuse. Unlike :py:meth:`readers`, this is
+        cheap enough to poll; use :py:meth:`reader_check` to clear slots left
+        by crashed processes.
+
+        ::
+
+            >>> [s for s in env.reader_slots() if s[3] is not None and s[3] > 1000]
+            [(4242, 140221380847424, 10511, 2048)]
+        """
+        info = _ffi.new('MDB_envinfo *')
+        _callbacks.msg_func = []
+        try:
+            # Issue #475: serialize against close()/set_mapsize().
+            with self._close_lock:
+                rc = _lib.mdb_env_info(self._env, info)
+                if rc:
+                    raise _error("mdb_env_info", rc)
+                rc = _lib.mdb_reader_list(self._env, _msg_func, _ffi.NULL)
+                if rc:
+                    raise _error("mdb_reader_list", rc)
+            lines = _callbacks.msg_func
+        finally:
+            del _callbacks.msg_func
+        last_txnid = info.me_last_txnid
+        slots = []
+        # The header and "(no ...)" lines do not start with a number.
+        for line in lines:
+            fields = line.split()
+            if len(fields) != 3 or not fields[0].isdigit():
+                continue
+            pid = int(fields[0])
+            tid = int(fields[1], 16)
+            if fields[2] == '-':
+                slots.append((pid, tid, None, None))
+            else:
+                txnid = int(fields[2])
+                slots.append((pid, tid, txnid, max(0, last_txnid - txnid)))
+        return slots
+
+    def freelist_stat(self):
+        """Walk the freelist, the internal database of pages freed by past
+        write transactions, and return a dict describing it. A map that keeps
+        growing while its live data does not usually has a large freelist
+        whose pages are still pinned by long-lived readers; see
+        :py:meth:`reader_slots`.
+
+        +-------------------+---------------------------------------------+
+        | ``entries``       | Number of freelist records, one per freeing |
+        |                   | transaction.                                |
+        +-------------------+---------------------------------------------+
+        | ``free_pages``    | Total pages on the freelist.                |
+        +-------------------+---------------------------------------------+
+        | ``pending_pages`` | Pages that cannot be reused yet, since a    |
+        |                   | reader's snapshot may still refer to them.  |
+        +-------------------+---------------------------------------------+
+        | ``pending``       | Dict mapping the ID of each transaction     |
+        |                   | whose freed pages are pending to their      |
+        |                   | count.                                      |
+        +-------------------+---------------------------------------------+
+        | ``largest_run``   | Longest run of consecutive reusable pages,  |
+        |                   | bounding the largest value that can be      |
+        |                   | stored without growing the map.             |
+        +-------------------+---------------------------------------------+
+
+        The walk runs in a temporary read-only transaction and takes time
+        proportional to the size of the freelist.
+        """
+        txn = self.begin()
+        try:
+            # As in mdb_find_oldest(), pages freed by a transaction can only
+            # be reused once no reader's snapshot is that transaction or
+            # newer.
+            oldest = txn.id()
+            for _, _, txnid, _ in self.reader_slots():
+                if txnid is not None and txnid < oldest:
+                    oldest = txnid
+
+            curpp = _ffi.new('MDB_cursor **')
+            # dbi 0 is FREE_DBI, keyed by the freeing txnid, each value an
+            # IDL: a count followed by that many page numbers.
+            rc = _lib.mdb_cursor_open(txn._txn, 0, curpp)
+            if rc:
+                raise _error("mdb_cursor_open", rc)
+            cur = curpp[0]
+            key = _ffi.new('MDB_val *')
+            val = _ffi.new('MDB_val *')
+            id_size = _ffi.sizeof('size_t')
+            entries = free_pages = pending_pages = 0
+            pending = {}
+            pages = []
+            try:
+                while True:
+                    rc = _lib.mdb_cursor_get(cur, key, val, _lib.MDB_NEXT)
+                    if rc == _lib.MDB_NOTFOUND:
+                        break
+                    if rc:
+                        raise _error("mdb_cursor_get", rc)
+                    ids = _ffi.cast('size_t *', val.mv_data)
+                    if (key.mv_size != id_size or val.mv_size < id_size or
+                            ids[0] > val.mv_size // id_size - 1):
+                        raise _error("freelist_stat", _lib.MDB_CORRUPTED)
+                    txnid = _ffi.cast('size_t *', key.mv_data)[0]
+                    n = ids[0]
+                    entries += 1
+                    free_pages += n
+                    if txnid >= oldest:
+                        pending_pages += n
+                        pending[txnid] = n
+                    else:
+                        pages.extend(_ffi.unpack(ids + 1, n))
+            finally:
+                _lib.mdb_cursor_close(cur)
+        finally:
+            txn.abort()
+
+        # Each IDL is contiguous only within itself; runs may span records.
+        pages.sort()
+        largest = run = 0
+        for i, pgno in enumerate(pages):
+            run = run + 1 if i and pgno == pages[i - 1] + 1 else 1
+            largest = max(largest, run)
+        return {
+            'entries': entries,
+            'free_pages': free_pages,
+            'pending_pages': pending_pages,
+            'pending': pending,
+            'largest_run': largest,
+        }
+
     def reader_check(self):
         """Search the reader lock table for stale entries, for example due to a
         crashed process. Returns the number of stale entries that were cleared.
@@ -1424,6 +1873,208 @@ class Environment:
         """Shortcut for :py:class:`lmdb.Transaction`"""
         return Transaction(self, db, parent, write, buffers)
 
+    def bulk_load(self, items, db=None, presorted=True, txn_bytes=64 << 20,
+                  grow_factor=2.0):
+        """Store each `(key, value)` 2-tuple from the iterable `items`,
+        committing a write transaction after every `txn_bytes` bytes of keys
+        and values. Elements must be exactly 2-tuples, as for
+        :py:meth:`Transaction.putmany`, which writes each chunk.
+
+        If the map fills up, the failed chunk's transaction is aborted, the
+        map size is multiplied by `grow_factor` using :py:meth:`set_mapsize`,
+        and the chunk is retried. Chunks committed before the failure are
+        kept. Since :py:meth:`set_mapsize` invalidates every open
+        transaction, no other transaction should be active while loading.
+
+        Returns a tuple `(consumed, added)`, where `consumed` is the number of
+        elements read from the iterable, and `added` is the number of new
+        records stored.
+
+            `items`:
+                Iterable to read records from. It is read lazily, so at most
+                one chunk is held in memory.
+
+            `db`:
+                Named database to operate on. If unspecified, defaults to the
+                main database.
+
+            `presorted`:
+                If ``True``, `items` must be sorted in the database's key
+                order, with every key greater than any already stored, and
+                records are appended with `MDB_APPEND` (`MDB_APPENDDUP` for
+                `dupsort=True` databases), building the B-tree without
+                comparisons or page splits. An out-of-order record raises
+                :py:exc:`ValueError`, and its chunk is not stored, though
+                chunks before it remain committed.
+
+            `txn_bytes`:
+                Approximate number of key and value bytes written per
+                transaction, bounding the memory used for dirty pages.
+
+            `grow_factor`:
+                Factor, greater than 1, by which the map size is multiplied
+                each time the map fills up.
+
+        ::
+
+            >>> env.bulk_load((b'%08d' % i, b'value') for i in range(10**7))
+            (10000000, 10000000)
+        """
+        if not grow_factor > 1:
+            raise ValueError("grow_factor must be greater than 1")
+        if txn_bytes <= 0:
+            raise ValueError("txn_bytes must be positive")
+        it = iter(items)
+        end = object()
+        consumed = 0
+        added = 0
+        more = True
+        while more:
+            chunk = []
+            nbytes = 0
+            while nbytes < txn_bytes:
+                item = next(it, end)
+                if item is end:
+                    more = False
+                    break
+                if type(item) is not tuple or len(item) != 2:
+                    raise TypeError("bulk_load() elements must be 2-tuples")
+                nbytes += len(item[0]) + len(item[1])
+                chunk.append(item)
+            if not chunk:
+                break
+            while True:
+                try:
+                    with self.begin(db=db, write=True) as txn:
+                        _, chunk_added = txn.putmany(chunk, db=db,
+                                                     append=presorted)
+                        # MDB_APPEND refuses a record that is out of order
+                        # as though it already existed.
+                        if presorted and chunk_added < len(chunk):
+                            raise ValueError("bulk_load() items out of "
+                                             "order with presorted=True")
+                    break
+                except MapFullError:
+                    map_size = self.info()['map_size']
+                    self.set_mapsize(int(map_size * grow_factor))
+            consumed += len(chunk)
+            added += chunk_added
+        return consumed, added
+
+    def run_write(self, fn, db=None):
+        """Call `fn(txn)` with a new write transaction, committing it if
+        `fn` returns normally, and returning the result of `fn`. If `fn`
+        raises, the transaction is aborted and the exception propagates.
+
+        When the environment was opened with `auto_grow=True` and the
+        transaction fails with :py:class:`MapFullError`, the map is grown
+        once it has been aborted, and `fn` is called again with a fresh
+        transaction, until it succeeds or the map can grow no further. `fn`
+        must therefore be safe to call more than once.
+
+            `fn`:
+                Callable taking the :py:class:`Transaction`.
+
+            `db`:
+                Default named database for the transaction, as for
+                :py:meth:`begin`.
+
+        ::
+
+            >>> env = lmdb.open('/tmp/test', auto_grow=True)
+            >>> env.run_write(lambda txn: txn.put(b'key', b'value'))
+            True
+        """
+        while True:
+            map_size = self.info()['map_size']
+            txn = self.begin(db=db, write=True)
+            try:
+                result = fn(txn)
+                txn.commit()
+                return result
+            except BaseException as e:
+                txn.abort()
+                # Grow only here, with no transaction of ours left open,
+                # rather than whenever a write transaction ends: the resize
+                # invalidates every transaction on the environment.
+                if isinstance(e, MapFullError):
+                    self._map_full = True
+                if not self._map_full:
+                    raise
+                self._grow_map()
+                if self.info()['map_size'] == map_size:
+                    raise
+
+    def reader(self, max_age_ms=100, max_txns=None):
+        """Return the calling thread's cached read-only
+        :py:class:`Transaction`, beginning a new one if there is none yet or
+        it has gone stale. Hot read paths that tolerate a slightly old
+        snapshot can call this per request instead of :py:meth:`begin`,
+        avoiding most transaction setup and reader table traffic.
+
+        The cached transaction is replaced once it is older than
+        `max_age_ms`, once the environment's last committed transaction ID
+        has advanced more than `max_txns` past its snapshot, or once it is
+        no longer valid, for example after :py:meth:`Transaction.abort` or
+        :py:meth:`set_mapsize`. A replaced transaction is not aborted, and
+        stays usable while the caller holds a reference to it.
+
+        Callers should not commit or abort the returned transaction, nor use
+        it as a context manager, since that ends it for every later call on
+        the thread. Each thread's transaction holds a reader slot and keeps
+        the environment alive until :py:meth:`close`.
+
+            `max_age_ms`:
+                Maximum age of the snapshot in milliseconds.
+
+            `max_txns`:
+                Maximum number of write transactions the snapshot may lag
+                behind, checked with `mdb_env_info()` on each call. If
+                ``None``, only `max_age_ms` is checked.
+
+        ::
+
+            >>> txn = env.reader(max_age_ms=50)
+            >>> txn.get(b'key')
+        """
+        if max_txns is not None and max_txns < 0:
+            raise OverflowError("max_txns must not be negative")
+        readers = self._readers
+        if readers is None:
+            readers = self._readers = threading.local()
+        now = time.monotonic()
+        # Entries are (Transaction, deadline, txnid at begin).
+        cached = getattr(readers, 'txn', None)
+        if cached is not None:
+            txn, deadline, txnid = cached
+            if txn._txn and now < deadline:
+                if max_txns is None:
+                    return txn
+                info = _ffi.new('MDB_envinfo *')
+                with self._close_lock:
+                    rc = _lib.mdb_env_info(self._env, info)
+                if rc:
+                    raise _error("mdb_env_info", rc)
+                if info.me_last_txnid - txnid <= max_txns:
+                    return txn
+        # The stale transaction is not aborted, since the caller may still
+        # be using it; replacing the entry drops the cache's reference.
+        txn = self.begin()
+        readers.txn = (txn, now + max_age_ms / 1000.0, txn.id())
+        return txn
+
+    def writer(self, max_batch=1000, max_delay_ms=0, db=None):
+        """Start a :py:class:`Writer`: a background thread accepting
+        put, replace and delete requests from any thread and committing each
+        batch of up to `max_batch` requests in a single write transaction.
+        Under many concurrent writers this amortizes the commit's disk flush
+        and the write lock handoff across the batch.
+
+        See :py:class:`Writer` for the meaning of the arguments.
+        """
+        from lmdb._writer import Writer
+        return Writer(self, max_batch, max_delay_ms, db)
+
 
 class _Database:
     """
@@ -1546,6 +2197,10 @@ class Transaction:
     # Mutations occurred since transaction start. Required to know when Cursor
     # key/value must be refreshed.
     _mutations = 0
+    # (weakref to the memoryview, finalizer of its buffer) for the last
+    # reserve(). Released by the next mutation, since it points into a page
+    # the mutation may move.
+    _reserved = None
 
     def __init__(self, env, db=None, parent=None, write=False, buffers=False):
         self._pyenv = env  # hold ref
@@ -1558,6 +2213,8 @@ class Transaction:
         if parent:
             self._parent = parent
             parent_txn = parent._txn
+            # The child takes over the parent's dirty pages.
+            parent._mutated()
         else:
             parent_txn = _ffi.NULL
 
@@ -1585,6 +2242,7 @@ class Transaction:
 
                 if not parent:
                     env._write_txn_tid = threading.get_ident()
+                    env._map_full = False
                 txnpp = _ffi.new('MDB_txn **')
                 rc = _lib.mdb_txn_begin(self._env, parent_txn, 0, txnpp)
                 if rc:
@@ -1617,7 +2275,58 @@ class Transaction:
                         raise _error("mdb_txn_begin", rc)
                     self._txn = txnpp[0]
 
+    def _write_error(self, what, rc):
+        """Like :py:func:`_error`, also noting MDB_MAP_FULL for the
+        environment's `auto_grow`."""
+        if rc == _lib.MDB_MAP_FULL:
+            self._pyenv._map_full = True
+        return _error(what, rc)
+
+    def _mutated(self):
+        """Record a mutation before making it: cursors refresh their
+        key/value, and the last :py:meth:`reserve` view is released. Fails
+        while a buffer derived from a :py:meth:`reserve` view is alive."""
+        self._mutations += 1
+        if self._write and self._pyenv._reserved_txns:
+            self._pyenv._check_reserved()
+
+    def _release_reserved(self):
+        """Release the view returned by the last :py:meth:`reserve`, so later
+        access raises ValueError instead of touching a stale page. Its buffer
+        stays registered with the environment while a buffer derived from it,
+        such as a slice or a NumPy array, is alive."""
+        if self._reserved is None:
+            return
+        view_ref, finalizer = self._reserved
+        view = view_ref()
+        if view is not None:
+            try:
+                view.release()
+            except BufferError:  # The view itself is exported.
+                pass
+            del view
+        if not finalizer.alive:
+            self._reserved = None
+
+    def _reserve_view(self, rc, val):
+        """Shared between :py:meth:`Cursor.reserve` and :py:meth:`reserve`.
+        The caller's :py:meth:`_mutated` has released any earlier view."""
+        if rc:
+            if rc == _lib.MDB_KEYEXIST:
+                return None
+            raise self._write_error("mdb_put", rc)
+        buf = _ffi.buffer(val.mv_data, val.mv_size)
+        view = memoryview(buf)
+        # Every buffer derived from the view keeps `buf` alive, and the
+        # finalizer keeps this transaction, and so the space, alive with it.
+        reserved = self._pyenv._reserved_txns
+        reserved.add(self)
+        self._reserved = (weakref.ref(view),
+                          weakref.finalize(buf, reserved.discard, self))
+        return view
+
     def _invalidate(self):
+        self._release_reserved()
         if self._txn:
             self.abort()
         deps = self._pyenv._deps
@@ -1683,12 +2392,12 @@ class Transaction:
         """
         while db._deps:
             db._deps.pop()._invalidate()
+        self._mutated()
         # Issue #475: serialize against close()/set_mapsize().
         with self._pyenv._close_lock:
             rc = _lib.mdb_drop(self._txn, db._dbi, delete)
-        self._mutations += 1
         if rc:
-            raise _error("mdb_drop", rc)
+            raise self._write_error("mdb_drop", rc)
         if db._name in self._pyenv._dbs:
             del self._pyenv._dbs[db._name]
 
@@ -1724,8 +2433,11 @@ class Transaction:
         Equivalent to `mdb_txn_commit()
         <http://lmdb.tech/doc/group__mdb.html#ga846fbd6f46105617ac9f4d76476f6597>`_
         """
+        if self._write and self._pyenv._reserved_txns:
+            self._pyenv._check_reserved()
         while self._deps:
             self._deps.pop()._invalidate()
+        self._release_reserved()
         if self._write or not self._cache_spare():
             # Grab and clear _txn inside the lock so that a concurrent
             # close() → _invalidate() → abort() will see _txn as valid
@@ -1743,7 +2455,7 @@ class Transaction:
                     raise _error("env has been closed", _lib.EINVAL)
                 rc = _lib.mdb_txn_commit(txn)
             if rc:
-                raise _error("mdb_txn_commit", rc)
+                raise self._write_error("mdb_txn_commit", rc)
             self._invalidate()
 
     def abort(self):
@@ -1756,8 +2468,11 @@ class Transaction:
         <http://lmdb.tech/doc/group__mdb.html#ga73a5938ae4c3239ee11efa07eb22b882>`_
         """
         if self._txn:
+            if self._write and self._pyenv._reserved_txns:
+                self._pyenv._check_reserved()
             while self._deps:
                 self._deps.pop()._invalidate()
+            self._release_reserved()
             if self._write or not self._cache_spare():
                 with self._pyenv._close_lock:
                     txn = self._txn
@@ -1793,6 +2508,68 @@ class Transaction:
             preload(self._val)
             return self._to_py(self._val)
 
+    def getmany(self, keys, db=None, default=None):
+        """Fetch the first value of each key in `keys`, returning a list of
+        results in the same order as `keys`, with `default` substituted for
+        any key that does not exist. This is equivalent to calling
+        :py:meth:`get` once per key, but keys are looked up in sorted order
+        for locality. With the CPython extension the sort uses the database's
+        comparator and the whole batch runs with the GIL released; otherwise
+        bytestring keys are sorted bytewise, and only for databases using the
+        default comparator.
+
+        This is also the way to warm the pages for a batch of keys on an
+        environment larger than RAM. LMDB does not expose the pages on a
+        key's path to advise the kernel of them ahead of time, so warming
+        them costs the same lookups, and fetching the values directly wastes
+        nothing.
+
+        Every key is checked before any lookup runs. An empty or oversized
+        key raises :py:exc:`BadValsizeError`. On `integerkey=True` databases
+        so does a key that is not an unsigned int or ``size_t``, or whose
+        width differs from the first key's.
+
+            `keys`:
+                Iterable of bytestring keys to look up. Duplicates are
+                permitted.
+
+            `db`:
+                Named database to operate on. If unspecified, defaults to the
+                database given to the :py:class:`Transaction` constructor.
+
+            `default`:
+                Value returned for missing keys.
+
+        ::
+
+            >>> txn.getmany([b'b', b'missing', b'a'])
+            [b'2', None, b'1']
+        """
+        keys = list(keys)
+        db = db or self._db
+        for i, key in enumerate(keys):
+            if not _key_size_ok(self._pyenv, db._flags, len(key),
+                                len(keys[0])):
+                raise _error("mdb_get() element #%d" % i,
+                             _lib.MDB_BAD_VALSIZE)
+        order = range(len(keys))
+        if (not db._flags & (_lib.MDB_REVERSEKEY | _lib.MDB_INTEGERKEY) and
+                all(type(key) is bytes for key in keys)):
+            order = sorted(order, key=keys.__getitem__)
+        out = [default] * len(keys)
+        with self._pyenv._close_lock:
+            for i in order:
+                key = keys[i]
+                rc = _lib.pymdb_get(self._txn, db._dbi, key, len(key),
+                                    self._val)
+                if rc:
+                    if rc == _lib.MDB_NOTFOUND:
+                        continue
+                    raise _error("mdb_cursor_get", rc)
+                preload(self._val)
+                out[i] = self._to_py(self._val)
+        return out
+
     def put(self, key, value, dupdata=True, overwrite=True, append=False,
             db=None):
         """Store a record, returning ``True`` if it was written, or ``False``
@@ -1835,18 +2612,257 @@ class Transaction:
         if append:
             flags |= _lib.MDB_APPEND
 
+        self._mutated()
         # Hold _close_lock so close()/set_mapsize() cannot abort the txn or
         # remap the environment during the C call.  Issue #475.
         with self._pyenv._close_lock:
             rc = _lib.pymdb_put(self._txn, (db or self._db)._dbi,
                                 key, len(key), value, len(value), flags)
-        self._mutations += 1
         if rc:
             if rc == _lib.MDB_KEYEXIST:
                 return False
-            raise _error("mdb_put", rc)
+            raise self._write_error("mdb_put", rc)
         return True
 
+    def reserve(self, key, size, overwrite=True, append=False, db=None):
+        """Store a record of `size` bytes without copying a value, returning
+        a writable ``memoryview`` of the space reserved for it, or ``None``
+        if the key was already present and `overwrite=False`. Serializers can
+        then write the value straight into the database page.
+
+        The view is only valid until the next change made by the transaction,
+        including another :py:meth:`reserve`, or until the transaction ends;
+        it is then released, and further access raises :py:exc:`ValueError`.
+        While a buffer derived from it is alive, such as a slice or a NumPy
+        array built on it, that change, :py:meth:`commit`, :py:meth:`abort`
+        and :py:meth:`Environment.close` instead raise :py:exc:`BufferError`,
+        leaving the transaction unchanged. The database must not have been
+        opened with `dupsort=True`, otherwise :py:exc:`IncompatibleError` is
+        raised.
+
+        Equivalent to `mdb_put()
+        <http://lmdb.tech/doc/group__mdb.html#ga4fa8573d9236d54687c61827ebf8cac0>`_
+        with `MDB_RESERVE`.
+
+            `key`:
+                Bytestring key to store.
+
+            `size`:
+                Size in bytes of the value.
+
+            `overwrite`:
+                If ``False``, do not overwrite any existing matching key.
+
+            `append`:
+                If ``True``, append the record to the end of the database
+                without comparing its order first, as with :py:meth:`put`.
+
+            `db`:
+                Named database to operate on. If unspecified, defaults to the
+                database given to the :py:class:`Transaction` constructor.
+
+        ::
+
+            >>> view = txn.reserve(b'key', len(payload))
+            >>> view[:] = payload
+        """
+        db = db or self._db
+        if db._flags & _lib.MDB_DUPSORT:
+            raise _error("reserve() cannot be used with a dupsort database",
+                         _lib.MDB_INCOMPATIBLE)
+        flags = 0
+        if not overwrite:
+            flags |= _lib.MDB_NOOVERWRITE
+        if append:
+            flags |= _lib.MDB_APPEND
+        val = _ffi.new('MDB_val *')
+        val.mv_size = size
+        self._mutated()
+        # Hold _close_lock so close()/set_mapsize() cannot abort the txn or
+        # remap the environment during the C call.  Issue #475.
+        with self._pyenv._close_lock:
+            rc = _lib.pymdb_reserve(self._txn, db._dbi, key, len(key), val,
+                                    flags)
+        return self._reserve_view(rc, val)
+
+    def putmany(self, items, db=None, dupdata=True, overwrite=True,
+                append=False):
+        """Store each `(key, value)` 2-tuple from the iterable `items`, like
+        :py:meth:`Cursor.putmulti`. Elements must be exactly 2-tuples, they
+        may not be of any other type, or tuple subclass.
+
+        Every element is read and its buffers pinned before any record is
+        written. With the CPython extension the whole batch is then written
+        with the GIL released once, rather than once per record, which
+        matters most for small records. If a write fails, the records before
+        it remain stored and the exception names the failing element.
+
+        Returns a tuple `(consumed, added)`, where `consumed` is the number of
+        elements read from the iterable, and `added` is the number of new
+        entries added to the database. `added` may be less than `consumed`
+        when `overwrite=False`.
+
+            `items`:
+                Iterable to read records from.
+
+            `db`:
+                Named database to operate on. If unspecified, defaults to the
+                database given to the :py:class:`Transaction` constructor.
+
+            `dupdata`, `overwrite`, `append`:
+                As for :py:meth:`Cursor.putmulti`.
+
+        ::
+
+            >>> txn.putmany([(b'a', b'1'), (b'b', b'2')])
+            (2, 2)
+        """
+        items = list(items)
+        db = db or self._db
+        for item in items:
+            if type(item) is not tuple or len(item) != 2:
+                raise TypeError('putmany() elements must be 2-tuples')
+        flags = 0
+        if not dupdata:
+            flags |= _lib.MDB_NODUPDATA
+        if not overwrite:
+            flags |= _lib.MDB_NOOVERWRITE
+        if append:
+            if db._flags & _lib.MDB_DUPSORT:
+                flags |= _lib.MDB_APPENDDUP
+            else:
+                flags |= _lib.MDB_APPEND
+
+        added = 0
+        with Cursor(db, self) as curs:
+            self._mutated()
+            with self._pyenv._close_lock:
+                for i, (key, value) in enumerate(items):
+                    rc = _lib.pymdb_cursor_put(curs._cur, key, len(key),
+                                               value, len(value), flags)
+                    if not rc:
+                        added += 1
+                    elif rc != _lib.MDB_KEYEXIST:
+                        raise self._write_error(
+                            "mdb_cursor_put() element #%d" % i, rc)
+        return len(items), added
+
+    def incr(self, key, delta=1, db=None, width=8, signed=True):
+        """Add `delta` to the integer counter stored as the value of `key`,
+        returning its new value. A missing key is created as if its counter
+        were 0. The counter is stored as a native-endian integer of `width`
+        bytes, and is positioned on and rewritten in place with
+        `MDB_CURRENT`, avoiding a separate :py:meth:`get` and
+        :py:meth:`put`.
+
+        :py:exc:`BadValsizeError` is raised if the stored value is not
+        `width` bytes, and :py:exc:`OverflowError` if the new value does not
+        fit, leaving the counter unchanged. The database must not have been
+        opened with `dupsort=True`, otherwise :py:exc:`IncompatibleError` is
+        raised.
+
+            `key`:
+                Bytestring key of the counter.
+
+            `delta`:
+                Integer to add, which may be negative.
+
+            `db`:
+                Named database to operate on. If unspecified, defaults to the
+                database given to the :py:class:`Transaction` constructor.
+
+            `width`:
+                Size of the counter in bytes: 1, 2, 4 or 8.
+
+            `signed`:
+                If ``False``, the counter is unsigned.
+
+        ::
+
+            >>> txn.incr(b'hits')
+            1
+            >>> txn.incr(b'hits', 10)
+            11
+        """
+        return self._incr([(key, delta)], db, width, signed, 'incr()',
+                          False)[0]
+
+    def incrmany(self, pairs, db=None, width=8, signed=True):
+        """Apply each `(key, delta)` 2-tuple from the iterable `pairs` as
+        :py:meth:`incr` would, returning a list of the new counter values in
+        input order. With the CPython extension the batch is sorted into
+        database order and applied by a single C loop with the GIL released;
+        a key repeated in the batch is updated once per occurrence, in input
+        order. If an update fails, updates already applied remain and the
+        exception names the failing element.
+
+            `pairs`:
+                Iterable of `(key, delta)` 2-tuples.
+
+            `db`, `width`, `signed`:
+                As for :py:meth:`incr`.
+
+        ::
+
+            >>> txn.incrmany([(b'hits', 1), (b'misses', 1), (b'hits', 1)])
+            [12, 1, 13]
+        """
+        pairs = list(pairs)
+        for item in pairs:
+            if type(item) is not tuple or len(item) != 2:
+                raise TypeError('incrmany() elements must be 2-tuples')
+        return self._incr(pairs, db, width, signed, 'incrmany()', True)
+
+    def _incr(self, pairs, db, width, signed, what, batch):
+        """Shared between :py:meth:`incr` and :py:meth:`incrmany`."""
+        db = db or self._db
+        if width not in (1, 2, 4, 8):
+            raise ValueError("width must be 1, 2, 4 or 8")
+        if db._flags & _lib.MDB_DUPSORT:
+            raise _error("%s cannot be used with a dupsort database" % what,
+                         _lib.MDB_INCOMPATIBLE)
+        deltas = [operator.index(delta) for _, delta in pairs]
+        for i, (key, _) in enumerate(pairs):
+            if not _key_size_ok(self._pyenv, db._flags, len(key),
+                                len(pairs[0][0])):
+                raise _error("%s element #%d" % (what, i) if batch else what,
+                             _lib.MDB_BAD_VALSIZE)
+        bits = 8 * width
+        lo, hi = (-(1 << (bits - 1)), (1 << (bits - 1)) - 1) if signed \
+            else (0, (1 << bits) - 1)
+        key_out = _ffi.new('MDB_val *')
+        val_out = _ffi.new('MDB_val *')
+        out = []
+        with Cursor(db, self) as curs:
+            self._mutated()
+            with self._pyenv._close_lock:
+                for i, (key, _) in enumerate(pairs):
+                    where = "%s element #%d" % (what, i) if batch else what
+                    rc = _lib.pymdb_cursor_get(curs._cur, key, len(key),
+                                               _ffi.NULL, 0, key_out, val_out,
+                                               _lib.MDB_SET_KEY)
+                    flags = _lib.MDB_CURRENT
+                    if rc == _lib.MDB_NOTFOUND:
+                        value = 0
+                        flags = 0
+                    elif rc:
+                        raise _error(where, rc)
+                    elif val_out.mv_size != width:
+                        raise _error(where, _lib.MDB_BAD_VALSIZE)
+                    else:
+                        value = int.from_bytes(_mvstr(val_out), sys.byteorder,
+                                               signed=signed)
+                    value += deltas[i]
+                    if not lo <= value <= hi:
+                        raise OverflowError("%s: counter out of range" % where)
+                    data = value.to_bytes(width, sys.byteorder, signed=signed)
+                    rc = _lib.pymdb_cursor_put(curs._cur, key, len(key),
+                                               data, width, flags)
+                    if rc:
+                        raise self._write_error(where, rc)
+                    out.append(value)
+        return out
+
     def replace(self, key, value, db=None):
         """Use a temporary cursor to invoke :py:meth:`Cursor.replace`.
 
@@ -1886,18 +2902,59 @@ class Transaction:
         if value is None:  # for bug-compatibility with cpython impl
             value = EMPTY_BYTES
 
+        self._mutated()
         # Hold _close_lock so close()/set_mapsize() cannot abort the txn or
         # remap the environment during the C call.  Issue #475.
         with self._pyenv._close_lock:
             rc = _lib.pymdb_del(self._txn, (db or self._db)._dbi,
                                 key, len(key), value, len(value))
-        self._mutations += 1
         if rc:
             if rc == _lib.MDB_NOTFOUND:
                 return False
-            raise _error("mdb_del", rc)
+            raise self._write_error("mdb_del", rc)
         return True
 
+    def delete_range(self, start=None, stop=None, db=None, inclusive=False):
+        """Delete every record whose key falls in the range `[start, stop)`,
+        returning the number of records deleted. If `start` is ``None``,
+        deletion begins at the first key, and if `stop` is ``None`` it
+        continues to the end of the database. Keys are compared using the
+        database's comparison function. For databases opened with
+        `dupsort=True`, all values of each key in the range are deleted and
+        counted.
+
+        With the CPython extension the range is deleted by a single C loop
+        with the GIL released.
+
+            `db`:
+                Named database to operate on. If unspecified, defaults to the
+                database given to the :py:class:`Transaction` constructor.
+
+            `inclusive`:
+                If ``True``, also delete the records whose key equals `stop`.
+
+        ::
+
+            >>> txn.delete_range(b'tenant:42:', b'tenant:42;')
+            1048576
+        """
+        if not start:
+            start = None
+        with Cursor(db or self._db, self) as curs:
+            curs._check_bound(start, "start")
+            curs._check_bound(stop, "stop")
+            if start is None:
+                curs.first()
+            else:
+                curs.set_range(start)
+            dupsort = bool(curs._pydb._flags & _lib.MDB_DUPSORT)
+            n = 0
+            while curs._valid and curs._before_stop(stop, inclusive):
+                ndup = curs.count() if dupsort else 1
+                curs.delete(dupdata=dupsort)
+                n += ndup
+        return n
+
     def cursor(self, db=None):
         """Shortcut for ``lmdb.Cursor(db, self)``"""
         return Cursor(db or self._db, self)
@@ -2069,9 +3126,12 @@ class Cursor:
         preload(self._val)
         return self._to_py(self._key), self._to_py(self._val)
 
-    def _iter(self, op, keys, values):
+    def _iter(self, op, keys, values, stop=None, inclusive=False,
+              limit=None, prefix=None, dtype=None):
         if not values:
             get = self.key
+        elif dtype is not None:
+            get = self._dtype_getter(keys, dtype)
         elif not keys:
             get = self.value
         else:
@@ -2081,9 +3141,41 @@ class Cursor:
         key = self._key
         val = self._val
         rc = 0
+        if stop is not None:
+            # Yield while the key compares below (forward) or above
+            # (reverse) `stop`, or equal to it if `inclusive`.
+            reverse = op in (_lib.MDB_PREV, _lib.MDB_PREV_DUP,
+                             _lib.MDB_PREV_NODUP)
+            stop_s = bytes(stop)
+            env = self._pytxn._pyenv
+
+        if limit is not None and limit <= 0:
+            return
 
         while self._valid:
+            if (stop is not None or prefix) and \
+                    self._last_mutation != self._pytxn._mutations:
+                self._cursor_get(_lib.MDB_GET_CURRENT)
+                if not self._valid:
+                    break
+            if prefix and (key.mv_size < len(prefix) or
+                           _ffi.buffer(key.mv_data, len(prefix))[:] != prefix):
+                return
+            if stop is not None:
+                with env._close_lock:
+                    cmp = _lib.pymdb_cmp_bound(self._txn, self._dbi,
+                                               self._pydb._flags, key,
+                                               stop_s, len(stop_s))
+                if reverse:
+                    cmp = -cmp
+                if cmp > 0 or (cmp == 0 and not inclusive):
+                    return
             yield get()
+            if limit is not None:
+                limit -= 1
+                if not limit:
+                    # Leave the cursor on the last element yielded.
+                    return
             rc = _lib.mdb_cursor_get(cur, key, val, op)
             self._valid = not rc
 
@@ -2093,7 +3185,20 @@ class Cursor:
             if rc != _lib.MDB_NOTFOUND:
                 raise _error("mdb_cursor_get", rc)
 
-    def iternext(self, keys=True, values=True):
+    def _dtype_getter(self, keys, dtype):
+        itemsize = _check_dtype(dtype)
+
+        def get():
+            if self._last_mutation != self._pytxn._mutations:
+                self._cursor_get(_lib.MDB_GET_CURRENT)
+            val = _mvdtype(self._val, dtype, itemsize)
+            if keys:
+                return self._to_py(self._key), val
+            return val
+        return get
+
+    def iternext(self, keys=True, values=True, stop=None, inclusive=False,
+                 limit=None):
         """Return a forward iterator that yields the current element before
         calling :py:meth:`next`, repeating until the end of the database is
         reached. As a convenience, :py:class:`Cursor` implements the iterator
@@ -2107,19 +3212,47 @@ class Cursor:
 
         If the cursor is not yet positioned, it is moved to the first key in
         the database, otherwise iteration proceeds from the current position.
+
+        `stop`:
+            If not ``None``, iteration ends at the first key that sorts at
+            or after `stop` according to the database's comparison function.
+            The cursor is left positioned on that key, and no Python object
+            is created for it.
+
+        `inclusive`:
+            If ``True``, a key equal to `stop` is yielded rather than ending
+            iteration.
+
+        `limit`:
+            If not ``None``, yield at most `limit` elements. The cursor is
+            left positioned on the last element yielded.
+
+        ::
+
+            >>> cursor.set_range(b'user:')
+            >>> for key, value in cursor.iternext(stop=b'user;', limit=100):
+            ...     print(key)
         """
+        if stop is not None:
+            self._check_bound(stop, "stop")
         if not self._valid:
             self.first()
-        return self._iter(_lib.MDB_NEXT, keys, values)
+        return self._iter(_lib.MDB_NEXT, keys, values, stop, inclusive, limit)
     __iter__ = iternext
 
-    def iternext_dup(self, keys=False, values=True):
+    def iternext_dup(self, keys=False, values=True, dtype=None):
         """Return a forward iterator that yields the current value
         ("duplicate") of the current key before calling :py:meth:`next_dup`,
         repeating until the last value of the current key is reached.
 
         Only meaningful for databases opened with `dupsort=True`.
 
+        If `dtype` is given, it is an :py:mod:`array` typecode such as
+        ``'Q'``, ``'I'`` or ``'d'``, and each value is decoded as a single
+        native-endian number of that type rather than returned as a
+        bytestring. :py:exc:`BadValsizeError` is raised for a value of the
+        wrong size.
+
         .. code-block:: python
 
             if not cursor.set_key("foo"):
@@ -2128,7 +3261,9 @@ class Cursor:
                 for idx, data in enumerate(cursor.iternext_dup()):
                     print("%d'th value for 'foo': %s" % (idx, data))
         """
-        return self._iter(_lib.MDB_NEXT_DUP, keys, values)
+        if dtype is not None:
+            _check_dtype(dtype)
+        return self._iter(_lib.MDB_NEXT_DUP, keys, values, dtype=dtype)
 
     def iternext_nodup(self, keys=True, values=False):
         """Return a forward iterator that yields the current value
@@ -2149,7 +3284,43 @@ class Cursor:
             self.first()
         return self._iter(_lib.MDB_NEXT_NODUP, keys, values)
 
-    def iterprev(self, keys=True, values=True):
+    def iterprefix(self, prefix, keys=True, values=True, reverse=False):
+        """Return an iterator over the elements whose key begins with
+        `prefix`. The cursor is positioned using :py:meth:`set_range`, and
+        iteration ends at the first key lacking the prefix. If `reverse` is
+        ``True``, the cursor is positioned on the last key having the prefix
+        by seeking to the prefix's successor, and elements are yielded in
+        descending order.
+
+        Keys are matched bytewise, so this is only meaningful for databases
+        using the default key order. An empty `prefix` matches every key.
+
+        ::
+
+            >>> for key, value in txn.cursor().iterprefix(b'tenant1/'):
+            ...     print(key)
+        """
+        prefix = bytes(prefix)
+        if not prefix:
+            self._cursor_get(_lib.MDB_LAST if reverse else _lib.MDB_FIRST)
+        else:
+            self._check_bound(prefix, "prefix")
+            if not reverse:
+                self.set_range(prefix)
+            else:
+                # The successor increments the last byte that is not 0xff
+                # and drops any that follow; an all-0xff prefix has none.
+                succ = prefix.rstrip(b'\xff')
+                if succ and self.set_range(succ[:-1] +
+                                           bytes((succ[-1] + 1,))):
+                    self.prev()
+                else:
+                    self.last()
+        op = _lib.MDB_PREV if reverse else _lib.MDB_NEXT
+        return self._iter(op, keys, values, prefix=prefix)
+
+    def iterprev(self, keys=True, values=True, stop=None, inclusive=False,
+                 limit=None):
         """Return a reverse iterator that yields the current element before
         calling :py:meth:`prev`, until the start of the database is reached.
 
@@ -2161,19 +3332,29 @@ class Cursor:
             >>> with env.begin() as txn:
             ...     for i, (key, value) in enumerate(txn.cursor().iterprev()):
             ...         print('%dth last item is (%r, %r)' % (1+i, key, value))
+
+        `stop`, `inclusive` and `limit` are as for :py:meth:`iternext`,
+        except `stop` is a lower bound: iteration ends at the first key that
+        sorts at or before `stop`.
         """
+        if stop is not None:
+            self._check_bound(stop, "stop")
         if not self._valid:
             self.last()
-        return self._iter(_lib.MDB_PREV, keys, values)
+        return self._iter(_lib.MDB_PREV, keys, values, stop, inclusive, limit)
 
-    def iterprev_dup(self, keys=False, values=True):
+    def iterprev_dup(self, keys=False, values=True, dtype=None):
         """Return a reverse iterator that yields the current value
         ("duplicate") of the current key before calling :py:meth:`prev_dup`,
         repeating until the first value of the current key is reached.
 
         Only meaningful for databases opened with `dupsort=True`.
+
+        `dtype` is as for :py:meth:`iternext_dup`.
         """
-        return self._iter(_lib.MDB_PREV_DUP, keys, values)
+        if dtype is not None:
+            _check_dtype(dtype)
+        return self._iter(_lib.MDB_PREV_DUP, keys, values, dtype=dtype)
 
     def iterprev_nodup(self, keys=True, values=False):
         """Return a reverse iterator that yields the current value
@@ -2189,6 +3370,79 @@ class Cursor:
             self.last()
         return self._iter(_lib.MDB_PREV_NODUP, keys, values)
 
+    def _iter_batches(self, pos_op, op, n, keys, values):
+        # Validate `n` before positioning, as the C implementation does.
+        if n < 1:
+            raise ValueError('n must be >= 1')
+        if pos_op is not None and not self._valid:
+            self._cursor_get(pos_op)
+        return self._batches(self._iter(op, keys, values), n)
+
+    @staticmethod
+    def _batches(it, n):
+        batch = []
+        for item in it:
+            batch.append(item)
+            if len(batch) == n:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def iternext_batches(self, n, keys=True, values=True):
+        """Like :py:meth:`iternext`, but yield lists of up to `n` elements
+        rather than individual elements. With the CPython extension, each
+        list is filled by a single C call that steps the cursor with the GIL
+        released, avoiding per-element interpreter overhead on large scans.
+        The final list may be shorter than `n`; no empty list is produced.
+
+        After each list except the last is produced, the cursor is positioned
+        on its last element. Once the end of the database is reached the
+        cursor is left unpositioned, as with :py:meth:`iternext`.
+
+        ::
+
+            >>> for batch in txn.cursor().iternext_batches(1000):
+            ...     process(batch)
+        """
+        return self._iter_batches(_lib.MDB_FIRST, _lib.MDB_NEXT,
+                                  n, keys, values)
+
+    def iternext_dup_batches(self, n, keys=False, values=True):
+        """Like :py:meth:`iternext_dup`, but yield lists of up to `n`
+        elements. See :py:meth:`iternext_batches`.
+        """
+        return self._iter_batches(None, _lib.MDB_NEXT_DUP,
+                                  n, keys, values)
+
+    def iternext_nodup_batches(self, n, keys=True, values=False):
+        """Like :py:meth:`iternext_nodup`, but yield lists of up to `n`
+        elements. See :py:meth:`iternext_batches`.
+        """
+        return self._iter_batches(_lib.MDB_FIRST, _lib.MDB_NEXT_NODUP,
+                                  n, keys, values)
+
+    def iterprev_batches(self, n, keys=True, values=True):
+        """Like :py:meth:`iterprev`, but yield lists of up to `n` elements.
+        See :py:meth:`iternext_batches`.
+        """
+        return self._iter_batches(_lib.MDB_LAST, _lib.MDB_PREV,
+                                  n, keys, values)
+
+    def iterprev_dup_batches(self, n, keys=False, values=True):
+        """Like :py:meth:`iterprev_dup`, but yield lists of up to `n`
+        elements. See :py:meth:`iternext_batches`.
+        """
+        return self._iter_batches(None, _lib.MDB_PREV_DUP,
+                                  n, keys, values)
+
+    def iterprev_nodup_batches(self, n, keys=True, values=False):
+        """Like :py:meth:`iterprev_nodup`, but yield lists of up to `n`
+        elements. See :py:meth:`iternext_batches`.
+        """
+        return self._iter_batches(_lib.MDB_LAST, _lib.MDB_PREV_NODUP,
+                                  n, keys, values)
+
     def _cursor_get(self, op):
         # Hold _close_lock to prevent concurrent txn.abort() from
         # calling mdb_txn_abort (which frees cursor memory) while
@@ -2399,7 +3653,7 @@ class Cursor:
         return default
 
     def getmulti(self, keys, dupdata=False, dupfixed_bytes=None, keyfixed=False,
-                 values=True):
+                 values=True, dtype=None):
         """Returns an iterable of `(key, value)` 2-tuples containing results
         for each key in the iterable `keys`.
 
@@ -2436,6 +3690,14 @@ class Cursor:
                 never touched, avoiding page faults on large values.
                 Incompatible with ``dupdata=True``.
 
+            `dtype`:
+                If given, an :py:mod:`array` typecode such as ``'Q'``, ``'I'``
+                or ``'d'``. Each value is decoded as a native-endian number
+                of that type instead of being returned as a bytestring. With
+                `dupfixed_bytes`, which must then equal the type's size,
+                numbers are decoded directly from each page of values.
+                Incompatible with `keyfixed`.
+
         """
         if dupfixed_bytes and dupfixed_bytes < 0:
             raise Error("dupfixed_bytes must be a positive integer.")
@@ -2445,6 +3707,12 @@ class Cursor:
             raise Error("dupfixed_bytes is required for key_bytes.")
         elif not values and dupdata:
             raise Error("values=False is incompatible with dupdata.")
+        if dtype is not None:
+            itemsize = _check_dtype(dtype)
+            if keyfixed:
+                raise Error("dtype is incompatible with keyfixed.")
+            elif dupfixed_bytes and dupfixed_bytes != itemsize:
+                raise Error("dupfixed_bytes must match the dtype size.")
 
         if dupfixed_bytes:
             get_op = _lib.MDB_GET_MULTIPLE
@@ -2464,9 +3732,14 @@ class Cursor:
                     self._cursor_get(get_op)
                     preload(self._val)
                     key = self._to_py(self._key)
-                    val = self._to_py(self._val)
-
-                    if dupfixed_bytes:
+                    if dtype is not None and dupfixed_bytes:
+                        lst.extend((key, v) for v in
+                                   memoryview(_mvbuf(self._val)).cast(dtype))
+                    elif dtype is not None:
+                        lst.append((key, _mvdtype(self._val, dtype,
+                                                  itemsize)))
+                    elif dupfixed_bytes:
+                        val = self._to_py(self._val)
                         gen = (
                             (key, val[i:i + dupfixed_bytes])
                             for i in range(0, len(val), dupfixed_bytes))
@@ -2477,7 +3750,7 @@ class Cursor:
                             for k, v in gen:
                                 lst.append((k, v))
                     else:
-                        lst.append((key, val))
+                        lst.append((key, self._to_py(self._val)))
 
                     if dupdata:
                         self._cursor_get(next_op)
@@ -2489,6 +3762,146 @@ class Cursor:
         else:
             return lst
 
+    def values_array(self, dtype):
+        """Return the values of the current key as an :py:class:`array.array`
+        of typecode `dtype`, such as ``'Q'``, ``'I'`` or ``'d'``, with each
+        value decoded as a native-endian number. Returns an empty array if
+        the cursor is unpositioned.
+
+        For databases opened with `dupsort=True`, every value ("duplicate")
+        of the key becomes one element, and the cursor is left positioned on
+        the last value. Each must be exactly the size of `dtype`, as on
+        databases opened with `integerdup=True` or `dupfixed=True`. With
+        the CPython extension the array is sized using
+        :py:meth:`count` and filled in one GIL-released pass, copying whole
+        `MDB_GET_MULTIPLE` pages when `dupfixed=True`.
+
+        Otherwise the key's single value is decoded as a packed array, and
+        its size must be a multiple of the size of `dtype`.
+
+        :py:exc:`BadValsizeError` is raised for a value of the wrong size.
+
+        ::
+
+            >>> cursor.set_key(b'series')
+            >>> cursor.values_array('Q')
+            array('Q', [3, 17, 42])
+        """
+        itemsize = _check_dtype(dtype)
+        arr = array.array(dtype)
+        if self._valid and self._last_mutation != self._pytxn._mutations:
+            self._cursor_get(_lib.MDB_GET_CURRENT)
+        if not self._valid:
+            return arr
+
+        flags = self._pydb._flags
+        if not flags & _lib.MDB_DUPSORT:
+            if self._val.mv_size % itemsize:
+                raise _error("dtype", _lib.MDB_BAD_VALSIZE)
+            preload(self._val)
+            arr.frombytes(_mvbuf(self._val))
+            return arr
+
+        count = self.count()
+        self._cursor_get(_lib.MDB_FIRST_DUP)
+        if self._val.mv_size != itemsize:
+            raise _error("dtype", _lib.MDB_BAD_VALSIZE)
+        if flags & _lib.MDB_DUPFIXED:
+            self._cursor_get(_lib.MDB_GET_MULTIPLE)
+            while self._valid:
+                arr.frombytes(_mvbuf(self._val))
+                self._cursor_get(_lib.MDB_NEXT_MULTIPLE)
+        else:
+            for i in range(count):
+                if i:
+                    self._cursor_get(_lib.MDB_NEXT_DUP)
+                if self._val.mv_size != itemsize:
+                    raise _error("dtype", _lib.MDB_BAD_VALSIZE)
+                arr.frombytes(_mvbuf(self._val))
+        if len(arr) != count:
+            raise _error("dtype", _lib.MDB_BAD_VALSIZE)
+        # MDB_NEXT_MULTIPLE leaves the cursor within the key on failure, but
+        # MDB_LAST_DUP does not return the key, so refresh it afterwards.
+        self._cursor_get(_lib.MDB_LAST_DUP)
+        self._cursor_get(_lib.MDB_GET_CURRENT)
+        return arr
+
+    def _check_bound(self, bound, what):
+        if bound is not None and not _key_size_ok(
+                self._pytxn._pyenv, self._pydb._flags, len(bound)):
+            raise _error(what, _lib.MDB_BAD_VALSIZE)
+
+    def _before_stop(self, stop, inclusive=False):
+        """Return ``True`` if the current key sorts before `stop`, or equal to
+        it if `inclusive`, using the database's comparator. `stop` may be
+        ``None``."""
+        if stop is None:
+            return True
+        with self._pytxn._pyenv._close_lock:
+            cmp = _lib.pymdb_cmp_bound(self._txn, self._dbi,
+                                       self._pydb._flags, self._key,
+                                       stop, len(stop))
+        return cmp < 0 or (cmp == 0 and inclusive)
+
+    def export_columns(self, start=None, stop=None, limit=None):
+        """Export a range of records in a columnar layout, returning a tuple
+        `(keys, key_offsets, values, value_offsets)`. `keys` and `values` are
+        memoryviews over the concatenated key and value bytes. The two offset
+        arrays are memoryviews of format ``'q'`` (int64), each holding one
+        more element than the number of records, such that record `i`
+        occupies ``keys[key_offsets[i]:key_offsets[i+1]]``. This is the
+        layout Apache Arrow uses for binary arrays, so the buffers can be
+        wrapped without further copies. With the CPython extension the range
+        is walked in a single C pass with the GIL released, copying each
+        record straight into the returned buffers.
+
+            `start`:
+                Export from the first key greater than or equal to `start`.
+                If ``None`` or the empty bytestring, export from the first
+                key in the database.
+
+            `stop`:
+                If not ``None``, export only keys that sort before `stop`
+                according to the database's comparator.
+
+            `limit`:
+                If not ``None``, export at most this many records.
+
+        For databases opened with `dupsort=True`, each duplicate is exported
+        as a separate record. On return the cursor is positioned on the first
+        record past the exported range, or is unpositioned if the end of the
+        database was reached.
+
+        ::
+
+            >>> keys, koffs, vals, voffs = cursor.export_columns(b'a', b'b')
+            >>> arr = pyarrow.Array.from_buffers(pyarrow.binary(), len(koffs) - 1,
+            ...     [None, pyarrow.py_buffer(koffs), pyarrow.py_buffer(keys)])
+        """
+        if not start:
+            start = None
+        self._check_bound(start, "start")
+        self._check_bound(stop, "stop")
+        if start is None:
+            self.first()
+        else:
+            self.set_range(start)
+
+        keys = []
+        vals = []
+        key_offsets = array.array('q', [0])
+        val_offsets = array.array('q', [0])
+        while (self._valid and (limit is None or len(keys) < limit) and
+               self._before_stop(stop)):
+            preload(self._val)
+            keys.append(_mvstr(self._key))
+            vals.append(_mvstr(self._val))
+            key_offsets.append(key_offsets[-1] + len(keys[-1]))
+            val_offsets.append(val_offsets[-1] + len(vals[-1]))
+            self._cursor_get(_lib.MDB_NEXT)
+        return (memoryview(EMPTY_BYTES.join(keys)), memoryview(key_offsets),
+                memoryview(EMPTY_BYTES.join(vals)), memoryview(val_offsets))
+
     def set_range(self, key):
         """Seek to the first key greater than or equal to `key`, returning
         ``True`` on success, or ``False`` to indicate key was past end of
@@ -2540,18 +3953,82 @@ class Cursor:
         v = self._valid
         if v:
             flags = _lib.MDB_NODUPDATA if dupdata else 0
+            self._pytxn._mutated()
             with self._pytxn._pyenv._close_lock:
                 if not self._cur:
                     raise _error("Attempt to operate on closed cursor",
                                   _lib.EINVAL)
                 rc = _lib.mdb_cursor_del(self._cur, flags)
-            self._pytxn._mutations += 1
             if rc:
-                raise _error("mdb_cursor_del", rc)
+                raise self._pytxn._write_error("mdb_cursor_del", rc)
             self._cursor_get(_lib.MDB_GET_CURRENT)
             v = rc == 0
         return v
 
+    def deletemulti(self, keys, dupdata=False):
+        """Delete a batch of records, returning a tuple `(consumed, deleted)`,
+        where `consumed` is the number of elements read from `keys`, and
+        `deleted` is the number of records removed. Missing records are
+        skipped.
+
+        Elements of `keys` are either keys, or `(key, value)` 2-tuples
+        deleting only the matching value ("duplicate") of a database opened
+        with `dupsort=True`. With the CPython extension the batch is sorted
+        into database order and deleted by a single C loop with the GIL
+        released. The cursor is left unpositioned.
+
+            `keys`:
+                Iterable of keys or `(key, value)` 2-tuples.
+
+            `dupdata`:
+                If ``True`` and the database was opened with `dupsort=True`,
+                a bare key deletes all of its values, each counted in
+                `deleted`. Otherwise it deletes only the key's first value, as
+                for :py:meth:`delete`.
+
+        ::
+
+            >>> txn.cursor().deletemulti([b'a', b'b', b'c'])
+            (3, 2)
+        """
+        items = []
+        for item in keys:
+            if type(item) is tuple:
+                if len(item) != 2:
+                    raise TypeError(
+                        "deletemulti() elements must be keys or 2-tuples")
+                items.append(item)
+            else:
+                items.append((item, None))
+        flags = self._pydb._flags
+        for i, (key, _) in enumerate(items):
+            if not _key_size_ok(self._pytxn._pyenv, flags, len(key),
+                                len(items[0][0])):
+                raise _error("mdb_cursor_del() element #%d" % i,
+                             _lib.MDB_BAD_VALSIZE)
+        order = range(len(items))
+        if (not flags & (_lib.MDB_REVERSEKEY | _lib.MDB_INTEGERKEY) and
+                all(type(key) is bytes for key, _ in items)):
+            order = sorted(order, key=lambda i: items[i][0])
+        dupsort = bool(flags & _lib.MDB_DUPSORT)
+        deleted = 0
+        for i in order:
+            key, value = items[i]
+            if value is not None:
+                found = self.set_key_dup(key, value)
+                ndup = 1
+            else:
+                found = self.set_key(key)
+                ndup = self.count() if found and dupsort and dupdata else 1
+            if found:
+                self.delete(dupdata=dupdata and value is None)
+                deleted += ndup
+        self._valid = False
+        self._key.mv_size = 0
+        self._val.mv_size = 0
+        self._last_mutation = self._pytxn._mutations
+        return len(items), deleted
+
     def count(self):
         """Return the number of values ("duplicates") for the current key.
 
@@ -2570,6 +4047,41 @@ class Cursor:
             raise _error("mdb_cursor_count", rc)
         return countp[0]
 
+    def count_range(self, start=None, stop=None, dup=True):
+        """Return the number of records whose keys fall in the range
+        `[start, stop)`. If `start` is ``None``, counting begins at the first
+        key, and if `stop` is ``None`` it continues to the end of the
+        database. Keys are compared using the database's comparison function.
+
+        For databases opened with `dupsort=True`, every value ("duplicate")
+        is counted when `dup` is ``True``, otherwise each key is counted
+        once. The cursor is left positioned on the first record past the
+        range, if any.
+
+        With the CPython extension the range is walked in C with the GIL
+        released, without creating a Python object per record.
+
+        ::
+
+            >>> total = txn.cursor().count_range(b'user:', b'user;')
+        """
+        if not start:
+            start = None
+        self._check_bound(start, "start")
+        self._check_bound(stop, "stop")
+        if start is None:
+            self.first()
+        else:
+            self.set_range(start)
+
+        dupsort = self._pydb._flags & _lib.MDB_DUPSORT
+        op = _lib.MDB_NEXT_NODUP if dupsort else _lib.MDB_NEXT
+        n = 0
+        while self._valid and self._before_stop(stop):
+            n += self.count() if dupsort and dup else 1
+            self._cursor_get(op)
+        return n
+
     def put(self, key, val, dupdata=True, overwrite=True, append=False):
         """Store a record, returning ``True`` if it was written, or ``False``
         to indicate the key was already present and `overwrite=False`. On
@@ -2612,19 +4124,66 @@ class Cursor:
             else:
                 flags |= _lib.MDB_APPEND
 
+        self._pytxn._mutated()
         with self._pytxn._pyenv._close_lock:
             if not self._cur:
                 raise _error("Attempt to operate on closed cursor",
                               _lib.EINVAL)
             rc = _lib.pymdb_cursor_put(self._cur, key, len(key), val, len(val), flags)
-        self._pytxn._mutations += 1
         if rc:
             if rc == _lib.MDB_KEYEXIST:
                 return False
-            raise _error("mdb_cursor_put", rc)
+            raise self._pytxn._write_error("mdb_cursor_put", rc)
         self._cursor_get(_lib.MDB_GET_CURRENT)
         return True
 
+    def reserve(self, key, size, overwrite=True, append=False):
+        """Store a record of `size` bytes without copying a value, returning
+        a writable ``memoryview`` of the space reserved for it, or ``None``
+        if the key was already present and `overwrite=False`. On success, the
+        cursor is positioned on the key. See :py:meth:`Transaction.reserve`
+        for how long the view remains valid.
+
+        Equivalent to `mdb_cursor_put()
+        <http://lmdb.tech/doc/group__mdb.html#ga1f83ccb40011837ff37cc32be01ad91e>`_
+        with `MDB_RESERVE`.
+
+            `key`:
+                Bytestring key to store.
+
+            `size`:
+                Size in bytes of the value.
+
+            `overwrite`:
+                If ``False``, do not overwrite the value for the key if it
+                exists, just return ``None``.
+
+            `append`:
+                If ``True``, append the record to the end of the database
+                without comparing its order first, as with :py:meth:`put`.
+        """
+        if self._pydb._flags & _lib.MDB_DUPSORT:
+            raise _error("reserve() cannot be used with a dupsort database",
+                         _lib.MDB_INCOMPATIBLE)
+        flags = 0
+        if not overwrite:
+            flags |= _lib.MDB_NOOVERWRITE
+        if append:
+            flags |= _lib.MDB_APPEND
+        val = _ffi.new('MDB_val *')
+        val.mv_size = size
+        self._pytxn._mutated()
+        with self._pytxn._pyenv._close_lock:
+            if not self._cur:
+                raise _error("Attempt to operate on closed cursor",
+                              _lib.EINVAL)
+            rc = _lib.pymdb_cursor_reserve(self._cur, key, len(key), val,
+                                           flags)
+        view = self._pytxn._reserve_view(rc, val)
+        if view is not None:
+            self._cursor_get(_lib.MDB_GET_CURRENT)
+        return view
+
     def putmulti(self, items, dupdata=True, overwrite=True, append=False):
         """Invoke :py:meth:`put` for each `(key, value)` 2-tuple from the
         iterable `items`. Elements must be exactly 2-tuples, they may not be of
@@ -2669,22 +4228,150 @@ class Cursor:
         added = 0
         skipped = 0
         for key, value in items:
+            self._pytxn._mutated()
             with self._pytxn._pyenv._close_lock:
                 if not self._cur:
                     raise _error("Attempt to operate on closed cursor",
                                   _lib.EINVAL)
                 rc = _lib.pymdb_cursor_put(self._cur, key, len(key),
                                            value, len(value), flags)
-            self._pytxn._mutations += 1
             added += 1
             if rc:
                 if rc == _lib.MDB_KEYEXIST:
                     skipped += 1
                 else:
-                    raise _error("mdb_cursor_put", rc)
+                    raise self._pytxn._write_error("mdb_cursor_put", rc)
         self._cursor_get(_lib.MDB_GET_CURRENT)
         return added, added - skipped
 
+    def putmulti_columns(self, keys, key_offsets=None, values=None,
+                         value_offsets=None, key_size=0, value_size=0,
+                         dupdata=True, overwrite=True, append=False):
+        """Store records held in a columnar layout, the inverse of
+        :py:meth:`export_columns`. `keys` and `values` are buffers holding
+        the concatenated key and value bytes. Each column is split into
+        records either by an offsets buffer of int32 or int64 integers,
+        holding one more element than the number of records, such that
+        record `i` occupies ``keys[key_offsets[i]:key_offsets[i+1]]``, or by
+        a fixed record width. Exactly one of `key_offsets` and `key_size`
+        must be given, and likewise for values.
+
+        Records are read directly from the buffers, so no Python object is
+        created per record. With the CPython extension the whole batch is
+        written with the GIL released once.
+
+        Returns a tuple `(consumed, added)` as for :py:meth:`putmulti`.
+
+            `keys`, `values`:
+                Buffers holding the key and value bytes.
+
+            `key_offsets`, `value_offsets`:
+                Buffers of int32 or int64 record boundaries, for example an
+                ``array.array('q')`` or the offsets buffer of an Apache Arrow
+                binary array.
+
+            `key_size`, `value_size`:
+                Width of every key or value, for fixed-width columns.
+
+            `dupdata`, `overwrite`, `append`:
+                As for :py:meth:`putmulti`.
+
+        ::
+
+            >>> cursor.putmulti_columns(b'abc', array.array('q', [0, 1, 3]),
+            ...                         b'0011', value_size=2)
+            (2, 2)
+        """
+        if values is None:
+            raise TypeError("'keys' and 'values' arguments required.")
+        kptr, kbounds = _column(keys, key_offsets, key_size, 'key')
+        vptr, vbounds = _column(values, value_offsets, value_size, 'value')
+        count = len(kbounds) - 1
+        if count != len(vbounds) - 1:
+            raise ValueError("%d keys but %d values"
+                             % (count, len(vbounds) - 1))
+
+        flags = 0
+        if not dupdata:
+            flags |= _lib.MDB_NODUPDATA
+        if not overwrite:
+            flags |= _lib.MDB_NOOVERWRITE
+        if append:
+            if self._pydb._flags & _lib.MDB_DUPSORT:
+                flags |= _lib.MDB_APPENDDUP
+            else:
+                flags |= _lib.MDB_APPEND
+
+        added = 0
+        self._pytxn._mutated()
+        with self._pytxn._pyenv._close_lock:
+            if not self._cur:
+                raise _error("Attempt to operate on closed cursor",
+                              _lib.EINVAL)
+            for i in range(count):
+                koff = kbounds[i]
+                voff = vbounds[i]
+                rc = _lib.pymdb_cursor_put(self._cur, kptr + koff,
+                                           kbounds[i + 1] - koff,
+                                           vptr + voff,
+                                           vbounds[i + 1] - voff, flags)
+                if not rc:
+                    added += 1
+                elif rc != _lib.MDB_KEYEXIST:
+                    raise self._pytxn._write_error(
+                        "mdb_cursor_put() element #%d" % i, rc)
+        return count, added
+
+    def putmulti_dupfixed(self, key, values, item_size):
+        """Store many fixed-size duplicates of `key` in a single
+        `mdb_cursor_put()
+        <http://lmdb.tech/doc/group__mdb.html#ga1f83ccb40011837ff37cc32be01ad91e>`_
+        call with `MDB_MULTIPLE`, the write-side counterpart of
+        :py:meth:`getmulti`'s bulk reads. Returns the number of items stored,
+        which counts items that were already present. The database must have
+        been opened with `dupsort=True` and `dupfixed=True`, otherwise
+        :py:exc:`IncompatibleError` is raised.
+
+            `key`:
+                Bytestring key to store the duplicates under.
+
+            `values`:
+                Buffer holding the duplicates back to back, for example an
+                ``array.array`` or a NumPy array. Its length must be a
+                multiple of `item_size`.
+
+            `item_size`:
+                Size in bytes of each duplicate. It must match the size of
+                any duplicates already stored in the database.
+
+        ::
+
+            >>> cursor.putmulti_dupfixed(b'k', array.array('I', range(10000)), 4)
+            10000
+        """
+        if item_size <= 0:
+            raise ValueError("item_size must be positive")
+        mv = memoryview(values).cast('B')
+        if len(mv) % item_size:
+            raise ValueError("values length is not a multiple of item_size")
+        if not self._pydb._flags & _lib.MDB_DUPFIXED:
+            raise _error("putmulti_dupfixed() requires a dupfixed database",
+                         _lib.MDB_INCOMPATIBLE)
+        if not len(mv):
+            return 0
+        count = _ffi.new('size_t *', len(mv) // item_size)
+        self._pytxn._mutated()
+        with self._pytxn._pyenv._close_lock:
+            if not self._cur:
+                raise _error("Attempt to operate on closed cursor",
+                              _lib.EINVAL)
+            rc = _lib.pymdb_cursor_put_multiple(self._cur, key, len(key),
+                                                _ffi.from_buffer(mv),
+                                                item_size, count)
+        if rc:
+            raise self._pytxn._write_error("mdb_cursor_put", rc)
+        return count[0]
+
     def replace(self, key, val):
         """Store a record, returning its previous value if one existed. Returns
         ``None`` if no previous value existed. This uses the best available
@@ -2713,28 +4400,28 @@ class Cursor:
 
         flags = _lib.MDB_NOOVERWRITE
         keylen = len(key)
+        self._pytxn._mutated()
         with self._pytxn._pyenv._close_lock:
             if not self._cur:
                 raise _error("Attempt to operate on closed cursor",
                               _lib.EINVAL)
             rc = _lib.pymdb_cursor_put(self._cur, key, keylen, val, len(val), flags)
-        self._pytxn._mutations += 1
         if not rc:
             return
         if rc != _lib.MDB_KEYEXIST:
-            raise _error("mdb_cursor_put", rc)
+            raise self._pytxn._write_error("mdb_cursor_put", rc)
 
         self._cursor_get(_lib.MDB_GET_CURRENT)
         preload(self._val)
         old = _mvstr(self._val)
+        self._pytxn._mutated()
         with self._pytxn._pyenv._close_lock:
             if not self._cur:
                 raise _error("Attempt to operate on closed cursor",
                               _lib.EINVAL)
             rc = _lib.pymdb_cursor_put(self._cur, key, keylen, val, len(val), 0)
-        self._pytxn._mutations += 1
         if rc:
-            raise _error("mdb_cursor_put", rc)
+            raise self._pytxn._write_error("mdb_cursor_put", rc)
         self._cursor_get(_lib.MDB_GET_CURRENT)
         return old
 
@@ -2752,21 +4439,24 @@ class Cursor:
         if self._cursor_get_kv(_lib.MDB_SET_KEY, key, EMPTY_BYTES):
             preload(self._val)
             old = _mvstr(self._val)
+            self._pytxn._mutated()
             with self._pytxn._pyenv._close_lock:
                 if not self._cur:
                     raise _error("Attempt to operate on closed cursor",
                                   _lib.EINVAL)
                 rc = _lib.mdb_cursor_del(self._cur, 0)
-            self._pytxn._mutations += 1
             if rc:
-                raise _error("mdb_cursor_del", rc)
+                raise self._pytxn._write_error("mdb_cursor_del", rc)
             self._cursor_get(_lib.MDB_GET_CURRENT)
             return old
 
-    def _iter_from(self, k, reverse):
+    def _iter_from(self, k, reverse, stop=None, inclusive=False,
+                   limit=None):
         """Helper for centidb. Please do not rely on this interface, it may be
         removed in future.
         """
+        if stop is not None:
+            self._check_bound(stop, "stop")
         if not k and not reverse:
             found = self.first()
         else:
@@ -2774,8 +4464,8 @@ class Cursor:
         if reverse:
             if not found:
                 self.last()
-            return self.iterprev()
+            return self.iterprev(stop=stop, inclusive=inclusive, limit=limit)
         else:
             if not found:
                 return iter(())
-            return self.iternext()
+            return self.iternext(stop=stop, inclusive=inclusive, limit=limit)
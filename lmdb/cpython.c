@@ -55,6 +55,7 @@
 
 #ifndef _WIN32
 #include <pthread.h>
+#include <time.h>
 #endif
 
 /* Sequentially-consistent atomic counter primitives.  INCR/DECR return the
@@ -122,6 +123,8 @@ static PyObject *py_zero;
 static PyObject *py_int_max;
 /** PyLong representing SIZE_MAX. */
 static PyObject *py_size_max;
+/** array.array type, used by Cursor.values_array(). */
+static PyObject *array_type;
 /** lmdb.Error type. */
 static PyObject *Error;
 /** Global set of canonical paths for open environments. */
@@ -135,11 +138,13 @@ static PyTypeObject PyEnvironment_Type;
 static PyTypeObject PyTransaction_Type;
 static PyTypeObject PyCursor_Type;
 static PyTypeObject PyIterator_Type;
+static PyTypeObject PyReservedBuffer_Type;
 
 typedef struct CursorObject CursorObject;
 typedef struct DbObject DbObject;
 typedef struct EnvObject EnvObject;
 typedef struct IterObject IterObject;
+typedef struct ReservedBufferObject ReservedBufferObject;
 typedef struct TransObject TransObject;
 
 
@@ -186,6 +191,28 @@ struct DbObject {
     unsigned int flags;
 };
 
+/** Maximum number of spare MDB cursors, and of released objects of each
+ * kind, kept by an Environment for reuse. */
+#define ENV_FREELIST_MAX 16
+
+/** Kinds of object kept on EnvObject.free_objs. */
+enum env_freelist {
+    FREE_CURSOR,
+    FREE_ITER,
+    FREE_TRANS,
+    FREE_KINDS
+};
+
+/** A read-only MDB cursor whose Cursor was released, and the DBI it was
+ * opened on. */
+struct spare_cursor {
+    MDB_cursor *curs;
+    MDB_dbi dbi;
+    /** DBI flags at time of creation; MDB_DUPSORT decides whether the cursor
+     * carries a sub-cursor. */
+    unsigned int flags;
+};
+
 /** lmdb.Environment */
 struct EnvObject {
     LmdbObject_HEAD
@@ -197,15 +224,39 @@ struct EnvObject {
     DbObject *main_db;
     /**  1 if env opened read-only; transactions must always be read-only. */
     int readonly;
-    /** Spare read-only transaction. */
-    struct MDB_txn *spare_txn;
-    /** Maximum number of spare transactions.  In cpython only 0 and 1 are supported.
-     *  If process will be forked, this must be set to 0. */
+    /** Reset read-only transactions ready for mdb_txn_renew(), allocated on
+     *  first use with room for max_spare_txns. */
+    struct MDB_txn **spare_txns;
+    int nspare_txns;
+    /** Maximum number of spare transactions. */
     int max_spare_txns;
+    /** threading.local() holding each thread's reader() transaction, or
+     *  NULL before the first reader() call. */
+    PyObject *readers;
+    /** Read-only MDB cursors ready for mdb_cursor_renew(). */
+    struct spare_cursor spare_curs[ENV_FREELIST_MAX];
+    int nspare_curs;
+    /** Released Cursor, Iterator and Transaction objects, reused by the
+     * next make_cursor(), new_iterator() and make_trans(). */
+    PyObject *free_objs[FREE_KINDS][ENV_FREELIST_MAX];
+    int nfree_objs[FREE_KINDS];
     /** Process ID of the process this Environment was opened in. */
     pid_t pid;
     /** Thread ID of the thread holding the write transaction, or 0. */
     unsigned long write_txn_tid;
+    /** 1 if run_write() grows the map after its write transaction fails
+     *  with MDB_MAP_FULL. */
+    int auto_grow;
+    /** Bytes added to the map by each automatic growth, or 0 to double. */
+    size_t grow_step;
+    /** Upper bound for automatic growth, or 0 for no bound. */
+    size_t max_map_size;
+    /** Set when an operation in the current write transaction returned
+     *  MDB_MAP_FULL; consumed by env_auto_grow(). */
+    int map_full;
+    /** Number of reserve() buffers with live exports. While nonzero, the
+     *  write transaction they point into may not change or end. */
+    int reserve_exports;
     /** Resolved path used to track this env in open_env_paths. */
     PyObject *open_path;
     /** Count of in-flight LMDB operations (GIL released).  env_clear and
@@ -258,7 +309,9 @@ enum trans_flags {
     /** Transaction can be can go on freelist instead of deallocation. */
     TRANS_RDONLY        = 2,
     /** Transaction is spare, ready for mdb_txn_renew() */
-    TRANS_SPARE         = 4
+    TRANS_SPARE         = 4,
+    /** Transaction is a child of another transaction. */
+    TRANS_NESTED        = 8
 };
 
 /** lmdb.Transaction */
@@ -280,6 +333,30 @@ struct TransObject {
     /** Number of mutations occurred since start of transaction. Required to
      * know when cursor key/value must be refreshed. */
     int mutations;
+    /** Exporter behind the memoryview returned by the last reserve(), or
+     * NULL. Detached by the next mutation, since it points into a page the
+     * mutation may move; see trans_release_reserved(). */
+    ReservedBufferObject *reserved;
+    /** Weak reference to that memoryview. */
+    PyObject *reserved_view;
+};
+
+/** Buffer exporter behind the memoryview returned by reserve(). It counts
+ * the buffers taken from it, so the transaction can refuse to move or free
+ * the reserved space while any of them, including slices of the memoryview
+ * and arrays built on it, is alive. */
+struct ReservedBufferObject {
+    PyObject_HEAD
+    /** Transaction owning the space, or NULL once detached. Held, along
+     * with its environment, while `exports` is nonzero, so the space cannot
+     * be freed by the transaction's deallocation. */
+    TransObject *trans;
+    EnvObject *env;
+    /** Reserved space. */
+    void *data;
+    Py_ssize_t size;
+    /** Number of buffers currently exported. */
+    Py_ssize_t exports;
 };
 
 /** lmdb.Cursor */
@@ -320,6 +397,27 @@ struct IterObject {
     MDB_cursor_op op;
     /** Iterator value function, should be item(), key(), or value(). */
     IterValFunc val_func;
+    /** If nonzero, next() returns lists of up to this many elements. */
+    size_t batch;
+    /** Scratch (key, value) pairs for one batch, or NULL. */
+    MDB_val *batch_vals;
+    /** 1 if batch elements include keys, values respectively. */
+    int batch_keys;
+    int batch_values;
+    /** Private copy of the range bound, or mv_data NULL if unbounded. */
+    MDB_val stop;
+    /** 1 if an element equal to `stop` is within range. */
+    int inclusive;
+    /** 1 if `op` steps backwards, making `stop` a lower bound. */
+    int reverse;
+    /** Number of elements left to yield before the limit is reached. */
+    size_t remaining;
+    /** 1 once iteration has run past `stop`. */
+    int done;
+    /** 1 if `stop` holds a key prefix rather than a range bound. */
+    int prefix;
+    /** Typecode values are decoded as, or 0 to return them as bytes. */
+    char dtype;
 };
 
 
@@ -468,6 +566,129 @@ static void invalidate_txns(struct lmdb_object *parent)
 #define INVALIDATE_TXNS(parent) invalidate_txns((void *)parent);
 #define INVALIDATE_MARK_TXNS(parent) invalidate_mark_txns((void *)parent);
 
+/**
+ * Release the memoryview returned by the last reserve() on `trans`, so later
+ * access raises ValueError instead of touching a stale page. While a buffer
+ * derived from it is still alive, such as a slice or a NumPy array, the
+ * reserved space stays attached, and env_check_reserved() fails.
+ */
+static void
+trans_release_reserved(TransObject *trans)
+{
+    ReservedBufferObject *rb = trans->reserved;
+    PyObject *view = NULL;
+    PyObject *type, *value, *traceback;
+    PyObject *res;
+
+    if(! rb) {
+        return;
+    }
+    if(trans->reserved_view) {
+#if PY_VERSION_HEX >= 0x030d0000
+        if(PyWeakref_GetRef(trans->reserved_view, &view) < 0) {
+            PyErr_Clear();
+        }
+#else
+        view = PyWeakref_GetObject(trans->reserved_view);
+        if(view == Py_None) {
+            view = NULL;
+        }
+        Py_XINCREF(view);
+#endif
+    }
+    if(view) {
+        /* Fails with BufferError if the view itself is exported. */
+        PyErr_Fetch(&type, &value, &traceback);
+        if((res = PyObject_CallMethod(view, "release", NULL))) {
+            Py_DECREF(res);
+        } else {
+            PyErr_Clear();
+        }
+        PyErr_Restore(type, value, traceback);
+        Py_DECREF(view);
+    }
+    if(! rb->exports) {
+        rb->trans = NULL;
+        trans->reserved = NULL;
+        Py_CLEAR(trans->reserved_view);
+        Py_DECREF(rb);
+    }
+}
+
+/**
+ * Call trans_release_reserved() on every transaction of `env`, including
+ * child transactions, which are also linked to the environment.
+ */
+static void
+env_release_reserved(EnvObject *env)
+{
+    struct lmdb_object *child = env->children.next;
+    PyObject *held_ref = NULL;
+    while(child) {
+        struct lmdb_object *next = child->siblings.next;
+        /* Releasing a view may drop the last reference to a transaction
+         * (see invalidate()). */
+        Py_XINCREF((PyObject *) next);
+        Py_INCREF((PyObject *) child);
+        if(Py_TYPE(child) == &PyTransaction_Type) {
+            trans_release_reserved((TransObject *) child);
+        }
+        Py_DECREF((PyObject *) child);
+        Py_XDECREF(held_ref);
+        held_ref = (PyObject *) next;
+        child = next;
+    }
+    Py_XDECREF(held_ref);
+}
+
+/**
+ * Fail with BufferError if a buffer derived from a reserve() view is still
+ * alive in `env`.
+ */
+static int
+env_check_reserved(EnvObject *env)
+{
+    if(env->reserve_exports) {
+        PyErr_SetString(PyExc_BufferError,
+            "A buffer derived from a reserve() view is still in use");
+        return -1;
+    }
+    return 0;
+}
+
+/**
+ * Record a mutation of `trans`: cursors refresh their key/value, and the
+ * last reserve() view is released. Call before mutating; fails while a
+ * buffer derived from a reserve() view is alive.
+ */
+static int
+trans_mutate(TransObject *trans)
+{
+    trans->mutations++;
+    if(trans->reserved) {
+        trans_release_reserved(trans);
+    }
+    if(trans->env && !(trans->flags & TRANS_RDONLY)) {
+        return env_check_reserved(trans->env);
+    }
+    return 0;
+}
+
+/**
+ * Release the reserve() views of write transaction `trans` and its children
+ * before it ends; fails while a buffer derived from one is alive.
+ */
+static int
+trans_end_reserved(TransObject *trans)
+{
+    if((trans->flags & TRANS_RDONLY) || !trans->env ||
+       !trans->env->reserve_exports) {
+        return 0;
+    }
+    env_release_reserved(trans->env);
+    return env_check_reserved(trans->env);
+}
+
 
 /* ---------- */
 /* Exceptions */
@@ -559,6 +780,23 @@ err_invalid(void)
     return NULL;
 }
 
+/**
+ * Return 1 if the pending exception is the one err_set() raises for `rc`.
+ */
+static int
+err_matches(int rc)
+{
+    size_t count = sizeof error_map / sizeof error_map[0];
+    size_t i;
+
+    for(i = 0; i < count; i++) {
+        if(error_map[i].code == rc) {
+            return PyErr_ExceptionMatches(error_tbl[i]);
+        }
+    }
+    return 0;
+}
+
 static void * NOINLINE
 type_error(const char *what)
 {
@@ -699,6 +937,94 @@ obj_from_val(MDB_val *val, int as_buffer)
                                      (Py_ssize_t) val->mv_size);
 }
 
+/**
+ * Return the size of an element of array module typecode `code`, or 0 if
+ * `code` is not a supported numeric typecode.
+ */
+static size_t
+dtype_size(char code)
+{
+    switch(code) {
+    case 'b': case 'B': return 1;
+    case 'h': case 'H': return sizeof(short);
+    case 'i': case 'I': return sizeof(int);
+    case 'l': case 'L': return sizeof(long);
+    case 'q': case 'Q': return sizeof(long long);
+    case 'f': return sizeof(float);
+    case 'd': return sizeof(double);
+    }
+    return 0;
+}
+
+/**
+ * Convert a `dtype` argument to an array module typecode, storing 0 in
+ * `*code` if it is None. Returns 0 on success, or -1 with ValueError set.
+ */
+static int
+parse_dtype(PyObject *obj, char *code)
+{
+    const char *s;
+    Py_ssize_t len;
+
+    *code = 0;
+    if(obj == Py_None) {
+        return 0;
+    }
+    if(PyUnicode_Check(obj) &&
+       (s = PyUnicode_AsUTF8AndSize(obj, &len)) && len == 1 &&
+       dtype_size(s[0])) {
+        *code = s[0];
+        return 0;
+    }
+    PyErr_Clear();
+    PyErr_SetString(PyExc_ValueError,
+                    "dtype must be one of 'bBhHiIlLqQfd'");
+    return -1;
+}
+
+#define DTYPE_CASE(c, type, conv) \
+    case c: { type v; memcpy(&v, p, sizeof v); return conv(v); }
+
+/**
+ * Decode the native-endian number of typecode `code` stored at `p`.
+ */
+static PyObject *
+obj_from_dtype(const void *p, char code)
+{
+    switch(code) {
+    DTYPE_CASE('b', signed char, PyLong_FromLong)
+    DTYPE_CASE('B', unsigned char, PyLong_FromUnsignedLong)
+    DTYPE_CASE('h', short, PyLong_FromLong)
+    DTYPE_CASE('H', unsigned short, PyLong_FromUnsignedLong)
+    DTYPE_CASE('i', int, PyLong_FromLong)
+    DTYPE_CASE('I', unsigned int, PyLong_FromUnsignedLong)
+    DTYPE_CASE('l', long, PyLong_FromLong)
+    DTYPE_CASE('L', unsigned long, PyLong_FromUnsignedLong)
+    DTYPE_CASE('q', long long, PyLong_FromLongLong)
+    DTYPE_CASE('Q', unsigned long long, PyLong_FromUnsignedLongLong)
+    DTYPE_CASE('f', float, PyFloat_FromDouble)
+    DTYPE_CASE('d', double, PyFloat_FromDouble)
+    }
+    PyErr_SetString(PyExc_ValueError, "bad dtype");
+    return NULL;
+}
+
+#undef DTYPE_CASE
+
+/**
+ * Like obj_from_val(), but decode `val` as a single number of typecode
+ * `code`, raising BadValsizeError if its size does not match.
+ */
+static PyObject *
+obj_from_val_dtype(const MDB_val *val, char code)
+{
+    if(val->mv_size != dtype_size(code)) {
+        err_set("dtype", MDB_BAD_VALSIZE);
+        return NULL;
+    }
+    return obj_from_dtype(val->mv_data, code);
+}
+
 /* Track Py_buffer views acquired during argument parsing so they can be
  * released after the LMDB operation that consumes the data completes.
  * This prevents mutable buffer objects (bytearray, memoryview, etc.) from
@@ -782,6 +1108,207 @@ val_from_buffer(MDB_val *val, PyObject *buf, BufViewList *bvl)
     }
 }
 
+/* Growable variant of BufViewList for batch operations, which must keep an
+ * unbounded number of caller buffers pinned across a single GIL-released
+ * section.  Bytes objects are not tracked: the caller keeps them alive by
+ * holding the tuple they came from (see sequence_snapshot()). */
+typedef struct {
+    Py_buffer *views;
+    size_t count;
+    size_t size;
+} BufBatch;
+
+static void
+bufbatch_init(BufBatch *bb)
+{
+    bb->views = NULL;
+    bb->count = 0;
+    bb->size = 0;
+}
+
+static void
+bufbatch_release(BufBatch *bb)
+{
+    size_t i;
+    for(i = 0; i < bb->count; i++) {
+        PyBuffer_Release(&bb->views[i]);
+    }
+    free(bb->views);
+    bufbatch_init(bb);
+}
+
+/**
+ * Return a new reference to a tuple holding the elements of `obj`, or set
+ * TypeError using `msg` and return NULL if it is not iterable. Unlike
+ * PySequence_Fast(), a list is copied, so another thread emptying or
+ * rebinding the caller's list cannot free elements while they are in use
+ * with the GIL released.
+ */
+static PyObject *
+sequence_snapshot(PyObject *obj, const char *msg)
+{
+    PyObject *seq;
+    PyObject *tup;
+
+    if(PyTuple_CheckExact(obj)) {
+        Py_INCREF(obj);
+        return obj;
+    }
+    if(! ((seq = PySequence_Fast(obj, msg)))) {
+        return NULL;
+    }
+    tup = PySequence_Tuple(seq);
+    Py_DECREF(seq);
+    return tup;
+}
+
+/**
+ * Like val_from_buffer(), but keep any acquired view pinned in `bb` until
+ * bufbatch_release().
+ */
+static int NOINLINE
+val_from_buffer_batch(MDB_val *val, PyObject *buf, BufBatch *bb)
+{
+    Py_buffer *view;
+
+    if(PyBytes_CheckExact(buf)) {
+        val->mv_data = PyBytes_AS_STRING(buf);
+        val->mv_size = PyBytes_GET_SIZE(buf);
+        return 0;
+    }
+    if(PyUnicode_CheckExact(buf)) {
+        type_error("Won't implicitly convert Unicode to bytes; use .encode()");
+        return -1;
+    }
+    if(bb->count == bb->size) {
+        size_t new_size = bb->size ? (bb->size * 2) : 8;
+        Py_buffer *new_views;
+        if(SIZE_MUL_OVERFLOW(new_size, sizeof(Py_buffer))) {
+            PyErr_NoMemory();
+            return -1;
+        }
+        new_views = realloc(bb->views, new_size * sizeof(Py_buffer));
+        if(! new_views) {
+            PyErr_NoMemory();
+            return -1;
+        }
+        bb->views = new_views;
+        bb->size = new_size;
+    }
+    view = &bb->views[bb->count];
+    if(PyObject_GetBuffer(buf, view, PyBUF_SIMPLE)) {
+        return -1;
+    }
+    val->mv_data = view->buf;
+    val->mv_size = view->len;
+    bb->count++;
+    return 0;
+}
+
+/**
+ * Return 1 if a caller-supplied key of `size` bytes may be handed to
+ * mdb_cmp(), which performs no size checks of its own: the MDB_INTEGERKEY
+ * comparator assumes both keys share a width, and would otherwise read past
+ * the end of a shorter buffer. Empty and oversized keys are rejected, and on
+ * MDB_INTEGERKEY databases any key that is not an unsigned int or size_t,
+ * or (if `width` is nonzero) whose size differs from `width`.
+ */
+static int
+key_size_ok(EnvObject *env, unsigned int db_flags, size_t size, size_t width)
+{
+    if(! size || size > (size_t) mdb_env_get_maxkeysize(env->env)) {
+        return 0;
+    }
+    if(db_flags & MDB_INTEGERKEY) {
+        if(size != sizeof(unsigned int) && size != sizeof(size_t)) {
+            return 0;
+        }
+        if(width && size != width) {
+            return 0;
+        }
+    }
+    return 1;
+}
+
+/**
+ * Validate a batch of keys before sort_key_order() sorts them, requiring
+ * all keys of an MDB_INTEGERKEY batch to share the first key's width.
+ * Returns 0 on success, or -1 with BadValsizeError set.
+ */
+static int
+check_batch_keys(EnvObject *env, unsigned int db_flags, const MDB_val *keys,
+                 size_t n, const char *what)
+{
+    size_t i;
+
+    for(i = 0; i < n; i++) {
+        if(! key_size_ok(env, db_flags, keys[i].mv_size, keys[0].mv_size)) {
+            err_format(MDB_BAD_VALSIZE, "%s element #%zu", what, i);
+            return -1;
+        }
+    }
+    return 0;
+}
+
+/**
+ * Fill `order` with a permutation of [0, n) that visits `keys` in the
+ * database's sort order, so batch operations walk the B-tree left to right
+ * and touch each page once.  Stable bottom-up merge sort using `tmp` (room
+ * for `n` entries) as scratch; mdb_cmp() needs no GIL, so this may run
+ * inside the caller's unlocked section.
+ */
+static void
+sort_key_order(MDB_txn *txn, MDB_dbi dbi, const MDB_val *keys,
+               size_t *order, size_t *tmp, size_t n)
+{
+    size_t width, lo, mid, hi, i, j, k;
+    size_t *src = order;
+    size_t *dst = tmp;
+    size_t *swap;
+
+    for(i = 0; i < n; i++) {
+        order[i] = i;
+    }
+    /* Callers frequently pass already sorted input; skip the sort. */
+    for(i = 1; i < n; i++) {
+        if(mdb_cmp(txn, dbi, &keys[i - 1], &keys[i]) > 0) {
+            break;
+        }
+    }
+    if(i >= n) {
+        return;
+    }
+
+    for(width = 1; width < n; width *= 2) {
+        for(lo = 0; lo < n; lo += 2 * width) {
+            mid = (width < n - lo) ? (lo + width) : n;
+            hi = (2 * width < n - lo) ? (lo + 2 * width) : n;
+            i = lo;
+            j = mid;
+            k = lo;
+            while(i < mid && j < hi) {
+                if(mdb_cmp(txn, dbi, &keys[src[j]], &keys[src[i]]) < 0) {
+                    dst[k++] = src[j++];
+                } else {
+                    dst[k++] = src[i++];
+                }
+            }
+            while(i < mid) {
+                dst[k++] = src[i++];
+            }
+            while(j < hi) {
+                dst[k++] = src[j++];
+            }
+        }
+        swap = src;
+        src = dst;
+        dst = swap;
+    }
+    if(src != order) {
+        memcpy(order, src, n * sizeof(size_t));
+    }
+}
+
 /* ------------------- */
 /* Concurrency control */
 /* ------------------- */
@@ -881,6 +1408,16 @@ val_from_buffer(MDB_val *val, PyObject *buf, BufViewList *bvl)
         ENV_SYNC_UNLOCK(_env); \
     } while(0)
 
+/* NOTE_MAP_FULL: remember that an LMDB call returned MDB_MAP_FULL, so
+ * run_write() can grow the map when auto_grow is set.
+ * Must be called with the GIL held. */
+#define NOTE_MAP_FULL(_env, rc) \
+    do { \
+        if((rc) == MDB_MAP_FULL) { \
+            (_env)->map_full = 1; \
+        } \
+    } while(0)
+
 /* ENV_UNLOCKED: release GIL for an LMDB call, holding the env's active_ops
  * counter to prevent env_clear from closing the env underneath us.  The
  * counter is incremented while the GIL is still held (so env_clear can't
@@ -916,6 +1453,7 @@ val_from_buffer(MDB_val *val, PyObject *buf, BufViewList *bvl)
             out = (e); \
             Py_END_ALLOW_THREADS \
             ACTIVE_OPS_DEC(_saved_env); \
+            NOTE_MAP_FULL(_saved_env, out); \
         } \
     } while(0)
 
@@ -1165,40 +1703,199 @@ db_owner_check(DbObject *db, EnvObject *env)
 }
 
 
-/* -------------------------------------------------------- */
-/* Functionality shared between Transaction and Environment */
-/* -------------------------------------------------------- */
+/* ---------- */
+/* Free lists */
+/* ---------- */
 
+/**
+ * Return a new reference to an object of `type`, reusing one released to
+ * `env`'s free list of `kind` if available. Only the object header is
+ * initialized.
+ */
 static PyObject *
-make_trans(EnvObject *env, DbObject *db, TransObject *parent, int write,
-           int buffers)
+env_alloc_object(EnvObject *env, int kind, PyTypeObject *type)
 {
-    MDB_txn *parent_txn;
-    MDB_txn *txn;
-    TransObject *self;
-    int flags;
-    int rc;
-
-    DEBUG("make_trans(env=%p, parent=%p, write=%d, buffers=%d)",
-        env, parent, write, buffers)
-    if(! env->valid) {
-        return err_invalid();
+    if(env && env->nfree_objs[kind]) {
+        PyObject *o = env->free_objs[kind][--env->nfree_objs[kind]];
+        return PyObject_Init(o, type);
     }
+    return (PyObject *) PyObject_New(PyObject, type);
+}
 
-    if(! db) {
-        db = env->main_db;
-    } else if(! db_owner_check(db, env)) {
-        return NULL;
+/**
+ * Release the memory of deallocated object `o`, keeping it on `env`'s free
+ * list of `kind` if the environment is open in this process and the list
+ * has room.
+ */
+static void
+env_free_object(EnvObject *env, int kind, PyObject *o)
+{
+    if(env && env->valid && env->pid == _cached_pid &&
+       env->nfree_objs[kind] < ENV_FREELIST_MAX) {
+        env->free_objs[kind][env->nfree_objs[kind]++] = o;
+    } else {
+        PyObject_Del(o);
     }
+}
 
-    parent_txn = NULL;
-    if(parent) {
-        if(parent->flags & TRANS_RDONLY) {
-            return err_set("Read-only transactions cannot be nested.", EINVAL);
-        }
+/**
+ * Take a spare MDB cursor opened on `dbi` with DBI flags `flags` and renew
+ * it for read-only transaction `txn`. Returns NULL if none is available or
+ * renewal failed, in which case the caller should use mdb_cursor_open().
+ */
+static MDB_cursor *
+env_renew_cursor(EnvObject *env, MDB_txn *txn, MDB_dbi dbi,
+                 unsigned int flags)
+{
+    int i;
+
+    for(i = env->nspare_curs - 1; i >= 0; i--) {
+        struct spare_cursor *spare = &env->spare_curs[i];
+        if(spare->dbi == dbi && spare->flags == flags) {
+            MDB_cursor *curs = spare->curs;
+            *spare = env->spare_curs[--env->nspare_curs];
+            if(mdb_cursor_renew(txn, curs)) {
+                mdb_cursor_close(curs);
+                return NULL;
+            }
+            return curs;
+        }
+    }
+    return NULL;
+}
+
+/**
+ * Close `env`'s spare MDB cursors opened on `dbi`, or all of them if `all`
+ * is nonzero.
+ */
+static void
+env_close_spare_cursors(EnvObject *env, MDB_dbi dbi, int all)
+{
+    int i = 0;
+
+    while(i < env->nspare_curs) {
+        if(all || env->spare_curs[i].dbi == dbi) {
+            mdb_cursor_close(env->spare_curs[i].curs);
+            env->spare_curs[i] = env->spare_curs[--env->nspare_curs];
+        } else {
+            i++;
+        }
+    }
+}
+
+/**
+ * Take a spare read-only transaction from `env` and renew it. Returns NULL
+ * with `*rc` set to 0 if none is available, or with `*rc` set to the error if
+ * renewal failed. Spares are never handed out in a forked child, where the
+ * parent's transactions must not be touched.
+ */
+static MDB_txn *
+env_renew_txn(EnvObject *env, int *rc)
+{
+    MDB_txn *txn;
+
+    *rc = 0;
+    if(! env->nspare_txns || env->pid != _cached_pid) {
+        return NULL;
+    }
+    txn = env->spare_txns[--env->nspare_txns];
+    /* Hold GIL during mdb_txn_renew to prevent race with env_clear:
+     * env->valid checks by callers must be atomic with the LMDB operation.
+     * See https://github.com/jnwatson/py-lmdb/issues/180 */
+    if((*rc = mdb_txn_renew(txn))) {
+        mdb_txn_abort(txn);
+        return NULL;
+    }
+    return txn;
+}
+
+/**
+ * Reset read-only transaction `txn` and keep it on `env`'s spare list for
+ * env_renew_txn(), or abort it if the list is full.
+ */
+static void
+env_spare_txn(EnvObject *env, MDB_txn *txn)
+{
+    if(env->pid == _cached_pid && env->nspare_txns < env->max_spare_txns) {
+        if(! env->spare_txns) {
+            env->spare_txns = malloc(env->max_spare_txns * sizeof(MDB_txn *));
+        }
+        if(env->spare_txns) {
+            mdb_txn_reset(txn);
+            env->spare_txns[env->nspare_txns++] = txn;
+            return;
+        }
+    }
+    mdb_txn_abort(txn);
+}
+
+/**
+ * Abort `env`'s spare read-only transactions, which reference the current
+ * memory map.
+ */
+static void
+env_abort_spare_txns(EnvObject *env)
+{
+    while(env->nspare_txns) {
+        mdb_txn_abort(env->spare_txns[--env->nspare_txns]);
+    }
+}
+
+/**
+ * Free the spare MDB cursors and released objects held by `env`.
+ */
+static void
+env_clear_freelists(EnvObject *env)
+{
+    int kind;
+
+    env_close_spare_cursors(env, 0, 1);
+    for(kind = 0; kind < FREE_KINDS; kind++) {
+        while(env->nfree_objs[kind]) {
+            PyObject_Del(env->free_objs[kind][--env->nfree_objs[kind]]);
+        }
+    }
+}
+
+
+/* -------------------------------------------------------- */
+/* Functionality shared between Transaction and Environment */
+/* -------------------------------------------------------- */
+
+static PyObject *
+make_trans(EnvObject *env, DbObject *db, TransObject *parent, int write,
+           int buffers)
+{
+    MDB_txn *parent_txn;
+    MDB_txn *txn;
+    TransObject *self;
+    int flags;
+    int rc;
+
+    DEBUG("make_trans(env=%p, parent=%p, write=%d, buffers=%d)",
+        env, parent, write, buffers)
+    if(! env->valid) {
+        return err_invalid();
+    }
+
+    if(! db) {
+        db = env->main_db;
+    } else if(! db_owner_check(db, env)) {
+        return NULL;
+    }
+
+    parent_txn = NULL;
+    if(parent) {
+        if(parent->flags & TRANS_RDONLY) {
+            return err_set("Read-only transactions cannot be nested.", EINVAL);
+        }
         if(! parent->valid) {
             return err_invalid();
         }
+        /* The child takes over the parent's dirty pages. */
+        if(trans_mutate(parent)) {
+            return NULL;
+        }
         parent_txn = parent->txn;
     }
 
@@ -1224,19 +1921,16 @@ make_trans(EnvObject *env, DbObject *db, TransObject *parent, int write,
         return err_set(msg, EBUSY);
     }
 
-    if((!write) && env->spare_txn) {
-        txn = env->spare_txn;
-        DEBUG("using cached txn", txn)
-        env->spare_txn = NULL;
-        /* Hold GIL during mdb_txn_renew to prevent race with env_clear:
-         * env->valid check above must be atomic with the LMDB operation.
-         * See https://github.com/jnwatson/py-lmdb/issues/180 */
-        rc = mdb_txn_renew(txn);
+    txn = NULL;
+    if(! write) {
+        txn = env_renew_txn(env, &rc);
         if(rc) {
-            mdb_txn_abort(txn);
             return err_set("mdb_txn_renew", rc);
         }
     }
+    if(txn) {
+        DEBUG("using cached txn", txn)
+    }
     else {
         flags = write ? 0 : MDB_RDONLY;
         if(write && !parent) {
@@ -1250,6 +1944,7 @@ make_trans(EnvObject *env, DbObject *db, TransObject *parent, int write,
                 return err_set("mdb_txn_begin", rc);
             }
             SET_WRITE_TXN_TID(env);
+            env->map_full = 0;
         } else {
             /* Read txns and child txns: hold GIL during mdb_txn_begin to
              * prevent race with env_clear.  Issue #180. */
@@ -1260,7 +1955,9 @@ make_trans(EnvObject *env, DbObject *db, TransObject *parent, int write,
         }
     }
 
-    if(! ((self = PyObject_New(TransObject, &PyTransaction_Type)))) {
+    self = (TransObject *) env_alloc_object(env, FREE_TRANS,
+                                            &PyTransaction_Type);
+    if(! self) {
         mdb_txn_abort(txn);
         if(write && !parent) {
             /* Mutex released; wakes any close() waiting on it.  #465. */
@@ -1283,6 +1980,8 @@ make_trans(EnvObject *env, DbObject *db, TransObject *parent, int write,
 #endif
 
     self->mutations = 0;
+    self->reserved = NULL;
+    self->reserved_view = NULL;
     self->flags = 0;
     if(! write) {
         self->flags |= TRANS_RDONLY;
@@ -1290,6 +1989,9 @@ make_trans(EnvObject *env, DbObject *db, TransObject *parent, int write,
     if(buffers) {
         self->flags |= TRANS_BUFFERS;
     }
+    if(parent) {
+        self->flags |= TRANS_NESTED;
+    }
     return (PyObject *)self;
 }
 
@@ -1310,12 +2012,19 @@ make_cursor(DbObject *db, TransObject *trans)
     }
 
     /* Hold GIL: see make_trans comment and issue #180. */
-    rc = mdb_cursor_open(trans->txn, db->dbi, &curs);
-    if(rc) {
-        return err_set("mdb_cursor_open", rc);
+    curs = NULL;
+    if(trans->flags & TRANS_RDONLY) {
+        curs = env_renew_cursor(trans->env, trans->txn, db->dbi, db->flags);
+    }
+    if(! curs) {
+        rc = mdb_cursor_open(trans->txn, db->dbi, &curs);
+        if(rc) {
+            return err_set("mdb_cursor_open", rc);
+        }
     }
 
-    self = PyObject_New(CursorObject, &PyCursor_Type);
+    self = (CursorObject *) env_alloc_object(trans->env, FREE_CURSOR,
+                                             &PyCursor_Type);
     if (!self) {
         mdb_cursor_close(curs);
         return NULL;
@@ -1516,7 +2225,6 @@ txn_abort(MDB_txn *txn);
 static int
 env_clear(EnvObject *self)
 {
-    MDB_txn * txn;
     unsigned long me = (unsigned long) PyThread_get_thread_ident();
 
     MDEBUG("env_clear")
@@ -1568,15 +2276,14 @@ env_clear(EnvObject *self)
     /* Phase 2: actual cleanup (may release GIL for txn_abort etc.) */
     INVALIDATE(self)
     Py_CLEAR(self->main_db);
+    /* Cached reader() transactions hold references to the environment. */
+    Py_CLEAR(self->readers);
+    env_clear_freelists(self);
 
-    txn = self->spare_txn;
-    if(txn) {
-        self->spare_txn = NULL;
-        MDEBUG("killing spare txn %p", txn);
-        /* Don't release GIL — env is being torn down, workers could
-         * re-stash a spare_txn during the GIL release. */
-        mdb_txn_abort(txn);
-    }
+    MDEBUG("killing spare txns")
+    /* Don't release GIL — env is being torn down, workers could re-stash a
+     * spare txn during the GIL release. */
+    env_abort_spare_txns(self);
 
     if(self->env) {
         MDB_env *env = self->env;
@@ -1625,6 +2332,7 @@ env_dealloc(EnvObject *self)
      * env_clear drops it to 1, not 0. */
     Py_SET_REFCNT((PyObject *)self, 1);
     env_clear(self);
+    free(self->spare_txns);
     if(self->ops_sync_ready) {
         self->ops_sync_ready = 0;
 #ifdef _WIN32
@@ -1644,6 +2352,12 @@ env_dealloc(EnvObject *self)
 static PyObject *
 env_close(EnvObject *self, PyObject *Py_UNUSED(ignored))
 {
+    if(self->reserve_exports) {
+        env_release_reserved(self);
+        if(env_check_reserved(self)) {
+            return NULL;
+        }
+    }
     env_clear(self);
     Py_RETURN_NONE;
 }
@@ -1671,7 +2385,11 @@ env_new(PyTypeObject *type, PyObject *args, PyObject *kwds)
         int max_dbs;
         int max_spare_txns;
         int lock;
-    } arg = {NULL, 10485760, 1, 0, 1, 1, 0, 0755, 1, 1, 0, 1, 126, 0, 0, 1};
+        int auto_grow;
+        size_t grow_step;
+        size_t max_map_size;
+    } arg = {NULL, 10485760, 1, 0, 1, 1, 0, 0755, 1, 1, 0, 1, 126, 0, 0, 1,
+             0, 0, 0};
 
     static const struct argspec argspec[] = {
         {"path", ARG_OBJ, OFFSET(env_new, path)},
@@ -1690,6 +2408,9 @@ env_new(PyTypeObject *type, PyObject *args, PyObject *kwds)
         {"max_dbs", ARG_INT, OFFSET(env_new, max_dbs)},
         {"max_spare_txns", ARG_INT, OFFSET(env_new, max_spare_txns)},
         {"lock", ARG_BOOL, OFFSET(env_new, lock)},
+        {"auto_grow", ARG_BOOL, OFFSET(env_new, auto_grow)},
+        {"grow_step", ARG_SIZE, OFFSET(env_new, grow_step)},
+        {"max_map_size", ARG_SIZE, OFFSET(env_new, max_map_size)},
     };
 
     PyObject *fspath_obj = NULL;
@@ -1716,11 +2437,20 @@ env_new(PyTypeObject *type, PyObject *args, PyObject *kwds)
     self->weaklist = NULL;
     self->main_db = NULL;
     self->env = NULL;
-    self->spare_txn = NULL;
+    self->spare_txns = NULL;
+    self->nspare_txns = 0;
+    self->readers = NULL;
     self->open_path = NULL;
     self->max_spare_txns = arg.max_spare_txns;
+    self->nspare_curs = 0;
+    memset(self->nfree_objs, 0, sizeof self->nfree_objs);
     self->pid = _cached_pid;
     self->write_txn_tid = 0;
+    self->auto_grow = arg.auto_grow;
+    self->grow_step = arg.grow_step;
+    self->max_map_size = arg.max_map_size;
+    self->map_full = 0;
+    self->reserve_exports = 0;
     self->active_ops = 0;
     self->ops_waiters = 0;
     self->resizing = 0;
@@ -1901,116 +2631,593 @@ env_begin(EnvObject *self, PyObject *args, PyObject *kwds)
     return make_trans(self, arg.db, arg.parent, arg.write, arg.buffers);
 }
 
+static int
+env_resize(EnvObject *self, size_t map_size);
+static int
+env_auto_grow(EnvObject *self);
+static PyObject *
+trans_abort(TransObject *self, PyObject *Py_UNUSED(ignored));
+static PyObject *
+trans_commit(TransObject *self, PyObject *Py_UNUSED(ignored));
+static PyObject *
+trans_putmany(TransObject *self, PyObject *args, PyObject *kwds);
+
+/** Default Environment.bulk_load() txn_bytes. */
+#define BULK_LOAD_TXN_BYTES ((size_t) 64 << 20)
+
 /**
- * Environment.copy()
+ * Write one chunk of Environment.bulk_load() in its own transaction,
+ * growing the map by `grow` and retrying the chunk on MDB_MAP_FULL. If
+ * `presorted` is set, a record not appended means the chunk was out of
+ * order, and it is not committed.
+ * Returns 0 on success, or -1 with an exception set.
  */
-static PyObject *
-env_copy(EnvObject *self, PyObject *args, PyObject *kwds)
+static int
+bulk_load_chunk(EnvObject *self, DbObject *db, PyObject *putargs,
+                PyObject *putkwds, int presorted, double grow,
+                Py_ssize_t *added)
 {
-    struct env_copy {
-        PyObject *path;
-        int compact;
+    for(;;) {
         TransObject *txn;
-    } arg = {NULL, 0, NULL};
+        PyObject *res;
+        Py_ssize_t chunk_added = 0;
+        MDB_envinfo info;
+        double map_size;
+
+        if(! self->valid) {
+            err_invalid();
+            return -1;
+        }
+        if(! ((txn = (TransObject *) make_trans(self, db, NULL, 1, 0)))) {
+            return -1;
+        }
+        if((res = trans_putmany(txn, putargs, putkwds))) {
+            chunk_added = PyLong_AsSsize_t(PyTuple_GET_ITEM(res, 1));
+            Py_DECREF(res);
+            if(presorted && chunk_added <
+                    PyList_GET_SIZE(PyTuple_GET_ITEM(putargs, 0))) {
+                PyErr_SetString(PyExc_ValueError,
+                    "bulk_load() items out of order with presorted=True");
+                res = NULL;
+            } else {
+                res = trans_commit(txn, NULL);
+            }
+        }
+        /* Aborts the transaction if the chunk was not committed. */
+        Py_DECREF(txn);
+        if(res) {
+            Py_DECREF(res);
+            *added += chunk_added;
+            return 0;
+        }
+        if(! err_matches(MDB_MAP_FULL)) {
+            return -1;
+        }
+        PyErr_Clear();
+
+        mdb_env_info(self->env, &info);
+        map_size = (double) info.me_mapsize * grow;
+        if(map_size >= (double) SIZE_MAX) {
+            err_set("bulk_load", MDB_MAP_FULL);
+            return -1;
+        }
+        DEBUG("bulk_load: growing map to %zu", (size_t) map_size)
+        if(env_resize(self, (size_t) map_size)) {
+            return -1;
+        }
+    }
+}
+
+/**
+ * Environment.bulk_load(items) -> (consumed, added)
+ */
+static PyObject *
+env_bulk_load(EnvObject *self, PyObject *args, PyObject *kwds)
+{
+    struct env_bulk_load {
+        PyObject *items;
+        DbObject *db;
+        int presorted;
+        size_t txn_bytes;
+        PyObject *grow_factor;
+    } arg = {Py_None, NULL, 1, BULK_LOAD_TXN_BYTES, Py_None};
 
     static const struct argspec argspec[] = {
-        {"path", ARG_OBJ, OFFSET(env_copy, path)},
-        {"compact", ARG_BOOL, OFFSET(env_copy, compact)},
-        {"txn", ARG_TRANS, OFFSET(env_copy, txn)}
+        {"items", ARG_OBJ, OFFSET(env_bulk_load, items)},
+        {"db", ARG_DB, OFFSET(env_bulk_load, db)},
+        {"presorted", ARG_BOOL, OFFSET(env_bulk_load, presorted)},
+        {"txn_bytes", ARG_SIZE, OFFSET(env_bulk_load, txn_bytes)},
+        {"grow_factor", ARG_OBJ, OFFSET(env_bulk_load, grow_factor)}
     };
-
-    PyObject *fspath_obj;
-    const char *fspath_s;
-    int flags;
-    int rc;
-#ifdef HAVE_PATCHED_LMDB
-    MDB_txn *txn;
-#endif
+    PyObject *iter;
+    PyObject *item;
+    PyObject *chunk = NULL;
+    PyObject *putargs = NULL;
+    PyObject *putkwds = NULL;
+    PyObject *ret = NULL;
+    Py_ssize_t consumed = 0;
+    Py_ssize_t added = 0;
+    double grow = 2.0;
+    int more = 1;
 
     static PyObject *cache = NULL;
     if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, NULL)) {
         return NULL;
     }
-    if(! arg.path) {
-        return type_error("path argument required");
-    }
-    if(! ((fspath_obj = get_fspath(arg.path)))) {
+    if(arg.db && ! db_owner_check(arg.db, self)) {
         return NULL;
     }
-
-#ifdef HAVE_PATCHED_LMDB
-    if (arg.txn) {
-        txn = arg.txn->txn;
-        if (!arg.compact) {
-            Py_DECREF(fspath_obj);
-            return type_error("txn argument only compatible with compact=True");
+    if(arg.grow_factor != Py_None) {
+        grow = PyFloat_AsDouble(arg.grow_factor);
+        if(grow == -1.0 && PyErr_Occurred()) {
+            return NULL;
         }
     }
-    else {
-        txn = NULL;
+    if(! (grow > 1.0)) {
+        PyErr_SetString(PyExc_ValueError, "grow_factor must be greater than 1");
+        return NULL;
     }
-#else
-    if (arg.txn) {
-        Py_DECREF(fspath_obj);
-        return type_error("Non-patched LMDB doesn't support transaction with env.copy");
+    if(! arg.txn_bytes) {
+        PyErr_SetString(PyExc_ValueError, "txn_bytes must be positive");
+        return NULL;
     }
-#endif
 
-    fspath_s = PyBytes_AS_STRING(fspath_obj);
-    flags = arg.compact ? MDB_CP_COMPACT : 0;
-#ifdef HAVE_PATCHED_LMDB
-    ENV_UNLOCKED(self, rc, mdb_env_copy3(self->env, fspath_s, flags, txn));
-#else
-    ENV_UNLOCKED(self, rc, mdb_env_copy2(self->env, fspath_s, flags));
-#endif
-    Py_CLEAR(fspath_obj);
-    if(rc) {
-#ifdef HAVE_PATCHED_LMDB
-        return err_set("mdb_env_copy3", rc);
-#else
-        return err_set("mdb_env_copy2", rc);
-#endif
+    if(! ((putkwds = Py_BuildValue("{s:O,s:O}",
+            "db", arg.db ? (PyObject *) arg.db : Py_None,
+            "append", arg.presorted ? Py_True : Py_False)))) {
+        return NULL;
     }
-    Py_RETURN_NONE;
+    if(! ((iter = PyObject_GetIter(arg.items)))) {
+        Py_DECREF(putkwds);
+        return NULL;
+    }
+
+    while(more) {
+        size_t nbytes = 0;
+
+        Py_XDECREF(chunk);
+        if(! ((chunk = PyList_New(0)))) {
+            goto out;
+        }
+        while(nbytes < arg.txn_bytes) {
+            MDB_val key, val;
+            BufViewList bvl;
+            int rc;
+
+            if(! ((item = PyIter_Next(iter)))) {
+                if(PyErr_Occurred()) {
+                    goto out;
+                }
+                more = 0;
+                break;
+            }
+            if(! (PyTuple_CheckExact(item) && PyTuple_GET_SIZE(item) == 2)) {
+                PyErr_SetString(PyExc_TypeError,
+                                "bulk_load() elements must be 2-tuples");
+                Py_DECREF(item);
+                goto out;
+            }
+            bufviewlist_init(&bvl);
+            if(val_from_buffer(&key, PyTuple_GET_ITEM(item, 0), &bvl) ||
+               val_from_buffer(&val, PyTuple_GET_ITEM(item, 1), &bvl)) {
+                bufviewlist_release(&bvl);
+                Py_DECREF(item);
+                goto out;
+            }
+            bufviewlist_release(&bvl);
+            nbytes += key.mv_size + val.mv_size;
+            rc = PyList_Append(chunk, item);
+            Py_DECREF(item);
+            if(rc) {
+                goto out;
+            }
+        }
+        if(! PyList_GET_SIZE(chunk)) {
+            break;
+        }
+
+        Py_XDECREF(putargs);
+        if(! ((putargs = PyTuple_Pack(1, chunk)))) {
+            goto out;
+        }
+        if(bulk_load_chunk(self, arg.db, putargs, putkwds, arg.presorted,
+                           grow, &added)) {
+            goto out;
+        }
+        consumed += PyList_GET_SIZE(chunk);
+    }
+    ret = Py_BuildValue("(nn)", consumed, added);
+
+out:
+    Py_DECREF(iter);
+    Py_XDECREF(chunk);
+    Py_XDECREF(putargs);
+    Py_DECREF(putkwds);
+    return ret;
 }
 
 /**
- * Environment.copyfd(fd)
+ * Environment.run_write(fn) -> result
  */
 static PyObject *
-env_copyfd(EnvObject *self, PyObject *args, PyObject *kwds)
+env_run_write(EnvObject *self, PyObject *args, PyObject *kwds)
 {
-    struct env_copyfd {
-        int fd;
-        int compact;
-        TransObject *txn;
-    } arg = {-1, 0};
-    int rc;
-#ifdef HAVE_PATCHED_LMDB
-    MDB_txn *txn;
-#endif
-#ifdef _WIN32
-    PyObject *temp;
-    Py_ssize_t handle;
-#endif
+    struct env_run_write {
+        PyObject *fn;
+        DbObject *db;
+    } arg = {NULL, NULL};
 
     static const struct argspec argspec[] = {
-        {"fd", ARG_INT, OFFSET(env_copyfd, fd)},
-        {"compact", ARG_BOOL, OFFSET(env_copyfd, compact)},
-        {"txn", ARG_TRANS, OFFSET(env_copyfd, txn)},
+        {"fn", ARG_OBJ, OFFSET(env_run_write, fn)},
+        {"db", ARG_DB, OFFSET(env_run_write, db)}
     };
-    int flags;
 
     static PyObject *cache = NULL;
     if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, NULL)) {
         return NULL;
     }
-    if(arg.fd == -1) {
-        return type_error("fd argument required");
+    if(! arg.fn) {
+        return type_error("'fn' argument required");
     }
-    flags = arg.compact ? MDB_CP_COMPACT : 0;
 
-#ifdef HAVE_PATCHED_LMDB
+    for(;;) {
+        PyObject *txn;
+        PyObject *res;
+        PyObject *tmp;
+        PyObject *type, *value, *traceback;
+        MDB_envinfo info;
+        size_t old_size;
+        int map_full;
+
+        if(! self->valid) {
+            return err_invalid();
+        }
+        mdb_env_info(self->env, &info);
+        old_size = info.me_mapsize;
+        if(! ((txn = make_trans(self, arg.db, NULL, 1, 0)))) {
+            return NULL;
+        }
+        if((res = PyObject_CallFunctionObjArgs(arg.fn, txn, NULL))) {
+            if((tmp = trans_commit((TransObject *) txn, NULL))) {
+                Py_DECREF(tmp);
+                Py_DECREF(txn);
+                return res;
+            }
+            Py_DECREF(res);
+        }
+
+        /* Abort explicitly, since `fn` may have kept a reference to txn. */
+        map_full = err_matches(MDB_MAP_FULL);
+        if(map_full) {
+            self->map_full = 1;
+        }
+        PyErr_Fetch(&type, &value, &traceback);
+        tmp = trans_abort((TransObject *) txn, NULL);
+        Py_DECREF(txn);
+        if(! tmp) {
+            Py_XDECREF(type);
+            Py_XDECREF(value);
+            Py_XDECREF(traceback);
+            return NULL;
+        }
+        Py_DECREF(tmp);
+
+        /* Grow only here, with no transaction of ours left open, rather
+         * than whenever a write transaction ends: the resize invalidates
+         * every transaction on the environment. */
+        if(map_full || self->map_full) {
+            if(env_auto_grow(self)) {
+                Py_XDECREF(type);
+                Py_XDECREF(value);
+                Py_XDECREF(traceback);
+                return NULL;
+            }
+            map_full = self->valid && !mdb_env_info(self->env, &info) &&
+                       info.me_mapsize > old_size;
+        }
+        if(! map_full) {
+            PyErr_Restore(type, value, traceback);
+            return NULL;
+        }
+        Py_XDECREF(type);
+        Py_XDECREF(value);
+        Py_XDECREF(traceback);
+    }
+}
+
+/**
+ * Return a monotonic clock reading in milliseconds.
+ */
+static double
+monotonic_ms(void)
+{
+#ifdef _WIN32
+    return (double) GetTickCount64();
+#else
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return ts.tv_sec * 1e3 + ts.tv_nsec / 1e6;
+#endif
+}
+
+/**
+ * Environment.reader() -> Transaction
+ */
+static PyObject *
+env_reader(EnvObject *self, PyObject *args, PyObject *kwds)
+{
+    struct env_reader {
+        size_t max_age_ms;
+        PyObject *max_txns;
+    } arg = {100, Py_None};
+
+    static const struct argspec argspec[] = {
+        {"max_age_ms", ARG_SIZE, OFFSET(env_reader, max_age_ms)},
+        {"max_txns", ARG_OBJ, OFFSET(env_reader, max_txns)}
+    };
+    static PyObject *txn_attr = NULL;
+    PyObject *cached;
+    PyObject *entry;
+    TransObject *trans;
+    MDB_envinfo info;
+    size_t max_txns = 0;
+    double now;
+    int rc;
+
+    static PyObject *cache = NULL;
+    if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, NULL)) {
+        return NULL;
+    }
+    if(arg.max_txns != Py_None) {
+        max_txns = PyLong_AsSize_t(arg.max_txns);
+        if(max_txns == (size_t) -1 && PyErr_Occurred()) {
+            return NULL;
+        }
+    }
+    if(! txn_attr && ! ((txn_attr = PyUnicode_InternFromString("txn")))) {
+        return NULL;
+    }
+    if(! self->readers) {
+        PyObject *threading = PyImport_ImportModule("threading");
+        if(! threading) {
+            return NULL;
+        }
+        self->readers = PyObject_CallMethod(threading, "local", NULL);
+        Py_DECREF(threading);
+        if(! self->readers) {
+            return NULL;
+        }
+    }
+
+    /* Entries are (Transaction, deadline in ms, txnid at begin). */
+    now = monotonic_ms();
+    if(! ((cached = PyObject_GetAttr(self->readers, txn_attr)))) {
+        if(! PyErr_ExceptionMatches(PyExc_AttributeError)) {
+            return NULL;
+        }
+        PyErr_Clear();
+    } else {
+        trans = (TransObject *) PyTuple_GET_ITEM(cached, 0);
+        if(trans->valid &&
+           now < PyFloat_AS_DOUBLE(PyTuple_GET_ITEM(cached, 1))) {
+            if(arg.max_txns == Py_None) {
+                Py_INCREF(trans);
+                Py_DECREF(cached);
+                return (PyObject *) trans;
+            }
+            /* Hold GIL: mdb_env_info only reads the meta pages. */
+            if((rc = mdb_env_info(self->env, &info))) {
+                Py_DECREF(cached);
+                return err_set("mdb_env_info", rc);
+            }
+            if(info.me_last_txnid - PyLong_AsSize_t(PyTuple_GET_ITEM(cached, 2))
+                    <= max_txns) {
+                Py_INCREF(trans);
+                Py_DECREF(cached);
+                return (PyObject *) trans;
+            }
+        }
+        Py_DECREF(cached);
+    }
+
+    /* The stale transaction is not aborted, since the caller may still be
+     * using it; replacing the entry drops the cache's reference, returning
+     * it to the spare list once unused. */
+    if(! ((trans = (TransObject *) make_trans(self, NULL, NULL, 0, 0)))) {
+        return NULL;
+    }
+    entry = Py_BuildValue("(Odn)", (PyObject *) trans,
+                          now + (double) arg.max_age_ms,
+                          (Py_ssize_t) mdb_txn_id(trans->txn));
+    if(! entry || PyObject_SetAttr(self->readers, txn_attr, entry)) {
+        Py_XDECREF(entry);
+        Py_DECREF(trans);
+        return NULL;
+    }
+    Py_DECREF(entry);
+    return (PyObject *) trans;
+}
+
+/**
+ * Call `name` from the Python module `module` with `self` followed by `args`
+ * and `kwds`, for methods implemented in Python and shared with the CFFI
+ * version.
+ */
+static PyObject *
+env_call_python(EnvObject *self, const char *module, const char *name,
+                PyObject *args, PyObject *kwds)
+{
+    PyObject *mod;
+    PyObject *func;
+    PyObject *func_args;
+    PyObject *ret;
+    Py_ssize_t i;
+
+    if(! self->valid) {
+        return err_invalid();
+    }
+    if(! ((mod = PyImport_ImportModule(module)))) {
+        return NULL;
+    }
+    func = PyObject_GetAttrString(mod, name);
+    Py_DECREF(mod);
+    if(! func) {
+        return NULL;
+    }
+    if(! ((func_args = PyTuple_New(PyTuple_GET_SIZE(args) + 1)))) {
+        Py_DECREF(func);
+        return NULL;
+    }
+    Py_INCREF(self);
+    PyTuple_SET_ITEM(func_args, 0, (PyObject *) self);
+    for(i = 0; i < PyTuple_GET_SIZE(args); i++) {
+        PyObject *arg = PyTuple_GET_ITEM(args, i);
+        Py_INCREF(arg);
+        PyTuple_SET_ITEM(func_args, i + 1, arg);
+    }
+    ret = PyObject_Call(func, func_args, kwds);
+    Py_DECREF(func);
+    Py_DECREF(func_args);
+    return ret;
+}
+
+/**
+ * Environment.writer() -> lmdb.Writer
+ */
+static PyObject *
+env_writer(EnvObject *self, PyObject *args, PyObject *kwds)
+{
+    return env_call_python(self, "lmdb._writer", "Writer", args, kwds);
+}
+
+/**
+ * Environment.compact_to()
+ */
+static PyObject *
+env_compact_to(EnvObject *self, PyObject *args, PyObject *kwds)
+{
+    return env_call_python(self, "lmdb._copy", "compact_to", args, kwds);
+}
+
+/**
+ * Environment.backup() -> int
+ */
+static PyObject *
+env_backup(EnvObject *self, PyObject *args, PyObject *kwds)
+{
+    return env_call_python(self, "lmdb._copy", "backup", args, kwds);
+}
+
+/**
+ * Environment.copy()
+ */
+static PyObject *
+env_copy(EnvObject *self, PyObject *args, PyObject *kwds)
+{
+    struct env_copy {
+        PyObject *path;
+        int compact;
+        TransObject *txn;
+    } arg = {NULL, 0, NULL};
+
+    static const struct argspec argspec[] = {
+        {"path", ARG_OBJ, OFFSET(env_copy, path)},
+        {"compact", ARG_BOOL, OFFSET(env_copy, compact)},
+        {"txn", ARG_TRANS, OFFSET(env_copy, txn)}
+    };
+
+    PyObject *fspath_obj;
+    const char *fspath_s;
+    int flags;
+    int rc;
+#ifdef HAVE_PATCHED_LMDB
+    MDB_txn *txn;
+#endif
+
+    static PyObject *cache = NULL;
+    if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, NULL)) {
+        return NULL;
+    }
+    if(! arg.path) {
+        return type_error("path argument required");
+    }
+    if(! ((fspath_obj = get_fspath(arg.path)))) {
+        return NULL;
+    }
+
+#ifdef HAVE_PATCHED_LMDB
+    if (arg.txn) {
+        txn = arg.txn->txn;
+        if (!arg.compact) {
+            Py_DECREF(fspath_obj);
+            return type_error("txn argument only compatible with compact=True");
+        }
+    }
+    else {
+        txn = NULL;
+    }
+#else
+    if (arg.txn) {
+        Py_DECREF(fspath_obj);
+        return type_error("Non-patched LMDB doesn't support transaction with env.copy");
+    }
+#endif
+
+    fspath_s = PyBytes_AS_STRING(fspath_obj);
+    flags = arg.compact ? MDB_CP_COMPACT : 0;
+#ifdef HAVE_PATCHED_LMDB
+    ENV_UNLOCKED(self, rc, mdb_env_copy3(self->env, fspath_s, flags, txn));
+#else
+    ENV_UNLOCKED(self, rc, mdb_env_copy2(self->env, fspath_s, flags));
+#endif
+    Py_CLEAR(fspath_obj);
+    if(rc) {
+#ifdef HAVE_PATCHED_LMDB
+        return err_set("mdb_env_copy3", rc);
+#else
+        return err_set("mdb_env_copy2", rc);
+#endif
+    }
+    Py_RETURN_NONE;
+}
+
+/**
+ * Environment.copyfd(fd)
+ */
+static PyObject *
+env_copyfd(EnvObject *self, PyObject *args, PyObject *kwds)
+{
+    struct env_copyfd {
+        int fd;
+        int compact;
+        TransObject *txn;
+    } arg = {-1, 0};
+    int rc;
+#ifdef HAVE_PATCHED_LMDB
+    MDB_txn *txn;
+#endif
+#ifdef _WIN32
+    PyObject *temp;
+    Py_ssize_t handle;
+#endif
+
+    static const struct argspec argspec[] = {
+        {"fd", ARG_INT, OFFSET(env_copyfd, fd)},
+        {"compact", ARG_BOOL, OFFSET(env_copyfd, compact)},
+        {"txn", ARG_TRANS, OFFSET(env_copyfd, txn)},
+    };
+    int flags;
+
+    static PyObject *cache = NULL;
+    if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, NULL)) {
+        return NULL;
+    }
+    if(arg.fd == -1) {
+        return type_error("fd argument required");
+    }
+    flags = arg.compact ? MDB_CP_COMPACT : 0;
+
+#ifdef HAVE_PATCHED_LMDB
     if (arg.txn) {
         txn = arg.txn->txn;
         if (!arg.compact) {
@@ -2250,15 +3457,11 @@ env_dbs(EnvObject *self, PyObject *args, PyObject *kwds)
     if(arg.txn) {
         txn = arg.txn->txn;
     } else {
-        if(self->spare_txn) {
-            txn = self->spare_txn;
-            self->spare_txn = NULL;
-            rc = mdb_txn_renew(txn);
-            if(rc) {
-                mdb_txn_abort(txn);
-                return err_set("mdb_txn_renew", rc);
-            }
-        } else {
+        txn = env_renew_txn(self, &rc);
+        if(rc) {
+            return err_set("mdb_txn_renew", rc);
+        }
+        if(! txn) {
             rc = mdb_txn_begin(self->env, NULL, MDB_RDONLY, &txn);
             if(rc) {
                 return err_set("mdb_txn_begin", rc);
@@ -2270,8 +3473,7 @@ env_dbs(EnvObject *self, PyObject *args, PyObject *kwds)
     rc = mdb_cursor_open(txn, self->main_db->dbi, &cursor);
     if(rc) {
         if(own_txn) {
-            mdb_txn_reset(txn);
-            self->spare_txn = txn;
+            env_spare_txn(self, txn);
         }
         return err_set("mdb_cursor_open", rc);
     }
@@ -2280,8 +3482,7 @@ env_dbs(EnvObject *self, PyObject *args, PyObject *kwds)
     if(! list) {
         mdb_cursor_close(cursor);
         if(own_txn) {
-            mdb_txn_reset(txn);
-            self->spare_txn = txn;
+            env_spare_txn(self, txn);
         }
         return NULL;
     }
@@ -2293,8 +3494,7 @@ env_dbs(EnvObject *self, PyObject *args, PyObject *kwds)
             Py_DECREF(list);
             mdb_cursor_close(cursor);
             if(own_txn) {
-                mdb_txn_reset(txn);
-                self->spare_txn = txn;
+                env_spare_txn(self, txn);
             }
             PyErr_SetString(PyExc_OverflowError,
                 "sub-database name size overflow (corrupt database?)");
@@ -2305,8 +3505,7 @@ env_dbs(EnvObject *self, PyObject *args, PyObject *kwds)
             Py_DECREF(list);
             mdb_cursor_close(cursor);
             if(own_txn) {
-                mdb_txn_reset(txn);
-                self->spare_txn = txn;
+                env_spare_txn(self, txn);
             }
             return PyErr_NoMemory();
         }
@@ -2324,8 +3523,7 @@ env_dbs(EnvObject *self, PyObject *args, PyObject *kwds)
                 Py_DECREF(list);
                 mdb_cursor_close(cursor);
                 if(own_txn) {
-                    mdb_txn_reset(txn);
-                    self->spare_txn = txn;
+                    env_spare_txn(self, txn);
                 }
                 return NULL;
             }
@@ -2336,8 +3534,7 @@ env_dbs(EnvObject *self, PyObject *args, PyObject *kwds)
 
     mdb_cursor_close(cursor);
     if(own_txn) {
-        mdb_txn_reset(txn);
-        self->spare_txn = txn;
+        env_spare_txn(self, txn);
     }
 
     if(rc != MDB_NOTFOUND) {
@@ -2442,45 +3639,275 @@ env_readers(EnvObject *self, PyObject *Py_UNUSED(ignored))
 }
 
 /**
- * Environment.reader_check() -> int
+ * Parse one line of mdb_reader_list() output into `pid`, `tid` and `txnid`.
+ * Return -1 for the header and "(no ...)" lines, which do not start with a
+ * number, 0 for a slot held by a reset transaction, or 1 for an active one.
  */
-static PyObject *
-env_reader_check(EnvObject *self, PyObject *Py_UNUSED(ignored))
+static int
+parse_reader_record(const char *msg, long *pid, unsigned long long *tid,
+                    unsigned long long *txnid)
 {
-    int rc;
-    int dead;
+    const char *p;
+    char *end;
 
-    if(! self->valid) {
-        return err_invalid();
+    *pid = strtol(msg, &end, 10);
+    if(end == msg) {
+        return -1;
     }
-
-    if((rc = mdb_reader_check(self->env, &dead))) {
-        return err_set("mdb_reader_check", rc);
+    p = end;
+    *tid = strtoull(p, &end, 16);
+    p = end;
+    while(*p == ' ') {
+        p++;
     }
-    return PyLong_FromLongLong(dead);
+    if(*p == '-') {
+        return 0;
+    }
+    *txnid = strtoull(p, NULL, 10);
+    return 1;
 }
 
+/** State for env_reader_slots_callback(). */
+struct reader_slots_ctx {
+    PyObject *list;
+    size_t last_txnid;
+};
+
 /**
- * Environment.set_mapsize(size) -> None
+ * Callback appending one mdb_reader_list() record to the list built by
+ * env_reader_slots(). Return 0 on success or -1 on error.
  */
-static PyObject *
-env_reader_set_mapsize(EnvObject *self, PyObject *args, PyObject *kwargs)
+static int env_reader_slots_callback(const char *msg, void *ctx_)
 {
-    struct env_set_mapsize {
-        size_t map_size;
-    } arg = {0};
-
-    static const struct argspec argspec[] = {
-        {"map_size", ARG_SIZE, OFFSET(env_set_mapsize, map_size)}
-    };
+    struct reader_slots_ctx *ctx = ctx_;
+    PyObject *slot;
+    long pid;
+    unsigned long long tid;
+    unsigned long long txnid;
     int rc;
-    MDB_txn *txn;
 
-    static PyObject *cache = NULL;
-    if(parse_args(self->valid, SPECSIZE(), argspec, &cache,
-                  args, kwargs, &arg, NULL)) {
+    switch(parse_reader_record(msg, &pid, &tid, &txnid)) {
+    case -1:
+        return 0;
+    case 0:
+        /* Reset transaction, such as a spare kept for reuse. */
+        slot = Py_BuildValue("(lKOO)", pid, tid, Py_None, Py_None);
+        break;
+    default:
+        /* A reader may begin on a txnid newer than the one read before the
+         * walk; report it as not lagging. */
+        slot = Py_BuildValue("(lKKK)", pid, tid, txnid,
+            (unsigned long long) (ctx->last_txnid > txnid
+                                  ? ctx->last_txnid - txnid : 0));
+    }
+    if(! slot) {
+        return -1;
+    }
+    rc = PyList_Append(ctx->list, slot);
+    Py_DECREF(slot);
+    return rc;
+}
+
+/**
+ * Environment.reader_slots() -> list
+ */
+static PyObject *
+env_reader_slots(EnvObject *self, PyObject *Py_UNUSED(ignored))
+{
+    struct reader_slots_ctx ctx;
+    MDB_envinfo info;
+    int rc;
+
+    if(! self->valid) {
+        return err_invalid();
+    }
+
+    /* Hold GIL: mdb_env_info only reads the meta pages. */
+    if((rc = mdb_env_info(self->env, &info))) {
+        return err_set("mdb_env_info", rc);
+    }
+    if(! ((ctx.list = PyList_New(0)))) {
         return NULL;
     }
+    ctx.last_txnid = info.me_last_txnid;
+    if((rc = mdb_reader_list(self->env, env_reader_slots_callback, &ctx))) {
+        Py_CLEAR(ctx.list);
+        if(! PyErr_Occurred()) {
+            err_set("mdb_reader_list", rc);
+        }
+    }
+    return ctx.list;
+}
+
+/**
+ * Callback lowering the txnid pointed to by `oldest_` to that of each active
+ * reader listed by mdb_reader_list(). Always returns 0.
+ */
+static int env_oldest_reader_callback(const char *msg, void *oldest_)
+{
+    size_t *oldest = oldest_;
+    long pid;
+    unsigned long long tid;
+    unsigned long long txnid;
+
+    if(parse_reader_record(msg, &pid, &tid, &txnid) == 1 && txnid < *oldest) {
+        *oldest = (size_t) txnid;
+    }
+    return 0;
+}
+
+/** qsort() comparator for page numbers. */
+static int
+pgno_cmp(const void *a_, const void *b_)
+{
+    size_t a = *(const size_t *) a_;
+    size_t b = *(const size_t *) b_;
+    return (a > b) - (a < b);
+}
+
+/**
+ * Environment.freelist_stat() -> dict
+ */
+static PyObject *
+env_freelist_stat(EnvObject *self, PyObject *Py_UNUSED(ignored))
+{
+    MDB_txn *txn;
+    MDB_cursor *cursor;
+    MDB_val key, data;
+    size_t *ids;
+    size_t *pages = NULL;
+    size_t *grown;
+    size_t npages = 0;
+    size_t pages_cap = 0;
+    size_t oldest;
+    size_t txnid;
+    size_t n;
+    size_t i;
+    size_t run = 0;
+    size_t largest = 0;
+    size_t entries = 0;
+    size_t free_pages = 0;
+    size_t pending_pages = 0;
+    PyObject *pending;
+    PyObject *k;
+    PyObject *v;
+    PyObject *ret = NULL;
+    int rc;
+
+    if(! self->valid) {
+        return err_invalid();
+    }
+
+    txn = env_renew_txn(self, &rc);
+    if(rc) {
+        return err_set("mdb_txn_renew", rc);
+    }
+    if(! txn) {
+        if((rc = mdb_txn_begin(self->env, NULL, MDB_RDONLY, &txn))) {
+            return err_set("mdb_txn_begin", rc);
+        }
+    }
+    /* As in mdb_find_oldest(), pages freed by a transaction can only be
+     * reused once no reader's snapshot is that transaction or newer. */
+    oldest = mdb_txn_id(txn);
+    mdb_reader_list(self->env, env_oldest_reader_callback, &oldest);
+
+    /* dbi 0 is FREE_DBI, keyed by the freeing txnid, each value an IDL: a
+     * count followed by that many page numbers. */
+    if((rc = mdb_cursor_open(txn, 0, &cursor))) {
+        env_spare_txn(self, txn);
+        return err_set("mdb_cursor_open", rc);
+    }
+    if(! ((pending = PyDict_New()))) {
+        goto out;
+    }
+    while(! ((rc = mdb_cursor_get(cursor, &key, &data, MDB_NEXT)))) {
+        ids = data.mv_data;
+        if(key.mv_size != sizeof txnid || data.mv_size < sizeof(size_t) ||
+           ids[0] > (data.mv_size / sizeof(size_t)) - 1) {
+            err_set("freelist_stat", MDB_CORRUPTED);
+            goto out;
+        }
+        memcpy(&txnid, key.mv_data, sizeof txnid);
+        n = ids[0];
+        entries++;
+        free_pages += n;
+        if(txnid >= oldest) {
+            pending_pages += n;
+            k = PyLong_FromSize_t(txnid);
+            v = PyLong_FromSize_t(n);
+            rc = (! k || ! v) ? -1 : PyDict_SetItem(pending, k, v);
+            Py_XDECREF(k);
+            Py_XDECREF(v);
+            if(rc) {
+                goto out;
+            }
+            continue;
+        }
+        if(npages + n > pages_cap) {
+            pages_cap = Py_MAX(pages_cap * 2, npages + n);
+            if(! ((grown = realloc(pages, pages_cap * sizeof *pages)))) {
+                PyErr_NoMemory();
+                goto out;
+            }
+            pages = grown;
+        }
+        memcpy(pages + npages, ids + 1, n * sizeof *pages);
+        npages += n;
+    }
+    if(rc != MDB_NOTFOUND) {
+        err_set("mdb_cursor_get", rc);
+        goto out;
+    }
+
+    /* Each IDL is contiguous only within itself; runs may span records. */
+    qsort(pages, npages, sizeof *pages, pgno_cmp);
+    for(i = 0; i < npages; i++) {
+        run = (i && pages[i] == pages[i - 1] + 1) ? run + 1 : 1;
+        largest = Py_MAX(largest, run);
+    }
+    ret = Py_BuildValue("{sKsKsKsOsK}",
+        "entries", (unsigned long long) entries,
+        "free_pages", (unsigned long long) free_pages,
+        "pending_pages", (unsigned long long) pending_pages,
+        "pending", pending,
+        "largest_run", (unsigned long long) largest);
+
+out:
+    mdb_cursor_close(cursor);
+    env_spare_txn(self, txn);
+    Py_XDECREF(pending);
+    free(pages);
+    return ret;
+}
+
+/**
+ * Environment.reader_check() -> int
+ */
+static PyObject *
+env_reader_check(EnvObject *self, PyObject *Py_UNUSED(ignored))
+{
+    int rc;
+    int dead;
+
+    if(! self->valid) {
+        return err_invalid();
+    }
+
+    if((rc = mdb_reader_check(self->env, &dead))) {
+        return err_set("mdb_reader_check", rc);
+    }
+    return PyLong_FromLongLong(dead);
+}
+
+/**
+ * Change the map size of `self`, invalidating its open transactions and
+ * cursors. Returns 0 on success, or -1 with an exception set.
+ */
+static int
+env_resize(EnvObject *self, size_t map_size)
+{
+    int rc;
 
     /* Reject if a write transaction is active — mdb_env_set_mapsize would
      * return EINVAL anyway, but we must also avoid invalidating a write txn
@@ -2488,7 +3915,7 @@ env_reader_set_mapsize(EnvObject *self, PyObject *args, PyObject *kwargs)
     if(self->write_txn_tid) {
         PyErr_Format(Error,
             "Cannot set_mapsize while a write transaction is active");
-        return NULL;
+        return -1;
     }
 
     /* Reject overlapping resizes.  Cannot be our own thread (no Python runs
@@ -2497,7 +3924,7 @@ env_reader_set_mapsize(EnvObject *self, PyObject *args, PyObject *kwargs)
     if(self->resizing) {
         PyErr_Format(Error,
             "Cannot set_mapsize: another set_mapsize is in progress");
-        return NULL;
+        return -1;
     }
 
     /* Enter the resize critical section: from here until the flag is
@@ -2555,21 +3982,18 @@ env_reader_set_mapsize(EnvObject *self, PyObject *args, PyObject *kwargs)
         self->resizing = 0;
         ENV_SYNC_BROADCAST(self);
         ENV_SYNC_UNLOCK(self);
-        return err_invalid();
+        err_invalid();
+        return -1;
     }
 
-    /* Abort the spare read-only transaction — it holds references to the
+    /* Abort the spare read-only transactions — they hold references to the
      * old memory map. */
-    txn = self->spare_txn;
-    if(txn) {
-        self->spare_txn = NULL;
-        mdb_txn_abort(txn);
-    }
+    env_abort_spare_txns(self);
 
     /* Now safe to remap: in-flight operations have drained, new ones fail
      * fast on the resize gate, and this call itself runs with the GIL
      * held. */
-    rc = mdb_env_set_mapsize(self->env, arg.map_size);
+    rc = mdb_env_set_mapsize(self->env, map_size);
 
     if(rc) {
         /* Remap failed — env is in an unusable state.  Mark it invalid
@@ -2586,9 +4010,78 @@ env_reader_set_mapsize(EnvObject *self, PyObject *args, PyObject *kwargs)
     ENV_SYNC_UNLOCK(self);
 
     if(rc) {
-        return err_set("mdb_env_set_mapsize", rc);
+        err_set("mdb_env_set_mapsize", rc);
+        return -1;
+    }
+    return 0;
+}
+
+/**
+ * Called by run_write() once its write transaction has ended. If an operation
+ * in it failed with MDB_MAP_FULL and auto_grow is enabled, grow the map by
+ * grow_step bytes (or double it), up to max_map_size. Returns 0 on success
+ * or if there was nothing to do, or -1 with an exception set.
+ */
+static int
+env_auto_grow(EnvObject *self)
+{
+    MDB_envinfo info;
+    size_t size;
+    int rc;
+
+    if(! self->map_full) {
+        return 0;
+    }
+    self->map_full = 0;
+    if(! (self->auto_grow && self->valid && self->env) ||
+       self->pid != _cached_pid || self->resizing) {
+        return 0;
+    }
+
+    if((rc = mdb_env_info(self->env, &info))) {
+        err_set("mdb_env_info", rc);
+        return -1;
+    }
+    size = info.me_mapsize;
+    if(self->grow_step) {
+        size = SIZE_ADD_OVERFLOW(size, self->grow_step)
+            ? SIZE_MAX : size + self->grow_step;
+    } else {
+        size = SIZE_MUL_OVERFLOW(size, 2) ? SIZE_MAX : size * 2;
+    }
+    if(self->max_map_size && size > self->max_map_size) {
+        size = self->max_map_size;
+    }
+    if(size <= info.me_mapsize) {
+        /* Already at max_map_size: leave MapFullError to the caller. */
+        return 0;
     }
+    DEBUG("growing map to %zu", size)
+    return env_resize(self, size);
+}
+
+/**
+ * Environment.set_mapsize(size) -> None
+ */
+static PyObject *
+env_reader_set_mapsize(EnvObject *self, PyObject *args, PyObject *kwargs)
+{
+    struct env_set_mapsize {
+        size_t map_size;
+    } arg = {0};
+
+    static const struct argspec argspec[] = {
+        {"map_size", ARG_SIZE, OFFSET(env_set_mapsize, map_size)}
+    };
 
+    static PyObject *cache = NULL;
+    if(parse_args(self->valid, SPECSIZE(), argspec, &cache,
+                  args, kwargs, &arg, NULL)) {
+        return NULL;
+    }
+    if(env_resize(self, arg.map_size)) {
+        return NULL;
+    }
     Py_RETURN_NONE;
 }
 
@@ -2641,6 +4134,11 @@ static struct PyMethodDef env_methods[] = {
     {"__enter__", (PyCFunction)env_enter, METH_NOARGS},
     {"__exit__", (PyCFunction)env_exit, METH_VARARGS},
     {"begin", (PyCFunction)env_begin, METH_VARARGS|METH_KEYWORDS},
+    {"bulk_load", (PyCFunction)env_bulk_load, METH_VARARGS|METH_KEYWORDS},
+    {"run_write", (PyCFunction)env_run_write, METH_VARARGS|METH_KEYWORDS},
+    {"writer", (PyCFunction)env_writer, METH_VARARGS|METH_KEYWORDS},
+    {"compact_to", (PyCFunction)env_compact_to, METH_VARARGS|METH_KEYWORDS},
+    {"backup", (PyCFunction)env_backup, METH_VARARGS|METH_KEYWORDS},
     {"close", (PyCFunction)env_close, METH_NOARGS},
     {"copy", (PyCFunction)env_copy, METH_VARARGS|METH_KEYWORDS},
     {"dbs", (PyCFunction)env_dbs, METH_VARARGS|METH_KEYWORDS},
@@ -2652,7 +4150,10 @@ static struct PyMethodDef env_methods[] = {
     {"open_db", (PyCFunction)env_open_db, METH_VARARGS|METH_KEYWORDS},
     {"path", (PyCFunction)env_path, METH_NOARGS},
     {"stat", (PyCFunction)env_stat, METH_NOARGS},
+    {"reader", (PyCFunction)env_reader, METH_VARARGS|METH_KEYWORDS},
     {"readers", (PyCFunction)env_readers, METH_NOARGS},
+    {"reader_slots", (PyCFunction)env_reader_slots, METH_NOARGS},
+    {"freelist_stat", (PyCFunction)env_freelist_stat, METH_NOARGS},
     {"reader_check", (PyCFunction)env_reader_check, METH_NOARGS},
     {"set_mapsize", (PyCFunction)env_reader_set_mapsize,
      METH_VARARGS|METH_KEYWORDS},
@@ -2711,14 +4212,25 @@ cursor_clear(CursorObject *self)
 {
     if(self->curs) {
         MDB_cursor *curs = self->curs;
+        EnvObject *env = self->trans->env;
         self->valid = 0;
         self->curs = NULL;  /* Prevent double-close (issue #180). */
         INVALIDATE(self)
         UNLINK_CHILD(self->trans, self)
-        /* mdb_cursor_close does no I/O — just unlinks from txn and frees.
-         * No need to release the GIL; keeping it held avoids widening the
-         * race window during INVALIDATE. */
-        mdb_cursor_close(curs);
+        /* A read-only cursor may outlive its transaction, so keep it for
+         * mdb_cursor_renew() by the next Cursor on the same database. */
+        if((self->trans->flags & TRANS_RDONLY) && env && env->valid &&
+           env->pid == _cached_pid && env->nspare_curs < ENV_FREELIST_MAX) {
+            struct spare_cursor *spare = &env->spare_curs[env->nspare_curs++];
+            spare->curs = curs;
+            spare->dbi = mdb_cursor_dbi(curs);
+            spare->flags = self->dbi_flags;
+        } else {
+            /* mdb_cursor_close does no I/O — just unlinks from txn and
+             * frees.  No need to release the GIL; keeping it held avoids
+             * widening the race window during INVALIDATE. */
+            mdb_cursor_close(curs);
+        }
     }
     Py_CLEAR(self->trans);
     return 0;
@@ -2730,9 +4242,15 @@ cursor_clear(CursorObject *self)
 static void
 cursor_dealloc(CursorObject *self)
 {
+    /* Hold the Environment until the object is released to its free list,
+     * since dropping the Transaction may drop the last reference to it. */
+    EnvObject *env = self->trans ? self->trans->env : NULL;
+
     DEBUG("destroying cursor")
+    Py_XINCREF(env);
     cursor_clear(self);
-    PyObject_Del(self);
+    env_free_object(env, FREE_CURSOR, (PyObject *) self);
+    Py_XDECREF(env);
 }
 
 /**
@@ -2815,6 +4333,48 @@ _cursor_get_c(CursorObject *self, enum MDB_cursor_op op)
     return 0;
 }
 
+/**
+ * Compare the stored key `key` against a caller-supplied range bound using
+ * the comparator of database `dbi`, whose flags are `db_flags`.
+ * mdb_cmp_cint() assumes both keys share a width, so on MDB_INTEGERKEY
+ * databases keys of differing widths are ordered by width instead. Safe to
+ * call with the GIL released.
+ */
+static int
+key_bound_cmp(MDB_txn *txn, MDB_dbi dbi, unsigned int db_flags,
+              const MDB_val *key, const MDB_val *bound)
+{
+    if((db_flags & MDB_INTEGERKEY) && key->mv_size != bound->mv_size) {
+        return (key->mv_size < bound->mv_size) ? -1 : 1;
+    }
+    return mdb_cmp(txn, dbi, key, bound);
+}
+
+/**
+ * key_bound_cmp() for the cursor's database.
+ */
+static int
+cursor_bound_cmp(CursorObject *self, const MDB_val *key, const MDB_val *bound)
+{
+    return key_bound_cmp(self->trans->txn, mdb_cursor_dbi(self->curs),
+                         self->dbi_flags, key, bound);
+}
+
+/**
+ * Validate an optional range bound argument. `bound->mv_data` is NULL when
+ * the argument was omitted or None.
+ */
+static int
+cursor_check_bound(CursorObject *self, const MDB_val *bound, const char *what)
+{
+    if(bound->mv_data &&
+       ! key_size_ok(self->trans->env, self->dbi_flags, bound->mv_size, 0)) {
+        err_set(what, MDB_BAD_VALSIZE);
+        return -1;
+    }
+    return 0;
+}
+
 /**
  * Wrap _cursor_get_c() to return True or False depending on whether the
  * Cursor's final state is positioned.
@@ -2858,8 +4418,10 @@ cursor_delete(CursorObject *self, PyObject *args, PyObject *kwds)
         DEBUG("deleting key '%.*s'",
               (int) self->key.mv_size,
               (char*) self->key.mv_data)
+        if(trans_mutate(self->trans)) {
+            return NULL;
+        }
         ENV_UNLOCKED(self->trans->env, rc, mdb_cursor_del(self->curs, flags));
-        self->trans->mutations++;
         if(rc) {
             return err_set("mdb_cursor_del", rc);
         }
@@ -2870,346 +4432,304 @@ cursor_delete(CursorObject *self, PyObject *args, PyObject *kwds)
 }
 
 /**
- * Cursor.first() -> bool
- */
-static PyObject *
-cursor_first(CursorObject *self, PyObject *Py_UNUSED(ignored))
-{
-    return _cursor_get(self, MDB_FIRST);
-}
-
-/**
- * Cursor.first_dup() -> bool
- */
-static PyObject *
-cursor_first_dup(CursorObject *self, PyObject *Py_UNUSED(ignored))
-{
-    return _cursor_get(self, MDB_FIRST_DUP);
-}
-
-static PyObject *
-cursor_value(CursorObject *self, PyObject *Py_UNUSED(ignored));
-
-/**
- * Cursor.getmulti() -> Iterable of (key, value)
+ * Cursor.deletemulti(keys, dupdata=False) -> (consumed, deleted)
  */
 static PyObject *
-cursor_get_multi(CursorObject *self, PyObject *args, PyObject *kwds)
+cursor_delete_multi(CursorObject *self, PyObject *args, PyObject *kwds)
 {
-    struct cursor_get {
+    struct cursor_delete_multi {
         PyObject *keys;
         int dupdata;
-        size_t dupfixed_bytes;
-        int keyfixed;
-        int values;
-    } arg = {Py_None, 0, 0, 0, 1};
-
-    int as_buffer;
-    size_t i;
-    PyObject *iter, *item, *tup, *key, *val;
-    PyObject *pylist = NULL;
-    MDB_cursor_op get_op, next_op;
-    bool done, first;
+    } arg = {Py_None, 0};
 
     static const struct argspec argspec[] = {
-        {"keys", ARG_OBJ, OFFSET(cursor_get, keys)},
-        {"dupdata", ARG_BOOL, OFFSET(cursor_get, dupdata)},
-        {"dupfixed_bytes", ARG_SIZE, OFFSET(cursor_get, dupfixed_bytes)},
-        {"keyfixed", ARG_BOOL, OFFSET(cursor_get, keyfixed)},
-        {"values", ARG_BOOL, OFFSET(cursor_get, values)}
+        {"keys", ARG_OBJ, OFFSET(cursor_delete_multi, keys)},
+        {"dupdata", ARG_BOOL, OFFSET(cursor_delete_multi, dupdata)}
     };
-
-    size_t buffer_pos = 0, buffer_size = 8;
-    size_t key_size = 0, val_size, item_size = 0;
-    char *buffer = NULL;
+    PyObject *seq;
+    PyObject *ret = NULL;
+    EnvObject *env;
+    BufBatch bb;
+    MDB_val *keys = NULL;
+    MDB_val *vals = NULL;
+    size_t *order = NULL;
+    const char *what = "mdb_cursor_get";
+    size_t deleted = 0;
+    size_t n;
+    size_t i = 0;
+    int dupsort;
+    int rc = 0;
 
     static PyObject *cache = NULL;
     if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, NULL)) {
         return NULL;
     }
-
-    if(arg.dupfixed_bytes < 0) {
-        return type_error("dupfixed_bytes must be a positive integer.");
-    }else if ((arg.dupfixed_bytes > 0 || arg.keyfixed) && !arg.dupdata) {
-        return type_error("dupdata is required for dupfixed_bytes/keyfixed.");
-    }else if (arg.keyfixed && !arg.dupfixed_bytes){
-        return type_error("dupfixed_bytes is required for keyfixed.");
-    }else if (!arg.values && arg.dupdata) {
-        return type_error("values=False is incompatible with dupdata.");
-    }
-
-    if(! ((iter = PyObject_GetIter(arg.keys)))) {
+    if(! ((seq = sequence_snapshot(arg.keys, "keys must be iterable")))) {
         return NULL;
     }
 
-    /* Choose ops */
-    if(arg.dupfixed_bytes) {
-        get_op = MDB_GET_MULTIPLE;
-        next_op = MDB_NEXT_MULTIPLE;
-    } else {
-        get_op = MDB_GET_CURRENT;
-        next_op = MDB_NEXT_DUP;
+    bufbatch_init(&bb);
+    n = (size_t) PyTuple_GET_SIZE(seq);
+    if(SIZE_MUL_OVERFLOW(n, 2 * sizeof(size_t) + 2 * sizeof(MDB_val))) {
+        PyErr_NoMemory();
+        goto out;
     }
-
-    as_buffer = self->trans->flags & TRANS_BUFFERS;
-    val_size = arg.dupfixed_bytes;
-    if (!arg.keyfixed){ /* Init list */
-        pylist = PyList_New(0);
-        if(! pylist) {
-            Py_DECREF(iter);
-            return NULL;
-        }
+    keys = malloc((n ? n : 1) * sizeof(MDB_val));
+    vals = malloc((n ? n : 1) * sizeof(MDB_val));
+    order = malloc((n ? n : 1) * 2 * sizeof(size_t));
+    if(! (keys && vals && order)) {
+        PyErr_NoMemory();
+        goto out;
     }
-    first = true;
-    while((item = PyIter_Next(iter))) {
-        MDB_val mkey;
-        BufViewList bvl;
-        bufviewlist_init(&bvl);
-
-        if(val_from_buffer(&mkey, item, &bvl)) {
-            bufviewlist_release(&bvl);
-            goto failiter;
-        } /* val_from_buffer sets exception */
-
-        self->key = mkey;
-        if(_cursor_get_c(self, MDB_SET_KEY)) {
-            bufviewlist_release(&bvl);
-            goto failiter;
+    /* An element is either a key, or a (key, value) pair naming a single
+     * duplicate. vals[i].mv_data is NULL for bare keys. */
+    for(i = 0; i < n; i++) {
+        PyObject *item = PyTuple_GET_ITEM(seq, i);
+
+        vals[i].mv_data = NULL;
+        vals[i].mv_size = 0;
+        if(PyTuple_Check(item)) {
+            if(PyTuple_GET_SIZE(item) != 2) {
+                type_error("deletemulti() elements must be keys or 2-tuples");
+                goto out;
+            }
+            if(val_from_buffer_batch(&keys[i], PyTuple_GET_ITEM(item, 0), &bb) ||
+               val_from_buffer_batch(&vals[i], PyTuple_GET_ITEM(item, 1), &bb)) {
+                goto out;
+            }
+        } else if(val_from_buffer_batch(&keys[i], item, &bb)) {
+            goto out;
         }
-        bufviewlist_release(&bvl);
+    }
+    if(check_batch_keys(self->trans->env, self->dbi_flags, keys, n,
+                        "mdb_cursor_del()")) {
+        goto out;
+    }
 
-        if(!arg.values) {
-            /* values=False: append key only if it was found. */
-            if(self->positioned) {
-                key = obj_from_val(&self->key, as_buffer);
-                if(key) {
-                    PyList_Append(pylist, key);
-                    Py_DECREF(key);
-                } else {
-                    goto failiter;
+    env = self->trans->env;
+    if(ENV_RESIZE_BLOCKED(env)) {
+        err_set("mdb_cursor_del", EINVAL);
+        goto out;
+    }
+    /* Sort, then seek and delete each element in B-tree order in a single
+     * unlocked section; the buffers stay pinned in `bb` throughout. */
+    dupsort = (self->dbi_flags & MDB_DUPSORT) != 0;
+    if(trans_mutate(self->trans)) {
+        goto out;
+    }
+    ACTIVE_OPS_INC(env);
+    Py_BEGIN_ALLOW_THREADS
+    sort_key_order(self->trans->txn, mdb_cursor_dbi(self->curs), keys,
+                   order, order + n, n);
+    for(i = 0; i < n; i++) {
+        size_t j = order[i];
+        MDB_val key = keys[j];
+        MDB_val val = vals[j];
+        size_t ndup = 1;
+        int flags = 0;
+
+        if(val.mv_data) {
+            rc = mdb_cursor_get(self->curs, &key, &val, MDB_GET_BOTH);
+        } else {
+            rc = mdb_cursor_get(self->curs, &key, &val, MDB_SET_KEY);
+            if(! rc && dupsort && arg.dupdata) {
+                flags = MDB_NODUPDATA;
+                if((rc = mdb_cursor_count(self->curs, &ndup))) {
+                    what = "mdb_cursor_count";
+                    break;
                 }
             }
-            Py_DECREF(item);
+        }
+        if(rc == MDB_NOTFOUND) {
+            rc = 0;
             continue;
+        } else if(rc) {
+            break;
         }
+        if((rc = mdb_cursor_del(self->curs, flags))) {
+            what = "mdb_cursor_del";
+            break;
+        }
+        deleted += ndup;
+    }
+    Py_END_ALLOW_THREADS
+    ACTIVE_OPS_DEC(env);
+    NOTE_MAP_FULL(env, rc);
 
-        done = false;
-        while (!done) {
-
-            if(! self->positioned) {
-                done = true;
-            }
-            else if(_cursor_get_c(self, get_op)) {
-                goto failiter;
-            } else {
-                key = obj_from_val(&self->key, as_buffer);
-                ENV_PRELOAD_UNLOCKED(self->trans->env, 0, self->val.mv_data, self->val.mv_size);
+    /* The cursor is left unpositioned. */
+    self->positioned = 0;
+    self->key.mv_size = 0;
+    self->val.mv_size = 0;
+    if(rc) {
+        err_format(rc, "%s() element #%zu", what, order[i]);
+        goto out;
+    }
+    ret = Py_BuildValue("(nn)", (Py_ssize_t) n, (Py_ssize_t) deleted);
 
-                if(!arg.dupfixed_bytes) {
-                    /* Not dupfixed, MDB_GET_CURRENT returns single item */
-                    val = obj_from_val(&self->val, as_buffer);
-                    tup = PyTuple_New(2);
+out:
+    bufbatch_release(&bb);
+    Py_DECREF(seq);
+    free(keys);
+    free(vals);
+    free(order);
+    return ret;
+}
 
-                    if (tup && key && val) {
-                        PyTuple_SET_ITEM(tup, 0, key);
-                        PyTuple_SET_ITEM(tup, 1, val);
-                        PyList_Append(pylist, tup);
-                        Py_DECREF(tup);
-                    } else {
-                        Py_XDECREF(key);
-                        Py_XDECREF(val);
-                        Py_XDECREF(tup);
-                        goto failiter;
-                    }
-                } else {
-                    /* dupfixed, MDB_GET_MULTIPLE returns batch, iterate values */
-                    size_t items = self->val.mv_size / val_size;
-                    if (first) {
-                        key_size = (size_t) self->key.mv_size;
-                        /* key_size is from a (possibly adversarial) on-disk
-                         * record; guard size arithmetic against overflow. */
-                        if (SIZE_ADD_OVERFLOW(key_size, val_size)) {
-                            PyErr_SetString(PyExc_OverflowError,
-                                "key+value size overflow in getmulti "
-                                "(corrupt database?)");
-                            goto failiter;
-                        }
-                        item_size = key_size + val_size;
-                        if (arg.keyfixed) { /* Init structured array buffer */
-                            if (SIZE_MUL_OVERFLOW(buffer_size, item_size)) {
-                                PyErr_NoMemory();
-                                goto failiter;
-                            }
-                            buffer = malloc(buffer_size * item_size);
-                            if (! buffer) {
-                                PyErr_NoMemory();
-                                goto failiter;
-                            }
-                        }
-                        first = false;
-                    }
+/* Bytes object filled in place while the GIL is released, so the result
+ * needs no copy once complete. Only growing it requires the GIL. */
+typedef struct {
+    PyObject *bytes;
+    size_t len;
+} BytesBuf;
 
-                    for(i=0; i<items; i++) {
-                        char *val_data = (char *) self->val.mv_data + (i * val_size);
-                        if (arg.keyfixed) {
-                            /* Add to array buffer */
-                            char *k, *v;
-                            if (buffer_pos >= buffer_size) { // Grow buffer
-                                char *new_buffer;
-                                size_t new_size;
-                                if (buffer_size > SIZE_MAX / 2) {
-                                    PyErr_NoMemory();
-                                    goto failiter;
-                                }
-                                new_size = buffer_size * 2;
-                                if (SIZE_MUL_OVERFLOW(new_size, item_size)) {
-                                    PyErr_NoMemory();
-                                    goto failiter;
-                                }
-                                new_buffer = realloc(buffer,
-                                                     new_size * item_size);
-                                if (! new_buffer) {
-                                    /* Original `buffer` still valid; the
-                                     * failiter cleanup frees it. */
-                                    PyErr_NoMemory();
-                                    goto failiter;
-                                }
-                                buffer = new_buffer;
-                                buffer_size = new_size;
-                            }
-                            k = buffer + (buffer_pos * item_size);
-                            v = k + key_size;
-                            memcpy(k, (char *) self->key.mv_data, key_size);
-                            memcpy(v, val_data, val_size);
+/**
+ * Append `len` bytes at `data` to `bb`. Called with the GIL released by
+ * PyEval_SaveThread() into `save`, which is updated if the GIL must be taken
+ * to grow the object. Returns 0 on success, or -1 with an exception set.
+ */
+static int
+bytesbuf_append(BytesBuf *bb, const void *data, size_t len,
+                PyThreadState **save)
+{
+    size_t size = (size_t) PyBytes_GET_SIZE(bb->bytes);
+    int rc;
 
-                            buffer_pos++;
-                        } else {
-                            /* Add to list of tuples */
-                            if(as_buffer) {
-                                val = PyMemoryView_FromMemory(
-                                    val_data, (size_t) arg.dupfixed_bytes, PyBUF_READ);
-                            } else {
-                                val = PyBytes_FromStringAndSize(
-                                    val_data, (size_t) arg.dupfixed_bytes);
-                            }
-                            tup = PyTuple_New(2);
-                            if (tup && key && val) {
-                                Py_INCREF(key); // Hold key in loop
-                                PyTuple_SET_ITEM(tup, 0, key);
-                                PyTuple_SET_ITEM(tup, 1, val);
-                                PyList_Append(pylist, tup);
-                                Py_DECREF(tup);
-                            } else {
-                                Py_XDECREF(val);
-                                Py_XDECREF(tup);
-                                Py_XDECREF(key);
-                                goto failiter;
-                            }
-                        }
-                    }
-                    Py_DECREF(key); // Release key
-                }
+    if(len > size - bb->len) {
+        size_t need = bb->len + len;
 
-                if(arg.dupdata){
-                    if(_cursor_get_c(self, next_op)) {
-                        goto failiter;
-                    }
-                }
-                else {
-                    done = true;
-                }
+        PyEval_RestoreThread(*save);
+        if(SIZE_ADD_OVERFLOW(bb->len, len) || need > (size_t) PY_SSIZE_T_MAX) {
+            PyErr_NoMemory();
+            rc = -1;
+        } else {
+            while(size < need) {
+                size = size > (size_t) PY_SSIZE_T_MAX / 2 ? need : size * 2;
             }
+            rc = _PyBytes_Resize(&bb->bytes, (Py_ssize_t) size);
+        }
+        *save = PyEval_SaveThread();
+        if(rc) {
+            return -1;
         }
-        Py_DECREF(item);
     }
-
-    Py_DECREF(iter);
-    if(PyErr_Occurred()) {
-        goto fail;
+    if(len) {
+        memcpy(PyBytes_AS_STRING(bb->bytes) + bb->len, data, len);
     }
+    bb->len += len;
+    return 0;
+}
 
-    if (arg.keyfixed){
-        size_t newsize;
-        char *new_buffer;
-        PyObject *owner, *mv;
-        if (SIZE_MUL_OVERFLOW(buffer_pos, item_size)) {
-            PyErr_NoMemory();
-            goto fail;
-        }
-        newsize = buffer_pos * item_size;
-        new_buffer = realloc(buffer, newsize);
-        if(! new_buffer && newsize) {
-            /* Original buffer still allocated; fail cleanup frees it. */
-            PyErr_NoMemory();
-            goto fail;
-        }
-        buffer = new_buffer;
-        /* Wrap the buffer in a bytes object that owns the memory.
-         * PyBytes_FromStringAndSize copies the data, then we free
-         * the original buffer. */
-        owner = PyBytes_FromStringAndSize(buffer, newsize);
-        free(buffer);
-        buffer = NULL;
-        if(! owner) {
-            goto fail;
-        }
-        mv = PyMemoryView_FromObject(owner);
-        Py_DECREF(owner);
-        return mv;
-    } else {
-        return pylist;
-    }
+/**
+ * Trim `bb` to its contents and return a memoryview of them cast to
+ * `format`, taking `bb`'s reference to the bytes object.
+ */
+static PyObject *
+bytesbuf_to_memoryview(BytesBuf *bb, const char *format)
+{
+    PyObject *mv;
+    PyObject *cast;
 
-failiter:
-    Py_DECREF(item);
-    Py_DECREF(iter);
-fail:
-    Py_XDECREF(pylist);
-    if (buffer) {
-        free(buffer);
+    if(_PyBytes_Resize(&bb->bytes, (Py_ssize_t) bb->len)) {
+        return NULL;
     }
-    return NULL;
+    mv = PyMemoryView_FromObject(bb->bytes);
+    Py_CLEAR(bb->bytes);
+    if(! mv || ! strcmp(format, "B")) {
+        return mv;
+    }
+    cast = PyObject_CallMethod(mv, "cast", "s", format);
+    Py_DECREF(mv);
+    return cast;
 }
 
 /**
- * Cursor.get() -> result
+ * Cursor.count_range() -> int
  */
 static PyObject *
-cursor_get(CursorObject *self, PyObject *args, PyObject *kwds)
+cursor_count_range(CursorObject *self, PyObject *args, PyObject *kwds)
 {
-    struct cursor_get {
-        MDB_val key;
-        PyObject *default_;
-    } arg = {{0, 0}, Py_None};
+    struct cursor_count_range {
+        MDB_val start;
+        MDB_val stop;
+        int dup;
+    } arg = {{0, 0}, {0, 0}, 1};
 
     static const struct argspec argspec[] = {
-        {"key", ARG_BUF, OFFSET(cursor_get, key)},
-        {"default", ARG_OBJ, OFFSET(cursor_get, default_)}
+        {"start", ARG_BUF, OFFSET(cursor_count_range, start)},
+        {"stop", ARG_BUF, OFFSET(cursor_count_range, stop)},
+        {"dup", ARG_BOOL, OFFSET(cursor_count_range, dup)}
     };
     BufViewList bvl;
     PyObject *ret = NULL;
-
-    bufviewlist_init(&bvl);
+    EnvObject *env;
+    MDB_cursor_op op;
+    const char *what = "mdb_cursor_get";
+    size_t count = 0;
+    size_t ndup;
+    int dupsort;
+    int rc;
+
+    bufviewlist_init(&bvl);
     static PyObject *cache = NULL;
     if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, &bvl)) {
         goto out;
     }
-
-    if(! arg.key.mv_data) {
-        type_error("key must be given.");
+    if(! arg.start.mv_size) {
+        arg.start.mv_data = NULL;
+    }
+    if(cursor_check_bound(self, &arg.start, "start") ||
+       cursor_check_bound(self, &arg.stop, "stop")) {
         goto out;
     }
-
-    self->key = arg.key;
-    if(_cursor_get_c(self, MDB_SET_KEY)) {
+    env = self->trans->env;
+    if(ENV_RESIZE_BLOCKED(env)) {
+        err_set("mdb_cursor_get", EINVAL);
         goto out;
     }
-    bufviewlist_release(&bvl);
-    if(! self->positioned) {
-        Py_INCREF(arg.default_);
-        return arg.default_;
+
+    /* On dupsort databases visit each key once, adding its duplicate count
+     * if requested, rather than stepping over every duplicate. */
+    dupsort = (self->dbi_flags & MDB_DUPSORT) != 0;
+    op = dupsort ? MDB_NEXT_NODUP : MDB_NEXT;
+    ACTIVE_OPS_INC(env);
+    Py_BEGIN_ALLOW_THREADS
+    if(arg.start.mv_data) {
+        self->key = arg.start;
+        rc = mdb_cursor_get(self->curs, &self->key, &self->val, MDB_SET_RANGE);
+    } else {
+        rc = mdb_cursor_get(self->curs, &self->key, &self->val, MDB_FIRST);
     }
-    return cursor_value(self, NULL);
+    while(! rc) {
+        if(arg.stop.mv_data &&
+           cursor_bound_cmp(self, &self->key, &arg.stop) >= 0) {
+            break;
+        }
+        if(dupsort && arg.dup) {
+            if((rc = mdb_cursor_count(self->curs, &ndup))) {
+                what = "mdb_cursor_count";
+                break;
+            }
+            count += ndup;
+        } else {
+            count++;
+        }
+        rc = mdb_cursor_get(self->curs, &self->key, &self->val, op);
+    }
+    Py_END_ALLOW_THREADS
+    ACTIVE_OPS_DEC(env);
+
+    /* The cursor rests on the first record past the range, if any. */
+    self->positioned = rc == 0;
+    self->last_mutation = self->trans->mutations;
+    if(rc) {
+        self->key.mv_size = 0;
+        self->val.mv_size = 0;
+        if(rc != MDB_NOTFOUND) {
+            err_set(what, rc);
+            goto out;
+        }
+    }
+    ret = PyLong_FromSize_t(count);
 
 out:
     bufviewlist_release(&bvl);
@@ -3217,387 +4737,629 @@ out:
 }
 
 /**
- * Cursor.item() -> (key, value)
+ * Cursor.export_columns() -> (keys, key_offsets, values, value_offsets)
  */
 static PyObject *
-cursor_item(CursorObject *self, PyObject *Py_UNUSED(ignored))
+cursor_export_columns(CursorObject *self, PyObject *args, PyObject *kwds)
 {
-    int as_buffer;
-    PyObject *key;
-    PyObject *val;
-    PyObject *tup;
-    int rc = 0;
+    struct cursor_export_columns {
+        MDB_val start;
+        MDB_val stop;
+        size_t limit;
+    } arg = {{0, 0}, {0, 0}, SIZE_MAX};
 
-    if(! self->valid) {
-        return err_invalid();
+    static const struct argspec argspec[] = {
+        {"start", ARG_BUF, OFFSET(cursor_export_columns, start)},
+        {"stop", ARG_BUF, OFFSET(cursor_export_columns, stop)},
+        {"limit", ARG_SIZE, OFFSET(cursor_export_columns, limit)}
+    };
+    BufViewList bvl;
+    BytesBuf bufs[4] = {{NULL, 0}, {NULL, 0}, {NULL, 0}, {NULL, 0}};
+    BytesBuf *keys = &bufs[0];
+    BytesBuf *key_offsets = &bufs[1];
+    BytesBuf *vals = &bufs[2];
+    BytesBuf *val_offsets = &bufs[3];
+    static const char *const formats[4] = {"B", "q", "B", "q"};
+    PyObject *cols[4] = {NULL, NULL, NULL, NULL};
+    PyObject *ret = NULL;
+    PyThreadState *save;
+    EnvObject *env;
+    int64_t offset = 0;
+    size_t count = 0;
+    int failed;
+    int rc;
+    int i;
+
+    bufviewlist_init(&bvl);
+    static PyObject *cache = NULL;
+    if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, &bvl)) {
+        goto out;
     }
-    /* Must refresh `key` and `val` following mutation. */
-    if(self->last_mutation != self->trans->mutations &&
-       _cursor_get_c(self, MDB_GET_CURRENT)) {
-        return NULL;
+    if(! arg.start.mv_size) {
+        arg.start.mv_data = NULL;
     }
-
-    as_buffer = self->trans->flags & TRANS_BUFFERS;
-    key = obj_from_val(&self->key, as_buffer);
-    ENV_PRELOAD_UNLOCKED(self->trans->env, rc, self->val.mv_data, self->val.mv_size);
-    val = obj_from_val(&self->val, as_buffer);
-    tup = PyTuple_New(2);
-    if(tup && key && val) {
-        PyTuple_SET_ITEM(tup, 0, key);
-        PyTuple_SET_ITEM(tup, 1, val);
-        return tup;
+    if(cursor_check_bound(self, &arg.start, "start") ||
+       cursor_check_bound(self, &arg.stop, "stop")) {
+        goto out;
     }
-    Py_CLEAR(key);
-    Py_CLEAR(val);
-    Py_CLEAR(tup);
-    return NULL;
-}
-
-/**
- * Cursor.key() -> result
- */
-static PyObject *
-cursor_key(CursorObject *self, PyObject *Py_UNUSED(ignored))
-{
-    if(! self->valid) {
-        return err_invalid();
+    env = self->trans->env;
+    if(ENV_RESIZE_BLOCKED(env)) {
+        err_set("mdb_cursor_get", EINVAL);
+        goto out;
     }
-    /* Must refresh `key` and `val` following mutation. */
-    if(self->last_mutation != self->trans->mutations &&
-       _cursor_get_c(self, MDB_GET_CURRENT)) {
-        return NULL;
+    for(i = 0; i < 4; i++) {
+        if(! ((bufs[i].bytes = PyBytes_FromStringAndSize(NULL, 256)))) {
+            goto out;
+        }
     }
-    return obj_from_val(&self->key, self->trans->flags & TRANS_BUFFERS);
-}
-
-/**
- * Cursor.last() -> bool
- */
-static PyObject *
-cursor_last(CursorObject *self, PyObject *Py_UNUSED(ignored))
-{
-    return _cursor_get(self, MDB_LAST);
-}
 
-/**
- * Cursor.last_dup() -> bool
- */
-static PyObject *
-cursor_last_dup(CursorObject *self, PyObject *Py_UNUSED(ignored))
-{
-    return _cursor_get(self, MDB_LAST_DUP);
-}
+    /* Position, walk and copy the whole range in one unlocked section,
+     * writing straight into the result's bytes objects. Growing them takes
+     * the GIL, but active_ops still keeps the map from being resized. */
+    ACTIVE_OPS_INC(env);
+    save = PyEval_SaveThread();
+    failed = bytesbuf_append(key_offsets, &offset, sizeof offset, &save) ||
+             bytesbuf_append(val_offsets, &offset, sizeof offset, &save);
+    if(arg.start.mv_data) {
+        self->key = arg.start;
+        rc = mdb_cursor_get(self->curs, &self->key, &self->val, MDB_SET_RANGE);
+    } else {
+        rc = mdb_cursor_get(self->curs, &self->key, &self->val, MDB_FIRST);
+    }
+    while(! (rc || failed) && count < arg.limit) {
+        if(arg.stop.mv_data &&
+           cursor_bound_cmp(self, &self->key, &arg.stop) >= 0) {
+            break;
+        }
+        preload(0, self->val.mv_data, self->val.mv_size);
+        if(bytesbuf_append(keys, self->key.mv_data, self->key.mv_size,
+                           &save) ||
+           bytesbuf_append(vals, self->val.mv_data, self->val.mv_size,
+                           &save)) {
+            failed = 1;
+            break;
+        }
+        offset = (int64_t) keys->len;
+        failed = bytesbuf_append(key_offsets, &offset, sizeof offset, &save);
+        offset = (int64_t) vals->len;
+        failed = failed ||
+                 bytesbuf_append(val_offsets, &offset, sizeof offset, &save);
+        count++;
+        rc = mdb_cursor_get(self->curs, &self->key, &self->val, MDB_NEXT);
+    }
+    PyEval_RestoreThread(save);
+    ACTIVE_OPS_DEC(env);
+    bufviewlist_release(&bvl);
 
-/**
- * Cursor.next() -> bool
- */
-static PyObject *
-cursor_next(CursorObject *self, PyObject *Py_UNUSED(ignored))
-{
-    return _cursor_get(self, MDB_NEXT);
-}
+    /* The cursor rests on the first record past the range, if any. */
+    self->positioned = rc == 0;
+    self->last_mutation = self->trans->mutations;
+    if(rc) {
+        self->key.mv_size = 0;
+        self->val.mv_size = 0;
+    }
+    if(failed) {
+        goto out;
+    }
+    if(rc && rc != MDB_NOTFOUND) {
+        err_set("mdb_cursor_get", rc);
+        goto out;
+    }
 
-/**
- * Cursor.next_dup() -> bool
- */
-static PyObject *
-cursor_next_dup(CursorObject *self, PyObject *Py_UNUSED(ignored))
-{
-    return _cursor_get(self, MDB_NEXT_DUP);
-}
+    for(i = 0; i < 4; i++) {
+        if(! ((cols[i] = bytesbuf_to_memoryview(&bufs[i], formats[i])))) {
+            goto out;
+        }
+    }
+    ret = Py_BuildValue("(OOOO)", cols[0], cols[1], cols[2], cols[3]);
 
-/**
- * Cursor.next_nodup() -> bool
- */
-static PyObject *
-cursor_next_nodup(CursorObject *self, PyObject *Py_UNUSED(ignored))
-{
-    return _cursor_get(self, MDB_NEXT_NODUP);
+out:
+    bufviewlist_release(&bvl);
+    for(i = 0; i < 4; i++) {
+        Py_XDECREF(cols[i]);
+        Py_XDECREF(bufs[i].bytes);
+    }
+    return ret;
 }
 
 /**
- * Cursor.prev() -> bool
+ * Cursor.first() -> bool
  */
 static PyObject *
-cursor_prev(CursorObject *self, PyObject *Py_UNUSED(ignored))
+cursor_first(CursorObject *self, PyObject *Py_UNUSED(ignored))
 {
-    return _cursor_get(self, MDB_PREV);
+    return _cursor_get(self, MDB_FIRST);
 }
 
 /**
- * Cursor.prev_dup() -> bool
+ * Cursor.first_dup() -> bool
  */
 static PyObject *
-cursor_prev_dup(CursorObject *self, PyObject *Py_UNUSED(ignored))
+cursor_first_dup(CursorObject *self, PyObject *Py_UNUSED(ignored))
 {
-    return _cursor_get(self, MDB_PREV_DUP);
+    return _cursor_get(self, MDB_FIRST_DUP);
 }
 
-/**
- * Cursor.prev_nodup() -> bool
- */
 static PyObject *
-cursor_prev_nodup(CursorObject *self, PyObject *Py_UNUSED(ignored))
-{
-    return _cursor_get(self, MDB_PREV_NODUP);
-}
+cursor_value(CursorObject *self, PyObject *Py_UNUSED(ignored));
 
 /**
- * Cursor.putmulti(iter|dict) -> (consumed, added)
+ * Cursor.getmulti() -> Iterable of (key, value)
  */
 static PyObject *
-cursor_put_multi(CursorObject *self, PyObject *args, PyObject *kwds)
+cursor_get_multi(CursorObject *self, PyObject *args, PyObject *kwds)
 {
-    struct cursor_put {
-        PyObject *items;
+    struct cursor_get {
+        PyObject *keys;
         int dupdata;
-        int overwrite;
-        int append;
-    } arg = {Py_None, 1, 1, 0};
+        size_t dupfixed_bytes;
+        int keyfixed;
+        int values;
+        PyObject *dtype;
+    } arg = {Py_None, 0, 0, 0, 1, Py_None};
 
-    PyObject *iter;
-    PyObject *item;
+    int as_buffer;
+    size_t i;
+    PyObject *iter, *item, *tup, *key, *val;
+    PyObject *pylist = NULL;
+    MDB_cursor_op get_op, next_op;
+    bool done, first;
+    char dtype;
 
     static const struct argspec argspec[] = {
-        {"items", ARG_OBJ, OFFSET(cursor_put, items)},
-        {"dupdata", ARG_BOOL, OFFSET(cursor_put, dupdata)},
-        {"overwrite", ARG_BOOL, OFFSET(cursor_put, overwrite)},
-        {"append", ARG_BOOL, OFFSET(cursor_put, append)}
+        {"keys", ARG_OBJ, OFFSET(cursor_get, keys)},
+        {"dupdata", ARG_BOOL, OFFSET(cursor_get, dupdata)},
+        {"dupfixed_bytes", ARG_SIZE, OFFSET(cursor_get, dupfixed_bytes)},
+        {"keyfixed", ARG_BOOL, OFFSET(cursor_get, keyfixed)},
+        {"values", ARG_BOOL, OFFSET(cursor_get, values)},
+        {"dtype", ARG_OBJ, OFFSET(cursor_get, dtype)}
     };
-    int flags;
-    int rc;
-    Py_ssize_t consumed;
-    Py_ssize_t added;
-    PyObject *ret = NULL;
+
+    size_t buffer_pos = 0, buffer_size = 8;
+    size_t key_size = 0, val_size, item_size = 0;
+    char *buffer = NULL;
 
     static PyObject *cache = NULL;
     if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, NULL)) {
         return NULL;
     }
 
-    flags = 0;
-    if(! arg.dupdata) {
-        flags |= MDB_NODUPDATA;
+    if(arg.dupfixed_bytes < 0) {
+        return type_error("dupfixed_bytes must be a positive integer.");
+    }else if ((arg.dupfixed_bytes > 0 || arg.keyfixed) && !arg.dupdata) {
+        return type_error("dupdata is required for dupfixed_bytes/keyfixed.");
+    }else if (arg.keyfixed && !arg.dupfixed_bytes){
+        return type_error("dupfixed_bytes is required for keyfixed.");
+    }else if (!arg.values && arg.dupdata) {
+        return type_error("values=False is incompatible with dupdata.");
     }
-    if(! arg.overwrite) {
-        flags |= MDB_NOOVERWRITE;
+    if(parse_dtype(arg.dtype, &dtype)) {
+        return NULL;
     }
-    if(arg.append) {
-        flags |= (self->trans->db->flags & MDB_DUPSORT) ? MDB_APPENDDUP : MDB_APPEND;
+    if(dtype && arg.keyfixed) {
+        return type_error("dtype is incompatible with keyfixed.");
+    } else if(dtype && arg.dupfixed_bytes &&
+              arg.dupfixed_bytes != dtype_size(dtype)) {
+        return type_error("dupfixed_bytes must match the dtype size.");
     }
 
-    if(! ((iter = PyObject_GetIter(arg.items)))) {
+    if(! ((iter = PyObject_GetIter(arg.keys)))) {
         return NULL;
     }
 
-    consumed = 0;
-    added = 0;
-    while((item = PyIter_Next(iter))) {
-        MDB_val mkey, mval;
-        BufViewList bvl;
-        bufviewlist_init(&bvl);
+    /* Choose ops */
+    if(arg.dupfixed_bytes) {
+        get_op = MDB_GET_MULTIPLE;
+        next_op = MDB_NEXT_MULTIPLE;
+    } else {
+        get_op = MDB_GET_CURRENT;
+        next_op = MDB_NEXT_DUP;
+    }
 
-        if(! (PyTuple_CheckExact(item) && PyTuple_GET_SIZE(item) == 2)) {
-            PyErr_SetString(PyExc_TypeError,
-                            "putmulti() elements must be 2-tuples");
-            Py_DECREF(item);
-            Py_DECREF(iter);
+    as_buffer = self->trans->flags & TRANS_BUFFERS;
+    val_size = arg.dupfixed_bytes;
+    if (!arg.keyfixed){ /* Init list */
+        pylist = PyList_New(0);
+        if(! pylist) {
+            Py_DECREF(iter);
             return NULL;
         }
+    }
+    first = true;
+    while((item = PyIter_Next(iter))) {
+        MDB_val mkey;
+        BufViewList bvl;
+        bufviewlist_init(&bvl);
 
-        if(val_from_buffer(&mkey, PyTuple_GET_ITEM(item, 0), &bvl) ||
-           val_from_buffer(&mval, PyTuple_GET_ITEM(item, 1), &bvl)) {
+        if(val_from_buffer(&mkey, item, &bvl)) {
             bufviewlist_release(&bvl);
-            Py_DECREF(item);
-            Py_DECREF(iter);
-            return NULL; /* val_from_buffer sets exception */
-        }
+            goto failiter;
+        } /* val_from_buffer sets exception */
 
-        ENV_UNLOCKED(self->trans->env, rc, mdb_cursor_put(self->curs, &mkey, &mval, flags));
+        self->key = mkey;
+        if(_cursor_get_c(self, MDB_SET_KEY)) {
+            bufviewlist_release(&bvl);
+            goto failiter;
+        }
         bufviewlist_release(&bvl);
-        self->trans->mutations++;
-        switch(rc) {
-        case MDB_SUCCESS:
-            added++;
-            break;
-        case MDB_KEYEXIST:
-            break;
-        default:
+
+        if(!arg.values) {
+            /* values=False: append key only if it was found. */
+            if(self->positioned) {
+                key = obj_from_val(&self->key, as_buffer);
+                if(key) {
+                    PyList_Append(pylist, key);
+                    Py_DECREF(key);
+                } else {
+                    goto failiter;
+                }
+            }
             Py_DECREF(item);
-            Py_DECREF(iter);
-            return err_format(rc, "mdb_cursor_put() element #%zd", consumed);
+            continue;
         }
 
+        done = false;
+        while (!done) {
+
+            if(! self->positioned) {
+                done = true;
+            }
+            else if(_cursor_get_c(self, get_op)) {
+                goto failiter;
+            } else {
+                key = obj_from_val(&self->key, as_buffer);
+                ENV_PRELOAD_UNLOCKED(self->trans->env, 0, self->val.mv_data, self->val.mv_size);
+
+                if(!arg.dupfixed_bytes) {
+                    /* Not dupfixed, MDB_GET_CURRENT returns single item */
+                    if(dtype) {
+                        val = obj_from_val_dtype(&self->val, dtype);
+                    } else {
+                        val = obj_from_val(&self->val, as_buffer);
+                    }
+                    tup = PyTuple_New(2);
+
+                    if (tup && key && val) {
+                        PyTuple_SET_ITEM(tup, 0, key);
+                        PyTuple_SET_ITEM(tup, 1, val);
+                        PyList_Append(pylist, tup);
+                        Py_DECREF(tup);
+                    } else {
+                        Py_XDECREF(key);
+                        Py_XDECREF(val);
+                        Py_XDECREF(tup);
+                        goto failiter;
+                    }
+                } else {
+                    /* dupfixed, MDB_GET_MULTIPLE returns batch, iterate values */
+                    size_t items = self->val.mv_size / val_size;
+                    if (first) {
+                        key_size = (size_t) self->key.mv_size;
+                        /* key_size is from a (possibly adversarial) on-disk
+                         * record; guard size arithmetic against overflow. */
+                        if (SIZE_ADD_OVERFLOW(key_size, val_size)) {
+                            PyErr_SetString(PyExc_OverflowError,
+                                "key+value size overflow in getmulti "
+                                "(corrupt database?)");
+                            goto failiter;
+                        }
+                        item_size = key_size + val_size;
+                        if (arg.keyfixed) { /* Init structured array buffer */
+                            if (SIZE_MUL_OVERFLOW(buffer_size, item_size)) {
+                                PyErr_NoMemory();
+                                goto failiter;
+                            }
+                            buffer = malloc(buffer_size * item_size);
+                            if (! buffer) {
+                                PyErr_NoMemory();
+                                goto failiter;
+                            }
+                        }
+                        first = false;
+                    }
+
+                    for(i=0; i<items; i++) {
+                        char *val_data = (char *) self->val.mv_data + (i * val_size);
+                        if (arg.keyfixed) {
+                            /* Add to array buffer */
+                            char *k, *v;
+                            if (buffer_pos >= buffer_size) { // Grow buffer
+                                char *new_buffer;
+                                size_t new_size;
+                                if (buffer_size > SIZE_MAX / 2) {
+                                    PyErr_NoMemory();
+                                    goto failiter;
+                                }
+                                new_size = buffer_size * 2;
+                                if (SIZE_MUL_OVERFLOW(new_size, item_size)) {
+                                    PyErr_NoMemory();
+                                    goto failiter;
+                                }
+                                new_buffer = realloc(buffer,
+                                                     new_size * item_size);
+                                if (! new_buffer) {
+                                    /* Original `buffer` still valid; the
+                                     * failiter cleanup frees it. */
+                                    PyErr_NoMemory();
+                                    goto failiter;
+                                }
+                                buffer = new_buffer;
+                                buffer_size = new_size;
+                            }
+                            k = buffer + (buffer_pos * item_size);
+                            v = k + key_size;
+                            memcpy(k, (char *) self->key.mv_data, key_size);
+                            memcpy(v, val_data, val_size);
+
+                            buffer_pos++;
+                        } else {
+                            /* Add to list of tuples */
+                            if(dtype) {
+                                val = obj_from_dtype(val_data, dtype);
+                            } else if(as_buffer) {
+                                val = PyMemoryView_FromMemory(
+                                    val_data, (size_t) arg.dupfixed_bytes, PyBUF_READ);
+                            } else {
+                                val = PyBytes_FromStringAndSize(
+                                    val_data, (size_t) arg.dupfixed_bytes);
+                            }
+                            tup = PyTuple_New(2);
+                            if (tup && key && val) {
+                                Py_INCREF(key); // Hold key in loop
+                                PyTuple_SET_ITEM(tup, 0, key);
+                                PyTuple_SET_ITEM(tup, 1, val);
+                                PyList_Append(pylist, tup);
+                                Py_DECREF(tup);
+                            } else {
+                                Py_XDECREF(val);
+                                Py_XDECREF(tup);
+                                Py_XDECREF(key);
+                                goto failiter;
+                            }
+                        }
+                    }
+                    Py_DECREF(key); // Release key
+                }
+
+                if(arg.dupdata){
+                    if(_cursor_get_c(self, next_op)) {
+                        goto failiter;
+                    }
+                }
+                else {
+                    done = true;
+                }
+            }
+        }
         Py_DECREF(item);
-        consumed++;
     }
 
     Py_DECREF(iter);
-    if(! PyErr_Occurred()) {
-        ret = Py_BuildValue("(nn)", consumed, added);
+    if(PyErr_Occurred()) {
+        goto fail;
     }
-    return ret;
+
+    if (arg.keyfixed){
+        size_t newsize;
+        char *new_buffer;
+        PyObject *owner, *mv;
+        if (SIZE_MUL_OVERFLOW(buffer_pos, item_size)) {
+            PyErr_NoMemory();
+            goto fail;
+        }
+        newsize = buffer_pos * item_size;
+        new_buffer = realloc(buffer, newsize);
+        if(! new_buffer && newsize) {
+            /* Original buffer still allocated; fail cleanup frees it. */
+            PyErr_NoMemory();
+            goto fail;
+        }
+        buffer = new_buffer;
+        /* Wrap the buffer in a bytes object that owns the memory.
+         * PyBytes_FromStringAndSize copies the data, then we free
+         * the original buffer. */
+        owner = PyBytes_FromStringAndSize(buffer, newsize);
+        free(buffer);
+        buffer = NULL;
+        if(! owner) {
+            goto fail;
+        }
+        mv = PyMemoryView_FromObject(owner);
+        Py_DECREF(owner);
+        return mv;
+    } else {
+        return pylist;
+    }
+
+failiter:
+    Py_DECREF(item);
+    Py_DECREF(iter);
+fail:
+    Py_XDECREF(pylist);
+    if (buffer) {
+        free(buffer);
+    }
+    return NULL;
 }
 
 /**
- * Cursor.put() -> bool
+ * Cursor.values_array() -> array.array
  */
 static PyObject *
-cursor_put(CursorObject *self, PyObject *args, PyObject *kwds)
+cursor_values_array(CursorObject *self, PyObject *args, PyObject *kwds)
 {
-    struct cursor_put {
-        MDB_val key;
-        MDB_val val;
-        int dupdata;
-        int overwrite;
-        int append;
-    } arg = {{0, 0}, {0, 0}, 1, 1, 0};
+    struct cursor_values_array {
+        PyObject *dtype;
+    } arg = {Py_None};
 
     static const struct argspec argspec[] = {
-        {"key", ARG_BUF, OFFSET(cursor_put, key)},
-        {"value", ARG_BUF, OFFSET(cursor_put, val)},
-        {"dupdata", ARG_BOOL, OFFSET(cursor_put, dupdata)},
-        {"overwrite", ARG_BOOL, OFFSET(cursor_put, overwrite)},
-        {"append", ARG_BOOL, OFFSET(cursor_put, append)}
+        {"dtype", ARG_OBJ, OFFSET(cursor_values_array, dtype)}
     };
-    BufViewList bvl;
-    int flags;
+    PyObject *arr = NULL;
+    PyObject *one;
+    PyObject *mv;
+    PyObject *res;
+    Py_buffer view;
+    EnvObject *env;
+    MDB_val key;
+    MDB_val val;
+    size_t itemsize;
+    size_t count;
+    size_t pos = 0;
+    char dtype;
+    int bad = 0;
     int rc;
 
-    bufviewlist_init(&bvl);
     static PyObject *cache = NULL;
-    if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, &bvl)) {
-        bufviewlist_release(&bvl);
+    if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, NULL)) {
         return NULL;
     }
-
-    flags = 0;
-    if(! arg.dupdata) {
-        flags |= MDB_NODUPDATA;
+    if(parse_dtype(arg.dtype, &dtype)) {
+        return NULL;
     }
-    if(! arg.overwrite) {
-        flags |= MDB_NOOVERWRITE;
+    if(! dtype) {
+        return type_error("dtype must be specified.");
     }
-    if(arg.append) {
-        flags |= (self->trans->db->flags & MDB_DUPSORT) ? MDB_APPENDDUP : MDB_APPEND;
+    itemsize = dtype_size(dtype);
+    if(self->positioned && self->last_mutation != self->trans->mutations) {
+        if(_cursor_get_c(self, MDB_GET_CURRENT)) {
+            return NULL;
+        }
+    }
+    if(! self->positioned) {
+        return PyObject_CallFunction(array_type, "C", dtype);
     }
 
-    ENV_UNLOCKED(self->trans->env, rc, mdb_cursor_put(self->curs, &arg.key, &arg.val, flags));
-    bufviewlist_release(&bvl);
-    self->trans->mutations++;
-    if(rc) {
-        if(rc == MDB_KEYEXIST) {
-            Py_RETURN_FALSE;
+    env = self->trans->env;
+    if(! (self->dbi_flags & MDB_DUPSORT)) {
+        /* A single value, holding packed numbers. */
+        if(self->val.mv_size % itemsize ||
+           self->val.mv_size > (size_t) PY_SSIZE_T_MAX) {
+            return err_set("dtype", MDB_BAD_VALSIZE);
         }
-        return err_set("mdb_put", rc);
+        if(! ((arr = PyObject_CallFunction(array_type, "C", dtype)))) {
+            return NULL;
+        }
+        ENV_PRELOAD_UNLOCKED(env, 0, self->val.mv_data, self->val.mv_size);
+        mv = PyMemoryView_FromMemory(self->val.mv_data,
+                                     (Py_ssize_t) self->val.mv_size,
+                                     PyBUF_READ);
+        res = mv ? PyObject_CallMethod(arr, "frombytes", "O", mv) : NULL;
+        Py_XDECREF(mv);
+        if(! res) {
+            Py_DECREF(arr);
+            return NULL;
+        }
+        Py_DECREF(res);
+        return arr;
     }
-    Py_RETURN_TRUE;
-}
 
-/**
- * Shared between Cursor.replace() and Transaction.replace()
- */
-static PyObject *
-do_cursor_replace(CursorObject *self, MDB_val *key, MDB_val *val)
-{
-    int rc = 0;
-    PyObject *old;
-    MDB_val newval = *val;
+    if((rc = mdb_cursor_count(self->curs, &count))) {
+        return err_set("mdb_cursor_count", rc);
+    }
+    if(count > (size_t) PY_SSIZE_T_MAX / itemsize) {
+        return PyErr_NoMemory();
+    }
+    /* Size the array up front, then fill its buffer directly. */
+    if(! ((one = PyObject_CallFunction(array_type, "C(i)", dtype, 0)))) {
+        return NULL;
+    }
+    arr = PySequence_Repeat(one, (Py_ssize_t) count);
+    Py_DECREF(one);
+    if(! arr) {
+        return NULL;
+    }
+    if(PyObject_GetBuffer(arr, &view, PyBUF_WRITABLE)) {
+        Py_DECREF(arr);
+        return NULL;
+    }
+    if(ENV_RESIZE_BLOCKED(env)) {
+        PyBuffer_Release(&view);
+        Py_DECREF(arr);
+        return err_set("mdb_cursor_get", EINVAL);
+    }
 
-    if(self->dbi_flags & MDB_DUPSORT) {
-        self->key = *key;
-        if(_cursor_get_c(self, MDB_SET_KEY)) {
-            return NULL;
-        }
-        if(self->positioned) {
-            ENV_PRELOAD_UNLOCKED(self->trans->env, rc, self->val.mv_data, self->val.mv_size);
-            if(! ((old = obj_from_val(&self->val, 0)))) {
-                return NULL;
-            }
-            ENV_UNLOCKED(self->trans->env, rc, mdb_cursor_del(self->curs, MDB_NODUPDATA));
-            self->trans->mutations++;
-            if(rc) {
-                Py_CLEAR(old);
-                return err_set("mdb_cursor_del", rc);
+    ACTIVE_OPS_INC(env);
+    Py_BEGIN_ALLOW_THREADS
+    rc = mdb_cursor_get(self->curs, &key, &val, MDB_FIRST_DUP);
+    if(! rc && val.mv_size != itemsize) {
+        bad = 1;
+    } else if(! rc && (self->dbi_flags & MDB_DUPFIXED)) {
+        /* Copy a page of packed values at a time. */
+        rc = mdb_cursor_get(self->curs, &key, &val, MDB_GET_MULTIPLE);
+        while(! rc) {
+            if(val.mv_size > (size_t) view.len - pos) {
+                bad = 1;
+                break;
             }
-        } else {
-            old = Py_None;
-            Py_INCREF(old);
+            memcpy((char *) view.buf + pos, val.mv_data, val.mv_size);
+            pos += val.mv_size;
+            rc = mdb_cursor_get(self->curs, &key, &val, MDB_NEXT_MULTIPLE);
         }
     } else {
-        /* val is updated if MDB_KEYEXIST. */
-        int flags = MDB_NOOVERWRITE;
-        ENV_UNLOCKED(self->trans->env, rc, mdb_cursor_put(self->curs, key, val, flags));
-        self->trans->mutations++;
-        if(! rc) {
-            Py_RETURN_NONE;
-        } else if(rc != MDB_KEYEXIST) {
-            return err_set("mdb_put", rc);
-        }
-
-        if(! ((old = obj_from_val(val, 0)))) {
-            return NULL;
+        while(! rc) {
+            if(val.mv_size != itemsize || itemsize > (size_t) view.len - pos) {
+                bad = 1;
+                break;
+            }
+            memcpy((char *) view.buf + pos, val.mv_data, itemsize);
+            pos += itemsize;
+            rc = mdb_cursor_get(self->curs, &key, &val, MDB_NEXT_DUP);
         }
     }
+    if(rc == MDB_NOTFOUND) {
+        rc = 0;
+    }
+    if(! (rc || bad)) {
+        bad = pos != (size_t) view.len;
+        /* Leave the cursor on the last value. */
+        rc = mdb_cursor_get(self->curs, &self->key, &self->val, MDB_LAST_DUP);
+    }
+    Py_END_ALLOW_THREADS
+    ACTIVE_OPS_DEC(env);
+    PyBuffer_Release(&view);
 
-    ENV_UNLOCKED(self->trans->env, rc, mdb_cursor_put(self->curs, key, &newval, 0));
+    self->positioned = rc == 0;
+    self->last_mutation = self->trans->mutations;
     if(rc) {
-        Py_DECREF(old);
-        return err_set("mdb_put", rc);
+        self->key.mv_size = 0;
+        self->val.mv_size = 0;
+        Py_DECREF(arr);
+        return err_set("mdb_cursor_get", rc);
     }
-    return old;
+    if(bad) {
+        Py_DECREF(arr);
+        return err_set("dtype", MDB_BAD_VALSIZE);
+    }
+    return arr;
 }
 
 /**
- * Cursor.replace() -> None|result
+ * Cursor.get() -> result
  */
 static PyObject *
-cursor_replace(CursorObject *self, PyObject *args, PyObject *kwds)
+cursor_get(CursorObject *self, PyObject *args, PyObject *kwds)
 {
-    struct cursor_replace {
+    struct cursor_get {
         MDB_val key;
-        MDB_val val;
-    } arg = {{0, 0}, {0, 0}};
+        PyObject *default_;
+    } arg = {{0, 0}, Py_None};
 
     static const struct argspec argspec[] = {
-        {"key", ARG_BUF, OFFSET(cursor_replace, key)},
-        {"value", ARG_BUF, OFFSET(cursor_replace, val)}
+        {"key", ARG_BUF, OFFSET(cursor_get, key)},
+        {"default", ARG_OBJ, OFFSET(cursor_get, default_)}
     };
     BufViewList bvl;
-    PyObject *ret;
+    PyObject *ret = NULL;
 
     bufviewlist_init(&bvl);
     static PyObject *cache = NULL;
     if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, &bvl)) {
-        bufviewlist_release(&bvl);
-        return NULL;
+        goto out;
     }
 
-    ret = do_cursor_replace(self, &arg.key, &arg.val);
-    bufviewlist_release(&bvl);
-    return ret;
-}
-
-/**
- * Cursor.pop() -> None|result
- */
-static PyObject *
-cursor_pop(CursorObject *self, PyObject *args, PyObject *kwds)
-{
-    struct cursor_pop {
-        MDB_val key;
-    } arg = {{0, 0}};
-
-    static const struct argspec argspec[] = {
-        {"key", ARG_BUF, OFFSET(cursor_pop, key)},
-    };
-    BufViewList bvl;
-    PyObject *old;
-    int rc = 0;
-
-    bufviewlist_init(&bvl);
-    static PyObject *cache = NULL;
-    if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, &bvl)) {
+    if(! arg.key.mv_data) {
+        type_error("key must be given.");
         goto out;
     }
 
@@ -3607,496 +5369,594 @@ cursor_pop(CursorObject *self, PyObject *args, PyObject *kwds)
     }
     bufviewlist_release(&bvl);
     if(! self->positioned) {
-        Py_RETURN_NONE;
-    }
-    ENV_PRELOAD_UNLOCKED(self->trans->env, rc, self->val.mv_data, self->val.mv_size);
-    if(! ((old = obj_from_val(&self->val, 0)))) {
-        return NULL;
-    }
-
-    ENV_UNLOCKED(self->trans->env, rc, mdb_cursor_del(self->curs, 0));
-    self->trans->mutations++;
-    if(rc) {
-        Py_DECREF(old);
-        return err_set("mdb_cursor_del", rc);
+        Py_INCREF(arg.default_);
+        return arg.default_;
     }
-    return old;
+    return cursor_value(self, NULL);
 
 out:
     bufviewlist_release(&bvl);
-    return NULL;
+    return ret;
 }
 
 /**
- * Cursor.set_key(key) -> bool
+ * Cursor.item() -> (key, value)
  */
 static PyObject *
-cursor_set_key(CursorObject *self, PyObject *arg)
+cursor_item(CursorObject *self, PyObject *Py_UNUSED(ignored))
 {
-    BufViewList bvl;
-    PyObject *ret;
+    int as_buffer;
+    PyObject *key;
+    PyObject *val;
+    PyObject *tup;
+    int rc = 0;
 
     if(! self->valid) {
         return err_invalid();
     }
-    bufviewlist_init(&bvl);
-    if(val_from_buffer(&self->key, arg, &bvl)) {
-        bufviewlist_release(&bvl);
+    /* Must refresh `key` and `val` following mutation. */
+    if(self->last_mutation != self->trans->mutations &&
+       _cursor_get_c(self, MDB_GET_CURRENT)) {
         return NULL;
     }
-    ret = _cursor_get(self, MDB_SET_KEY);
-    bufviewlist_release(&bvl);
-    return ret;
+
+    as_buffer = self->trans->flags & TRANS_BUFFERS;
+    key = obj_from_val(&self->key, as_buffer);
+    ENV_PRELOAD_UNLOCKED(self->trans->env, rc, self->val.mv_data, self->val.mv_size);
+    val = obj_from_val(&self->val, as_buffer);
+    tup = PyTuple_New(2);
+    if(tup && key && val) {
+        PyTuple_SET_ITEM(tup, 0, key);
+        PyTuple_SET_ITEM(tup, 1, val);
+        return tup;
+    }
+    Py_CLEAR(key);
+    Py_CLEAR(val);
+    Py_CLEAR(tup);
+    return NULL;
 }
 
 /**
- * Cursor.set_key_dup(key, value) -> bool
+ * Cursor.key() -> result
  */
 static PyObject *
-cursor_set_key_dup(CursorObject *self, PyObject *args, PyObject *kwds)
+cursor_key(CursorObject *self, PyObject *Py_UNUSED(ignored))
 {
-    struct cursor_set_key_dup {
-        MDB_val key;
-        MDB_val value;
-    } arg = {{0, 0}, {0, 0}};
-
-    static const struct argspec argspec[] = {
-        {"key", ARG_BUF, OFFSET(cursor_set_key_dup, key)},
-        {"value", ARG_BUF, OFFSET(cursor_set_key_dup, value)}
-    };
-    BufViewList bvl;
-    PyObject *ret;
-
-    bufviewlist_init(&bvl);
-    static PyObject *cache = NULL;
-    if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, &bvl)) {
-        bufviewlist_release(&bvl);
+    if(! self->valid) {
+        return err_invalid();
+    }
+    /* Must refresh `key` and `val` following mutation. */
+    if(self->last_mutation != self->trans->mutations &&
+       _cursor_get_c(self, MDB_GET_CURRENT)) {
         return NULL;
     }
-    self->key = arg.key;
-    self->val = arg.value;
-    ret = _cursor_get(self, MDB_GET_BOTH);
-    bufviewlist_release(&bvl);
-    return ret;
+    return obj_from_val(&self->key, self->trans->flags & TRANS_BUFFERS);
 }
 
 /**
- * Cursor.set_range(key) -> bool
+ * Cursor.last() -> bool
  */
 static PyObject *
-cursor_set_range(CursorObject *self, PyObject *arg)
+cursor_last(CursorObject *self, PyObject *Py_UNUSED(ignored))
 {
-    BufViewList bvl;
-    PyObject *ret;
+    return _cursor_get(self, MDB_LAST);
+}
 
-    if(! self->valid) {
-        return err_invalid();
-    }
-    bufviewlist_init(&bvl);
-    if(val_from_buffer(&self->key, arg, &bvl)) {
-        bufviewlist_release(&bvl);
-        return NULL;
-    }
-    if(self->key.mv_size) {
-        ret = _cursor_get(self, MDB_SET_RANGE);
-    } else {
-        ret = _cursor_get(self, MDB_FIRST);
-    }
-    bufviewlist_release(&bvl);
-    return ret;
+/**
+ * Cursor.last_dup() -> bool
+ */
+static PyObject *
+cursor_last_dup(CursorObject *self, PyObject *Py_UNUSED(ignored))
+{
+    return _cursor_get(self, MDB_LAST_DUP);
 }
 
 /**
- * Cursor.set_range_dup(key, value) -> bool
+ * Cursor.next() -> bool
  */
 static PyObject *
-cursor_set_range_dup(CursorObject *self, PyObject *args, PyObject *kwds)
+cursor_next(CursorObject *self, PyObject *Py_UNUSED(ignored))
 {
-    BufViewList bvl;
-    PyObject *ret;
-    struct cursor_set_range_dup {
-        MDB_val key;
-        MDB_val value;
-    } arg = {{0, 0}, {0, 0}};
-
-    static const struct argspec argspec[] = {
-        {"key", ARG_BUF, OFFSET(cursor_set_range_dup, key)},
-        {"value", ARG_BUF, OFFSET(cursor_set_range_dup, value)}
-    };
-
-    bufviewlist_init(&bvl);
-    static PyObject *cache = NULL;
-    if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, &bvl)) {
-        bufviewlist_release(&bvl);
-        return NULL;
-    }
-
-    self->key = arg.key;
-    self->val = arg.value;
-    ret = _cursor_get(self, MDB_GET_BOTH_RANGE);
-    bufviewlist_release(&bvl);
-
-    /* issue #126: MDB_GET_BOTH_RANGE does not satisfy its documentation, and
-     * fails to update `key` and `value` on success. Therefore explicitly call
-     * MDB_GET_CURRENT after MDB_GET_BOTH_RANGE. */
-    _cursor_get_c(self, MDB_GET_CURRENT);
-
-    return ret;
-}
-
-/**
- * Cursor.value() -> result
- */
-static PyObject *
-cursor_value(CursorObject *self, PyObject *Py_UNUSED(ignored))
-{
-    if(! self->valid) {
-        return err_invalid();
-    }
-    /* Must refresh `key` and `val` following mutation. */
-    if(self->last_mutation != self->trans->mutations &&
-        _cursor_get_c(self, MDB_GET_CURRENT)) {
-        return NULL;
-    }
-    ENV_PRELOAD_UNLOCKED(self->trans->env, 0, self->val.mv_data, self->val.mv_size);
-
-    return obj_from_val(&self->val, self->trans->flags & TRANS_BUFFERS);
-}
-
-static PyObject *
-new_iterator(CursorObject *cursor, IterValFunc val_func, MDB_cursor_op op)
-{
-    IterObject *iter = PyObject_New(IterObject, &PyIterator_Type);
-    if (!iter) {
-        return NULL;
-    }
-
-    iter->val_func = val_func;
-    iter->curs = cursor;
-    Py_INCREF(cursor);
-    iter->started = 0;
-    iter->op = op;
-
-    DEBUG("new_iterator: %p", (void *)iter)
-    return (PyObject *) iter;
-}
-
-static PyObject *
-iter_from_args(CursorObject *self, PyObject *args, PyObject *kwds,
-               signed int pos_op, enum MDB_cursor_op op,
-               int keys_default, int values_default)
-{
-    struct iter_from_args {
-        int keys;
-        int values;
-    } arg = {keys_default, values_default};
-
-    static const struct argspec argspec[] = {
-        {"keys", ARG_BOOL, OFFSET(iter_from_args, keys)},
-        {"values", ARG_BOOL, OFFSET(iter_from_args, values)}
-    };
-    void *val_func;
-
-    static PyObject *cache = NULL;
-    if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, NULL)) {
-        return NULL;
-    }
-
-    if(pos_op != -1 && !self->positioned) {
-        if(_cursor_get_c(self, (enum MDB_cursor_op) pos_op)) {
-            return NULL;
-        }
-    }
-
-    if(! arg.values) {
-        val_func = cursor_key;
-    } else if(! arg.keys) {
-        val_func = cursor_value;
-    } else {
-        val_func = cursor_item;
-    }
-    return new_iterator(self, val_func, op);
-}
-
-static PyObject *
-cursor_iter(CursorObject *self)
-{
-    return iter_from_args(self, NULL, NULL, MDB_FIRST, MDB_NEXT, 1, 1);
-}
+    return _cursor_get(self, MDB_NEXT);
+}
 
 /**
- * Cursor.iternext() -> Iterator
+ * Cursor.next_dup() -> bool
  */
 static PyObject *
-cursor_iternext(CursorObject *self, PyObject *args, PyObject *kwargs)
+cursor_next_dup(CursorObject *self, PyObject *Py_UNUSED(ignored))
 {
-    return iter_from_args(self, args, kwargs, MDB_FIRST, MDB_NEXT, 1, 1);
+    return _cursor_get(self, MDB_NEXT_DUP);
 }
 
 /**
- * Cursor.iternext_dup() -> Iterator
+ * Cursor.next_nodup() -> bool
  */
 static PyObject *
-cursor_iternext_dup(CursorObject *self, PyObject *args, PyObject *kwargs)
+cursor_next_nodup(CursorObject *self, PyObject *Py_UNUSED(ignored))
 {
-    return iter_from_args(self, args, kwargs, -1, MDB_NEXT_DUP, 0, 1);
+    return _cursor_get(self, MDB_NEXT_NODUP);
 }
 
 /**
- * Cursor.iternext_nodup() -> Iterator
+ * Cursor.prev() -> bool
  */
 static PyObject *
-cursor_iternext_nodup(CursorObject *self, PyObject *args, PyObject *kwargs)
+cursor_prev(CursorObject *self, PyObject *Py_UNUSED(ignored))
 {
-    return iter_from_args(self, args, kwargs, MDB_FIRST, MDB_NEXT_NODUP, 1, 0);
+    return _cursor_get(self, MDB_PREV);
 }
 
 /**
- * Cursor.iterprev() -> Iterator
+ * Cursor.prev_dup() -> bool
  */
 static PyObject *
-cursor_iterprev(CursorObject *self, PyObject *args, PyObject *kwargs)
+cursor_prev_dup(CursorObject *self, PyObject *Py_UNUSED(ignored))
 {
-    return iter_from_args(self, args, kwargs, MDB_LAST, MDB_PREV, 1, 1);
+    return _cursor_get(self, MDB_PREV_DUP);
 }
 
 /**
- * Cursor.iterprev_dup() -> Iterator
+ * Cursor.prev_nodup() -> bool
  */
 static PyObject *
-cursor_iterprev_dup(CursorObject *self, PyObject *args, PyObject *kwargs)
+cursor_prev_nodup(CursorObject *self, PyObject *Py_UNUSED(ignored))
 {
-    return iter_from_args(self, args, kwargs, -1, MDB_PREV_DUP, 0, 1);
+    return _cursor_get(self, MDB_PREV_NODUP);
 }
 
 /**
- * Cursor.iterprev_nodup() -> Iterator
+ * Cursor.putmulti(iter|dict) -> (consumed, added)
  */
 static PyObject *
-cursor_iterprev_nodup(CursorObject *self, PyObject *args, PyObject *kwargs)
+cursor_put_multi(CursorObject *self, PyObject *args, PyObject *kwds)
 {
-    return iter_from_args(self, args, kwargs, MDB_LAST, MDB_PREV_NODUP, 1, 0);
-}
+    struct cursor_put {
+        PyObject *items;
+        int dupdata;
+        int overwrite;
+        int append;
+    } arg = {Py_None, 1, 1, 0};
 
-/**
- * Cursor._iter_from() -> Iterator
- */
-static PyObject *
-cursor_iter_from(CursorObject *self, PyObject *args)
-{
-    struct cursor_iter_from {
-        MDB_val key;
-        int reverse;
-    } arg = {{0, 0}, 0};
+    PyObject *iter;
+    PyObject *item;
 
     static const struct argspec argspec[] = {
-        {"key", ARG_BUF, OFFSET(cursor_iter_from, key)},
-        {"reverse", ARG_BOOL, OFFSET(cursor_iter_from, reverse)}
+        {"items", ARG_OBJ, OFFSET(cursor_put, items)},
+        {"dupdata", ARG_BOOL, OFFSET(cursor_put, dupdata)},
+        {"overwrite", ARG_BOOL, OFFSET(cursor_put, overwrite)},
+        {"append", ARG_BOOL, OFFSET(cursor_put, append)}
     };
-    BufViewList bvl;
-    enum MDB_cursor_op op;
+    int flags;
     int rc;
+    Py_ssize_t consumed;
+    Py_ssize_t added;
+    PyObject *ret = NULL;
 
-    bufviewlist_init(&bvl);
     static PyObject *cache = NULL;
-    if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, NULL, &arg, &bvl)) {
-        bufviewlist_release(&bvl);
+    if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, NULL)) {
         return NULL;
     }
 
-    if((! arg.key.mv_size) && (! arg.reverse)) {
-        rc = _cursor_get_c(self, MDB_FIRST);
-    } else {
-        self->key = arg.key;
-        rc = _cursor_get_c(self, MDB_SET_RANGE);
+    flags = 0;
+    if(! arg.dupdata) {
+        flags |= MDB_NODUPDATA;
+    }
+    if(! arg.overwrite) {
+        flags |= MDB_NOOVERWRITE;
+    }
+    if(arg.append) {
+        flags |= (self->trans->db->flags & MDB_DUPSORT) ? MDB_APPENDDUP : MDB_APPEND;
     }
-    bufviewlist_release(&bvl);
 
-    if(rc) {
+    if(! ((iter = PyObject_GetIter(arg.items)))) {
         return NULL;
     }
 
-    op = MDB_NEXT;
-    if(arg.reverse) {
-        op = MDB_PREV;
-        if(! self->positioned) {
-            if(_cursor_get_c(self, MDB_LAST)) {
-                return NULL;
-            }
+    consumed = 0;
+    added = 0;
+    while((item = PyIter_Next(iter))) {
+        MDB_val mkey, mval;
+        BufViewList bvl;
+        bufviewlist_init(&bvl);
+
+        if(! (PyTuple_CheckExact(item) && PyTuple_GET_SIZE(item) == 2)) {
+            PyErr_SetString(PyExc_TypeError,
+                            "putmulti() elements must be 2-tuples");
+            Py_DECREF(item);
+            Py_DECREF(iter);
+            return NULL;
+        }
+
+        if(val_from_buffer(&mkey, PyTuple_GET_ITEM(item, 0), &bvl) ||
+           val_from_buffer(&mval, PyTuple_GET_ITEM(item, 1), &bvl)) {
+            bufviewlist_release(&bvl);
+            Py_DECREF(item);
+            Py_DECREF(iter);
+            return NULL; /* val_from_buffer sets exception */
+        }
+        if(trans_mutate(self->trans)) {
+            bufviewlist_release(&bvl);
+            Py_DECREF(item);
+            Py_DECREF(iter);
+            return NULL;
+        }
+
+        ENV_UNLOCKED(self->trans->env, rc, mdb_cursor_put(self->curs, &mkey, &mval, flags));
+        bufviewlist_release(&bvl);
+        switch(rc) {
+        case MDB_SUCCESS:
+            added++;
+            break;
+        case MDB_KEYEXIST:
+            break;
+        default:
+            Py_DECREF(item);
+            Py_DECREF(iter);
+            return err_format(rc, "mdb_cursor_put() element #%zd", consumed);
         }
+
+        Py_DECREF(item);
+        consumed++;
     }
 
-    DEBUG("positioned? %d", self->positioned)
-    return new_iterator(self, (void *)cursor_item, op);
+    Py_DECREF(iter);
+    if(! PyErr_Occurred()) {
+        ret = Py_BuildValue("(nn)", consumed, added);
+    }
+    return ret;
 }
 
 /**
- * Cursor.__enter__()
+ * One column of Cursor.putmulti_columns(): a data buffer holding the
+ * elements back to back, and either an Arrow-style offsets buffer of
+ * int32 or int64 entries, or a fixed element width.
  */
-static PyObject *cursor_enter(CursorObject *self, PyObject *Py_UNUSED(ignored))
-{
-    Py_INCREF(self);
-    return (PyObject *)self;
-}
+typedef struct {
+    Py_buffer data;
+    Py_buffer offsets;
+    /** Fixed element width, or 0 if `offsets` is used. */
+    size_t width;
+    /** Number of elements. */
+    size_t count;
+} Column;
 
 /**
- * Cursor.__exit__()
+ * Return the offset of element `i` of `col`.
  */
-static PyObject *cursor_exit(CursorObject *self, PyObject *args)
+static size_t
+column_offset(const Column *col, size_t i)
 {
-    cursor_clear(self);
-    Py_RETURN_NONE;
+    if(col->width) {
+        return i * col->width;
+    } else if(col->offsets.itemsize == 8) {
+        return (size_t) ((const int64_t *) col->offsets.buf)[i];
+    }
+    return (size_t) ((const int32_t *) col->offsets.buf)[i];
 }
 
 /**
- * Cursor.close()
+ * Acquire `data` and `offsets` (or None when `width` is nonzero) into `col`,
+ * checking that the offsets are integers, ascending and within the data
+ * buffer. Returns 0 on success, or -1 with an exception set; in either case
+ * the caller must column_release(`col`).
  */
-static PyObject *cursor_close(CursorObject *self, PyObject *Py_UNUSED(ignored))
+static int
+column_init(Column *col, PyObject *data, PyObject *offsets, size_t width,
+            const char *name)
 {
-    cursor_clear(self);
-    Py_RETURN_NONE;
-}
-
-static struct PyMethodDef cursor_methods[] = {
-    {"__enter__", (PyCFunction)cursor_enter, METH_NOARGS},
-    {"__exit__", (PyCFunction)cursor_exit, METH_VARARGS},
-    {"close", (PyCFunction)cursor_close, METH_NOARGS},
-    {"count", (PyCFunction)cursor_count, METH_NOARGS},
-    {"delete", (PyCFunction)cursor_delete, METH_VARARGS|METH_KEYWORDS},
-    {"first", (PyCFunction)cursor_first, METH_NOARGS},
-    {"first_dup", (PyCFunction)cursor_first_dup, METH_NOARGS},
-    {"get", (PyCFunction)cursor_get, METH_VARARGS|METH_KEYWORDS},
-    {"getmulti", (PyCFunction)cursor_get_multi, METH_VARARGS|METH_KEYWORDS},
-    {"item", (PyCFunction)cursor_item, METH_NOARGS},
-    {"iternext", (PyCFunction)cursor_iternext, METH_VARARGS|METH_KEYWORDS},
-    {"iternext_dup", (PyCFunction)cursor_iternext_dup, METH_VARARGS|METH_KEYWORDS},
-    {"iternext_nodup", (PyCFunction)cursor_iternext_nodup, METH_VARARGS|METH_KEYWORDS},
-    {"iterprev", (PyCFunction)cursor_iterprev, METH_VARARGS|METH_KEYWORDS},
-    {"iterprev_dup", (PyCFunction)cursor_iterprev_dup, METH_VARARGS|METH_KEYWORDS},
-    {"iterprev_nodup", (PyCFunction)cursor_iterprev_nodup, METH_VARARGS|METH_KEYWORDS},
-    {"key", (PyCFunction)cursor_key, METH_NOARGS},
-    {"last", (PyCFunction)cursor_last, METH_NOARGS},
-    {"last_dup", (PyCFunction)cursor_last_dup, METH_NOARGS},
-    {"next", (PyCFunction)cursor_next, METH_NOARGS},
-    {"next_dup", (PyCFunction)cursor_next_dup, METH_NOARGS},
-    {"next_nodup", (PyCFunction)cursor_next_nodup, METH_NOARGS},
-    {"prev", (PyCFunction)cursor_prev, METH_NOARGS},
-    {"prev_dup", (PyCFunction)cursor_prev_dup, METH_NOARGS},
-    {"prev_nodup", (PyCFunction)cursor_prev_nodup, METH_NOARGS},
-    {"put", (PyCFunction)cursor_put, METH_VARARGS|METH_KEYWORDS},
-    {"putmulti", (PyCFunction)cursor_put_multi, METH_VARARGS|METH_KEYWORDS},
-    {"replace", (PyCFunction)cursor_replace, METH_VARARGS|METH_KEYWORDS},
-    {"pop", (PyCFunction)cursor_pop, METH_VARARGS|METH_KEYWORDS},
-    {"set_key", (PyCFunction)cursor_set_key, METH_O},
-    {"set_key_dup", (PyCFunction)cursor_set_key_dup, METH_VARARGS|METH_KEYWORDS},
-    {"set_range", (PyCFunction)cursor_set_range, METH_O},
-    {"set_range_dup", (PyCFunction)cursor_set_range_dup, METH_VARARGS|METH_KEYWORDS},
-    {"value", (PyCFunction)cursor_value, METH_NOARGS},
-    {"_iter_from", (PyCFunction)cursor_iter_from, METH_VARARGS},
-    {NULL, NULL}
-};
-
-static PyTypeObject PyCursor_Type = {
-    PyVarObject_HEAD_INIT(NULL, 0)
-    "Cursor",                   /*tp_name*/
-    sizeof(CursorObject),       /*tp_basicsize*/
-    0,                          /*tp_itemsize*/
-    (destructor) cursor_dealloc,/*tp_dealloc*/
-    0,                          /*tp_print*/
-    0,                          /*tp_getattr*/
-    0,                          /*tp_setattr*/
-    0,                          /*tp_compare*/
-    0,                          /*tp_repr*/
-    0,                          /*tp_as_number*/
-    0,                          /*tp_as_sequence*/
-    0,                          /*tp_as_mapping*/
-    0,                          /*tp_hash*/
-    0,                          /*tp_call*/
-    0,                          /*tp_str*/
-    0,                          /*tp_getattro*/
-    0,                          /*tp_setattro*/
-    0,                          /*tp_as_buffer*/
-    Py_TPFLAGS_DEFAULT,         /*tp_flags*/
-    0,                          /*tp_doc*/
-    0,                          /*tp_traverse*/
-    (inquiry) cursor_clear,     /*tp_clear*/
-    0,                          /*tp_richcompare*/
-    0,                          /*tp_weaklistoffset*/
-    (getiterfunc)cursor_iter,   /*tp_iter*/
-    0,                          /*tp_iternext*/
-    cursor_methods,             /*tp_methods*/
-    0,                          /*tp_members*/
-    0,                          /*tp_getset*/
-    0,                          /*tp_base*/
-    0,                          /*tp_dict*/
-    0,                          /*tp_descr_get*/
-    0,                          /*tp_descr_set*/
-    0,                          /*tp_dictoffset*/
-    0,                          /*tp_init*/
-    0,                          /*tp_alloc*/
-    cursor_new,                 /*tp_new*/
-    0,                          /*tp_free*/
-};
-
+    const char *fmt;
+    size_t i;
+    int64_t prev = 0;
+
+    col->data.obj = NULL;
+    col->offsets.obj = NULL;
+    col->width = width;
+    col->count = 0;
+    if((offsets == Py_None) == (width == 0)) {
+        PyErr_Format(PyExc_TypeError,
+                     "exactly one of '%s_offsets' and '%s_size' required",
+                     name, name);
+        return -1;
+    }
+    if(PyObject_GetBuffer(data, &col->data, PyBUF_SIMPLE)) {
+        return -1;
+    }
+    if(width) {
+        if(col->data.len % width) {
+            PyErr_Format(PyExc_ValueError,
+                         "%s buffer length is not a multiple of %s_size",
+                         name, name);
+            return -1;
+        }
+        col->count = col->data.len / width;
+        return 0;
+    }
 
-/* --------- */
-/* Iterators */
-/* --------- */
+    if(PyObject_GetBuffer(offsets, &col->offsets,
+                          PyBUF_FORMAT | PyBUF_C_CONTIGUOUS)) {
+        return -1;
+    }
+    fmt = col->offsets.format ? col->offsets.format : "B";
+    if(*fmt == '@' || *fmt == '=' || *fmt == '<') {
+        fmt++;
+    }
+    if(! (fmt[0] && !fmt[1] && strchr("iIlLqQ", fmt[0]) &&
+          col->offsets.ndim == 1 &&
+          (col->offsets.itemsize == 4 || col->offsets.itemsize == 8) &&
+          col->offsets.len >= col->offsets.itemsize)) {
+        PyErr_Format(PyExc_ValueError,
+                     "%s_offsets must be a non-empty int32 or int64 buffer",
+                     name);
+        return -1;
+    }
+    col->count = (size_t) (col->offsets.len / col->offsets.itemsize) - 1;
+    for(i = 0; i <= col->count; i++) {
+        int64_t off = col->offsets.itemsize == 8 ?
+            ((const int64_t *) col->offsets.buf)[i] :
+            ((const int32_t *) col->offsets.buf)[i];
+        if(off < prev || off > (int64_t) col->data.len) {
+            PyErr_Format(PyExc_ValueError,
+                         "%s_offsets element #%zu out of range", name, i);
+            return -1;
+        }
+        prev = off;
+    }
+    return 0;
+}
 
+static void
+column_release(Column *col)
+{
+    if(col->data.obj) {
+        PyBuffer_Release(&col->data);
+    }
+    if(col->offsets.obj) {
+        PyBuffer_Release(&col->offsets);
+    }
+}
 
 /**
- * Iterator.__del__()
+ * Cursor.putmulti_columns(keys, key_offsets, values, value_offsets)
+ *      -> (consumed, added)
  */
-static void
-iter_dealloc(IterObject *self)
+static PyObject *
+cursor_put_multi_columns(CursorObject *self, PyObject *args, PyObject *kwds)
 {
-    DEBUG("destroying iterator")
-    Py_CLEAR(self->curs);
-    PyObject_Del(self);
+    struct cursor_put_multi_columns {
+        PyObject *keys;
+        PyObject *key_offsets;
+        PyObject *values;
+        PyObject *value_offsets;
+        size_t key_size;
+        size_t value_size;
+        int dupdata;
+        int overwrite;
+        int append;
+    } arg = {Py_None, Py_None, Py_None, Py_None, 0, 0, 1, 1, 0};
+
+    static const struct argspec argspec[] = {
+        {"keys", ARG_OBJ, OFFSET(cursor_put_multi_columns, keys)},
+        {"key_offsets", ARG_OBJ, OFFSET(cursor_put_multi_columns, key_offsets)},
+        {"values", ARG_OBJ, OFFSET(cursor_put_multi_columns, values)},
+        {"value_offsets", ARG_OBJ, OFFSET(cursor_put_multi_columns, value_offsets)},
+        {"key_size", ARG_SIZE, OFFSET(cursor_put_multi_columns, key_size)},
+        {"value_size", ARG_SIZE, OFFSET(cursor_put_multi_columns, value_size)},
+        {"dupdata", ARG_BOOL, OFFSET(cursor_put_multi_columns, dupdata)},
+        {"overwrite", ARG_BOOL, OFFSET(cursor_put_multi_columns, overwrite)},
+        {"append", ARG_BOOL, OFFSET(cursor_put_multi_columns, append)}
+    };
+    Column keys;
+    Column vals;
+    PyObject *ret = NULL;
+    EnvObject *env;
+    size_t added = 0;
+    size_t i = 0;
+    int flags;
+    int rc = 0;
+
+    static PyObject *cache = NULL;
+    if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, NULL)) {
+        return NULL;
+    }
+    if(arg.keys == Py_None || arg.values == Py_None) {
+        return type_error("'keys' and 'values' arguments required.");
+    }
+
+    flags = 0;
+    if(! arg.dupdata) {
+        flags |= MDB_NODUPDATA;
+    }
+    if(! arg.overwrite) {
+        flags |= MDB_NOOVERWRITE;
+    }
+    if(arg.append) {
+        flags |= (self->dbi_flags & MDB_DUPSORT) ? MDB_APPENDDUP : MDB_APPEND;
+    }
+
+    vals.data.obj = NULL;
+    vals.offsets.obj = NULL;
+    if(column_init(&keys, arg.keys, arg.key_offsets, arg.key_size, "key") ||
+       column_init(&vals, arg.values, arg.value_offsets, arg.value_size,
+                   "value")) {
+        goto out;
+    }
+    if(keys.count != vals.count) {
+        PyErr_Format(PyExc_ValueError,
+                     "%zu keys but %zu values", keys.count, vals.count);
+        goto out;
+    }
+
+    env = self->trans->env;
+    if(ENV_RESIZE_BLOCKED(env)) {
+        err_set("mdb_cursor_put", EINVAL);
+        goto out;
+    }
+    /* Every record is sliced straight out of the pinned column buffers. */
+    if(trans_mutate(self->trans)) {
+        goto out;
+    }
+    ACTIVE_OPS_INC(env);
+    Py_BEGIN_ALLOW_THREADS
+    for(i = 0; i < keys.count; i++) {
+        MDB_val mkey, mval;
+        size_t koff = column_offset(&keys, i);
+        size_t voff = column_offset(&vals, i);
+
+        mkey.mv_data = (char *) keys.data.buf + koff;
+        mkey.mv_size = column_offset(&keys, i + 1) - koff;
+        mval.mv_data = (char *) vals.data.buf + voff;
+        mval.mv_size = column_offset(&vals, i + 1) - voff;
+        rc = mdb_cursor_put(self->curs, &mkey, &mval, flags);
+        if(rc == MDB_SUCCESS) {
+            added++;
+        } else if(rc == MDB_KEYEXIST) {
+            rc = 0;
+        } else {
+            break;
+        }
+    }
+    Py_END_ALLOW_THREADS
+    ACTIVE_OPS_DEC(env);
+    NOTE_MAP_FULL(env, rc);
+
+    if(rc) {
+        err_format(rc, "mdb_cursor_put() element #%zu", i);
+        goto out;
+    }
+    ret = Py_BuildValue("(nn)", (Py_ssize_t) keys.count, (Py_ssize_t) added);
+
+out:
+    column_release(&keys);
+    column_release(&vals);
+    return ret;
 }
 
 /**
- * Iterator.__iter__() -> self
+ * Cursor.putmulti_dupfixed(key, values, item_size) -> int
  */
 static PyObject *
-iter_iter(IterObject *self)
+cursor_put_multi_dupfixed(CursorObject *self, PyObject *args, PyObject *kwds)
 {
-    Py_INCREF(self);
-    return (PyObject *)self;
+    struct cursor_put_multi_dupfixed {
+        MDB_val key;
+        MDB_val values;
+        size_t item_size;
+    } arg = {{0, 0}, {0, 0}, 0};
+
+    static const struct argspec argspec[] = {
+        {"key", ARG_BUF, OFFSET(cursor_put_multi_dupfixed, key)},
+        {"values", ARG_BUF, OFFSET(cursor_put_multi_dupfixed, values)},
+        {"item_size", ARG_SIZE, OFFSET(cursor_put_multi_dupfixed, item_size)}
+    };
+    BufViewList bvl;
+    PyObject *ret = NULL;
+    MDB_val data[2];
+    int rc;
+
+    bufviewlist_init(&bvl);
+    static PyObject *cache = NULL;
+    if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, &bvl)) {
+        goto out;
+    }
+    if(! arg.item_size) {
+        PyErr_SetString(PyExc_ValueError, "item_size must be positive");
+        goto out;
+    }
+    if(arg.values.mv_size % arg.item_size) {
+        PyErr_SetString(PyExc_ValueError,
+                        "values length is not a multiple of item_size");
+        goto out;
+    }
+    if(! (self->dbi_flags & MDB_DUPFIXED)) {
+        err_set("putmulti_dupfixed() requires a dupfixed database",
+                MDB_INCOMPATIBLE);
+        goto out;
+    }
+    if(! arg.values.mv_size) {
+        ret = PyLong_FromLong(0);
+        goto out;
+    }
+
+    /* With MDB_MULTIPLE, data[0] describes one item and points at the
+     * first, and data[1].mv_size holds the item count on entry and the
+     * number stored on return. */
+    data[0].mv_size = arg.item_size;
+    data[0].mv_data = arg.values.mv_data;
+    data[1].mv_size = arg.values.mv_size / arg.item_size;
+    data[1].mv_data = NULL;
+    if(trans_mutate(self->trans)) {
+        goto out;
+    }
+    ENV_UNLOCKED(self->trans->env, rc,
+                 mdb_cursor_put(self->curs, &arg.key, data, MDB_MULTIPLE));
+    if(rc) {
+        err_set("mdb_cursor_put", rc);
+        goto out;
+    }
+    ret = PyLong_FromSize_t(data[1].mv_size);
+
+out:
+    bufviewlist_release(&bvl);
+    return ret;
 }
 
 /**
- * Iterator.next() -> result
+ * ReservedBuffer buffer protocol: export the reserved space until detached.
  */
-static PyObject *
-iter_next(IterObject *self)
+static int
+reserved_buffer_getbuffer(ReservedBufferObject *self, Py_buffer *view,
+                          int flags)
 {
-    if(! self->curs->valid) {
-        return err_invalid();
+    if(! self->trans) {
+        PyErr_SetString(PyExc_ValueError,
+                        "reserve() buffer is no longer valid");
+        return -1;
     }
-    if(! self->curs->positioned) {
-        return NULL;
+    if(PyBuffer_FillInfo(view, (PyObject *) self, self->data, self->size,
+                         0, flags)) {
+        return -1;
+    }
+    if(! self->exports++) {
+        Py_INCREF((PyObject *) self->trans);
+        self->env = self->trans->env;
+        Py_INCREF((PyObject *) self->env);
+        self->env->reserve_exports++;
     }
+    return 0;
+}
 
-    if(self->started) {
-        if(_cursor_get_c(self->curs, self->op)) {
-            return NULL;
-        }
-        if(! self->curs->positioned) {
-            return NULL;
-        }
+static void
+reserved_buffer_releasebuffer(ReservedBufferObject *self, Py_buffer *view)
+{
+    if(! --self->exports) {
+        TransObject *trans = self->trans;
+        EnvObject *env = self->env;
+        env->reserve_exports--;
+        self->env = NULL;
+        /* self->trans is left borrowed from trans->reserved. */
+        Py_DECREF((PyObject *) env);
+        Py_DECREF((PyObject *) trans);
     }
+}
 
-    self->started = 1;
-    return self->val_func(self->curs);
+static void
+reserved_buffer_dealloc(ReservedBufferObject *self)
+{
+    PyObject_Del(self);
 }
 
-static PyTypeObject PyIterator_Type = {
+static PyBufferProcs reserved_buffer_as_buffer = {
+    (getbufferproc) reserved_buffer_getbuffer,
+    (releasebufferproc) reserved_buffer_releasebuffer
+};
+
+static PyTypeObject PyReservedBuffer_Type = {
     PyVarObject_HEAD_INIT(NULL, 0)
-    "_Iterator",                 /*tp_name*/
-    sizeof(IterObject),         /*tp_basicsize*/
+    "_ReservedBuffer",          /*tp_name*/
+    sizeof(ReservedBufferObject), /*tp_basicsize*/
     0,                          /*tp_itemsize*/
-    (destructor) iter_dealloc,  /*tp_dealloc*/
+    (destructor) reserved_buffer_dealloc, /*tp_dealloc*/
     0,                          /*tp_print*/
     0,                          /*tp_getattr*/
     0,                          /*tp_setattr*/
@@ -4110,221 +5970,1545 @@ static PyTypeObject PyIterator_Type = {
     0,                          /*tp_str*/
     0,                          /*tp_getattro*/
     0,                          /*tp_setattro*/
-    0,                          /*tp_as_buffer*/
+    &reserved_buffer_as_buffer, /*tp_as_buffer*/
     Py_TPFLAGS_DEFAULT,         /*tp_flags*/
-    0,                          /*tp_doc*/
-    0,                          /*tp_traverse*/
-    0,                          /*tp_clear*/
-    0,                          /*tp_richcompare*/
-    0,                          /*tp_weaklistoffset*/
-    (getiterfunc)iter_iter,     /*tp_iter*/
-    (iternextfunc)iter_next,    /*tp_iternext*/
-    0,                          /*tp_methods*/
-    0,                          /*tp_members*/
-    0,                          /*tp_getset*/
-    0,                          /*tp_base*/
-    0,                          /*tp_dict*/
-    0,                          /*tp_descr_get*/
-    0,                          /*tp_descr_set*/
-    0,                          /*tp_dictoffset*/
-    0,                          /*tp_init*/
-    0,                          /*tp_alloc*/
-    0,                          /*tp_new*/
-    0,                          /*tp_free*/
 };
 
-
-
-/* ------------ */
-/* Transactions */
-/* ------------ */
-
-static void
-txn_abort(MDB_txn *self)
-{
-    Py_BEGIN_ALLOW_THREADS
-    MDEBUG("aborting")
-    mdb_txn_abort(self);
-    Py_END_ALLOW_THREADS
-}
-
-
-static int
-trans_clear(TransObject *self)
+/**
+ * Shared between Cursor.reserve() and Transaction.reserve(): return a writable
+ * memoryview of the space reserved by a put with MDB_RESERVE, or None if the
+ * key existed and overwrite was disabled. The caller's trans_mutate() has
+ * already detached any earlier view.
+ */
+static PyObject *
+reserve_view(TransObject *trans, int rc, MDB_val *val)
 {
-    MDEBUG("clearing trans")
-    self->valid = 0;
-    INVALIDATE(self)
-#ifdef HAVE_MEMSINK
-    ms_notify((PyObject *) self, &self->sink_head);
-#endif
+    ReservedBufferObject *rb;
+    PyObject *mv;
 
-    if(self->txn) {
-        MDB_txn *txn = self->txn;
-        self->txn = NULL;  /* Prevent double-abort from concurrent
-                            * trans_clear calls (issue #180). */
-        if(self->env && !(self->flags & TRANS_RDONLY)) {
-            /* The abort below runs with the GIL held, so a #465 waiter
-             * (which needs the GIL to proceed) cannot act on the cleared
-             * tid before the write mutex is actually released. */
-            CLEAR_WRITE_TXN_TID(self->env);
-        }
-        /* Don't release the GIL here — trans_clear is called from
-         * invalidate() while iterating the children list, and releasing
-         * the GIL would allow other threads to modify the list or free
-         * objects we're still using.  The explicit trans_abort() path
-         * releases the GIL for performance.  Issue #180.
-         *
-         * Skip the abort if the env's MDB_env* has been NULLed — this
-         * means env_clear is inside mdb_env_close (GIL released) and
-         * the txn's backing memory is being freed.  Issue #418. */
-        if(!self->env || self->env->env) {
-            mdb_txn_abort(txn);
+    if(rc) {
+        if(rc == MDB_KEYEXIST) {
+            Py_RETURN_NONE;
         }
+        return err_set("mdb_put", rc);
     }
-    MDEBUG("db is/was %p", self->db)
-    Py_CLEAR(self->db);
-    if(self->env) {
-        UNLINK_CHILD(self->env, self)
-        Py_CLEAR(self->env);
+    if(! ((rb = PyObject_New(ReservedBufferObject, &PyReservedBuffer_Type)))) {
+        return NULL;
     }
-    return 0;
+    rb->trans = trans;
+    rb->env = NULL;
+    rb->data = val->mv_data;
+    rb->size = (Py_ssize_t) val->mv_size;
+    rb->exports = 0;
+    if((mv = PyMemoryView_FromObject((PyObject *) rb))) {
+        if((trans->reserved_view = PyWeakref_NewRef(mv, NULL))) {
+            trans->reserved = rb;
+            return mv;
+        }
+        Py_DECREF(mv);
+    }
+    rb->trans = NULL;
+    Py_DECREF((PyObject *) rb);
+    return NULL;
 }
 
 /**
- * Transaction.__del__()
+ * Cursor.put() -> bool
  */
-static void
-trans_dealloc(TransObject *self)
+static PyObject *
+cursor_put(CursorObject *self, PyObject *args, PyObject *kwds)
 {
-    MDB_txn * txn = self->txn;
-    if(self->weaklist != NULL) {
-        MDEBUG("Clearing weaklist..")
-        PyObject_ClearWeakRefs((PyObject *) self);
+    struct cursor_put {
+        MDB_val key;
+        MDB_val val;
+        int dupdata;
+        int overwrite;
+        int append;
+    } arg = {{0, 0}, {0, 0}, 1, 1, 0};
+
+    static const struct argspec argspec[] = {
+        {"key", ARG_BUF, OFFSET(cursor_put, key)},
+        {"value", ARG_BUF, OFFSET(cursor_put, val)},
+        {"dupdata", ARG_BOOL, OFFSET(cursor_put, dupdata)},
+        {"overwrite", ARG_BOOL, OFFSET(cursor_put, overwrite)},
+        {"append", ARG_BOOL, OFFSET(cursor_put, append)}
+    };
+    BufViewList bvl;
+    int flags;
+    int rc;
+
+    bufviewlist_init(&bvl);
+    static PyObject *cache = NULL;
+    if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, &bvl)) {
+        bufviewlist_release(&bvl);
+        return NULL;
     }
 
-    if(self->env && self->env->pid == _cached_pid) {
-        if(self->env->valid && self->env->env && txn &&
-                !self->env->spare_txn &&
-                self->env->max_spare_txns && (self->flags & TRANS_RDONLY)) {
-            MDEBUG("caching trans")
-            mdb_txn_reset(txn);
-            self->env->spare_txn = txn;
-            self->txn = NULL;
-        } else if(txn && !(self->flags & TRANS_RDONLY)) {
-            /* Abort write txn with GIL released — mdb_txn_abort may do I/O
-             * flushing dirty pages.  Safe here because trans_dealloc is the
-             * normal refcount-to-zero path, not called from invalidate()'s
-             * child list iteration.  trans_clear will see txn==NULL and skip
-             * the abort.  Issue #180.
-             *
-             * Skip if env's MDB_env* is NULL — env_clear is inside
-             * mdb_env_close and the txn memory is being freed.  #418.
-             *
-             * active_ops keeps env_clear from calling mdb_env_close while
-             * this abort is in flight.  Issue #180. */
-            self->txn = NULL;
-            if(self->env) {
-                if(self->env->env) {
-                    ACTIVE_OPS_INC(self->env);
-                    txn_abort(txn);
-                    ACTIVE_OPS_DEC(self->env);
-                }
-                /* Mutex released on this (owning) thread; wakes a
-                 * close() blocked waiting for it.  Cleared after the
-                 * abort so waiters never observe tid == 0 while the
-                 * transaction is still live.  Issues #465, #475. */
-                CLEAR_WRITE_TXN_TID(self->env);
-            }
-        }
-        MDEBUG("deleting trans")
-        trans_clear(self);
+    flags = 0;
+    if(! arg.dupdata) {
+        flags |= MDB_NODUPDATA;
     }
-    else {
-       MDEBUG("In forked process, not deleting trans");
-       /* Can't touch LMDB handles after fork, but still need to
-        * release Python references to avoid leaking env/db. */
-       Py_CLEAR(self->db);
-       if(self->env) {
-           UNLINK_CHILD(self->env, self)
-           Py_CLEAR(self->env);
-       }
+    if(! arg.overwrite) {
+        flags |= MDB_NOOVERWRITE;
+    }
+    if(arg.append) {
+        flags |= (self->trans->db->flags & MDB_DUPSORT) ? MDB_APPENDDUP : MDB_APPEND;
     }
 
-    PyObject_Del(self);
+    if(trans_mutate(self->trans)) {
+        bufviewlist_release(&bvl);
+        return NULL;
+    }
+    ENV_UNLOCKED(self->trans->env, rc, mdb_cursor_put(self->curs, &arg.key, &arg.val, flags));
+    bufviewlist_release(&bvl);
+    if(rc) {
+        if(rc == MDB_KEYEXIST) {
+            Py_RETURN_FALSE;
+        }
+        return err_set("mdb_put", rc);
+    }
+    Py_RETURN_TRUE;
 }
 
 /**
- * Transaction(env, db) -> new instance.
+ * Cursor.reserve() -> memoryview or None
  */
 static PyObject *
-trans_new(PyTypeObject *type, PyObject *args, PyObject *kwds)
+cursor_reserve(CursorObject *self, PyObject *args, PyObject *kwds)
 {
-    struct trans_new {
-        EnvObject *env;
-        DbObject *db;
-        TransObject *parent;
-        int write;
-        int buffers;
-    } arg = {NULL, NULL, NULL, 0, 0};
+    struct cursor_reserve {
+        MDB_val key;
+        size_t size;
+        int overwrite;
+        int append;
+    } arg = {{0, 0}, 0, 1, 0};
 
     static const struct argspec argspec[] = {
-        {"env", ARG_ENV, OFFSET(trans_new, env)},
-        {"db", ARG_DB, OFFSET(trans_new, db)},
-        {"parent", ARG_TRANS, OFFSET(trans_new, parent)},
-        {"write", ARG_BOOL, OFFSET(trans_new, write)},
-        {"buffers", ARG_BOOL, OFFSET(trans_new, buffers)}
+        {"key", ARG_BUF, OFFSET(cursor_reserve, key)},
+        {"size", ARG_SIZE, OFFSET(cursor_reserve, size)},
+        {"overwrite", ARG_BOOL, OFFSET(cursor_reserve, overwrite)},
+        {"append", ARG_BOOL, OFFSET(cursor_reserve, append)}
     };
+    BufViewList bvl;
+    MDB_val val;
+    int flags;
+    int rc;
 
+    bufviewlist_init(&bvl);
     static PyObject *cache = NULL;
-    if(parse_args(1, SPECSIZE(), argspec, &cache, args, kwds, &arg, NULL)) {
+    if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, &bvl)) {
+        bufviewlist_release(&bvl);
         return NULL;
     }
-    if(! arg.env) {
-        return type_error("'env' argument required");
+    if(self->dbi_flags & MDB_DUPSORT) {
+        bufviewlist_release(&bvl);
+        return err_set("reserve() cannot be used with a dupsort database",
+                       MDB_INCOMPATIBLE);
     }
-    return make_trans(arg.env, arg.db, arg.parent, arg.write, arg.buffers);
+
+    flags = MDB_RESERVE;
+    if(! arg.overwrite) {
+        flags |= MDB_NOOVERWRITE;
+    }
+    if(arg.append) {
+        flags |= MDB_APPEND;
+    }
+
+    val.mv_size = arg.size;
+    val.mv_data = NULL;
+    if(trans_mutate(self->trans)) {
+        bufviewlist_release(&bvl);
+        return NULL;
+    }
+    ENV_UNLOCKED(self->trans->env, rc, mdb_cursor_put(self->curs, &arg.key, &val, flags));
+    bufviewlist_release(&bvl);
+    return reserve_view(self->trans, rc, &val);
 }
 
 /**
- * Transaction.abort()
+ * Shared between Cursor.replace() and Transaction.replace()
  */
 static PyObject *
-trans_abort(TransObject *self, PyObject *Py_UNUSED(ignored))
+do_cursor_replace(CursorObject *self, MDB_val *key, MDB_val *val)
 {
-    if(self->valid) {
-        self->valid = 0;  /* Prevent concurrent trans_clear (issue #180). */
-        /* Save txn and env before INVALIDATE, which may release the GIL
-         * and allow concurrent trans_clear to NULL them. */
-        MDB_txn *txn = self->txn;
-        EnvObject *env = self->env;
-        self->txn = NULL;  /* Prevent double-abort (issue #180). */
-        Py_XINCREF((PyObject *) env);
-        DEBUG("invalidate")
-        INVALIDATE(self)
-#ifdef HAVE_MEMSINK
-        ms_notify((PyObject *) self, &self->sink_head);
-#endif
-        if(self->flags & TRANS_RDONLY) {
-            DEBUG("resetting")
-            /* Reset to spare state, ready for _dealloc to freelist it. */
-            if(txn) {
-                mdb_txn_reset(txn);
-                self->txn = txn;  /* Restore for spare_txn caching. */
+    int rc = 0;
+    PyObject *old;
+    MDB_val newval = *val;
+
+    if(trans_mutate(self->trans)) {
+        return NULL;
+    }
+    if(self->dbi_flags & MDB_DUPSORT) {
+        self->key = *key;
+        if(_cursor_get_c(self, MDB_SET_KEY)) {
+            return NULL;
+        }
+        if(self->positioned) {
+            ENV_PRELOAD_UNLOCKED(self->trans->env, rc, self->val.mv_data, self->val.mv_size);
+            if(! ((old = obj_from_val(&self->val, 0)))) {
+                return NULL;
+            }
+            ENV_UNLOCKED(self->trans->env, rc, mdb_cursor_del(self->curs, MDB_NODUPDATA));
+            if(rc) {
+                Py_CLEAR(old);
+                return err_set("mdb_cursor_del", rc);
             }
-            self->flags |= TRANS_SPARE;
         } else {
-            if(txn && env) {
-                DEBUG("aborting")
-                /* Wait for child ops (e.g. child commit) to finish before
-                 * aborting, since LMDB doesn't allow concurrent access to
-                 * parent+child txns.  Issue #180.
-                 *
-                 * write_txn_tid stays set until the abort completes: the
-                 * waits below release the GIL while the MDB txn (and the
-                 * writer mutex) is still live, and clearing the tid early
-                 * would let a concurrent set_mapsize() pass its write-txn
-                 * check and then find the txn undead at remap time (its
+            old = Py_None;
+            Py_INCREF(old);
+        }
+    } else {
+        /* val is updated if MDB_KEYEXIST. */
+        int flags = MDB_NOOVERWRITE;
+        ENV_UNLOCKED(self->trans->env, rc, mdb_cursor_put(self->curs, key, val, flags));
+        if(! rc) {
+            Py_RETURN_NONE;
+        } else if(rc != MDB_KEYEXIST) {
+            return err_set("mdb_put", rc);
+        }
+
+        if(! ((old = obj_from_val(val, 0)))) {
+            return NULL;
+        }
+    }
+
+    ENV_UNLOCKED(self->trans->env, rc, mdb_cursor_put(self->curs, key, &newval, 0));
+    if(rc) {
+        Py_DECREF(old);
+        return err_set("mdb_put", rc);
+    }
+    return old;
+}
+
+/**
+ * Cursor.replace() -> None|result
+ */
+static PyObject *
+cursor_replace(CursorObject *self, PyObject *args, PyObject *kwds)
+{
+    struct cursor_replace {
+        MDB_val key;
+        MDB_val val;
+    } arg = {{0, 0}, {0, 0}};
+
+    static const struct argspec argspec[] = {
+        {"key", ARG_BUF, OFFSET(cursor_replace, key)},
+        {"value", ARG_BUF, OFFSET(cursor_replace, val)}
+    };
+    BufViewList bvl;
+    PyObject *ret;
+
+    bufviewlist_init(&bvl);
+    static PyObject *cache = NULL;
+    if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, &bvl)) {
+        bufviewlist_release(&bvl);
+        return NULL;
+    }
+
+    ret = do_cursor_replace(self, &arg.key, &arg.val);
+    bufviewlist_release(&bvl);
+    return ret;
+}
+
+/**
+ * Cursor.pop() -> None|result
+ */
+static PyObject *
+cursor_pop(CursorObject *self, PyObject *args, PyObject *kwds)
+{
+    struct cursor_pop {
+        MDB_val key;
+    } arg = {{0, 0}};
+
+    static const struct argspec argspec[] = {
+        {"key", ARG_BUF, OFFSET(cursor_pop, key)},
+    };
+    BufViewList bvl;
+    PyObject *old;
+    int rc = 0;
+
+    bufviewlist_init(&bvl);
+    static PyObject *cache = NULL;
+    if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, &bvl)) {
+        goto out;
+    }
+
+    self->key = arg.key;
+    if(_cursor_get_c(self, MDB_SET_KEY)) {
+        goto out;
+    }
+    bufviewlist_release(&bvl);
+    if(! self->positioned) {
+        Py_RETURN_NONE;
+    }
+    ENV_PRELOAD_UNLOCKED(self->trans->env, rc, self->val.mv_data, self->val.mv_size);
+    if(! ((old = obj_from_val(&self->val, 0)))) {
+        return NULL;
+    }
+
+    if(trans_mutate(self->trans)) {
+        Py_DECREF(old);
+        return NULL;
+    }
+    ENV_UNLOCKED(self->trans->env, rc, mdb_cursor_del(self->curs, 0));
+    if(rc) {
+        Py_DECREF(old);
+        return err_set("mdb_cursor_del", rc);
+    }
+    return old;
+
+out:
+    bufviewlist_release(&bvl);
+    return NULL;
+}
+
+/**
+ * Cursor.set_key(key) -> bool
+ */
+static PyObject *
+cursor_set_key(CursorObject *self, PyObject *arg)
+{
+    BufViewList bvl;
+    PyObject *ret;
+
+    if(! self->valid) {
+        return err_invalid();
+    }
+    bufviewlist_init(&bvl);
+    if(val_from_buffer(&self->key, arg, &bvl)) {
+        bufviewlist_release(&bvl);
+        return NULL;
+    }
+    ret = _cursor_get(self, MDB_SET_KEY);
+    bufviewlist_release(&bvl);
+    return ret;
+}
+
+/**
+ * Cursor.set_key_dup(key, value) -> bool
+ */
+static PyObject *
+cursor_set_key_dup(CursorObject *self, PyObject *args, PyObject *kwds)
+{
+    struct cursor_set_key_dup {
+        MDB_val key;
+        MDB_val value;
+    } arg = {{0, 0}, {0, 0}};
+
+    static const struct argspec argspec[] = {
+        {"key", ARG_BUF, OFFSET(cursor_set_key_dup, key)},
+        {"value", ARG_BUF, OFFSET(cursor_set_key_dup, value)}
+    };
+    BufViewList bvl;
+    PyObject *ret;
+
+    bufviewlist_init(&bvl);
+    static PyObject *cache = NULL;
+    if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, &bvl)) {
+        bufviewlist_release(&bvl);
+        return NULL;
+    }
+    self->key = arg.key;
+    self->val = arg.value;
+    ret = _cursor_get(self, MDB_GET_BOTH);
+    bufviewlist_release(&bvl);
+    return ret;
+}
+
+/**
+ * Cursor.set_range(key) -> bool
+ */
+static PyObject *
+cursor_set_range(CursorObject *self, PyObject *arg)
+{
+    BufViewList bvl;
+    PyObject *ret;
+
+    if(! self->valid) {
+        return err_invalid();
+    }
+    bufviewlist_init(&bvl);
+    if(val_from_buffer(&self->key, arg, &bvl)) {
+        bufviewlist_release(&bvl);
+        return NULL;
+    }
+    if(self->key.mv_size) {
+        ret = _cursor_get(self, MDB_SET_RANGE);
+    } else {
+        ret = _cursor_get(self, MDB_FIRST);
+    }
+    bufviewlist_release(&bvl);
+    return ret;
+}
+
+/**
+ * Cursor.set_range_dup(key, value) -> bool
+ */
+static PyObject *
+cursor_set_range_dup(CursorObject *self, PyObject *args, PyObject *kwds)
+{
+    BufViewList bvl;
+    PyObject *ret;
+    struct cursor_set_range_dup {
+        MDB_val key;
+        MDB_val value;
+    } arg = {{0, 0}, {0, 0}};
+
+    static const struct argspec argspec[] = {
+        {"key", ARG_BUF, OFFSET(cursor_set_range_dup, key)},
+        {"value", ARG_BUF, OFFSET(cursor_set_range_dup, value)}
+    };
+
+    bufviewlist_init(&bvl);
+    static PyObject *cache = NULL;
+    if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, &bvl)) {
+        bufviewlist_release(&bvl);
+        return NULL;
+    }
+
+    self->key = arg.key;
+    self->val = arg.value;
+    ret = _cursor_get(self, MDB_GET_BOTH_RANGE);
+    bufviewlist_release(&bvl);
+
+    /* issue #126: MDB_GET_BOTH_RANGE does not satisfy its documentation, and
+     * fails to update `key` and `value` on success. Therefore explicitly call
+     * MDB_GET_CURRENT after MDB_GET_BOTH_RANGE. */
+    _cursor_get_c(self, MDB_GET_CURRENT);
+
+    return ret;
+}
+
+/**
+ * Cursor.value() -> result
+ */
+static PyObject *
+cursor_value(CursorObject *self, PyObject *Py_UNUSED(ignored))
+{
+    if(! self->valid) {
+        return err_invalid();
+    }
+    /* Must refresh `key` and `val` following mutation. */
+    if(self->last_mutation != self->trans->mutations &&
+        _cursor_get_c(self, MDB_GET_CURRENT)) {
+        return NULL;
+    }
+    ENV_PRELOAD_UNLOCKED(self->trans->env, 0, self->val.mv_data, self->val.mv_size);
+
+    return obj_from_val(&self->val, self->trans->flags & TRANS_BUFFERS);
+}
+
+static PyObject *
+new_iterator(CursorObject *cursor, IterValFunc val_func, MDB_cursor_op op)
+{
+    IterObject *iter = (IterObject *) env_alloc_object(cursor->trans->env,
+                                                       FREE_ITER,
+                                                       &PyIterator_Type);
+    if (!iter) {
+        return NULL;
+    }
+
+    iter->val_func = val_func;
+    iter->curs = cursor;
+    Py_INCREF(cursor);
+    iter->started = 0;
+    iter->op = op;
+    iter->batch = 0;
+    iter->batch_vals = NULL;
+    iter->stop.mv_size = 0;
+    iter->stop.mv_data = NULL;
+    iter->inclusive = 0;
+    iter->reverse = (op == MDB_PREV || op == MDB_PREV_DUP ||
+                     op == MDB_PREV_NODUP);
+    iter->remaining = SIZE_MAX;
+    iter->done = 0;
+    iter->prefix = 0;
+    iter->dtype = 0;
+
+    DEBUG("new_iterator: %p", (void *)iter)
+    return (PyObject *) iter;
+}
+
+/**
+ * Bound an iterator returned by new_iterator() by `stop` (if its mv_data is
+ * not NULL) and `limit`. The bound is copied, so the caller may release its
+ * buffer afterwards. On failure, the iterator is released and NULL returned.
+ */
+static PyObject *
+iter_set_range(IterObject *iter, const MDB_val *stop, int inclusive,
+               size_t limit)
+{
+    if(stop->mv_data) {
+        if(! ((iter->stop.mv_data = malloc(stop->mv_size)))) {
+            Py_DECREF(iter);
+            return PyErr_NoMemory();
+        }
+        memcpy(iter->stop.mv_data, stop->mv_data, stop->mv_size);
+        iter->stop.mv_size = stop->mv_size;
+    }
+    iter->inclusive = inclusive;
+    iter->remaining = limit;
+    return (PyObject *) iter;
+}
+
+static PyObject *
+iter_from_args(CursorObject *self, PyObject *args, PyObject *kwds,
+               signed int pos_op, enum MDB_cursor_op op,
+               int keys_default, int values_default)
+{
+    struct iter_from_args {
+        int keys;
+        int values;
+    } arg = {keys_default, values_default};
+
+    static const struct argspec argspec[] = {
+        {"keys", ARG_BOOL, OFFSET(iter_from_args, keys)},
+        {"values", ARG_BOOL, OFFSET(iter_from_args, values)}
+    };
+    void *val_func;
+
+    static PyObject *cache = NULL;
+    if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, NULL)) {
+        return NULL;
+    }
+
+    if(pos_op != -1 && !self->positioned) {
+        if(_cursor_get_c(self, (enum MDB_cursor_op) pos_op)) {
+            return NULL;
+        }
+    }
+
+    if(! arg.values) {
+        val_func = cursor_key;
+    } else if(! arg.keys) {
+        val_func = cursor_value;
+    } else {
+        val_func = cursor_item;
+    }
+    return new_iterator(self, val_func, op);
+}
+
+/**
+ * Like iter_from_args(), additionally accepting the `stop`, `inclusive` and
+ * `limit` range arguments of iternext() and iterprev().
+ */
+static PyObject *
+range_iter_from_args(CursorObject *self, PyObject *args, PyObject *kwds,
+                     enum MDB_cursor_op pos_op, enum MDB_cursor_op op)
+{
+    struct range_iter_from_args {
+        int keys;
+        int values;
+        MDB_val stop;
+        int inclusive;
+        size_t limit;
+    } arg = {1, 1, {0, 0}, 0, SIZE_MAX};
+
+    static const struct argspec argspec[] = {
+        {"keys", ARG_BOOL, OFFSET(range_iter_from_args, keys)},
+        {"values", ARG_BOOL, OFFSET(range_iter_from_args, values)},
+        {"stop", ARG_BUF, OFFSET(range_iter_from_args, stop)},
+        {"inclusive", ARG_BOOL, OFFSET(range_iter_from_args, inclusive)},
+        {"limit", ARG_SIZE, OFFSET(range_iter_from_args, limit)}
+    };
+    BufViewList bvl;
+    PyObject *iter;
+    void *val_func;
+
+    bufviewlist_init(&bvl);
+    static PyObject *cache = NULL;
+    if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, &bvl)) {
+        bufviewlist_release(&bvl);
+        return NULL;
+    }
+    if(cursor_check_bound(self, &arg.stop, "stop") ||
+       (!self->positioned && _cursor_get_c(self, pos_op))) {
+        bufviewlist_release(&bvl);
+        return NULL;
+    }
+
+    if(! arg.values) {
+        val_func = cursor_key;
+    } else if(! arg.keys) {
+        val_func = cursor_value;
+    } else {
+        val_func = cursor_item;
+    }
+    if((iter = new_iterator(self, val_func, op))) {
+        iter = iter_set_range((IterObject *) iter, &arg.stop, arg.inclusive,
+                              arg.limit);
+    }
+    bufviewlist_release(&bvl);
+    return iter;
+}
+
+/**
+ * Like iter_from_args(), for iternext_dup() and iterprev_dup(), which
+ * additionally accept `dtype`.
+ */
+static PyObject *
+dup_iter_from_args(CursorObject *self, PyObject *args, PyObject *kwds,
+                   enum MDB_cursor_op op)
+{
+    struct dup_iter_from_args {
+        int keys;
+        int values;
+        PyObject *dtype;
+    } arg = {0, 1, Py_None};
+
+    static const struct argspec argspec[] = {
+        {"keys", ARG_BOOL, OFFSET(dup_iter_from_args, keys)},
+        {"values", ARG_BOOL, OFFSET(dup_iter_from_args, values)},
+        {"dtype", ARG_OBJ, OFFSET(dup_iter_from_args, dtype)}
+    };
+    PyObject *iter;
+    void *val_func;
+    char dtype;
+
+    static PyObject *cache = NULL;
+    if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, NULL)) {
+        return NULL;
+    }
+    if(parse_dtype(arg.dtype, &dtype)) {
+        return NULL;
+    }
+
+    if(! arg.values) {
+        val_func = cursor_key;
+        dtype = 0;
+    } else if(! arg.keys) {
+        val_func = cursor_value;
+    } else {
+        val_func = cursor_item;
+    }
+    if((iter = new_iterator(self, val_func, op))) {
+        ((IterObject *) iter)->dtype = dtype;
+    }
+    return iter;
+}
+
+static PyObject *
+cursor_iter(CursorObject *self)
+{
+    return iter_from_args(self, NULL, NULL, MDB_FIRST, MDB_NEXT, 1, 1);
+}
+
+/**
+ * Cursor.iternext() -> Iterator
+ */
+static PyObject *
+cursor_iternext(CursorObject *self, PyObject *args, PyObject *kwargs)
+{
+    return range_iter_from_args(self, args, kwargs, MDB_FIRST, MDB_NEXT);
+}
+
+/**
+ * Cursor.iternext_dup() -> Iterator
+ */
+static PyObject *
+cursor_iternext_dup(CursorObject *self, PyObject *args, PyObject *kwargs)
+{
+    return dup_iter_from_args(self, args, kwargs, MDB_NEXT_DUP);
+}
+
+/**
+ * Cursor.iternext_nodup() -> Iterator
+ */
+static PyObject *
+cursor_iternext_nodup(CursorObject *self, PyObject *args, PyObject *kwargs)
+{
+    return iter_from_args(self, args, kwargs, MDB_FIRST, MDB_NEXT_NODUP, 1, 0);
+}
+
+/**
+ * Cursor.iterprev() -> Iterator
+ */
+static PyObject *
+cursor_iterprev(CursorObject *self, PyObject *args, PyObject *kwargs)
+{
+    return range_iter_from_args(self, args, kwargs, MDB_LAST, MDB_PREV);
+}
+
+/**
+ * Cursor.iterprev_dup() -> Iterator
+ */
+static PyObject *
+cursor_iterprev_dup(CursorObject *self, PyObject *args, PyObject *kwargs)
+{
+    return dup_iter_from_args(self, args, kwargs, MDB_PREV_DUP);
+}
+
+/**
+ * Cursor.iterprev_nodup() -> Iterator
+ */
+static PyObject *
+cursor_iterprev_nodup(CursorObject *self, PyObject *args, PyObject *kwargs)
+{
+    return iter_from_args(self, args, kwargs, MDB_LAST, MDB_PREV_NODUP, 1, 0);
+}
+
+/**
+ * Cursor.iterprefix() -> Iterator
+ */
+static PyObject *
+cursor_iterprefix(CursorObject *self, PyObject *args, PyObject *kwds)
+{
+    struct cursor_iterprefix {
+        MDB_val prefix;
+        int keys;
+        int values;
+        int reverse;
+    } arg = {{0, 0}, 1, 1, 0};
+
+    static const struct argspec argspec[] = {
+        {"prefix", ARG_BUF, OFFSET(cursor_iterprefix, prefix)},
+        {"keys", ARG_BOOL, OFFSET(cursor_iterprefix, keys)},
+        {"values", ARG_BOOL, OFFSET(cursor_iterprefix, values)},
+        {"reverse", ARG_BOOL, OFFSET(cursor_iterprefix, reverse)}
+    };
+    BufViewList bvl;
+    PyObject *iter = NULL;
+    IterObject *it;
+    void *val_func;
+    char *succ = NULL;
+    size_t i;
+    int rc;
+
+    bufviewlist_init(&bvl);
+    static PyObject *cache = NULL;
+    if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, &bvl)) {
+        goto out;
+    }
+    if(! arg.prefix.mv_size) {
+        rc = _cursor_get_c(self, arg.reverse ? MDB_LAST : MDB_FIRST);
+    } else if(cursor_check_bound(self, &arg.prefix, "prefix")) {
+        goto out;
+    } else if(! arg.reverse) {
+        self->key = arg.prefix;
+        rc = _cursor_get_c(self, MDB_SET_RANGE);
+    } else {
+        /* Seek to the first key past the prefix: its successor is formed by
+         * incrementing the last byte that is not 0xff and truncating after
+         * it. A prefix of only 0xff bytes has no successor. */
+        for(i = arg.prefix.mv_size; i > 0; i--) {
+            if(((unsigned char *)arg.prefix.mv_data)[i - 1] != 0xff) {
+                break;
+            }
+        }
+        rc = 0;
+        if(i) {
+            if(! ((succ = malloc(i)))) {
+                PyErr_NoMemory();
+                goto out;
+            }
+            memcpy(succ, arg.prefix.mv_data, i);
+            succ[i - 1]++;
+            self->key.mv_data = succ;
+            self->key.mv_size = i;
+            rc = _cursor_get_c(self, MDB_SET_RANGE);
+        }
+        if(! rc) {
+            rc = _cursor_get_c(self, self->positioned ? MDB_PREV : MDB_LAST);
+        }
+    }
+    if(rc) {
+        goto out;
+    }
+
+    if(! arg.values) {
+        val_func = cursor_key;
+    } else if(! arg.keys) {
+        val_func = cursor_value;
+    } else {
+        val_func = cursor_item;
+    }
+    iter = new_iterator(self, val_func, arg.reverse ? MDB_PREV : MDB_NEXT);
+    if(iter && arg.prefix.mv_size) {
+        it = (IterObject *) iter;
+        it->prefix = 1;
+        iter = iter_set_range(it, &arg.prefix, 0, SIZE_MAX);
+    }
+
+out:
+    free(succ);
+    bufviewlist_release(&bvl);
+    return iter;
+}
+
+static PyObject *
+batch_iter_from_args(CursorObject *self, PyObject *args, PyObject *kwds,
+                     signed int pos_op, enum MDB_cursor_op op,
+                     int keys_default, int values_default)
+{
+    struct batch_iter_from_args {
+        size_t n;
+        int keys;
+        int values;
+    } arg = {0, keys_default, values_default};
+
+    static const struct argspec argspec[] = {
+        {"n", ARG_SIZE, OFFSET(batch_iter_from_args, n)},
+        {"keys", ARG_BOOL, OFFSET(batch_iter_from_args, keys)},
+        {"values", ARG_BOOL, OFFSET(batch_iter_from_args, values)}
+    };
+    IterObject *iter;
+
+    static PyObject *cache = NULL;
+    if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, NULL)) {
+        return NULL;
+    }
+    if(! arg.n) {
+        return PyErr_Format(PyExc_ValueError, "n must be >= 1");
+    }
+    if(SIZE_MUL_OVERFLOW(arg.n, 2 * sizeof(MDB_val))) {
+        return PyErr_NoMemory();
+    }
+
+    if(pos_op != -1 && !self->positioned) {
+        if(_cursor_get_c(self, (enum MDB_cursor_op) pos_op)) {
+            return NULL;
+        }
+    }
+
+    iter = (IterObject *) new_iterator(self, NULL, op);
+    if(! iter) {
+        return NULL;
+    }
+    iter->batch_vals = malloc(arg.n * 2 * sizeof(MDB_val));
+    if(! iter->batch_vals) {
+        Py_DECREF(iter);
+        return PyErr_NoMemory();
+    }
+    iter->batch = arg.n;
+    iter->batch_keys = arg.keys || !arg.values;
+    iter->batch_values = arg.values;
+    return (PyObject *) iter;
+}
+
+/**
+ * Cursor.iternext_batches() -> Iterator
+ */
+static PyObject *
+cursor_iternext_batches(CursorObject *self, PyObject *args, PyObject *kwargs)
+{
+    return batch_iter_from_args(self, args, kwargs, MDB_FIRST, MDB_NEXT, 1, 1);
+}
+
+/**
+ * Cursor.iternext_dup_batches() -> Iterator
+ */
+static PyObject *
+cursor_iternext_dup_batches(CursorObject *self, PyObject *args, PyObject *kwargs)
+{
+    return batch_iter_from_args(self, args, kwargs, -1, MDB_NEXT_DUP, 0, 1);
+}
+
+/**
+ * Cursor.iternext_nodup_batches() -> Iterator
+ */
+static PyObject *
+cursor_iternext_nodup_batches(CursorObject *self, PyObject *args, PyObject *kwargs)
+{
+    return batch_iter_from_args(self, args, kwargs, MDB_FIRST, MDB_NEXT_NODUP, 1, 0);
+}
+
+/**
+ * Cursor.iterprev_batches() -> Iterator
+ */
+static PyObject *
+cursor_iterprev_batches(CursorObject *self, PyObject *args, PyObject *kwargs)
+{
+    return batch_iter_from_args(self, args, kwargs, MDB_LAST, MDB_PREV, 1, 1);
+}
+
+/**
+ * Cursor.iterprev_dup_batches() -> Iterator
+ */
+static PyObject *
+cursor_iterprev_dup_batches(CursorObject *self, PyObject *args, PyObject *kwargs)
+{
+    return batch_iter_from_args(self, args, kwargs, -1, MDB_PREV_DUP, 0, 1);
+}
+
+/**
+ * Cursor.iterprev_nodup_batches() -> Iterator
+ */
+static PyObject *
+cursor_iterprev_nodup_batches(CursorObject *self, PyObject *args, PyObject *kwargs)
+{
+    return batch_iter_from_args(self, args, kwargs, MDB_LAST, MDB_PREV_NODUP, 1, 0);
+}
+
+/**
+ * Cursor._iter_from() -> Iterator
+ */
+static PyObject *
+cursor_iter_from(CursorObject *self, PyObject *args, PyObject *kwds)
+{
+    struct cursor_iter_from {
+        MDB_val key;
+        int reverse;
+        MDB_val stop;
+        int inclusive;
+        size_t limit;
+    } arg = {{0, 0}, 0, {0, 0}, 0, SIZE_MAX};
+
+    static const struct argspec argspec[] = {
+        {"key", ARG_BUF, OFFSET(cursor_iter_from, key)},
+        {"reverse", ARG_BOOL, OFFSET(cursor_iter_from, reverse)},
+        {"stop", ARG_BUF, OFFSET(cursor_iter_from, stop)},
+        {"inclusive", ARG_BOOL, OFFSET(cursor_iter_from, inclusive)},
+        {"limit", ARG_SIZE, OFFSET(cursor_iter_from, limit)}
+    };
+    BufViewList bvl;
+    enum MDB_cursor_op op;
+    PyObject *iter;
+    int rc;
+
+    bufviewlist_init(&bvl);
+    static PyObject *cache = NULL;
+    if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, &bvl)) {
+        bufviewlist_release(&bvl);
+        return NULL;
+    }
+    if(cursor_check_bound(self, &arg.stop, "stop")) {
+        bufviewlist_release(&bvl);
+        return NULL;
+    }
+
+    if((! arg.key.mv_size) && (! arg.reverse)) {
+        rc = _cursor_get_c(self, MDB_FIRST);
+    } else {
+        self->key = arg.key;
+        rc = _cursor_get_c(self, MDB_SET_RANGE);
+    }
+
+    op = MDB_NEXT;
+    if(arg.reverse && !rc) {
+        op = MDB_PREV;
+        if(! self->positioned) {
+            rc = _cursor_get_c(self, MDB_LAST);
+        }
+    }
+    if(rc) {
+        bufviewlist_release(&bvl);
+        return NULL;
+    }
+
+    DEBUG("positioned? %d", self->positioned)
+    if((iter = new_iterator(self, (void *)cursor_item, op))) {
+        iter = iter_set_range((IterObject *) iter, &arg.stop, arg.inclusive,
+                              arg.limit);
+    }
+    bufviewlist_release(&bvl);
+    return iter;
+}
+
+/**
+ * Cursor.__enter__()
+ */
+static PyObject *cursor_enter(CursorObject *self, PyObject *Py_UNUSED(ignored))
+{
+    Py_INCREF(self);
+    return (PyObject *)self;
+}
+
+/**
+ * Cursor.__exit__()
+ */
+static PyObject *cursor_exit(CursorObject *self, PyObject *args)
+{
+    cursor_clear(self);
+    Py_RETURN_NONE;
+}
+
+/**
+ * Cursor.close()
+ */
+static PyObject *cursor_close(CursorObject *self, PyObject *Py_UNUSED(ignored))
+{
+    cursor_clear(self);
+    Py_RETURN_NONE;
+}
+
+static struct PyMethodDef cursor_methods[] = {
+    {"__enter__", (PyCFunction)cursor_enter, METH_NOARGS},
+    {"__exit__", (PyCFunction)cursor_exit, METH_VARARGS},
+    {"close", (PyCFunction)cursor_close, METH_NOARGS},
+    {"count", (PyCFunction)cursor_count, METH_NOARGS},
+    {"count_range", (PyCFunction)cursor_count_range, METH_VARARGS|METH_KEYWORDS},
+    {"delete", (PyCFunction)cursor_delete, METH_VARARGS|METH_KEYWORDS},
+    {"deletemulti", (PyCFunction)cursor_delete_multi, METH_VARARGS|METH_KEYWORDS},
+    {"export_columns", (PyCFunction)cursor_export_columns, METH_VARARGS|METH_KEYWORDS},
+    {"first", (PyCFunction)cursor_first, METH_NOARGS},
+    {"first_dup", (PyCFunction)cursor_first_dup, METH_NOARGS},
+    {"get", (PyCFunction)cursor_get, METH_VARARGS|METH_KEYWORDS},
+    {"getmulti", (PyCFunction)cursor_get_multi, METH_VARARGS|METH_KEYWORDS},
+    {"item", (PyCFunction)cursor_item, METH_NOARGS},
+    {"iternext", (PyCFunction)cursor_iternext, METH_VARARGS|METH_KEYWORDS},
+    {"iternext_batches", (PyCFunction)cursor_iternext_batches, METH_VARARGS|METH_KEYWORDS},
+    {"iternext_dup", (PyCFunction)cursor_iternext_dup, METH_VARARGS|METH_KEYWORDS},
+    {"iternext_dup_batches", (PyCFunction)cursor_iternext_dup_batches, METH_VARARGS|METH_KEYWORDS},
+    {"iternext_nodup", (PyCFunction)cursor_iternext_nodup, METH_VARARGS|METH_KEYWORDS},
+    {"iternext_nodup_batches", (PyCFunction)cursor_iternext_nodup_batches, METH_VARARGS|METH_KEYWORDS},
+    {"iterprefix", (PyCFunction)cursor_iterprefix, METH_VARARGS|METH_KEYWORDS},
+    {"iterprev", (PyCFunction)cursor_iterprev, METH_VARARGS|METH_KEYWORDS},
+    {"iterprev_batches", (PyCFunction)cursor_iterprev_batches, METH_VARARGS|METH_KEYWORDS},
+    {"iterprev_dup", (PyCFunction)cursor_iterprev_dup, METH_VARARGS|METH_KEYWORDS},
+    {"iterprev_dup_batches", (PyCFunction)cursor_iterprev_dup_batches, METH_VARARGS|METH_KEYWORDS},
+    {"iterprev_nodup", (PyCFunction)cursor_iterprev_nodup, METH_VARARGS|METH_KEYWORDS},
+    {"iterprev_nodup_batches", (PyCFunction)cursor_iterprev_nodup_batches, METH_VARARGS|METH_KEYWORDS},
+    {"key", (PyCFunction)cursor_key, METH_NOARGS},
+    {"last", (PyCFunction)cursor_last, METH_NOARGS},
+    {"last_dup", (PyCFunction)cursor_last_dup, METH_NOARGS},
+    {"next", (PyCFunction)cursor_next, METH_NOARGS},
+    {"next_dup", (PyCFunction)cursor_next_dup, METH_NOARGS},
+    {"next_nodup", (PyCFunction)cursor_next_nodup, METH_NOARGS},
+    {"prev", (PyCFunction)cursor_prev, METH_NOARGS},
+    {"prev_dup", (PyCFunction)cursor_prev_dup, METH_NOARGS},
+    {"prev_nodup", (PyCFunction)cursor_prev_nodup, METH_NOARGS},
+    {"put", (PyCFunction)cursor_put, METH_VARARGS|METH_KEYWORDS},
+    {"putmulti", (PyCFunction)cursor_put_multi, METH_VARARGS|METH_KEYWORDS},
+    {"putmulti_columns", (PyCFunction)cursor_put_multi_columns, METH_VARARGS|METH_KEYWORDS},
+    {"putmulti_dupfixed", (PyCFunction)cursor_put_multi_dupfixed, METH_VARARGS|METH_KEYWORDS},
+    {"reserve", (PyCFunction)cursor_reserve, METH_VARARGS|METH_KEYWORDS},
+    {"replace", (PyCFunction)cursor_replace, METH_VARARGS|METH_KEYWORDS},
+    {"pop", (PyCFunction)cursor_pop, METH_VARARGS|METH_KEYWORDS},
+    {"set_key", (PyCFunction)cursor_set_key, METH_O},
+    {"set_key_dup", (PyCFunction)cursor_set_key_dup, METH_VARARGS|METH_KEYWORDS},
+    {"set_range", (PyCFunction)cursor_set_range, METH_O},
+    {"set_range_dup", (PyCFunction)cursor_set_range_dup, METH_VARARGS|METH_KEYWORDS},
+    {"value", (PyCFunction)cursor_value, METH_NOARGS},
+    {"values_array", (PyCFunction)cursor_values_array, METH_VARARGS|METH_KEYWORDS},
+    {"_iter_from", (PyCFunction)cursor_iter_from, METH_VARARGS|METH_KEYWORDS},
+    {NULL, NULL}
+};
+
+static PyTypeObject PyCursor_Type = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    "Cursor",                   /*tp_name*/
+    sizeof(CursorObject),       /*tp_basicsize*/
+    0,                          /*tp_itemsize*/
+    (destructor) cursor_dealloc,/*tp_dealloc*/
+    0,                          /*tp_print*/
+    0,                          /*tp_getattr*/
+    0,                          /*tp_setattr*/
+    0,                          /*tp_compare*/
+    0,                          /*tp_repr*/
+    0,                          /*tp_as_number*/
+    0,                          /*tp_as_sequence*/
+    0,                          /*tp_as_mapping*/
+    0,                          /*tp_hash*/
+    0,                          /*tp_call*/
+    0,                          /*tp_str*/
+    0,                          /*tp_getattro*/
+    0,                          /*tp_setattro*/
+    0,                          /*tp_as_buffer*/
+    Py_TPFLAGS_DEFAULT,         /*tp_flags*/
+    0,                          /*tp_doc*/
+    0,                          /*tp_traverse*/
+    (inquiry) cursor_clear,     /*tp_clear*/
+    0,                          /*tp_richcompare*/
+    0,                          /*tp_weaklistoffset*/
+    (getiterfunc)cursor_iter,   /*tp_iter*/
+    0,                          /*tp_iternext*/
+    cursor_methods,             /*tp_methods*/
+    0,                          /*tp_members*/
+    0,                          /*tp_getset*/
+    0,                          /*tp_base*/
+    0,                          /*tp_dict*/
+    0,                          /*tp_descr_get*/
+    0,                          /*tp_descr_set*/
+    0,                          /*tp_dictoffset*/
+    0,                          /*tp_init*/
+    0,                          /*tp_alloc*/
+    cursor_new,                 /*tp_new*/
+    0,                          /*tp_free*/
+};
+
+
+/* --------- */
+/* Iterators */
+/* --------- */
+
+
+/**
+ * Iterator.__del__()
+ */
+static void
+iter_dealloc(IterObject *self)
+{
+    EnvObject *env = (self->curs && self->curs->trans) ?
+        self->curs->trans->env : NULL;
+
+    DEBUG("destroying iterator")
+    Py_XINCREF(env);
+    Py_CLEAR(self->curs);
+    free(self->batch_vals);
+    free(self->stop.mv_data);
+    env_free_object(env, FREE_ITER, (PyObject *) self);
+    Py_XDECREF(env);
+}
+
+/**
+ * Iterator.__iter__() -> self
+ */
+static PyObject *
+iter_iter(IterObject *self)
+{
+    Py_INCREF(self);
+    return (PyObject *)self;
+}
+
+/**
+ * Iterator.next() for batch iterators -> list
+ *
+ * Step the cursor up to `batch` times in a single GIL-released loop,
+ * collecting raw (key, value) pairs, then build the Python list. The first
+ * batch begins with the cursor's current element, re-read with
+ * MDB_GET_CURRENT in case a mutation invalidated the cached key/value.
+ */
+static PyObject *
+iter_next_batch(IterObject *self)
+{
+    CursorObject *curs = self->curs;
+    EnvObject *env = curs->trans->env;
+    MDB_val *kv = self->batch_vals;
+    MDB_cursor_op op;
+    PyObject *list;
+    PyObject *key;
+    PyObject *val;
+    PyObject *obj;
+    size_t count = 0;
+    size_t i;
+    int as_buffer;
+    int rc = 0;
+
+    if(ENV_RESIZE_BLOCKED(env)) {
+        return err_set("mdb_cursor_get", EINVAL);
+    }
+
+    op = self->started ? self->op : MDB_GET_CURRENT;
+    ACTIVE_OPS_INC(env);
+    Py_BEGIN_ALLOW_THREADS
+    while(count < self->batch) {
+        rc = mdb_cursor_get(curs->curs, &kv[2 * count], &kv[2 * count + 1], op);
+        if(rc) {
+            break;
+        }
+        if(self->batch_values) {
+            preload(0, kv[2 * count + 1].mv_data, kv[2 * count + 1].mv_size);
+        }
+        count++;
+        op = self->op;
+    }
+    Py_END_ALLOW_THREADS
+    ACTIVE_OPS_DEC(env);
+
+    self->started = 1;
+    curs->last_mutation = curs->trans->mutations;
+    if(rc) {
+        curs->positioned = 0;
+        curs->key.mv_size = 0;
+        curs->val.mv_size = 0;
+        if(rc != MDB_NOTFOUND && !(rc == EINVAL && op == MDB_GET_CURRENT)) {
+            return err_set("mdb_cursor_get", rc);
+        }
+        if(! count) {
+            return NULL;
+        }
+    } else {
+        curs->key = kv[2 * count - 2];
+        curs->val = kv[2 * count - 1];
+    }
+
+    as_buffer = curs->trans->flags & TRANS_BUFFERS;
+    if(! ((list = PyList_New(count)))) {
+        return NULL;
+    }
+    for(i = 0; i < count; i++) {
+        key = val = NULL;
+        if(self->batch_keys && !((key = obj_from_val(&kv[2 * i], as_buffer)))) {
+            goto fail;
+        }
+        if(self->batch_values &&
+           !((val = obj_from_val(&kv[2 * i + 1], as_buffer)))) {
+            Py_XDECREF(key);
+            goto fail;
+        }
+        if(key && val) {
+            if(! ((obj = PyTuple_New(2)))) {
+                Py_DECREF(key);
+                Py_DECREF(val);
+                goto fail;
+            }
+            PyTuple_SET_ITEM(obj, 0, key);
+            PyTuple_SET_ITEM(obj, 1, val);
+        } else {
+            obj = key ? key : val;
+        }
+        PyList_SET_ITEM(list, i, obj);
+    }
+    return list;
+
+fail:
+    Py_DECREF(list);
+    return NULL;
+}
+
+/**
+ * Return 1 if the cursor's current key lies within the iterator's `stop`
+ * bound, 0 if it does not, or -1 on error. Only the raw key is compared, so
+ * no Python object is created for an element outside the range.
+ */
+static int
+iter_in_range(IterObject *self)
+{
+    CursorObject *curs = self->curs;
+    int cmp;
+
+    if(curs->last_mutation != curs->trans->mutations) {
+        if(_cursor_get_c(curs, MDB_GET_CURRENT)) {
+            return -1;
+        }
+        if(! curs->positioned) {
+            return 0;
+        }
+    }
+    if(self->prefix) {
+        return curs->key.mv_size >= self->stop.mv_size &&
+               ! memcmp(curs->key.mv_data, self->stop.mv_data,
+                        self->stop.mv_size);
+    }
+    cmp = cursor_bound_cmp(curs, &curs->key, &self->stop);
+    if(self->reverse) {
+        cmp = -cmp;
+    }
+    return self->inclusive ? (cmp <= 0) : (cmp < 0);
+}
+
+/**
+ * Return the current value decoded as `dtype`, or a (key, value) tuple if
+ * the iterator yields items.
+ */
+static PyObject *
+iter_value_dtype(IterObject *self)
+{
+    CursorObject *curs = self->curs;
+    PyObject *key;
+    PyObject *val;
+    PyObject *tup;
+
+    if(curs->last_mutation != curs->trans->mutations) {
+        if(_cursor_get_c(curs, MDB_GET_CURRENT)) {
+            return NULL;
+        }
+    }
+    if(! ((val = obj_from_val_dtype(&curs->val, self->dtype)))) {
+        return NULL;
+    }
+    if(self->val_func != (IterValFunc) cursor_item) {
+        return val;
+    }
+    key = obj_from_val(&curs->key, curs->trans->flags & TRANS_BUFFERS);
+    tup = key ? PyTuple_New(2) : NULL;
+    if(! tup) {
+        Py_XDECREF(key);
+        Py_DECREF(val);
+        return NULL;
+    }
+    PyTuple_SET_ITEM(tup, 0, key);
+    PyTuple_SET_ITEM(tup, 1, val);
+    return tup;
+}
+
+/**
+ * Iterator.next() -> result
+ */
+static PyObject *
+iter_next(IterObject *self)
+{
+    int rc;
+
+    if(! self->curs->valid) {
+        return err_invalid();
+    }
+    if(self->done || !self->curs->positioned) {
+        return NULL;
+    }
+    if(self->batch) {
+        return iter_next_batch(self);
+    }
+    /* Leave the cursor on the last element yielded once the limit is hit. */
+    if(! self->remaining) {
+        return NULL;
+    }
+
+    if(self->started) {
+        if(_cursor_get_c(self->curs, self->op)) {
+            return NULL;
+        }
+        if(! self->curs->positioned) {
+            return NULL;
+        }
+    }
+
+    self->started = 1;
+    if(self->stop.mv_data) {
+        if((rc = iter_in_range(self)) <= 0) {
+            self->done = 1;
+            return NULL;
+        }
+    }
+    self->remaining--;
+    if(self->dtype) {
+        return iter_value_dtype(self);
+    }
+    return self->val_func(self->curs);
+}
+
+static PyTypeObject PyIterator_Type = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    "_Iterator",                 /*tp_name*/
+    sizeof(IterObject),         /*tp_basicsize*/
+    0,                          /*tp_itemsize*/
+    (destructor) iter_dealloc,  /*tp_dealloc*/
+    0,                          /*tp_print*/
+    0,                          /*tp_getattr*/
+    0,                          /*tp_setattr*/
+    0,                          /*tp_compare*/
+    0,                          /*tp_repr*/
+    0,                          /*tp_as_number*/
+    0,                          /*tp_as_sequence*/
+    0,                          /*tp_as_mapping*/
+    0,                          /*tp_hash*/
+    0,                          /*tp_call*/
+    0,                          /*tp_str*/
+    0,                          /*tp_getattro*/
+    0,                          /*tp_setattro*/
+    0,                          /*tp_as_buffer*/
+    Py_TPFLAGS_DEFAULT,         /*tp_flags*/
+    0,                          /*tp_doc*/
+    0,                          /*tp_traverse*/
+    0,                          /*tp_clear*/
+    0,                          /*tp_richcompare*/
+    0,                          /*tp_weaklistoffset*/
+    (getiterfunc)iter_iter,     /*tp_iter*/
+    (iternextfunc)iter_next,    /*tp_iternext*/
+    0,                          /*tp_methods*/
+    0,                          /*tp_members*/
+    0,                          /*tp_getset*/
+    0,                          /*tp_base*/
+    0,                          /*tp_dict*/
+    0,                          /*tp_descr_get*/
+    0,                          /*tp_descr_set*/
+    0,                          /*tp_dictoffset*/
+    0,                          /*tp_init*/
+    0,                          /*tp_alloc*/
+    0,                          /*tp_new*/
+    0,                          /*tp_free*/
+};
+
+
+
+/* ------------ */
+/* Transactions */
+/* ------------ */
+
+static void
+txn_abort(MDB_txn *self)
+{
+    Py_BEGIN_ALLOW_THREADS
+    MDEBUG("aborting")
+    mdb_txn_abort(self);
+    Py_END_ALLOW_THREADS
+}
+
+
+static int
+trans_clear(TransObject *self)
+{
+    MDEBUG("clearing trans")
+    self->valid = 0;
+    INVALIDATE(self)
+    trans_release_reserved(self);
+#ifdef HAVE_MEMSINK
+    ms_notify((PyObject *) self, &self->sink_head);
+#endif
+
+    if(self->txn) {
+        MDB_txn *txn = self->txn;
+        self->txn = NULL;  /* Prevent double-abort from concurrent
+                            * trans_clear calls (issue #180). */
+        if(self->env && !(self->flags & TRANS_RDONLY)) {
+            /* The abort below runs with the GIL held, so a #465 waiter
+             * (which needs the GIL to proceed) cannot act on the cleared
+             * tid before the write mutex is actually released. */
+            CLEAR_WRITE_TXN_TID(self->env);
+        }
+        /* Don't release the GIL here — trans_clear is called from
+         * invalidate() while iterating the children list, and releasing
+         * the GIL would allow other threads to modify the list or free
+         * objects we're still using.  The explicit trans_abort() path
+         * releases the GIL for performance.  Issue #180.
+         *
+         * Skip the abort if the env's MDB_env* has been NULLed — this
+         * means env_clear is inside mdb_env_close (GIL released) and
+         * the txn's backing memory is being freed.  Issue #418. */
+        if(!self->env || self->env->env) {
+            mdb_txn_abort(txn);
+        }
+    }
+    MDEBUG("db is/was %p", self->db)
+    Py_CLEAR(self->db);
+    if(self->env) {
+        UNLINK_CHILD(self->env, self)
+        Py_CLEAR(self->env);
+    }
+    return 0;
+}
+
+/**
+ * Transaction.__del__()
+ */
+static void
+trans_dealloc(TransObject *self)
+{
+    MDB_txn * txn = self->txn;
+    /* Held until the object is released to the Environment's free list. */
+    EnvObject *env = self->env;
+
+    Py_XINCREF(env);
+    if(self->weaklist != NULL) {
+        MDEBUG("Clearing weaklist..")
+        PyObject_ClearWeakRefs((PyObject *) self);
+    }
+
+    if(self->env && self->env->pid == _cached_pid) {
+        if(self->env->valid && self->env->env && txn &&
+                (self->flags & TRANS_RDONLY)) {
+            MDEBUG("caching trans")
+            self->txn = NULL;
+            env_spare_txn(self->env, txn);
+        } else if(txn && !(self->flags & TRANS_RDONLY)) {
+            /* Abort write txn with GIL released — mdb_txn_abort may do I/O
+             * flushing dirty pages.  Safe here because trans_dealloc is the
+             * normal refcount-to-zero path, not called from invalidate()'s
+             * child list iteration.  trans_clear will see txn==NULL and skip
+             * the abort.  Issue #180.
+             *
+             * Skip if env's MDB_env* is NULL — env_clear is inside
+             * mdb_env_close and the txn memory is being freed.  #418.
+             *
+             * active_ops keeps env_clear from calling mdb_env_close while
+             * this abort is in flight.  Issue #180. */
+            self->txn = NULL;
+            if(self->env) {
+                if(self->env->env) {
+                    ACTIVE_OPS_INC(self->env);
+                    txn_abort(txn);
+                    ACTIVE_OPS_DEC(self->env);
+                }
+                /* Mutex released on this (owning) thread; wakes a
+                 * close() blocked waiting for it.  Cleared after the
+                 * abort so waiters never observe tid == 0 while the
+                 * transaction is still live.  Issues #465, #475. */
+                CLEAR_WRITE_TXN_TID(self->env);
+            }
+        }
+        MDEBUG("deleting trans")
+        trans_clear(self);
+    }
+    else {
+       MDEBUG("In forked process, not deleting trans");
+       /* Can't touch LMDB handles after fork, but still need to
+        * release Python references to avoid leaking env/db. */
+       Py_CLEAR(self->db);
+       if(self->env) {
+           UNLINK_CHILD(self->env, self)
+           Py_CLEAR(self->env);
+       }
+    }
+
+    env_free_object(env, FREE_TRANS, (PyObject *) self);
+    Py_XDECREF(env);
+}
+
+/**
+ * Transaction(env, db) -> new instance.
+ */
+static PyObject *
+trans_new(PyTypeObject *type, PyObject *args, PyObject *kwds)
+{
+    struct trans_new {
+        EnvObject *env;
+        DbObject *db;
+        TransObject *parent;
+        int write;
+        int buffers;
+    } arg = {NULL, NULL, NULL, 0, 0};
+
+    static const struct argspec argspec[] = {
+        {"env", ARG_ENV, OFFSET(trans_new, env)},
+        {"db", ARG_DB, OFFSET(trans_new, db)},
+        {"parent", ARG_TRANS, OFFSET(trans_new, parent)},
+        {"write", ARG_BOOL, OFFSET(trans_new, write)},
+        {"buffers", ARG_BOOL, OFFSET(trans_new, buffers)}
+    };
+
+    static PyObject *cache = NULL;
+    if(parse_args(1, SPECSIZE(), argspec, &cache, args, kwds, &arg, NULL)) {
+        return NULL;
+    }
+    if(! arg.env) {
+        return type_error("'env' argument required");
+    }
+    return make_trans(arg.env, arg.db, arg.parent, arg.write, arg.buffers);
+}
+
+/**
+ * Transaction.abort()
+ */
+static PyObject *
+trans_abort(TransObject *self, PyObject *Py_UNUSED(ignored))
+{
+    if(self->valid) {
+        if(trans_end_reserved(self)) {
+            return NULL;
+        }
+        self->valid = 0;  /* Prevent concurrent trans_clear (issue #180). */
+        /* Save txn and env before INVALIDATE, which may release the GIL
+         * and allow concurrent trans_clear to NULL them. */
+        MDB_txn *txn = self->txn;
+        EnvObject *env = self->env;
+        self->txn = NULL;  /* Prevent double-abort (issue #180). */
+        Py_XINCREF((PyObject *) env);
+        DEBUG("invalidate")
+        INVALIDATE(self)
+        trans_release_reserved(self);
+#ifdef HAVE_MEMSINK
+        ms_notify((PyObject *) self, &self->sink_head);
+#endif
+        if(self->flags & TRANS_RDONLY) {
+            DEBUG("resetting")
+            /* Reset to spare state, ready for _dealloc to freelist it. */
+            if(txn) {
+                mdb_txn_reset(txn);
+                self->txn = txn;  /* Restore for spare_txn caching. */
+            }
+            self->flags |= TRANS_SPARE;
+        } else {
+            if(txn && env) {
+                DEBUG("aborting")
+                /* Wait for child ops (e.g. child commit) to finish before
+                 * aborting, since LMDB doesn't allow concurrent access to
+                 * parent+child txns.  Issue #180.
+                 *
+                 * write_txn_tid stays set until the abort completes: the
+                 * waits below release the GIL while the MDB txn (and the
+                 * writer mutex) is still live, and clearing the tid early
+                 * would let a concurrent set_mapsize() pass its write-txn
+                 * check and then find the txn undead at remap time (its
                  * invalidation pass skips this txn because self->txn was
                  * already NULLed above).  Issues #465, #475. */
                 if(LMDB_ATOMIC_LOAD(&env->active_ops) > 0) {
@@ -4347,184 +7531,999 @@ trans_abort(TransObject *self, PyObject *Py_UNUSED(ignored))
                 }
             }
         }
-        Py_XDECREF((PyObject *) env);
+        Py_XDECREF((PyObject *) env);
+    }
+    Py_RETURN_NONE;
+}
+
+/**
+ * Transaction.commit()
+ */
+static PyObject *
+trans_commit(TransObject *self, PyObject *Py_UNUSED(ignored))
+{
+    int rc;
+
+    if(! self->valid) {
+        return err_invalid();
+    }
+    if(trans_end_reserved(self)) {
+        return NULL;
+    }
+    self->valid = 0;  /* Prevent new operations from starting (issue #180). */
+    DEBUG("invalidate")
+    INVALIDATE(self)
+    trans_release_reserved(self);
+#ifdef HAVE_MEMSINK
+    ms_notify((PyObject *) self, &self->sink_head);
+#endif
+    if(self->flags & TRANS_RDONLY) {
+        DEBUG("resetting")
+        /* Reset to spare state, ready for _dealloc to freelist it. */
+        mdb_txn_reset(self->txn);
+        self->flags |= TRANS_SPARE;
+    } else {
+        /* Save txn/env locally before releasing the GIL.  mdb_txn_commit
+         * frees the MDB_txn, so self->txn must be NULLed first to prevent
+         * concurrent trans_clear from calling mdb_txn_abort on freed memory.
+         * Similarly, Py_INCREF the env since trans_clear may Py_CLEAR it
+         * while the GIL is released.  Issue #180. */
+        MDB_txn *txn = self->txn;
+        EnvObject *env = self->env;
+        self->txn = NULL;
+        Py_INCREF((PyObject *) env);
+        DEBUG("committing")
+        ACTIVE_OPS_INC(env);
+        Py_BEGIN_ALLOW_THREADS
+        rc = mdb_txn_commit(txn);
+        Py_END_ALLOW_THREADS
+        ACTIVE_OPS_DEC(env);
+        /* Mutex released on this (owning) thread; wakes a close() blocked
+         * waiting for it.  Cleared after the commit so waiters never
+         * observe tid == 0 while the transaction is still live.
+         * Issues #465, #475. */
+        CLEAR_WRITE_TXN_TID(env);
+        NOTE_MAP_FULL(env, rc);
+        Py_DECREF((PyObject *) env);
+        if(rc) {
+            return err_set("mdb_txn_commit", rc);
+        }
+    }
+    Py_RETURN_NONE;
+}
+
+/**
+ * Transaction.cursor() -> Cursor
+ */
+static PyObject *
+trans_cursor(TransObject *self, PyObject *args, PyObject *kwds)
+{
+    struct trans_cursor {
+        DbObject *db;
+    } arg = {self->db};
+
+    static const struct argspec argspec[] = {
+        {"db", ARG_DB, OFFSET(trans_cursor, db)}
+    };
+
+    static PyObject *cache = NULL;
+    if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, NULL)) {
+        return NULL;
+    }
+    return make_cursor(arg.db, self);
+}
+
+/**
+ * Transaction.delete() -> bool
+ */
+static PyObject *
+trans_delete(TransObject *self, PyObject *args, PyObject *kwds)
+{
+    struct trans_delete {
+        MDB_val key;
+        MDB_val val;
+        DbObject *db;
+    } arg = {{0, 0}, {0, 0}, self->db};
+
+    static const struct argspec argspec[] = {
+        {"key", ARG_BUF, OFFSET(trans_delete, key)},
+        {"value", ARG_BUF, OFFSET(trans_delete, val)},
+        {"db", ARG_DB, OFFSET(trans_delete, db)}
+    };
+    BufViewList bvl;
+    MDB_val *val_ptr;
+    int rc;
+
+    bufviewlist_init(&bvl);
+    static PyObject *cache = NULL;
+    if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, &bvl)) {
+        goto out;
+    }
+    if(! db_owner_check(arg.db, self->env)) {
+        goto out;
+    }
+    val_ptr = arg.val.mv_size ? &arg.val : NULL;
+    if(trans_mutate(self)) {
+        goto out;
+    }
+    ENV_UNLOCKED(self->env, rc, mdb_del(self->txn, arg.db->dbi, &arg.key, val_ptr));
+    bufviewlist_release(&bvl);
+    if(rc) {
+        if(rc == MDB_NOTFOUND) {
+             Py_RETURN_FALSE;
+        }
+        return err_set("mdb_del", rc);
+    }
+    Py_RETURN_TRUE;
+
+out:
+    bufviewlist_release(&bvl);
+    return NULL;
+}
+
+/**
+ * Transaction.delete_range(start, stop) -> int
+ */
+static PyObject *
+trans_delete_range(TransObject *self, PyObject *args, PyObject *kwds)
+{
+    struct trans_delete_range {
+        MDB_val start;
+        MDB_val stop;
+        DbObject *db;
+        int inclusive;
+    } arg = {{0, 0}, {0, 0}, self->db, 0};
+
+    static const struct argspec argspec[] = {
+        {"start", ARG_BUF, OFFSET(trans_delete_range, start)},
+        {"stop", ARG_BUF, OFFSET(trans_delete_range, stop)},
+        {"db", ARG_DB, OFFSET(trans_delete_range, db)},
+        {"inclusive", ARG_BOOL, OFFSET(trans_delete_range, inclusive)}
+    };
+    BufViewList bvl;
+    PyObject *ret = NULL;
+    MDB_cursor *curs;
+    MDB_val key, val;
+    const char *what = "mdb_cursor_get";
+    unsigned int db_flags;
+    size_t count = 0;
+    size_t ndup;
+    int dupsort;
+    int rc;
+
+    bufviewlist_init(&bvl);
+    static PyObject *cache = NULL;
+    if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, &bvl)) {
+        goto out;
+    }
+    if(! db_owner_check(arg.db, self->env)) {
+        goto out;
+    }
+    db_flags = arg.db->flags;
+    if(! arg.start.mv_size) {
+        arg.start.mv_data = NULL;
+    }
+    if(arg.start.mv_data &&
+       ! key_size_ok(self->env, db_flags, arg.start.mv_size, 0)) {
+        err_set("start", MDB_BAD_VALSIZE);
+        goto out;
+    }
+    if(arg.stop.mv_data &&
+       ! key_size_ok(self->env, db_flags, arg.stop.mv_size, 0)) {
+        err_set("stop", MDB_BAD_VALSIZE);
+        goto out;
+    }
+    if(ENV_RESIZE_BLOCKED(self->env)) {
+        err_set("mdb_cursor_del", EINVAL);
+        goto out;
+    }
+    if(trans_mutate(self)) {
+        goto out;
+    }
+    if((rc = mdb_cursor_open(self->txn, arg.db->dbi, &curs))) {
+        err_set("mdb_cursor_open", rc);
+        goto out;
+    }
+
+    /* On dupsort databases delete all duplicates of a key at once. */
+    dupsort = (db_flags & MDB_DUPSORT) != 0;
+    ACTIVE_OPS_INC(self->env);
+    Py_BEGIN_ALLOW_THREADS
+    if(arg.start.mv_data) {
+        key = arg.start;
+        rc = mdb_cursor_get(curs, &key, &val, MDB_SET_RANGE);
+    } else {
+        rc = mdb_cursor_get(curs, &key, &val, MDB_FIRST);
+    }
+    while(! rc) {
+        if(arg.stop.mv_data) {
+            int cmp = key_bound_cmp(self->txn, arg.db->dbi, db_flags,
+                                    &key, &arg.stop);
+            if(cmp > 0 || (cmp == 0 && ! arg.inclusive)) {
+                break;
+            }
+        }
+        ndup = 1;
+        if(dupsort && (rc = mdb_cursor_count(curs, &ndup))) {
+            what = "mdb_cursor_count";
+            break;
+        }
+        if((rc = mdb_cursor_del(curs, dupsort ? MDB_NODUPDATA : 0))) {
+            what = "mdb_cursor_del";
+            break;
+        }
+        count += ndup;
+        /* After a delete, MDB_NEXT/MDB_NEXT_NODUP return the record that
+         * followed the deleted one, or MDB_NOTFOUND if the database is now
+         * empty (where MDB_GET_CURRENT would fail with EINVAL). */
+        rc = mdb_cursor_get(curs, &key, &val,
+                            dupsort ? MDB_NEXT_NODUP : MDB_NEXT);
+    }
+    mdb_cursor_close(curs);
+    Py_END_ALLOW_THREADS
+    ACTIVE_OPS_DEC(self->env);
+    NOTE_MAP_FULL(self->env, rc);
+
+    if(rc && rc != MDB_NOTFOUND) {
+        err_set(what, rc);
+        goto out;
+    }
+    ret = PyLong_FromSize_t(count);
+
+out:
+    bufviewlist_release(&bvl);
+    return ret;
+}
+
+/**
+ * Transaction.drop(db)
+ */
+static PyObject *
+trans_drop(TransObject *self, PyObject *args, PyObject *kwds)
+{
+    struct trans_drop {
+        DbObject *db;
+        int delete;
+    } arg = {NULL, 1};
+
+    static const struct argspec argspec[] = {
+        {"db", ARG_DB, OFFSET(trans_drop, db)},
+        {"delete", ARG_BOOL, OFFSET(trans_drop, delete)}
+    };
+    int rc;
+
+    static PyObject *cache = NULL;
+    if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, NULL)) {
+        return NULL;
+    }
+    if(! arg.db) {
+        return type_error("'db' argument required.");
+    } else if(! db_owner_check(arg.db, self->env)) {
+        return NULL;
+    }
+
+    if(trans_mutate(self)) {
+        return NULL;
+    }
+    ENV_UNLOCKED(self->env, rc, mdb_drop(self->txn, arg.db->dbi, arg.delete));
+    if(arg.delete) {
+        /* The DBI handle is closed; it must not be renewed. */
+        env_close_spare_cursors(self->env, arg.db->dbi, 0);
+    }
+    if(rc) {
+        return err_set("mdb_drop", rc);
+    }
+    Py_RETURN_NONE;
+}
+
+/**
+ * Transaction.get() -> result
+ */
+static PyObject *
+trans_get(TransObject *self, PyObject *args, PyObject *kwds)
+{
+    struct trans_get {
+        MDB_val key;
+        PyObject *default_;
+        DbObject *db;
+    } arg = {{0, 0}, Py_None, self->db};
+
+    static const struct argspec argspec[] = {
+        {"key", ARG_BUF, OFFSET(trans_get, key)},
+        {"default", ARG_OBJ, OFFSET(trans_get, default_)},
+        {"db", ARG_DB, OFFSET(trans_get, db)}
+    };
+    BufViewList bvl;
+    MDB_val val;
+    int rc;
+
+    bufviewlist_init(&bvl);
+    static PyObject *cache = NULL;
+    if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, &bvl)) {
+        goto out;
+    }
+    if(! db_owner_check(arg.db, self->env)) {
+        goto out;
+    }
+
+    if(! arg.key.mv_data) {
+        type_error("key must be given.");
+        goto out;
+    }
+
+    ACTIVE_OPS_INC(self->env);
+    Py_BEGIN_ALLOW_THREADS
+    rc = mdb_get(self->txn, arg.db->dbi, &arg.key, &val);
+    preload(rc, val.mv_data, val.mv_size);
+    Py_END_ALLOW_THREADS
+    ACTIVE_OPS_DEC(self->env);
+    bufviewlist_release(&bvl);
+
+    if(rc) {
+        if(rc == MDB_NOTFOUND) {
+            Py_INCREF(arg.default_);
+            return arg.default_;
+        }
+        return err_set("mdb_get", rc);
+    }
+    return obj_from_val(&val, self->flags & TRANS_BUFFERS);
+
+out:
+    bufviewlist_release(&bvl);
+    return NULL;
+}
+
+/**
+ * Transaction.getmany() -> list
+ */
+static PyObject *
+trans_getmany(TransObject *self, PyObject *args, PyObject *kwds)
+{
+    struct trans_getmany {
+        PyObject *keys;
+        DbObject *db;
+        PyObject *default_;
+    } arg = {Py_None, self->db, Py_None};
+
+    static const struct argspec argspec[] = {
+        {"keys", ARG_OBJ, OFFSET(trans_getmany, keys)},
+        {"db", ARG_DB, OFFSET(trans_getmany, db)},
+        {"default", ARG_OBJ, OFFSET(trans_getmany, default_)}
+    };
+    PyObject *seq;
+    PyObject *list = NULL;
+    PyObject *obj;
+    BufBatch bb;
+    MDB_val *keys = NULL;
+    MDB_val *vals = NULL;
+    size_t *order = NULL;
+    int *rcs = NULL;
+    size_t n;
+    size_t i;
+    int as_buffer;
+
+    static PyObject *cache = NULL;
+    if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, NULL)) {
+        return NULL;
+    }
+    if(! db_owner_check(arg.db, self->env)) {
+        return NULL;
+    }
+    if(! ((seq = sequence_snapshot(arg.keys, "keys must be iterable")))) {
+        return NULL;
+    }
+
+    bufbatch_init(&bb);
+    n = (size_t) PyTuple_GET_SIZE(seq);
+    if(! n) {
+        Py_DECREF(seq);
+        return PyList_New(0);
+    }
+    if(SIZE_MUL_OVERFLOW(n, 2 * sizeof(size_t) + 2 * sizeof(MDB_val))) {
+        PyErr_NoMemory();
+        goto out;
+    }
+    keys = malloc(n * sizeof(MDB_val));
+    vals = malloc(n * sizeof(MDB_val));
+    order = malloc(2 * n * sizeof(size_t));
+    rcs = malloc(n * sizeof(int));
+    if(! (keys && vals && order && rcs)) {
+        PyErr_NoMemory();
+        goto out;
+    }
+    for(i = 0; i < n; i++) {
+        if(val_from_buffer_batch(&keys[i], PyTuple_GET_ITEM(seq, i),
+                                 &bb)) {
+            goto out;
+        }
+    }
+    if(check_batch_keys(self->env, arg.db->flags, keys, n, "mdb_get()")) {
+        goto out;
+    }
+
+    if(ENV_RESIZE_BLOCKED(self->env)) {
+        err_set("mdb_get", EINVAL);
+        goto out;
+    }
+    /* Sort, look up and fault in every value in a single unlocked section;
+     * the key buffers stay pinned in `bb` throughout. */
+    ACTIVE_OPS_INC(self->env);
+    Py_BEGIN_ALLOW_THREADS
+    sort_key_order(self->txn, arg.db->dbi, keys, order, order + n, n);
+    for(i = 0; i < n; i++) {
+        size_t j = order[i];
+        rcs[j] = mdb_get(self->txn, arg.db->dbi, &keys[j], &vals[j]);
+        preload(rcs[j], vals[j].mv_data, vals[j].mv_size);
+    }
+    Py_END_ALLOW_THREADS
+    ACTIVE_OPS_DEC(self->env);
+
+    as_buffer = self->flags & TRANS_BUFFERS;
+    if(! ((list = PyList_New(n)))) {
+        goto out;
+    }
+    for(i = 0; i < n; i++) {
+        if(! rcs[i]) {
+            if(! ((obj = obj_from_val(&vals[i], as_buffer)))) {
+                Py_CLEAR(list);
+                goto out;
+            }
+        } else if(rcs[i] == MDB_NOTFOUND) {
+            obj = arg.default_;
+            Py_INCREF(obj);
+        } else {
+            err_format(rcs[i], "mdb_get() element #%zu", i);
+            Py_CLEAR(list);
+            goto out;
+        }
+        PyList_SET_ITEM(list, i, obj);
     }
-    Py_RETURN_NONE;
+
+out:
+    bufbatch_release(&bb);
+    Py_DECREF(seq);
+    free(keys);
+    free(vals);
+    free(order);
+    free(rcs);
+    return list;
 }
 
 /**
- * Transaction.commit()
+ * Transaction.put() -> bool
  */
 static PyObject *
-trans_commit(TransObject *self, PyObject *Py_UNUSED(ignored))
+trans_put(TransObject *self, PyObject *args, PyObject *kwds)
 {
+    struct trans_put {
+        MDB_val key;
+        MDB_val value;
+        int dupdata;
+        int overwrite;
+        int append;
+        DbObject *db;
+    } arg = {{0, 0}, {0, 0}, 1, 1, 0, self->db};
+
+    static const struct argspec argspec[] = {
+        {"key", ARG_BUF, OFFSET(trans_put, key)},
+        {"value", ARG_BUF, OFFSET(trans_put, value)},
+        {"dupdata", ARG_BOOL, OFFSET(trans_put, dupdata)},
+        {"overwrite", ARG_BOOL, OFFSET(trans_put, overwrite)},
+        {"append", ARG_BOOL, OFFSET(trans_put, append)},
+        {"db", ARG_DB, OFFSET(trans_put, db)}
+    };
+    BufViewList bvl;
+    int flags;
     int rc;
 
-    if(! self->valid) {
-        return err_invalid();
+    bufviewlist_init(&bvl);
+    static PyObject *cache = NULL;
+    if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, &bvl)) {
+        goto out;
     }
-    self->valid = 0;  /* Prevent new operations from starting (issue #180). */
-    DEBUG("invalidate")
-    INVALIDATE(self)
-#ifdef HAVE_MEMSINK
-    ms_notify((PyObject *) self, &self->sink_head);
-#endif
-    if(self->flags & TRANS_RDONLY) {
-        DEBUG("resetting")
-        /* Reset to spare state, ready for _dealloc to freelist it. */
-        mdb_txn_reset(self->txn);
-        self->flags |= TRANS_SPARE;
-    } else {
-        /* Save txn/env locally before releasing the GIL.  mdb_txn_commit
-         * frees the MDB_txn, so self->txn must be NULLed first to prevent
-         * concurrent trans_clear from calling mdb_txn_abort on freed memory.
-         * Similarly, Py_INCREF the env since trans_clear may Py_CLEAR it
-         * while the GIL is released.  Issue #180. */
-        MDB_txn *txn = self->txn;
-        EnvObject *env = self->env;
-        self->txn = NULL;
-        Py_INCREF((PyObject *) env);
-        DEBUG("committing")
-        ACTIVE_OPS_INC(env);
-        Py_BEGIN_ALLOW_THREADS
-        rc = mdb_txn_commit(txn);
-        Py_END_ALLOW_THREADS
-        ACTIVE_OPS_DEC(env);
-        /* Mutex released on this (owning) thread; wakes a close() blocked
-         * waiting for it.  Cleared after the commit so waiters never
-         * observe tid == 0 while the transaction is still live.
-         * Issues #465, #475. */
-        CLEAR_WRITE_TXN_TID(env);
-        Py_DECREF((PyObject *) env);
-        if(rc) {
-            return err_set("mdb_txn_commit", rc);
+    if(! db_owner_check(arg.db, self->env)) {
+        goto out;
+    }
+
+    flags = 0;
+    if(! arg.dupdata) {
+        flags |= MDB_NODUPDATA;
+    }
+    if(! arg.overwrite) {
+        flags |= MDB_NOOVERWRITE;
+    }
+    if(arg.append) {
+        flags |= MDB_APPEND;
+    }
+
+    DEBUG("inserting '%.*s' (%d) -> '%.*s' (%d)",
+        (int)arg.key.mv_size, (char *)arg.key.mv_data,
+        (int)arg.key.mv_size,
+        (int)arg.value.mv_size, (char *)arg.value.mv_data,
+        (int)arg.value.mv_size)
+
+    if(trans_mutate(self)) {
+        goto out;
+    }
+    ENV_UNLOCKED(self->env, rc, mdb_put(self->txn, (arg.db)->dbi,
+                         &arg.key, &arg.value, flags));
+    bufviewlist_release(&bvl);
+    if(rc) {
+        if(rc == MDB_KEYEXIST) {
+            Py_RETURN_FALSE;
+        }
+        return err_set("mdb_put", rc);
+    }
+    Py_RETURN_TRUE;
+
+out:
+    bufviewlist_release(&bvl);
+    return NULL;
+}
+
+/**
+ * Transaction.reserve() -> memoryview or None
+ */
+static PyObject *
+trans_reserve(TransObject *self, PyObject *args, PyObject *kwds)
+{
+    struct trans_reserve {
+        MDB_val key;
+        size_t size;
+        int overwrite;
+        int append;
+        DbObject *db;
+    } arg = {{0, 0}, 0, 1, 0, self->db};
+
+    static const struct argspec argspec[] = {
+        {"key", ARG_BUF, OFFSET(trans_reserve, key)},
+        {"size", ARG_SIZE, OFFSET(trans_reserve, size)},
+        {"overwrite", ARG_BOOL, OFFSET(trans_reserve, overwrite)},
+        {"append", ARG_BOOL, OFFSET(trans_reserve, append)},
+        {"db", ARG_DB, OFFSET(trans_reserve, db)}
+    };
+    BufViewList bvl;
+    MDB_val val;
+    int flags;
+    int rc;
+
+    bufviewlist_init(&bvl);
+    static PyObject *cache = NULL;
+    if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, &bvl)) {
+        goto out;
+    }
+    if(! db_owner_check(arg.db, self->env)) {
+        goto out;
+    }
+    if(arg.db->flags & MDB_DUPSORT) {
+        err_set("reserve() cannot be used with a dupsort database",
+                MDB_INCOMPATIBLE);
+        goto out;
+    }
+
+    flags = MDB_RESERVE;
+    if(! arg.overwrite) {
+        flags |= MDB_NOOVERWRITE;
+    }
+    if(arg.append) {
+        flags |= MDB_APPEND;
+    }
+
+    val.mv_size = arg.size;
+    val.mv_data = NULL;
+    if(trans_mutate(self)) {
+        goto out;
+    }
+    ENV_UNLOCKED(self->env, rc, mdb_put(self->txn, (arg.db)->dbi,
+                         &arg.key, &val, flags));
+    bufviewlist_release(&bvl);
+    return reserve_view(self, rc, &val);
+
+out:
+    bufviewlist_release(&bvl);
+    return NULL;
+}
+
+/**
+ * Transaction.putmany(items) -> (consumed, added)
+ */
+static PyObject *
+trans_putmany(TransObject *self, PyObject *args, PyObject *kwds)
+{
+    struct trans_putmany {
+        PyObject *items;
+        DbObject *db;
+        int dupdata;
+        int overwrite;
+        int append;
+    } arg = {Py_None, self->db, 1, 1, 0};
+
+    static const struct argspec argspec[] = {
+        {"items", ARG_OBJ, OFFSET(trans_putmany, items)},
+        {"db", ARG_DB, OFFSET(trans_putmany, db)},
+        {"dupdata", ARG_BOOL, OFFSET(trans_putmany, dupdata)},
+        {"overwrite", ARG_BOOL, OFFSET(trans_putmany, overwrite)},
+        {"append", ARG_BOOL, OFFSET(trans_putmany, append)}
+    };
+    PyObject *seq;
+    PyObject *ret = NULL;
+    BufBatch bb;
+    MDB_val *vals = NULL;
+    MDB_cursor *curs;
+    size_t added = 0;
+    size_t n;
+    size_t i;
+    int flags;
+    int rc = 0;
+
+    static PyObject *cache = NULL;
+    if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, NULL)) {
+        return NULL;
+    }
+    if(! db_owner_check(arg.db, self->env)) {
+        return NULL;
+    }
+
+    flags = 0;
+    if(! arg.dupdata) {
+        flags |= MDB_NODUPDATA;
+    }
+    if(! arg.overwrite) {
+        flags |= MDB_NOOVERWRITE;
+    }
+    if(arg.append) {
+        flags |= (arg.db->flags & MDB_DUPSORT) ? MDB_APPENDDUP : MDB_APPEND;
+    }
+
+    /* The snapshot owns every tuple, and so every bytes key and value,
+     * for the whole call, whatever the caller's list does meanwhile. */
+    if(! ((seq = sequence_snapshot(arg.items, "items must be iterable")))) {
+        return NULL;
+    }
+
+    bufbatch_init(&bb);
+    n = (size_t) PyTuple_GET_SIZE(seq);
+    if(SIZE_MUL_OVERFLOW(n, 2 * sizeof(MDB_val))) {
+        PyErr_NoMemory();
+        goto out;
+    }
+    /* Key `i` is vals[2*i], its value vals[2*i+1]. */
+    if(! ((vals = malloc(2 * n * sizeof(MDB_val) + 1)))) {
+        PyErr_NoMemory();
+        goto out;
+    }
+    for(i = 0; i < n; i++) {
+        PyObject *item = PyTuple_GET_ITEM(seq, i);
+        if(! (PyTuple_CheckExact(item) && PyTuple_GET_SIZE(item) == 2)) {
+            PyErr_SetString(PyExc_TypeError,
+                            "putmany() elements must be 2-tuples");
+            goto out;
+        }
+        if(val_from_buffer_batch(&vals[2 * i], PyTuple_GET_ITEM(item, 0),
+                                 &bb) ||
+           val_from_buffer_batch(&vals[2 * i + 1], PyTuple_GET_ITEM(item, 1),
+                                 &bb)) {
+            goto out;
+        }
+    }
+
+    if(ENV_RESIZE_BLOCKED(self->env)) {
+        err_set("mdb_cursor_put", EINVAL);
+        goto out;
+    }
+    if(trans_mutate(self)) {
+        goto out;
+    }
+    /* Hold GIL: see make_trans comment and issue #180. */
+    if((rc = mdb_cursor_open(self->txn, arg.db->dbi, &curs))) {
+        err_set("mdb_cursor_open", rc);
+        goto out;
+    }
+    /* Write the whole batch in a single unlocked section; the buffers stay
+     * pinned in `bb` throughout. */
+    ACTIVE_OPS_INC(self->env);
+    Py_BEGIN_ALLOW_THREADS
+    for(i = 0; i < n; i++) {
+        rc = mdb_cursor_put(curs, &vals[2 * i], &vals[2 * i + 1], flags);
+        if(rc == MDB_SUCCESS) {
+            added++;
+        } else if(rc == MDB_KEYEXIST) {
+            rc = 0;
+        } else {
+            break;
         }
     }
-    Py_RETURN_NONE;
+    mdb_cursor_close(curs);
+    Py_END_ALLOW_THREADS
+    ACTIVE_OPS_DEC(self->env);
+    NOTE_MAP_FULL(self->env, rc);
+
+    if(rc) {
+        err_format(rc, "mdb_cursor_put() element #%zu", i);
+        goto out;
+    }
+    ret = Py_BuildValue("(nn)", (Py_ssize_t) n, (Py_ssize_t) added);
+
+out:
+    bufbatch_release(&bb);
+    Py_DECREF(seq);
+    free(vals);
+    return ret;
 }
 
+static PyObject *
+make_cursor(DbObject *db, TransObject *trans);
+static PyObject *
+do_cursor_replace(CursorObject *self, MDB_val *key, MDB_val *val);
+
 /**
- * Transaction.cursor() -> Cursor
+ * Load the native-endian integer counter of `width` bytes at `p`, sign
+ * extending it if `is_signed`.
  */
-static PyObject *
-trans_cursor(TransObject *self, PyObject *args, PyObject *kwds)
+static uint64_t
+counter_load(const void *p, size_t width, int is_signed)
 {
-    struct trans_cursor {
-        DbObject *db;
-    } arg = {self->db};
-
-    static const struct argspec argspec[] = {
-        {"db", ARG_DB, OFFSET(trans_cursor, db)}
-    };
+    uint8_t u8;
+    uint16_t u16;
+    uint32_t u32;
+    uint64_t u64;
+
+    switch(width) {
+    case 1:
+        memcpy(&u8, p, 1);
+        return is_signed ? (uint64_t) (int64_t) (int8_t) u8 : u8;
+    case 2:
+        memcpy(&u16, p, 2);
+        return is_signed ? (uint64_t) (int64_t) (int16_t) u16 : u16;
+    case 4:
+        memcpy(&u32, p, 4);
+        return is_signed ? (uint64_t) (int64_t) (int32_t) u32 : u32;
+    default:
+        memcpy(&u64, p, 8);
+        return u64;
+    }
+}
 
-    static PyObject *cache = NULL;
-    if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, NULL)) {
-        return NULL;
+/**
+ * Store the low `width` bytes of `value` at `p` in native byte order.
+ */
+static void
+counter_store(void *p, uint64_t value, size_t width)
+{
+    uint8_t u8 = (uint8_t) value;
+    uint16_t u16 = (uint16_t) value;
+    uint32_t u32 = (uint32_t) value;
+
+    switch(width) {
+    case 1:
+        memcpy(p, &u8, 1);
+        break;
+    case 2:
+        memcpy(p, &u16, 2);
+        break;
+    case 4:
+        memcpy(p, &u32, 4);
+        break;
+    default:
+        memcpy(p, &value, 8);
     }
-    return make_cursor(arg.db, self);
 }
 
 /**
- * Transaction.delete() -> bool
+ * Add `delta` to the counter `*value`, returning -1 without changing it if
+ * the result does not fit `width` bytes.
  */
-static PyObject *
-trans_delete(TransObject *self, PyObject *args, PyObject *kwds)
+static int
+counter_add(uint64_t *value, int64_t delta, size_t width, int is_signed)
 {
-    struct trans_delete {
-        MDB_val key;
-        MDB_val val;
-        DbObject *db;
-    } arg = {{0, 0}, {0, 0}, self->db};
+    int bits = (int) (8 * width);
+
+    if(is_signed) {
+        int64_t hi = (width == 8) ? INT64_MAX :
+                     (int64_t) ((UINT64_C(1) << (bits - 1)) - 1);
+        int64_t lo = -hi - 1;
+        int64_t cur = (int64_t) *value;
+        if((delta > 0 && cur > hi - delta) || (delta < 0 && cur < lo - delta)) {
+            return -1;
+        }
+        *value = (uint64_t) (cur + delta);
+    } else {
+        uint64_t hi = (width == 8) ? UINT64_MAX :
+                      ((UINT64_C(1) << bits) - 1);
+        if(delta >= 0) {
+            if((uint64_t) delta > hi || *value > hi - (uint64_t) delta) {
+                return -1;
+            }
+            *value += (uint64_t) delta;
+        } else {
+            uint64_t mag = (uint64_t) -(delta + 1) + 1;
+            if(*value < mag) {
+                return -1;
+            }
+            *value -= mag;
+        }
+    }
+    return 0;
+}
 
-    static const struct argspec argspec[] = {
-        {"key", ARG_BUF, OFFSET(trans_delete, key)},
-        {"value", ARG_BUF, OFFSET(trans_delete, val)},
-        {"db", ARG_DB, OFFSET(trans_delete, db)}
-    };
-    BufViewList bvl;
-    MDB_val *val_ptr;
+/**
+ * Apply `delta` to the counter stored at `key`, creating it if missing, and
+ * store its new value in `*out`. The record is updated in place with
+ * MDB_CURRENT once the cursor is positioned. Needs no GIL. Returns 0, an
+ * LMDB error, MDB_BAD_VALSIZE if the stored value is not `width` bytes, or
+ * ERANGE if the result does not fit.
+ */
+static int
+counter_incr(MDB_cursor *curs, MDB_val *key, int64_t delta, size_t width,
+             int is_signed, uint64_t *out)
+{
+    MDB_val k = *key;
+    MDB_val val;
+    uint64_t value = 0;
+    char buf[8];
+    int found;
     int rc;
 
-    bufviewlist_init(&bvl);
-    static PyObject *cache = NULL;
-    if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, &bvl)) {
-        goto out;
+    rc = mdb_cursor_get(curs, &k, &val, MDB_SET_KEY);
+    if(rc && rc != MDB_NOTFOUND) {
+        return rc;
     }
-    if(! db_owner_check(arg.db, self->env)) {
-        goto out;
-    }
-    val_ptr = arg.val.mv_size ? &arg.val : NULL;
-    self->mutations++;
-    ENV_UNLOCKED(self->env, rc, mdb_del(self->txn, arg.db->dbi, &arg.key, val_ptr));
-    bufviewlist_release(&bvl);
-    if(rc) {
-        if(rc == MDB_NOTFOUND) {
-             Py_RETURN_FALSE;
+    found = ! rc;
+    if(found) {
+        if(val.mv_size != width) {
+            return MDB_BAD_VALSIZE;
         }
-        return err_set("mdb_del", rc);
+        value = counter_load(val.mv_data, width, is_signed);
     }
-    Py_RETURN_TRUE;
-
-out:
-    bufviewlist_release(&bvl);
-    return NULL;
+    if(counter_add(&value, delta, width, is_signed)) {
+        return ERANGE;
+    }
+    counter_store(buf, value, width);
+    val.mv_data = buf;
+    val.mv_size = width;
+    if((rc = mdb_cursor_put(curs, key, &val, found ? MDB_CURRENT : 0))) {
+        return rc;
+    }
+    *out = value;
+    return 0;
 }
 
 /**
- * Transaction.drop(db)
+ * Shared between Transaction.incr() and Transaction.incrmany(): apply
+ * `deltas` to the counters at `keys` in database order within one unlocked
+ * section. Errors name the failing element if `batch` is set. Returns a list
+ * of the new values in input order, or NULL with an exception set.
  */
 static PyObject *
-trans_drop(TransObject *self, PyObject *args, PyObject *kwds)
+trans_incr_batch(TransObject *self, DbObject *db, MDB_val *keys,
+                 int64_t *deltas, size_t n, size_t width, int is_signed,
+                 const char *what, int batch)
 {
-    struct trans_drop {
-        DbObject *db;
-        int delete;
-    } arg = {NULL, 1};
-
-    static const struct argspec argspec[] = {
-        {"db", ARG_DB, OFFSET(trans_drop, db)},
-        {"delete", ARG_BOOL, OFFSET(trans_drop, delete)}
-    };
-    int rc;
+    PyObject *list = NULL;
+    PyObject *obj;
+    MDB_cursor *curs;
+    size_t *order = NULL;
+    uint64_t *out = NULL;
+    size_t failed = 0;
+    size_t i;
+    int rc = 0;
 
-    static PyObject *cache = NULL;
-    if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, NULL)) {
+    if(width != 1 && width != 2 && width != 4 && width != 8) {
+        PyErr_SetString(PyExc_ValueError, "width must be 1, 2, 4 or 8");
         return NULL;
     }
-    if(! arg.db) {
-        return type_error("'db' argument required.");
-    } else if(! db_owner_check(arg.db, self->env)) {
+    if(db->flags & MDB_DUPSORT) {
+        return err_format(MDB_INCOMPATIBLE,
+                          "%s cannot be used with a dupsort database", what);
+    }
+    if(! batch && ! key_size_ok(self->env, db->flags, keys[0].mv_size, 0)) {
+        return err_set(what, MDB_BAD_VALSIZE);
+    }
+    if(check_batch_keys(self->env, db->flags, keys, n, what)) {
         return NULL;
     }
+    if(SIZE_MUL_OVERFLOW(n, 2 * sizeof(size_t) + sizeof(uint64_t))) {
+        return PyErr_NoMemory();
+    }
+    order = malloc(2 * n * sizeof(size_t) + 1);
+    out = malloc(n * sizeof(uint64_t) + 1);
+    if(! (order && out)) {
+        PyErr_NoMemory();
+        goto out;
+    }
 
-    ENV_UNLOCKED(self->env, rc, mdb_drop(self->txn, arg.db->dbi, arg.delete));
-    self->mutations++;
-    if(rc) {
-        return err_set("mdb_drop", rc);
+    if(ENV_RESIZE_BLOCKED(self->env)) {
+        err_set("mdb_cursor_put", EINVAL);
+        goto out;
     }
-    Py_RETURN_NONE;
+    if(trans_mutate(self)) {
+        goto out;
+    }
+    /* Hold GIL: see make_trans comment and issue #180. */
+    if((rc = mdb_cursor_open(self->txn, db->dbi, &curs))) {
+        err_set("mdb_cursor_open", rc);
+        goto out;
+    }
+    /* The sort is stable, so repeated keys are still updated in input
+     * order. */
+    ACTIVE_OPS_INC(self->env);
+    Py_BEGIN_ALLOW_THREADS
+    sort_key_order(self->txn, db->dbi, keys, order, order + n, n);
+    for(i = 0; i < n; i++) {
+        failed = order[i];
+        if((rc = counter_incr(curs, &keys[failed], deltas[failed], width,
+                              is_signed, &out[failed]))) {
+            break;
+        }
+    }
+    mdb_cursor_close(curs);
+    Py_END_ALLOW_THREADS
+    ACTIVE_OPS_DEC(self->env);
+    NOTE_MAP_FULL(self->env, rc);
+
+    if(rc == ERANGE) {
+        if(batch) {
+            PyErr_Format(PyExc_OverflowError,
+                         "%s element #%zu: counter out of range", what, failed);
+        } else {
+            PyErr_Format(PyExc_OverflowError, "%s: counter out of range", what);
+        }
+        goto out;
+    } else if(rc) {
+        if(batch) {
+            err_format(rc, "%s element #%zu", what, failed);
+        } else {
+            err_set(what, rc);
+        }
+        goto out;
+    }
+    if(! ((list = PyList_New(n)))) {
+        goto out;
+    }
+    for(i = 0; i < n; i++) {
+        if(is_signed) {
+            obj = PyLong_FromLongLong((long long) (int64_t) out[i]);
+        } else {
+            obj = PyLong_FromUnsignedLongLong((unsigned long long) out[i]);
+        }
+        if(! obj) {
+            Py_CLEAR(list);
+            goto out;
+        }
+        PyList_SET_ITEM(list, i, obj);
+    }
+
+out:
+    free(order);
+    free(out);
+    return list;
 }
 
 /**
- * Transaction.get() -> result
+ * Transaction.incr() -> int
  */
 static PyObject *
-trans_get(TransObject *self, PyObject *args, PyObject *kwds)
+trans_incr(TransObject *self, PyObject *args, PyObject *kwds)
 {
-    struct trans_get {
+    struct trans_incr {
         MDB_val key;
-        PyObject *default_;
+        PyObject *delta;
         DbObject *db;
-    } arg = {{0, 0}, Py_None, self->db};
+        size_t width;
+        int is_signed;
+    } arg = {{0, 0}, NULL, self->db, 8, 1};
 
     static const struct argspec argspec[] = {
-        {"key", ARG_BUF, OFFSET(trans_get, key)},
-        {"default", ARG_OBJ, OFFSET(trans_get, default_)},
-        {"db", ARG_DB, OFFSET(trans_get, db)}
+        {"key", ARG_BUF, OFFSET(trans_incr, key)},
+        {"delta", ARG_OBJ, OFFSET(trans_incr, delta)},
+        {"db", ARG_DB, OFFSET(trans_incr, db)},
+        {"width", ARG_SIZE, OFFSET(trans_incr, width)},
+        {"signed", ARG_BOOL, OFFSET(trans_incr, is_signed)}
     };
     BufViewList bvl;
-    MDB_val val;
-    int rc;
+    PyObject *list;
+    PyObject *ret = NULL;
+    int64_t delta = 1;
 
     bufviewlist_init(&bvl);
     static PyObject *cache = NULL;
@@ -4534,109 +8533,104 @@ trans_get(TransObject *self, PyObject *args, PyObject *kwds)
     if(! db_owner_check(arg.db, self->env)) {
         goto out;
     }
-
-    if(! arg.key.mv_data) {
-        type_error("key must be given.");
-        goto out;
-    }
-
-    ACTIVE_OPS_INC(self->env);
-    Py_BEGIN_ALLOW_THREADS
-    rc = mdb_get(self->txn, arg.db->dbi, &arg.key, &val);
-    preload(rc, val.mv_data, val.mv_size);
-    Py_END_ALLOW_THREADS
-    ACTIVE_OPS_DEC(self->env);
-    bufviewlist_release(&bvl);
-
-    if(rc) {
-        if(rc == MDB_NOTFOUND) {
-            Py_INCREF(arg.default_);
-            return arg.default_;
+    if(arg.delta) {
+        delta = (int64_t) PyLong_AsLongLong(arg.delta);
+        if(delta == -1 && PyErr_Occurred()) {
+            goto out;
         }
-        return err_set("mdb_get", rc);
     }
-    return obj_from_val(&val, self->flags & TRANS_BUFFERS);
+    if((list = trans_incr_batch(self, arg.db, &arg.key, &delta, 1,
+                                arg.width, arg.is_signed, "incr()", 0))) {
+        ret = PyList_GET_ITEM(list, 0);
+        Py_INCREF(ret);
+        Py_DECREF(list);
+    }
 
 out:
     bufviewlist_release(&bvl);
-    return NULL;
+    return ret;
 }
 
 /**
- * Transaction.put() -> bool
+ * Transaction.incrmany(pairs) -> list
  */
 static PyObject *
-trans_put(TransObject *self, PyObject *args, PyObject *kwds)
+trans_incrmany(TransObject *self, PyObject *args, PyObject *kwds)
 {
-    struct trans_put {
-        MDB_val key;
-        MDB_val value;
-        int dupdata;
-        int overwrite;
-        int append;
+    struct trans_incrmany {
+        PyObject *pairs;
         DbObject *db;
-    } arg = {{0, 0}, {0, 0}, 1, 1, 0, self->db};
+        size_t width;
+        int is_signed;
+    } arg = {Py_None, self->db, 8, 1};
 
     static const struct argspec argspec[] = {
-        {"key", ARG_BUF, OFFSET(trans_put, key)},
-        {"value", ARG_BUF, OFFSET(trans_put, value)},
-        {"dupdata", ARG_BOOL, OFFSET(trans_put, dupdata)},
-        {"overwrite", ARG_BOOL, OFFSET(trans_put, overwrite)},
-        {"append", ARG_BOOL, OFFSET(trans_put, append)},
-        {"db", ARG_DB, OFFSET(trans_put, db)}
+        {"pairs", ARG_OBJ, OFFSET(trans_incrmany, pairs)},
+        {"db", ARG_DB, OFFSET(trans_incrmany, db)},
+        {"width", ARG_SIZE, OFFSET(trans_incrmany, width)},
+        {"signed", ARG_BOOL, OFFSET(trans_incrmany, is_signed)}
     };
-    BufViewList bvl;
-    int flags;
-    int rc;
+    PyObject *seq;
+    PyObject *list = NULL;
+    BufBatch bb;
+    MDB_val *keys = NULL;
+    int64_t *deltas = NULL;
+    size_t n;
+    size_t i;
 
-    bufviewlist_init(&bvl);
     static PyObject *cache = NULL;
-    if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, &bvl)) {
-        goto out;
+    if(parse_args(self->valid, SPECSIZE(), argspec, &cache, args, kwds, &arg, NULL)) {
+        return NULL;
     }
     if(! db_owner_check(arg.db, self->env)) {
-        goto out;
+        return NULL;
+    }
+    if(! ((seq = sequence_snapshot(arg.pairs, "pairs must be iterable")))) {
+        return NULL;
     }
 
-    flags = 0;
-    if(! arg.dupdata) {
-        flags |= MDB_NODUPDATA;
+    bufbatch_init(&bb);
+    n = (size_t) PyTuple_GET_SIZE(seq);
+    if(! n) {
+        Py_DECREF(seq);
+        return PyList_New(0);
     }
-    if(! arg.overwrite) {
-        flags |= MDB_NOOVERWRITE;
+    if(SIZE_MUL_OVERFLOW(n, sizeof(MDB_val) + sizeof(int64_t))) {
+        PyErr_NoMemory();
+        goto out;
     }
-    if(arg.append) {
-        flags |= MDB_APPEND;
+    keys = malloc(n * sizeof(MDB_val));
+    deltas = malloc(n * sizeof(int64_t));
+    if(! (keys && deltas)) {
+        PyErr_NoMemory();
+        goto out;
     }
-
-    DEBUG("inserting '%.*s' (%d) -> '%.*s' (%d)",
-        (int)arg.key.mv_size, (char *)arg.key.mv_data,
-        (int)arg.key.mv_size,
-        (int)arg.value.mv_size, (char *)arg.value.mv_data,
-        (int)arg.value.mv_size)
-
-    self->mutations++;
-    ENV_UNLOCKED(self->env, rc, mdb_put(self->txn, (arg.db)->dbi,
-                         &arg.key, &arg.value, flags));
-    bufviewlist_release(&bvl);
-    if(rc) {
-        if(rc == MDB_KEYEXIST) {
-            Py_RETURN_FALSE;
+    for(i = 0; i < n; i++) {
+        PyObject *item = PyTuple_GET_ITEM(seq, i);
+        if(! (PyTuple_CheckExact(item) && PyTuple_GET_SIZE(item) == 2)) {
+            PyErr_SetString(PyExc_TypeError,
+                            "incrmany() elements must be 2-tuples");
+            goto out;
+        }
+        if(val_from_buffer_batch(&keys[i], PyTuple_GET_ITEM(item, 0), &bb)) {
+            goto out;
+        }
+        deltas[i] = (int64_t) PyLong_AsLongLong(PyTuple_GET_ITEM(item, 1));
+        if(deltas[i] == -1 && PyErr_Occurred()) {
+            goto out;
         }
-        return err_set("mdb_put", rc);
     }
-    Py_RETURN_TRUE;
+    list = trans_incr_batch(self, arg.db, keys, deltas, n, arg.width,
+                            arg.is_signed, "incrmany()", 1);
 
 out:
-    bufviewlist_release(&bvl);
-    return NULL;
+    bufbatch_release(&bb);
+    Py_DECREF(seq);
+    free(keys);
+    free(deltas);
+    return list;
 }
 
-static PyObject *
-make_cursor(DbObject *db, TransObject *trans);
-static PyObject *
-do_cursor_replace(CursorObject *self, MDB_val *key, MDB_val *val);
-
 /**
  * Transaction.replace() -> None|result
  */
@@ -4732,9 +8726,13 @@ trans_pop(TransObject *self, PyObject *args, PyObject *kwds)
         return NULL;
     }
 
+    if(trans_mutate(self)) {
+        Py_DECREF(old);
+        Py_DECREF((PyObject *)cursor);
+        return NULL;
+    }
     ENV_UNLOCKED(self->env, rc, mdb_cursor_del(cursor->curs, 0));
     Py_DECREF((PyObject *)cursor);
-    self->mutations++;
     if(rc) {
         Py_DECREF(old);
         return err_set("mdb_cursor_del", rc);
@@ -4826,9 +8824,15 @@ static struct PyMethodDef trans_methods[] = {
     {"commit", (PyCFunction)trans_commit, METH_NOARGS},
     {"cursor", (PyCFunction)trans_cursor, METH_VARARGS|METH_KEYWORDS},
     {"delete", (PyCFunction)trans_delete, METH_VARARGS|METH_KEYWORDS},
+    {"delete_range", (PyCFunction)trans_delete_range, METH_VARARGS|METH_KEYWORDS},
     {"drop", (PyCFunction)trans_drop, METH_VARARGS|METH_KEYWORDS},
     {"get", (PyCFunction)trans_get, METH_VARARGS|METH_KEYWORDS},
+    {"getmany", (PyCFunction)trans_getmany, METH_VARARGS|METH_KEYWORDS},
     {"put", (PyCFunction)trans_put, METH_VARARGS|METH_KEYWORDS},
+    {"putmany", (PyCFunction)trans_putmany, METH_VARARGS|METH_KEYWORDS},
+    {"incr", (PyCFunction)trans_incr, METH_VARARGS|METH_KEYWORDS},
+    {"incrmany", (PyCFunction)trans_incrmany, METH_VARARGS|METH_KEYWORDS},
+    {"reserve", (PyCFunction)trans_reserve, METH_VARARGS|METH_KEYWORDS},
     {"replace", (PyCFunction)trans_replace, METH_VARARGS|METH_KEYWORDS},
     {"pop", (PyCFunction)trans_pop, METH_VARARGS|METH_KEYWORDS},
     {"id", (PyCFunction)trans_id, METH_NOARGS},
@@ -4974,6 +8978,11 @@ static int init_types(PyObject *mod, PyObject *__all__)
     };
 
     int i;
+    /* Not published: only reachable through the memoryviews returned by
+     * reserve(). */
+    if(PyType_Ready(&PyReservedBuffer_Type)) {
+        return -1;
+    }
     for(i = 0; types[i]; i++) {
         PyTypeObject *type = types[i];
         char const * name = type->tp_name;
@@ -5079,6 +9088,7 @@ PyMODINIT_FUNC
 MODINIT_NAME(void)
 {
     PyObject *__all__;
+    PyObject *array_mod;
     PyObject *mod = PyModule_Create(&moduledef);
     if(! mod) {
         MOD_RETURN(NULL);
@@ -5124,6 +9134,15 @@ MODINIT_NAME(void)
     }
 #endif
 
+    if(! ((array_mod = PyImport_ImportModule("array")))) {
+        MOD_RETURN(NULL);
+    }
+    array_type = PyObject_GetAttrString(array_mod, "array");
+    Py_DECREF(array_mod);
+    if(! array_type) {
+        MOD_RETURN(NULL);
+    }
+
     if(init_constants(mod)) {
         MOD_RETURN(NULL);
     }
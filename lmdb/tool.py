@@ -23,12 +23,20 @@
 """
 Basic tools for working with LMDB.
 
+    compact: Compact an environment in place, replacing its data file.
+        %prog compact -e /path/to/db
+
+        No other process may have the environment open.
+
     copy: Consistent high speed backup an environment.
         %prog copy -e source.lmdb target.lmdb
 
     copyfd: Consistent high speed backup an environment to stdout.
         %prog copyfd -e source.lmdb > target.lmdb/data.mdb
 
+        For both, --rate-limit caps the copy rate in MiB per second, and
+        progress is shown if stderr is a terminal.
+
     drop: Delete one or more sub-databases.
         %prog drop db1
 
@@ -76,10 +84,12 @@ import functools
 import optparse
 import os
 import pprint
+import shutil
 import signal
 import string
 import struct
 import sys
+import tempfile
 import time
 from io import BufferedReader
 from io import BytesIO as StringIO
@@ -165,6 +175,9 @@ def make_parser():
     group = parser.add_option_group('Options for "copy" command')
     group.add_option('--compact', action='store_true', default=False,
                      help='Perform compaction while copying.')
+    group = parser.add_option_group('Options for "copy" and "copyfd" commands')
+    group.add_option('--rate-limit', type='float', metavar='MIB',
+                     help='Limit copy rate to MIB mebibytes per second.')
     group = parser.add_option_group('Options for "edit" command')
     group.add_option('--set', action='append',
                      help='List of key=value pairs to set.')
@@ -226,6 +239,39 @@ def db_map_from_args(args):
     return db_map
 
 
+def _backup(opts, dest, compact):
+    """Copy ENV to `dest` with :py:meth:`lmdb.Environment.backup`, limited to
+    --rate-limit and showing progress on stderr if it is a terminal."""
+    assert ENV is not None
+    rate_limit_bytes = None
+    if opts.rate_limit is not None:
+        if opts.rate_limit <= 0:
+            die('--rate-limit must be positive')
+        rate_limit_bytes = opts.rate_limit * 1048576
+
+    progress = None
+    if sys.stderr.isatty():
+        start = last = time.monotonic()
+
+        def progress(copied):
+            nonlocal last
+            now = time.monotonic()
+            if now - last >= 0.1:
+                last = now
+                mib = copied / 1048576.0
+                sys.stderr.write('\rCopied %.1f MiB (%.1f MiB/s)' %
+                                 (mib, mib / (now - start)))
+                sys.stderr.flush()
+
+    copied = ENV.backup(dest, compact=compact,
+                        rate_limit_bytes=rate_limit_bytes, progress=progress)
+    if progress is not None:
+        msg = 'Copied %.1f MiB in %.1f seconds.' % (
+            copied / 1048576.0, time.monotonic() - start)
+        # Pad to overwrite the longest progress line.
+        sys.stderr.write('\r%-40s\n' % (msg,))
+
+
 def cmd_copy(opts, args):
     assert ENV is not None
     if len(args) != 1:
@@ -237,7 +283,10 @@ def cmd_copy(opts, args):
 
     os.makedirs(output_dir, int('0755', 8))
     print('Running copy to %r....' % (output_dir,))
-    ENV.copy(output_dir, compact=opts.compact)
+    if opts.rate_limit is not None or sys.stderr.isatty():
+        _backup(opts, output_dir, opts.compact)
+    else:
+        ENV.copy(output_dir, compact=opts.compact)
 
 
 def cmd_copyfd(opts, args):
@@ -251,7 +300,40 @@ def cmd_copyfd(opts, args):
         e = sys.exc_info()[1]
         die('Bad --out-fd %d: %s', opts.out_fd, e)
 
-    ENV.copyfd(opts.out_fd)
+    if opts.rate_limit is not None or sys.stderr.isatty():
+        _backup(opts, opts.out_fd, False)
+    else:
+        ENV.copyfd(opts.out_fd)
+
+
+def cmd_compact(opts, args):
+    assert ENV is not None
+    if args:
+        die('"compact" command takes no arguments (see --help)')
+
+    data_path = os.path.abspath(ENV.path())
+    if ENV.flags()['subdir']:
+        data_path = os.path.join(data_path, 'data.mdb')
+    # The copy must be on the same filesystem to be renamed into place.
+    scratch = tempfile.mkdtemp(prefix='compact-',
+                               dir=os.path.dirname(data_path))
+    target = scratch
+    if not ENV.flags()['subdir']:
+        target = os.path.join(scratch, 'data.mdb')
+
+    before = os.path.getsize(data_path)
+    print('Compacting %r....' % (data_path,))
+    try:
+        ENV.compact_to(target)
+    except lmdb.Error:
+        # Keep the scratch directory: it may hold a complete copy.
+        die('Compaction failed: %s', sys.exc_info()[1])
+    except BaseException:
+        shutil.rmtree(scratch, ignore_errors=True)
+        raise
+    shutil.rmtree(scratch, ignore_errors=True)
+    print('Compacted %d bytes to %d bytes.' % (before,
+                                               os.path.getsize(data_path)))
 
 
 def cmd_dump(opts, args):
@@ -524,10 +606,8 @@ def cmd_rewrite(opts, args):
 
     for name, src_db, dst_db in dbs:
         print('Writing %r...' % (name,))
-        with target_env.begin(db=dst_db, write=True) as wtxn:
-            with ENV.begin(db=src_db, buffers=True) as rtxn:
-                for key, value in rtxn.cursor():
-                    wtxn.put(bytes(key), bytes(value), append=True)
+        with ENV.begin(db=src_db) as rtxn:
+            target_env.bulk_load(rtxn.cursor(), db=dst_db)
 
     print('Syncing..')
     target_env.sync(True)
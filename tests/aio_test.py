@@ -76,6 +76,20 @@ class AsyncEnvTest(testlib.LmdbTest):
         self.assertIsInstance(aenv.path(), str)
         self.assertIsInstance(aenv.max_key_size(), int)
 
+    def test_reader(self):
+        async def go():
+            _, env = testlib.temp_env()
+            aenv = lmdb.aio.wrap(env)
+            txn = aenv.reader(max_age_ms=60000)
+            self.assertIsInstance(txn, lmdb.aio.AsyncTransaction)
+            self.assertIs(txn, aenv.reader(max_age_ms=60000))
+            self.assertIsNone(await txn.get(b'a'))
+            await aenv.run_write(lambda wtxn: wtxn.put(b'a', b'b'))
+            txn2 = aenv.reader(max_age_ms=60000, max_txns=0)
+            self.assertIsNot(txn2, txn)
+            self.assertEqual(await txn2.get(b'a'), b'b')
+        run(go())
+
 
 class AsyncTxnTest(testlib.LmdbTest):
     def tearDown(self):
@@ -22,7 +22,9 @@
 
 # test delete(dupdata)
 
+import array
 import os
+import struct
 import sys
 import unittest
 
@@ -30,6 +32,7 @@ import lmdb
 
 import testlib
 from testlib import B
+from testlib import BL
 from testlib import BT
 
 class ContextManagerTest(unittest.TestCase):
@@ -258,6 +261,335 @@ class PutmultiTest(CursorTestBase):
             assert c.put(B('b'), B('value1'), append=True)
             assert c.put(B('b'), B('value2'), append=True)
 
+class PutmultiColumnsTest(CursorTestBase):
+    def test_offsets(self):
+        keys = B('abbccc')
+        key_offsets = array.array('q', [0, 1, 3, 6])
+        values = B('123')
+        value_offsets = array.array('i', [0, 1, 2, 3])
+        assert (3, 3) == self.c.putmulti_columns(keys, key_offsets, values,
+                                                 value_offsets)
+        assert list(self.c) == [BT('a', '1'), BT('bb', '2'), BT('ccc', '3')]
+
+    def test_fixed_width(self):
+        keys = struct.pack('>4I', 4, 3, 2, 1)
+        assert (4, 4) == self.c.putmulti_columns(keys, values=B('aabbccdd'),
+                                                 key_size=4, value_size=2)
+        assert self.c.first()
+        assert self.c.item() == (struct.pack('>I', 1), B('dd'))
+        assert len(list(self.txn.cursor())) == 4
+
+    def test_round_trip(self):
+        items = [(B('k%02d' % i), B('v') * i) for i in range(1, 50)]
+        self.c.putmulti(items)  # type: ignore[arg-type]
+        cols = self.c.export_columns()
+        db = self.env.open_db(B('copy'), txn=self.txn)
+        curs = self.txn.cursor(db=db)
+        assert (49, 49) == curs.putmulti_columns(*cols)
+        assert list(self.txn.cursor(db=db)) == items
+
+    def test_overwrite(self):
+        self.c.put(B('a'), B('old'))
+        assert (2, 1) == self.c.putmulti_columns(
+            B('ab'), values=B('12'), key_size=1, value_size=1,
+            overwrite=False)
+        assert self.txn.get(B('a')) == B('old')
+
+    def test_empty(self):
+        assert (0, 0) == self.c.putmulti_columns(
+            B(''), array.array('q', [0]), B(''), array.array('q', [0]))
+
+    def test_bad_columns(self):
+        self.assertRaises(TypeError, lambda:
+            self.c.putmulti_columns(B('ab'), values=B('12'), value_size=1))
+        self.assertRaises(TypeError, lambda:
+            self.c.putmulti_columns(B('ab'), array.array('q', [0, 2]),
+                                    B('12'), key_size=1, value_size=1))
+        self.assertRaises(ValueError, lambda:
+            self.c.putmulti_columns(B('abc'), values=B('12'),
+                                    key_size=2, value_size=1))
+        self.assertRaises(ValueError, lambda:
+            self.c.putmulti_columns(B('ab'), values=B('123'),
+                                    key_size=1, value_size=1))
+        self.assertRaises(ValueError, lambda:
+            self.c.putmulti_columns(B('ab'), array.array('q', [0, 3]),
+                                    B('1'), value_size=1))
+        self.assertRaises(ValueError, lambda:
+            self.c.putmulti_columns(B('ab'), array.array('q', [0, 2, 1]),
+                                    B('12'), value_size=1))
+        self.assertRaises(ValueError, lambda:
+            self.c.putmulti_columns(B('ab'), array.array('d', [0, 2]),
+                                    B('1'), value_size=1))
+        assert not self.c.first()
+
+    def test_bad_key(self):
+        self.assertRaises(lmdb.BadValsizeError, lambda:
+            self.c.putmulti_columns(B('a'), array.array('q', [0, 1, 1]),
+                                    B('12'), value_size=1))
+        assert self.txn.get(B('a')) == B('1')
+
+
+class PutmultiDupfixedTest(unittest.TestCase):
+    def tearDown(self):
+        testlib.cleanup()
+
+    def setUp(self):
+        self.path, self.env = testlib.temp_env()
+        self.db = self.env.open_db(B('db1'), dupsort=True, dupfixed=True)
+        self.txn = self.env.begin(write=True, db=self.db)
+        self.c = self.txn.cursor()
+
+    def _values(self, key):
+        assert self.c.set_key(key)
+        return [struct.unpack('I', v)[0] for v in self.c.iternext_dup()]
+
+    def test_putmulti_dupfixed(self):
+        values = array.array('I', [5, 1, 3, 2, 4])
+        assert self.c.putmulti_dupfixed(B('a'), values, 4) == 5
+        assert self._values(B('a')) == [1, 2, 3, 4, 5]
+        assert self.c.putmulti_dupfixed(B('b'), B('\0\0\0\0'), 4) == 1
+        assert self._values(B('b')) == [0]
+
+    def test_many(self):
+        values = array.array('I', range(10000))
+        assert self.c.putmulti_dupfixed(B('a'), values, 4) == 10000
+        assert self.c.set_key(B('a'))
+        assert self.c.count() == 10000
+        assert sorted(self._values(B('a'))) == list(range(10000))
+
+    def test_existing(self):
+        self.c.putmulti_dupfixed(B('a'), array.array('I', [1, 3]), 4)
+        assert self.c.putmulti_dupfixed(
+            B('a'), array.array('I', [2, 3]), 4) == 2
+        assert self._values(B('a')) == [1, 2, 3]
+
+    def test_empty(self):
+        assert self.c.putmulti_dupfixed(B('a'), B(''), 4) == 0
+        assert self.txn.get(B('a')) is None
+
+    def test_bad_size(self):
+        self.assertRaises(ValueError,
+            lambda: self.c.putmulti_dupfixed(B('a'), B('12345'), 4))
+        self.assertRaises(ValueError,
+            lambda: self.c.putmulti_dupfixed(B('a'), B('1234'), 0))
+
+    def test_not_dupfixed(self):
+        db = self.env.open_db(B('db2'), txn=self.txn, dupsort=True)
+        curs = self.txn.cursor(db=db)
+        self.assertRaises(lmdb.IncompatibleError,
+            lambda: curs.putmulti_dupfixed(B('a'), B('1234'), 4))
+
+
+class ExportColumnsTest(CursorTestBase):
+    def setUp(self):
+        super().setUp()
+        for k in BL('a', 'b', 'baa', 'c', 'd'):
+            self.txn.put(k, k + B('-value'))
+
+    def split(self, data, offsets):
+        return [bytes(data[offsets[i]:offsets[i + 1]])
+                for i in range(len(offsets) - 1)]
+
+    def test_all(self):
+        keys, koffs, vals, voffs = self.c.export_columns()
+        assert koffs.format == voffs.format == 'q'
+        assert self.split(keys, koffs) == BL('a', 'b', 'baa', 'c', 'd')
+        assert self.split(vals, voffs)[2] == B('baa-value')
+        assert not self.c.key()  # end of db
+
+    def test_range(self):
+        keys, koffs, _, _ = self.c.export_columns(B('aa'), B('c'))
+        assert self.split(keys, koffs) == BL('b', 'baa')
+        # Cursor rests on the first record past the range.
+        assert self.c.key() == B('c')
+
+    def test_limit(self):
+        keys, koffs, vals, voffs = self.c.export_columns(B('b'), limit=2)
+        assert self.split(keys, koffs) == BL('b', 'baa')
+        keys, koffs, vals, voffs = self.c.export_columns(limit=0)
+        assert list(koffs) == list(voffs) == [0]
+        assert len(keys) == len(vals) == 0
+
+    def test_empty_range(self):
+        keys, koffs, _, _ = self.c.export_columns(B('x'))
+        assert list(koffs) == [0]
+        keys, koffs, _, _ = self.c.export_columns(B('b'), B('b'))
+        assert list(koffs) == [0]
+
+    def test_bad_stop(self):
+        self.assertRaises(lmdb.BadValsizeError,
+                          lambda: self.c.export_columns(stop=B('')))
+
+    def test_integerkey(self):
+        db = self.env.open_db(B('ints'), txn=self.txn, integerkey=True)
+        for i in range(10):
+            self.txn.put(struct.pack('I', i), B('%d' % i), db=db)
+        c = self.txn.cursor(db=db)
+        keys, koffs, vals, voffs = c.export_columns(
+            struct.pack('I', 3), struct.pack('I', 6))
+        assert self.split(vals, voffs) == BL('3', '4', '5')
+        self.assertRaises(lmdb.BadValsizeError,
+                          lambda: c.export_columns(stop=B('abc')))
+
+
+class CountRangeTest(CursorTestBase):
+    def setUp(self):
+        super().setUp()
+        for k in BL('a', 'b', 'baa', 'c', 'd'):
+            self.txn.put(k, B(''))
+
+    def test_all(self):
+        assert self.c.count_range() == 5
+        assert not self.c.key()  # end of db
+
+    def test_range(self):
+        assert self.c.count_range(B('aa'), B('c')) == 2
+        # Cursor rests on the first record past the range.
+        assert self.c.key() == B('c')
+        assert self.c.count_range(B('b')) == 4
+        assert self.c.count_range(stop=B('b')) == 1
+        assert self.c.count_range(B('x')) == 0
+        assert self.c.count_range(B('c'), B('b')) == 0
+
+    def test_bad_bound(self):
+        self.assertRaises(lmdb.BadValsizeError,
+                          lambda: self.c.count_range(stop=B('')))
+        self.assertRaises(lmdb.BadValsizeError,
+                          lambda: self.c.count_range(B('x') * 1000))
+
+    def test_dupsort(self):
+        db = self.env.open_db(B('dups'), txn=self.txn, dupsort=True)
+        for k, n in (('a', 3), ('b', 1), ('c', 2)):
+            for i in range(n):
+                self.txn.put(B(k), B('%d' % i), db=db)
+        c = self.txn.cursor(db=db)
+        assert c.count_range() == 6
+        assert c.count_range(dup=False) == 3
+        assert c.count_range(B('b'), B('c')) == 1
+        assert c.count_range(B('a'), B('c'), dup=False) == 2
+
+
+class ReserveTest(CursorTestBase):
+    def test_reserve(self):
+        view = self.c.reserve(B('a'), 3)
+        view[:] = B('abc')
+        assert self.c.key() == B('a')
+        assert self.c.value() == B('abc')
+        assert self.c.reserve(B('a'), 1, overwrite=False) is None
+        self.c.reserve(B('b'), 2, append=True)[:] = B('xy')
+        self.assertRaises(ValueError, lambda: view[0])
+        assert list(self.txn.cursor()) == [(B('a'), B('abc')),
+                                           (B('b'), B('xy'))]
+
+    def test_dupsort(self):
+        db = self.env.open_db(B('dups'), txn=self.txn, dupsort=True)
+        curs = self.txn.cursor(db=db)
+        self.assertRaises(lmdb.IncompatibleError,
+                          lambda: curs.reserve(B('a'), 1))
+
+
+class DeletemultiTest(CursorTestBase):
+    def setUp(self):
+        super().setUp()
+        for k in BL('a', 'b', 'c', 'd', 'e'):
+            self.txn.put(k, k)
+
+    def keys(self, db=None):
+        return list(self.txn.cursor(db=db).iternext(values=False))
+
+    def test_keys(self):
+        assert self.c.deletemulti(BL('d', 'b', 'x')) == (3, 2)
+        assert self.keys() == BL('a', 'c', 'e')
+        assert not self.c.key()  # cursor is unpositioned
+        assert self.c.deletemulti([]) == (0, 0)
+
+    def test_generator(self):
+        assert self.c.deletemulti(k for k in BL('e', 'a')) == (2, 2)
+        assert self.keys() == BL('b', 'c', 'd')
+
+    def test_bad_key(self):
+        self.assertRaises(lmdb.BadValsizeError,
+                          lambda: self.c.deletemulti([B('a'), B('')]))
+        assert self.keys() == BL('a', 'b', 'c', 'd', 'e')
+
+    def test_dupsort(self):
+        db = self.env.open_db(B('dups'), txn=self.txn, dupsort=True)
+        for k, n in (('a', 3), ('b', 2), ('c', 1)):
+            for i in range(n):
+                self.txn.put(B(k), B('%d' % i), db=db)
+        c = self.txn.cursor(db=db)
+        pairs = [(B('a'), B('1')), (B('b'), B('9')), (B('c'), B('0'))]
+        assert c.deletemulti(pairs) == (3, 2)
+        assert list(c.iternext()) == [(B('a'), B('0')), (B('a'), B('2')),
+                                      (B('b'), B('0')), (B('b'), B('1'))]
+        assert c.deletemulti([B('a')]) == (1, 1)
+        assert c.deletemulti([B('b')], dupdata=True) == (1, 2)
+        assert self.keys(db) == BL('a')
+        assert self.txn.get(B('a'), db=db) == B('2')
+
+
+class NumericValuesTest(CursorTestBase):
+    def setUp(self):
+        super().setUp()
+        self.db = self.env.open_db(B('nums'), txn=self.txn, dupsort=True,
+                                   dupfixed=True, integerdup=True)
+        self.nums = [i * 7 for i in range(2000)]
+        for i in self.nums:
+            self.txn.put(B('k'), struct.pack('Q', i), db=self.db)
+        self.txn.put(B('l'), struct.pack('Q', 1), db=self.db)
+        self.c = self.txn.cursor(db=self.db)
+
+    def test_values_array(self):
+        self.c.set_key(B('k'))
+        arr = self.c.values_array('Q')
+        assert arr.typecode == 'Q'
+        assert list(arr) == self.nums
+        # Cursor rests on the last value.
+        assert self.c.item() == (B('k'), struct.pack('Q', self.nums[-1]))
+        assert list(self.c.values_array('d')) == [
+            struct.unpack('d', struct.pack('Q', i))[0] for i in self.nums]
+
+    def test_values_array_not_dupfixed(self):
+        db = self.env.open_db(B('dups'), txn=self.txn, dupsort=True)
+        for i in 3, 1, 2:
+            self.txn.put(B('a'), struct.pack('I', i), db=db)
+        c = self.txn.cursor(db=db)
+        c.set_key(B('a'))
+        assert list(c.values_array('I')) == [1, 2, 3]
+        self.txn.put(B('a'), B('x'), db=db)
+        c.set_key(B('a'))
+        self.assertRaises(lmdb.BadValsizeError, lambda: c.values_array('I'))
+
+    def test_values_array_packed(self):
+        self.txn.put(B('a'), struct.pack('3d', 0.5, 1.5, 2.5))
+        self.c = self.txn.cursor()
+        self.c.set_key(B('a'))
+        assert list(self.c.values_array('d')) == [0.5, 1.5, 2.5]
+        self.txn.put(B('b'), B('12345'))
+        self.c.set_key(B('b'))
+        self.assertRaises(lmdb.BadValsizeError,
+                          lambda: self.c.values_array('I'))
+
+    def test_values_array_errors(self):
+        assert len(self.c.values_array('Q')) == 0  # unpositioned
+        self.c.set_key(B('k'))
+        self.assertRaises(lmdb.BadValsizeError,
+                          lambda: self.c.values_array('I'))
+        self.assertRaises(ValueError, lambda: self.c.values_array('x'))
+
+    def test_iternext_dup(self):
+        self.c.set_key(B('k'))
+        assert list(self.c.iternext_dup(dtype='Q')) == self.nums
+        self.c.set_key(B('l'))
+        assert list(self.c.iternext_dup(keys=True, dtype='Q')) == [
+            (B('l'), 1)]
+        self.c.last_dup()
+        assert list(self.c.iterprev_dup(dtype='Q')) == [1]
+        self.c.set_key(B('l'))
+        self.assertRaises(lmdb.BadValsizeError,
+                          lambda: list(self.c.iternext_dup(dtype='H')))
+
+
 class ReplaceTest(CursorTestBase):
     def test_replace(self):
         assert None is self.c.replace(B('a'), B(''))
@@ -350,6 +682,62 @@ class PreloadTest(CursorTestBase):
         # Getting the value does prefault the data, even if we only get it by pointer
         assert minflts_after_value > minflts_after_key
 
+class CursorReuseTest(unittest.TestCase):
+    def tearDown(self):
+        testlib.cleanup()
+
+    def setUp(self):
+        self.path, self.env = testlib.temp_env()
+        self.plain = self.env.open_db(b'plain')
+        self.dups = self.env.open_db(b'dups', dupsort=True)
+        with self.env.begin(write=True) as txn:
+            for i in range(10):
+                txn.put(B('k%d' % i), B('v%d' % i), db=self.plain)
+                txn.put(B('k%d' % i), B('a'), db=self.dups)
+                txn.put(B('k%d' % i), B('b'), db=self.dups)
+
+    def test_reuse_across_txns(self):
+        for _ in range(100):
+            with self.env.begin() as txn:
+                curs = txn.cursor(db=self.plain)
+                self.assertEqual(10, len(list(curs.iternext())))
+                dcurs = txn.cursor(db=self.dups)
+                self.assertTrue(dcurs.set_key(B('k3')))
+                self.assertEqual(2, dcurs.count())
+                self.assertEqual([B('a'), B('b')],
+                                 list(dcurs.iternext_dup()))
+                del curs, dcurs
+
+    def test_reused_cursor_sees_new_data(self):
+        with self.env.begin() as txn:
+            self.assertEqual(10, len(list(txn.cursor(db=self.plain))))
+        with self.env.begin(write=True) as txn:
+            txn.put(B('k99'), B('v99'), db=self.plain)
+        with self.env.begin() as txn:
+            curs = txn.cursor(db=self.plain)
+            self.assertEqual(11, len(list(curs)))
+            self.assertEqual(B('v99'), curs.get(B('k99')))
+
+    def test_outlived_txn_invalid(self):
+        txn = self.env.begin()
+        curs = txn.cursor(db=self.plain)
+        txn.abort()
+        self.assertRaises(Exception, curs.first)
+        with self.env.begin() as txn:
+            self.assertTrue(txn.cursor(db=self.plain).first())
+
+    def test_dropped_db(self):
+        with self.env.begin() as txn:
+            self.assertTrue(txn.cursor(db=self.dups).first())
+        with self.env.begin(write=True) as txn:
+            txn.drop(self.dups)
+        db = self.env.open_db(b'other')
+        with self.env.begin(write=True) as txn:
+            txn.put(B('x'), B('y'), db=db)
+        with self.env.begin() as txn:
+            self.assertEqual([(B('x'), B('y'))], list(txn.cursor(db=db)))
+
+
 class CursorReadOnlyTest(unittest.TestCase):
     def tearDown(self):
         testlib.cleanup()
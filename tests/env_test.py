@@ -22,6 +22,8 @@
 
 import os
 import sys
+import threading
+import time
 import unittest
 import weakref
 
@@ -391,6 +393,230 @@ class SetMapSizeTest(unittest.TestCase):
 @unittest.skipIf(os.getenv('LMDB_PURE') or os.getenv('LMDB_FORCE_SYSTEM'),
                  'requires patched LMDB: unpatched mdb_env_set_mapsize can '
                  'fail under concurrent load, invalidating the environment')
+class BulkLoadTest(unittest.TestCase):
+    def tearDown(self):
+        testlib.cleanup()
+
+    def _items(self, n):
+        return ((B('%08d' % i), B('v') * 100) for i in range(n))
+
+    def test_bulk_load(self):
+        _, env = testlib.temp_env()
+        assert env.bulk_load(self._items(1000)) == (1000, 1000)
+        assert env.bulk_load([]) == (0, 0)
+        with env.begin() as txn:
+            assert list(txn.cursor()) == list(self._items(1000))
+
+    def test_grows_map(self):
+        _, env = testlib.temp_env(map_size=PAGE_SIZE * 16)
+        assert env.bulk_load(self._items(20000), txn_bytes=1 << 18,
+                             grow_factor=1.5) == (20000, 20000)
+        assert env.info()['map_size'] > PAGE_SIZE * 16
+        assert env.stat()['entries'] == 20000
+
+    def test_unsorted(self):
+        _, env = testlib.temp_env()
+        items = [(B('b'), B('1')), (B('a'), B('2')), (B('c'), B('3'))]
+        self.assertRaises(ValueError, lambda: env.bulk_load(items))
+        assert env.stat()['entries'] == 0
+        # Chunks before the out-of-order record are kept.
+        self.assertRaises(ValueError,
+            lambda: env.bulk_load(items, txn_bytes=1))
+        with env.begin() as txn:
+            assert list(txn.cursor()) == [(B('b'), B('1'))]
+        assert env.bulk_load(items, presorted=False) == (3, 3)
+        with env.begin() as txn:
+            assert txn.get(B('a')) == B('2')
+
+    def test_db(self):
+        _, env = testlib.temp_env()
+        db = env.open_db(B('db1'), dupsort=True)
+        items = [(B('a'), B('1')), (B('a'), B('2')), (B('b'), B('1'))]
+        assert env.bulk_load(items, db=db, txn_bytes=1) == (3, 3)
+        with env.begin(db=db) as txn:
+            assert list(txn.cursor()) == items
+            assert txn.get(B('a'), db=env.open_db(None)) is None
+
+    def test_bad_args(self):
+        _, env = testlib.temp_env()
+        self.assertRaises(ValueError,
+            lambda: env.bulk_load([], grow_factor=1))
+        self.assertRaises(ValueError,
+            lambda: env.bulk_load([], txn_bytes=0))
+        self.assertRaises(TypeError,
+            lambda: env.bulk_load([(B('a'), B('1')), [B('b'), B('2')]]))
+        self.assertRaises(TypeError,
+            lambda: env.bulk_load([(B('a'), B('1')), None]))
+        # The chunk holding the bad element is never written.
+        with env.begin() as txn:
+            assert txn.get(B('a')) is None
+
+    def test_active_write_txn(self):
+        _, env = testlib.temp_env()
+        txn = env.begin(write=True)
+        self.assertRaises(lmdb.Error,
+            lambda: env.bulk_load([(B('a'), B('1'))]))
+        txn.abort()
+
+
+class AutoGrowTest(unittest.TestCase):
+    def tearDown(self):
+        testlib.cleanup()
+
+    def _fill(self, txn, n=2000):
+        for i in range(n):
+            txn.put(B('%06d' % i), B('v') * 100)
+        return n
+
+    def test_no_grow_on_end(self):
+        # Ending a transaction never grows the map, since that would
+        # invalidate other transactions, such as this reader.
+        _, env = testlib.temp_env(map_size=PAGE_SIZE * 16, auto_grow=True)
+        reader = env.begin()
+        txn = env.begin(write=True)
+        self.assertRaises(lmdb.MapFullError, lambda: self._fill(txn))
+        txn.abort()
+        try:
+            with env.begin(write=True) as txn:
+                self._fill(txn)
+        except lmdb.MapFullError:
+            pass
+        assert env.info()['map_size'] == PAGE_SIZE * 16
+        assert reader.get(B('000000')) is None
+        reader.abort()
+
+    def test_no_auto_grow(self):
+        _, env = testlib.temp_env(map_size=PAGE_SIZE * 16)
+        self.assertRaises(lmdb.MapFullError,
+            lambda: env.run_write(self._fill))
+        assert env.info()['map_size'] == PAGE_SIZE * 16
+
+    def test_nested(self):
+        _, env = testlib.temp_env(map_size=PAGE_SIZE * 16, auto_grow=True,
+                                  grow_step=PAGE_SIZE * 4)
+
+        def fn(txn):
+            with env.begin(write=True, parent=txn) as child:
+                return self._fill(child)
+        assert env.run_write(fn) == 2000
+        assert (env.info()['map_size'] - PAGE_SIZE * 16) % (PAGE_SIZE * 4) == 0
+        assert env.stat()['entries'] == 2000
+
+    def test_run_write(self):
+        _, env = testlib.temp_env(map_size=PAGE_SIZE * 16, auto_grow=True)
+        calls = []
+
+        def fn(txn):
+            calls.append(txn)
+            return self._fill(txn)
+        assert env.run_write(fn) == 2000
+        assert len(calls) > 1
+        assert env.stat()['entries'] == 2000
+
+    def test_run_write_max_map_size(self):
+        _, env = testlib.temp_env(map_size=PAGE_SIZE * 16, auto_grow=True,
+                                  max_map_size=PAGE_SIZE * 24)
+        self.assertRaises(lmdb.MapFullError,
+            lambda: env.run_write(self._fill))
+        assert env.info()['map_size'] == PAGE_SIZE * 24
+        assert env.stat()['entries'] == 0
+
+    def test_run_write_error(self):
+        _, env = testlib.temp_env(auto_grow=True)
+
+        def fn(txn):
+            txn.put(B('a'), B('1'))
+            raise ValueError()
+        self.assertRaises(ValueError, lambda: env.run_write(fn))
+        assert env.run_write(lambda txn: txn.get(B('a'))) is None
+        assert env.run_write(lambda txn: txn.put(B('a'), B('1')))
+        with env.begin() as txn:
+            assert txn.get(B('a')) == B('1')
+
+
+class WriterTest(unittest.TestCase):
+    def tearDown(self):
+        testlib.cleanup()
+
+    @staticmethod
+    def _test_exit_child(path):
+        """Exit with requests pending on a writer that was never closed."""
+        env = lmdb.open(path)
+        writer = env.writer(max_delay_ms=60000)
+        for i in range(100):
+            writer.put(B('%03d' % i), B('v'))
+
+    def test_exit(self):
+        path, env = testlib.temp_env()
+        # Let the child import the lmdb under test.
+        environ = dict(os.environ)
+        environ['PYTHONPATH'] = os.pathsep.join(
+            [os.path.dirname(os.path.dirname(lmdb.__file__))] +
+            environ.get('PYTHONPATH', '').split(os.pathsep))
+        rc = os.spawnle(os.P_WAIT, sys.executable, sys.executable,
+                        __file__, 'test_writer_exit_child', path, environ)
+        assert rc == 0
+        assert env.stat()['entries'] == 100
+
+    def test_threads(self):
+        _, env = testlib.temp_env()
+        futures = []
+
+        def produce(n):
+            for i in range(200):
+                futures.append(writer.put(B('%d-%03d' % (n, i)), B('v')))
+        with env.writer(max_batch=50) as writer:
+            threads = [threading.Thread(target=produce, args=(n,))
+                       for n in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        assert all(future.result() for future in futures)
+        assert env.stat()['entries'] == 800
+
+    def test_results(self):
+        _, env = testlib.temp_env()
+        db = env.open_db(B('db1'))
+        with env.writer(db=db, max_delay_ms=1) as writer:
+            assert writer.put(B('a'), B('1')).result()
+            assert not writer.put(B('a'), B('2'), overwrite=False).result()
+            assert writer.replace(B('a'), B('3')).result() == B('1')
+            assert writer.delete(B('a')).result()
+            assert not writer.delete(B('a')).result()
+            assert writer.put(B('b'), B('1'), db=env.open_db(None)).result()
+        with env.begin() as txn:
+            assert txn.get(B('b')) == B('1')
+            assert txn.get(B('a'), db=db) is None
+
+    def test_failed_request(self):
+        _, env = testlib.temp_env()
+        with env.writer() as writer:
+            writer.flush()
+            ok = writer.put(B('a'), B('1'))
+            bad = writer.put(B(''), B('1'))
+            ok2 = writer.put(B('b'), B('1'))
+            self.assertRaises(lmdb.BadValsizeError, bad.result)
+            assert ok.result() and ok2.result()
+        assert env.stat()['entries'] == 2
+
+    def test_closed(self):
+        _, env = testlib.temp_env()
+        writer = env.writer()
+        writer.put(B('a'), B('1'))
+        writer.close()
+        writer.close()
+        self.assertRaises(RuntimeError,
+            lambda: writer.put(B('b'), B('1')))
+        with env.begin() as txn:
+            assert txn.get(B('a')) == B('1')
+
+    def test_bad_args(self):
+        _, env = testlib.temp_env()
+        self.assertRaises(ValueError, lambda: env.writer(max_batch=0))
+        self.assertRaises(ValueError, lambda: env.writer(max_delay_ms=-1))
+
+
 class SetMapSizeConcurrencyTest(unittest.TestCase):
     """Stress set_mapsize() against concurrent environment operations.
 
@@ -828,6 +1054,212 @@ class OtherMethodsTest(unittest.TestCase):
             lambda: env.reader_check())
 
 
+class CompactToTest(unittest.TestCase):
+    def tearDown(self):
+        testlib.cleanup()
+
+    def _fill(self, env):
+        with env.begin(write=True) as txn:
+            for i in range(2000):
+                txn.put(B('%05d' % i), B('x') * 300)
+        with env.begin(write=True) as txn:
+            for i in range(1990):
+                txn.delete(B('%05d' % i))
+
+    def test_swap(self):
+        path, env = testlib.temp_env()
+        self._fill(env)
+        data_path = os.path.join(path, 'data.mdb')
+        mode = testlib.path_mode(data_path)
+        before = os.path.getsize(data_path)
+        txn = env.begin()
+        scratch = testlib.temp_dir()
+        env.compact_to(scratch)
+
+        # The environment is closed, signalling users to reopen it.
+        self.assertRaises(Exception, txn.get, B('01999'))
+        self.assertRaises(lmdb.Error, env.begin)
+        assert os.listdir(scratch) == []
+        assert os.path.getsize(data_path) < before
+        assert testlib.path_mode(data_path) == mode
+
+        _, env = testlib.temp_env(path)
+        with env.begin() as txn:
+            assert txn.stat()['entries'] == 10
+            assert txn.get(B('01999')) == B('x') * 300
+        with env.begin(write=True) as txn:
+            txn.put(B('a'), B('b'))
+        with env.begin() as txn:
+            assert txn.get(B('a')) == B('b')
+
+    def test_swap_single_file(self):
+        path = testlib.temp_file(create=False)
+        _, env = testlib.temp_env(path, subdir=False)
+        self._fill(env)
+        before = os.path.getsize(path)
+        env.compact_to(testlib.temp_file(create=False))
+        assert os.path.getsize(path) < before
+
+        _, env = testlib.temp_env(path, subdir=False)
+        with env.begin() as txn:
+            assert txn.get(B('01999')) == B('x') * 300
+
+    def test_no_swap(self):
+        path, env = testlib.temp_env()
+        self._fill(env)
+        before = os.path.getsize(os.path.join(path, 'data.mdb'))
+        dest_dir = testlib.temp_dir()
+        env.compact_to(dest_dir, swap=False)
+        copied = os.path.getsize(os.path.join(dest_dir, 'data.mdb'))
+        assert copied < before
+        with env.begin() as txn:
+            assert txn.get(B('01999')) == B('x') * 300
+
+    def test_readonly(self):
+        path, env = testlib.temp_env()
+        self._fill(env)
+        env.close()
+        _, env = testlib.temp_env(path, readonly=True)
+        self.assertRaises(lmdb.Error, env.compact_to, testlib.temp_dir())
+        with env.begin() as txn:
+            assert txn.get(B('01999')) == B('x') * 300
+
+    def test_queued_writer(self):
+        # A writer waiting on the lock must not have its write discarded:
+        # either it fails, or it commits and the swap is abandoned.
+        path, env = testlib.temp_env()
+        self._fill(env)
+        started = threading.Event()
+        result = []
+
+        def writer():
+            started.set()
+            try:
+                with env.begin(write=True) as txn:
+                    txn.put(B('w'), B('w'))
+                result.append(True)
+            except Exception:
+                result.append(False)
+
+        thread = threading.Thread(target=writer, daemon=True)
+        with env.begin(write=True) as txn:
+            thread.start()
+            started.wait()
+        try:
+            env.compact_to(testlib.temp_dir())
+        except lmdb.Error:
+            pass
+        thread.join(10)
+        assert result
+
+        env.close()
+        _, env = testlib.temp_env(path)
+        with env.begin() as txn:
+            assert txn.get(B('01999')) == B('x') * 300
+            if result[0]:
+                assert txn.get(B('w')) == B('w')
+
+
+class BackupTest(unittest.TestCase):
+    def tearDown(self):
+        testlib.cleanup()
+
+    def _env(self):
+        path, env = testlib.temp_env()
+        with env.begin(write=True) as txn:
+            for i in range(2000):
+                txn.put(B('%05d' % i), B('x') * 300)
+        return path, env
+
+    def _check(self, path, **kwargs):
+        env = lmdb.open(path, readonly=True, **kwargs)
+        try:
+            with env.begin() as txn:
+                assert txn.stat()['entries'] == 2000
+                assert txn.get(B('01999')) == B('x') * 300
+        finally:
+            env.close()
+
+    def test_backup(self):
+        _, env = self._env()
+        dest_dir = testlib.temp_dir()
+        seen = []
+        copied = env.backup(dest_dir, progress=seen.append)
+        assert copied == os.path.getsize(os.path.join(dest_dir, 'data.mdb'))
+        assert seen and seen[-1] == copied
+        assert seen == sorted(seen)
+        self._check(dest_dir)
+
+    def test_compact(self):
+        _, env = self._env()
+        with env.begin(write=True) as txn:
+            for i in range(1000):
+                txn.delete(B('%05d' % i))
+        full = env.backup(testlib.temp_dir())
+        dest_dir = testlib.temp_dir()
+        assert env.backup(dest_dir, compact=True) < full
+        cenv = lmdb.open(dest_dir, readonly=True)
+        with cenv.begin() as txn:
+            assert txn.stat()['entries'] == 1000
+        cenv.close()
+
+    def test_fd(self):
+        _, env = self._env()
+        dst_path = testlib.temp_file(create=False)
+        with open(dst_path, 'wb') as fp:
+            copied = env.backup(fp.fileno())
+        assert copied == os.path.getsize(dst_path)
+        self._check(dst_path, subdir=False)
+
+    def test_rate_limit(self):
+        _, env = self._env()
+        size = env.backup(testlib.temp_dir())
+        start = time.monotonic()
+        env.backup(testlib.temp_dir(), rate_limit_bytes=size / 0.3)
+        assert time.monotonic() - start >= 0.25
+        self.assertRaises(ValueError, env.backup, testlib.temp_dir(),
+                          rate_limit_bytes=0)
+
+    def test_progress_raises(self):
+        _, env = self._env()
+        dest_dir = testlib.temp_dir()
+
+        def progress(copied):
+            raise ValueError('stop')
+        self.assertRaises(ValueError, env.backup, dest_dir, progress=progress)
+        # The partial copy is removed and the environment remains usable.
+        assert os.listdir(dest_dir) == []
+        env.backup(dest_dir)
+        self._check(dest_dir)
+
+    def test_concurrent(self):
+        # Readers and writers on other threads are not held up by the copy.
+        _, env = self._env()
+        done = []
+
+        def work():
+            with env.begin(write=True) as txn:
+                txn.put(B('new'), B('1'))
+            with env.begin() as txn:
+                done.append(txn.get(B('new')))
+
+        def progress(copied):
+            if not done:
+                thread = threading.Thread(target=work)
+                thread.start()
+                thread.join(10)
+                assert not thread.is_alive()
+        env.backup(testlib.temp_dir(), progress=progress)
+        assert done == [B('1')]
+
+    def test_exists(self):
+        _, env = self._env()
+        dest_dir = testlib.temp_dir()
+        env.backup(dest_dir)
+        self.assertRaises(OSError, env.backup, dest_dir)
+        self._check(dest_dir)
+
+
 class BeginTest(unittest.TestCase):
     def tearDown(self):
         testlib.cleanup()
@@ -1139,6 +1571,193 @@ class SpareTxnTest(unittest.TestCase):
         del t3
         assert 1 == reader_count(env)  # 1 cached
 
+    def test_many(self):
+        _, env = testlib.temp_env(max_spare_txns=4)
+
+        txns = [env.begin() for _ in range(6)]
+        assert 6 == reader_count(env)
+        for txn in txns:
+            txn.abort()
+        del txn, txns
+        assert 4 == reader_count(env)  # 4 cached, 2 closed
+
+        txns = [env.begin() for _ in range(4)]
+        assert 4 == reader_count(env)  # all reused
+        for txn in txns:
+            with txn.cursor() as curs:
+                assert not curs.first()
+        del txn, txns
+        assert 4 == reader_count(env)
+
+    def test_threads(self):
+        _, env = testlib.temp_env(max_spare_txns=8)
+        with env.begin(write=True) as txn:
+            txn.put(B('a'), B('b'))
+        errors = []
+
+        def reader():
+            try:
+                for _ in range(200):
+                    with env.begin() as txn:
+                        assert txn.get(B('a')) == B('b')
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=reader) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert not errors
+        assert reader_count(env) <= 8
+
+
+class ReaderTest(unittest.TestCase):
+    def tearDown(self):
+        testlib.cleanup()
+
+    def test_cached(self):
+        _, env = testlib.temp_env()
+        txn = env.reader(max_age_ms=60000)
+        assert txn is env.reader(max_age_ms=60000)
+        assert not txn.get(B('a'))
+
+    def test_max_age(self):
+        _, env = testlib.temp_env()
+        txn = env.reader(max_age_ms=20)
+        time.sleep(0.05)
+        txn2 = env.reader(max_age_ms=20)
+        assert txn2 is not txn
+        # The replaced transaction is not aborted.
+        assert not txn.get(B('a'))
+
+    def test_max_txns(self):
+        _, env = testlib.temp_env()
+        txn = env.reader(max_age_ms=60000, max_txns=1)
+        with env.begin(write=True) as wtxn:
+            wtxn.put(B('a'), B('b'))
+        assert txn is env.reader(max_age_ms=60000, max_txns=1)
+        assert not txn.get(B('a'))
+        txn2 = env.reader(max_age_ms=60000, max_txns=0)
+        assert txn2 is not txn
+        assert txn2.get(B('a')) == B('b')
+
+    def test_invalid(self):
+        _, env = testlib.temp_env()
+        txn = env.reader(max_age_ms=60000)
+        txn.abort()
+        txn2 = env.reader(max_age_ms=60000)
+        assert txn2 is not txn
+        assert not txn2.get(B('a'))
+
+    def test_threads(self):
+        _, env = testlib.temp_env()
+        txn = env.reader(max_age_ms=60000)
+        other = []
+        thread = threading.Thread(
+            target=lambda: other.append(env.reader(max_age_ms=60000)))
+        thread.start()
+        thread.join()
+        assert other[0] is not txn
+        assert txn is env.reader(max_age_ms=60000)
+
+    def test_close(self):
+        _, env = testlib.temp_env()
+        txn = env.reader()
+        env.close()
+        self.assertRaises(Exception, txn.get, B('a'))
+        self.assertRaises(lmdb.Error, env.reader)
+
+
+class ReaderSlotsTest(unittest.TestCase):
+    def tearDown(self):
+        testlib.cleanup()
+
+    def test_empty(self):
+        _, env = testlib.temp_env(max_spare_txns=0)
+        assert env.reader_slots() == []
+
+    def test_lag(self):
+        _, env = testlib.temp_env(max_spare_txns=0)
+        txn = env.begin()
+        for i in range(3):
+            with env.begin(write=True) as wtxn:
+                wtxn.put(B('a'), B('%d' % i))
+        slots = env.reader_slots()
+        assert len(slots) == 1
+        pid, tid, txnid, lag = slots[0]
+        assert pid == os.getpid()
+        assert isinstance(tid, INT_TYPES)
+        assert txnid == txn.id()
+        assert lag == 3
+        txn.abort()
+        del txn
+        assert env.reader_slots() == []
+
+    def test_reset(self):
+        _, env = testlib.temp_env(max_spare_txns=1)
+        txn = env.begin()
+        txn.abort()
+        del txn
+        slots = env.reader_slots()
+        assert len(slots) == 1
+        assert slots[0][0] == os.getpid()
+        assert slots[0][2:] == (None, None)
+
+    def test_closed(self):
+        _, env = testlib.temp_env()
+        env.close()
+        self.assertRaises(Exception, env.reader_slots)
+
+
+class FreelistStatTest(unittest.TestCase):
+    def tearDown(self):
+        testlib.cleanup()
+
+    def test_empty(self):
+        _, env = testlib.temp_env()
+        assert env.freelist_stat() == {
+            'entries': 0,
+            'free_pages': 0,
+            'pending_pages': 0,
+            'pending': {},
+            'largest_run': 0,
+        }
+
+    def test_pending(self):
+        _, env = testlib.temp_env(max_spare_txns=0)
+        with env.begin(write=True) as txn:
+            for i in range(500):
+                txn.put(B('%05d' % i), B('x') * 500)
+        reader = env.begin()
+        with env.begin(write=True) as txn:
+            for i in range(500):
+                txn.delete(B('%05d' % i))
+            freeing = txn.id()
+        st = env.freelist_stat()
+        assert st['entries'] == 1
+        assert st['free_pages'] > 50
+        assert st['pending'] == {freeing: st['free_pages']}
+        assert st['pending_pages'] == st['free_pages']
+        assert st['largest_run'] == 0
+
+        # Once the reader is gone, the next writers may reuse the pages.
+        reader.abort()
+        del reader
+        for _ in range(2):
+            with env.begin(write=True) as txn:
+                txn.put(B('a'), B('b'))
+        st = env.freelist_stat()
+        assert freeing not in st['pending']
+        assert st['pending_pages'] == sum(st['pending'].values())
+        assert st['pending_pages'] < st['free_pages']
+        assert 0 < st['largest_run'] <= st['free_pages'] - st['pending_pages']
+
+    def test_closed(self):
+        _, env = testlib.temp_env()
+        env.close()
+        self.assertRaises(Exception, env.freelist_stat)
+
 
 class LeakTest(unittest.TestCase):
     def tearDown(self):
@@ -1178,5 +1797,7 @@ class LeakTest(unittest.TestCase):
 if __name__ == '__main__':
     if len(sys.argv) > 1 and sys.argv[1] == 'test_reader_check_child':
         OtherMethodsTest._test_reader_check_child(sys.argv[2])
+    elif len(sys.argv) > 1 and sys.argv[1] == 'test_writer_exit_child':
+        WriterTest._test_exit_child(sys.argv[2])
     else:
         unittest.main()
@@ -1,6 +1,7 @@
 import unittest
 
 import testlib, struct
+import lmdb
 from testlib import KEYSFIXED, ITEMS_MULTI_FIXEDKEY
 from testlib import putBigDataMultiFixed
 
@@ -117,5 +118,30 @@ class GetMultiTestDupsortDupfixedKeyfixed(GetMultiTestBase):
         self.assertEqual(all(asserts), True)
 
 
+class GetMultiTestDtype(GetMultiTestBase):
+
+    dupsort = True
+    dupfixed = True
+
+    def testDupfixed(self):
+        test_list = self.c.getmulti(KEYSFIXED, dupdata=True,
+                                    dupfixed_bytes=1, dtype='B')
+        self.assertEqual(test_list,
+                         [(k, ord(v)) for k, v in ITEMS_MULTI_FIXEDKEY])
+
+    def testGetCurrent(self):
+        test_list = self.c.getmulti(KEYSFIXED[:2], dupdata=True, dtype='b')
+        self.assertEqual(test_list,
+                         [(k, ord(v)) for k, v in ITEMS_MULTI_FIXEDKEY[:4]])
+
+    def testBadSize(self):
+        self.assertRaises(lmdb.BadValsizeError, self.c.getmulti,
+                          KEYSFIXED, dupdata=True, dtype='I')
+        self.assertRaises(Exception, self.c.getmulti, KEYSFIXED,
+                          dupdata=True, dupfixed_bytes=2, dtype='B')
+        self.assertRaises(ValueError, self.c.getmulti, KEYSFIXED,
+                          dupdata=True, dtype='x')
+
+
 if __name__ == '__main__':
     unittest.main()
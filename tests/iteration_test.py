@@ -25,8 +25,11 @@
 
 import unittest
 
+import lmdb
+
 import testlib
 from testlib import B
+from testlib import BL
 from testlib import BT
 from testlib import KEYS, ITEMS, KEYS2, ITEMS2
 from testlib import putData, putBigData
@@ -251,5 +254,186 @@ class SeekIterationTest(IterationTestBase2):
         self.assertEqual(test_list, test_item)
 
 
+class RangeIterationTest(IterationTestBase2):
+    def testStop(self):
+        self.c.set_range(B('b'))
+        self.assertEqual(list(self.c.iternext(values=False, stop=B('e'))),
+                         BL('b', 'baa', 'd'))
+        # Cursor rests on the first key past the range.
+        self.assertEqual(self.c.key(), B('e'))
+
+    def testStopBetweenKeys(self):
+        self.c.first()
+        self.assertEqual(list(self.c.iternext(values=False, stop=B('c'))),
+                         BL('a', 'b', 'baa'))
+
+    def testInclusive(self):
+        self.c.set_range(B('d'))
+        keys = list(self.c.iternext(values=False, stop=B('f'),
+                                    inclusive=True))
+        self.assertEqual(keys, BL('d', 'e', 'f'))
+
+    def testLimit(self):
+        self.c.first()
+        self.assertEqual(list(self.c.iternext(limit=3)), ITEMS2[:3])
+        # Cursor rests on the last element yielded.
+        self.assertEqual(self.c.key(), B('baa'))
+        self.assertEqual(list(self.c.iternext(limit=0)), [])
+
+    def testLimitAndStop(self):
+        self.c.first()
+        self.assertEqual(list(self.c.iternext(keys=False, stop=B('b'),
+                                              limit=5)), [B('')])
+        self.c.first()
+        self.assertEqual(list(self.c.iternext(values=False, stop=B('z'),
+                                              limit=2)), BL('a', 'b'))
+
+    def testReverse(self):
+        self.c.set_key(B('f'))
+        self.assertEqual(list(self.c.iterprev(values=False, stop=B('b'))),
+                         BL('f', 'e', 'd', 'baa'))
+        self.assertEqual(self.c.key(), B('b'))
+        self.c.last()
+        keys = list(self.c.iterprev(values=False, stop=B('f'),
+                                    inclusive=True))
+        self.assertEqual(keys, BL('h', 'g', 'f'))
+
+    def testOutOfRangeStart(self):
+        self.c.set_key(B('e'))
+        self.assertEqual(list(self.c.iternext(stop=B('d'))), [])
+        self.assertEqual(list(self.c.iterprev(stop=B('f'))), [])
+
+    def testUnpositioned(self):
+        self.assertEqual(list(self.c.iternext(values=False, stop=B('b'))),
+                         BL('a'))
+        self.c.last()
+        self.assertFalse(self.c.next())
+        self.assertEqual(list(self.c.iterprev(values=False, stop=B('g'))),
+                         BL('h'))
+
+    def testIterFrom(self):
+        it = self.c._iter_from(B('b'), False, stop=B('e'))
+        self.assertEqual([k for k, v in it], BL('b', 'baa', 'd'))
+        it = self.c._iter_from(B('e'), True, B('b'), True, 2)
+        self.assertEqual([k for k, v in it], BL('e', 'd'))
+
+    def testBadStop(self):
+        self.assertRaises(lmdb.BadValsizeError,
+                          lambda: self.c.iternext(stop=B('')))
+        self.assertRaises(lmdb.BadValsizeError,
+                          lambda: self.c.iterprev(stop=B('x') * 1000))
+
+
+class PrefixIterationTest(unittest.TestCase):
+    def tearDown(self):
+        testlib.cleanup()
+
+    def setUp(self):
+        self.path, self.env = testlib.temp_env()
+        self.txn = self.env.begin(write=True)
+        self.keys = [b'a', b'b', b'b/1', b'b/2', b'b\xff', b'b\xff\xff',
+                     b'c', b'c/1']
+        for k in self.keys:
+            self.txn.put(k, k + b'!')
+        self.c = self.txn.cursor()
+
+    def testForward(self):
+        self.assertEqual(list(self.c.iterprefix(b'b/', values=False)),
+                         [b'b/1', b'b/2'])
+        # Cursor rests on the first key lacking the prefix.
+        self.assertEqual(self.c.key(), b'b\xff')
+        self.assertEqual(list(self.c.iterprefix(b'b', keys=False)),
+                         [b'b!', b'b/1!', b'b/2!', b'b\xff!', b'b\xff\xff!'])
+
+    def testReverse(self):
+        self.assertEqual(list(self.c.iterprefix(b'b/', reverse=True)),
+                         [(b'b/2', b'b/2!'), (b'b/1', b'b/1!')])
+        self.assertEqual(self.c.key(), b'b')
+
+    def testReverseAllFF(self):
+        keys = list(self.c.iterprefix(b'b\xff', values=False,
+                                      reverse=True))
+        self.assertEqual(keys, [b'b\xff\xff', b'b\xff'])
+
+    def testReverseAtEnd(self):
+        keys = list(self.c.iterprefix(b'c', values=False, reverse=True))
+        self.assertEqual(keys, [b'c/1', b'c'])
+
+    def testNoMatch(self):
+        self.assertEqual(list(self.c.iterprefix(b'bb')), [])
+        self.assertEqual(list(self.c.iterprefix(b'bb', reverse=True)), [])
+        self.assertEqual(list(self.c.iterprefix(b'z')), [])
+        self.assertEqual(list(self.c.iterprefix(b'0', reverse=True)), [])
+
+    def testEmptyPrefix(self):
+        self.assertEqual(list(self.c.iterprefix(b'', values=False)),
+                         self.keys)
+        keys = list(self.c.iterprefix(b'', values=False, reverse=True))
+        self.assertEqual(keys, self.keys[::-1])
+
+    def testBadPrefix(self):
+        self.assertRaises(lmdb.BadValsizeError,
+                          lambda: self.c.iterprefix(b'x' * 1000))
+
+
+class BatchIterationTest(IterationTestBase2):
+    def testForward(self):
+        batches = list(self.c.iternext_batches(3))
+        self.assertEqual([len(b) for b in batches], [3, 3, 2])
+        self.assertEqual(sum(batches, []), ITEMS2)
+        self.assertEqual(self.c.item(), (B(''), B('')))  # end of db
+
+    def testReverse(self):
+        batches = list(self.c.iterprev_batches(5))
+        self.assertEqual([len(b) for b in batches], [5, 3])
+        self.assertEqual(sum(batches, []), ITEMS2[::-1])
+
+    def testKeysValues(self):
+        self.assertEqual(list(self.c.iternext_batches(100, values=False)),
+                         [KEYS2])
+        self.c.first()
+        self.assertEqual(list(self.c.iternext_batches(100, keys=False)),
+                         [[v for k, v in ITEMS2]])
+
+    def testFromCurrentPosition(self):
+        self.c.set_key(B('e'))
+        it = self.c.iternext_batches(2, values=False)
+        self.assertEqual(next(it), BL('e', 'f'))
+        # Cursor rests on the last element of each batch.
+        self.assertEqual(self.c.key(), B('f'))
+        self.c.set_key(B('a'))
+        self.assertEqual(next(it), BL('b', 'baa'))
+
+    def testExactMultiple(self):
+        batches = list(self.c.iternext_batches(4))
+        self.assertEqual([len(b) for b in batches], [4, 4])
+
+    def testEmpty(self):
+        c = self.txn.cursor(db=self.env.open_db(B('empty'), txn=self.txn))
+        self.assertEqual(list(c.iternext_batches(10)), [])
+        self.assertEqual(list(c.iterprev_batches(10)), [])
+
+    def testBadSize(self):
+        self.assertRaises(ValueError, lambda: self.c.iternext_batches(0))
+        # Rejected before the cursor is positioned.
+        self.assertEqual(self.c.item(), (B(''), B('')))
+
+    def testDups(self):
+        db = self.env.open_db(B('db1'), txn=self.txn, dupsort=True)
+        for v in BL('1', '2', '3'):
+            self.txn.put(B('a'), v, db=db)
+        self.txn.put(B('b'), B('1'), db=db)
+        c = self.txn.cursor(db=db)
+        c.first()
+        self.assertEqual(list(c.iternext_dup_batches(2)),
+                         [BL('1', '2'), BL('3')])
+        c.set_key(B('a'))
+        c.last_dup()
+        self.assertEqual(list(c.iterprev_dup_batches(2)),
+                         [BL('3', '2'), BL('1')])
+        self.assertEqual(list(c.iternext_nodup_batches(10)), [BL('a', 'b')])
+        self.assertEqual(list(c.iterprev_nodup_batches(10)), [BL('b', 'a')])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -62,6 +62,7 @@ class PackageExportsTest(unittest.TestCase):
             'Transaction',
             'TxnFullError',
             'VersionMismatchError',
+            'Writer',
             '_Database',
             'enable_drop_gil',
             'version',
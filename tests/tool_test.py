@@ -344,6 +344,21 @@ class CmdCopyTest(ToolTestBase):
         call_tool('-e %s --compact copy %s' % (self.path, target))
         self.assertTrue(os.path.exists(target))
 
+    def test_copy_rate_limit(self):
+        self.env.close()
+        target = testlib.temp_dir(create=False)
+        call_tool('-e %s --rate-limit 100 copy %s' % (self.path, target))
+        copy_env = lmdb.open(target, readonly=True)
+        with copy_env.begin() as txn:
+            self.assertEqual(txn.get(b'key1'), b'value1')
+        copy_env.close()
+
+    def test_copy_bad_rate_limit(self):
+        self.env.close()
+        target = testlib.temp_dir(create=False)
+        with self.assertRaises(SystemExit):
+            call_tool('-e %s --rate-limit 0 copy %s' % (self.path, target))
+
     def test_copy_existing_target(self):
         self.env.close()
         target = testlib.temp_dir()  # Already exists
@@ -367,6 +382,20 @@ class CmdCopyfdTest(ToolTestBase):
             os.close(fd)
         self.assertTrue(os.path.getsize(outpath) > 0)
 
+    def test_copyfd_rate_limit(self):
+        self.env.close()
+        outpath = os.path.join(testlib.temp_dir(), 'data.mdb')
+        fd = os.open(outpath, os.O_WRONLY | os.O_CREAT, 0o644)
+        try:
+            call_tool('-e %s --out-fd %d --rate-limit 100 copyfd'
+                      % (self.path, fd))
+        finally:
+            os.close(fd)
+        copy_env = lmdb.open(os.path.dirname(outpath), readonly=True)
+        with copy_env.begin() as txn:
+            self.assertEqual(txn.get(b'key1'), b'value1')
+        copy_env.close()
+
     def test_copyfd_with_args(self):
         self.env.close()
         with self.assertRaises(SystemExit):
@@ -378,6 +407,32 @@ class CmdCopyfdTest(ToolTestBase):
             call_tool('-e %s --out-fd 9999 copyfd' % self.path)
 
 
+class CmdCompactTest(ToolTestBase):
+    def test_compact(self):
+        with self.env.begin(write=True) as txn:
+            for i in range(2000):
+                txn.put(b'k%05d' % i, b'x' * 300)
+        with self.env.begin(write=True) as txn:
+            for i in range(2000):
+                txn.delete(b'k%05d' % i)
+        self.env.close()
+        data_path = os.path.join(self.path, 'data.mdb')
+        before = os.path.getsize(data_path)
+        call_tool('-e %s compact' % (self.path,))
+        self.assertLess(os.path.getsize(data_path), before)
+        self.assertEqual(sorted(os.listdir(self.path)),
+                         ['data.mdb', 'lock.mdb'])
+        env = lmdb.open(self.path, readonly=True)
+        with env.begin() as txn:
+            self.assertEqual(txn.get(b'key1'), b'value1')
+        env.close()
+
+    def test_compact_with_args(self):
+        self.env.close()
+        with self.assertRaises(SystemExit):
+            call_tool('-e %s compact extra_arg' % (self.path,))
+
+
 class CmdDumpRestoreTest(ToolTestBase):
     def test_dump_main(self):
         self.env.close()
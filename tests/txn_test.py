@@ -515,6 +515,97 @@ class GetTest(unittest.TestCase):
         assert txn.get(B('a')) == B('a')
 
 
+class GetManyTest(unittest.TestCase):
+    def tearDown(self):
+        testlib.cleanup()
+
+    def test_bad_txn(self):
+        _, env = testlib.temp_env()
+        txn = env.begin()
+        txn.abort()
+        self.assertRaises(Exception,
+            lambda: txn.getmany([B('a')]))
+
+    def test_empty(self):
+        _, env = testlib.temp_env()
+        txn = env.begin()
+        assert txn.getmany([]) == []
+
+    def test_order_and_default(self):
+        _, env = testlib.temp_env()
+        txn = env.begin(write=True)
+        for k in B('a'), B('c'), B('e'):
+            txn.put(k, k)
+        keys = [B('e'), B('missing'), B('a'), B('e'), B('c')]
+        assert txn.getmany(keys) == [B('e'), None, B('a'), B('e'), B('c')]
+        assert txn.getmany(iter(keys), default=B('x'))[1] == B('x')
+
+    def test_matches_get(self):
+        _, env = testlib.temp_env()
+        txn = env.begin(write=True)
+        for i in range(500):
+            txn.put(B('%05d' % i), B('v%d' % i))
+        keys = [B('%05d' % i) for i in range(999, -1, -7)]
+        assert txn.getmany(keys) == [txn.get(k) for k in keys]
+
+    def test_db(self):
+        _, env = testlib.temp_env()
+        db1 = env.open_db(B('db1'))
+        txn = env.begin(write=True)
+        txn.put(B('a'), B('main'))
+        txn.put(B('a'), B('db1'), db=db1)
+        assert txn.getmany([B('a')]) == [B('main')]
+        assert txn.getmany([B('a')], db=db1) == [B('db1')]
+
+    def test_integerkey(self):
+        _, env = testlib.temp_env()
+        db1 = env.open_db(B('db1'), integerkey=True)
+        txn = env.begin(write=True, db=db1)
+        assert txn.put(UINT_0002, B('b'))
+        assert txn.put(UINT_0001, B('a'))
+        assert txn.getmany([UINT_0002, UINT_0001]) == [B('b'), B('a')]
+
+    def test_buffers(self):
+        _, env = testlib.temp_env()
+        txn = env.begin(write=True, buffers=True)
+        txn.put(B('a'), B('a'))
+        result = txn.getmany([B('a')])
+        assert type(result[0]) is not bytes
+        assert bytes(result[0]) == B('a')
+
+    def test_empty_key(self):
+        _, env = testlib.temp_env()
+        txn = env.begin()
+        self.assertRaises(lmdb.BadValsizeError,
+            lambda: txn.getmany([B('a'), B('')]))
+
+    def test_bad_key_size(self):
+        _, env = testlib.temp_env()
+        txn = env.begin()
+        big = B('a') * (env.max_key_size() + 1)
+        self.assertRaises(lmdb.BadValsizeError,
+            lambda: txn.getmany([B('a'), big]))
+
+    def test_integerkey_mixed_width(self):
+        _, env = testlib.temp_env()
+        db1 = env.open_db(B('db1'), integerkey=True)
+        txn = env.begin(db=db1)
+        self.assertRaises(lmdb.BadValsizeError,
+            lambda: txn.getmany([struct.pack('Q', 1), B('x')]))
+        self.assertRaises(lmdb.BadValsizeError,
+            lambda: txn.getmany([struct.pack('Q', 1), UINT_0001]))
+
+    @unittest.skipIf(lmdb.Environment.__module__ == 'lmdb.cffi',
+                     "CFFI only accepts bytes keys")
+    def test_memoryview_keys(self):
+        _, env = testlib.temp_env()
+        txn = env.begin(write=True)
+        txn.put(B('a'), B('1'))
+        txn.put(B('b'), B('2'))
+        keys = [memoryview(B('b')), B('a')]
+        assert txn.getmany(keys) == [B('2'), B('1')]
+
+
 class PutTest(unittest.TestCase):
     def tearDown(self):
         testlib.cleanup()
@@ -556,6 +647,231 @@ class PutTest(unittest.TestCase):
         txn.get(B('a'))
 
 
+class PutManyTest(unittest.TestCase):
+    def tearDown(self):
+        testlib.cleanup()
+
+    def test_bad_txn(self):
+        _, env = testlib.temp_env()
+        txn = env.begin(write=True)
+        txn.abort()
+        self.assertRaises(Exception,
+            lambda: txn.putmany([(B('a'), B('a'))]))
+
+    def test_ro_txn(self):
+        _, env = testlib.temp_env()
+        txn = env.begin()
+        self.assertRaises(lmdb.ReadonlyError,
+            lambda: txn.putmany([(B('a'), B('a'))]))
+
+    def test_putmany(self):
+        _, env = testlib.temp_env()
+        txn = env.begin(write=True)
+        assert txn.putmany([]) == (0, 0)
+        items = [(B('%03d' % i), B('v%d' % i)) for i in range(100)]
+        assert txn.putmany(iter(items)) == (100, 100)
+        assert list(txn.cursor()) == items
+        assert txn.putmany([(B('000'), B('x'))]) == (1, 1)
+        assert txn.get(B('000')) == B('x')
+        assert txn.putmany([(B('000'), B('y')), (B('new'), B('z'))],
+                           overwrite=False) == (2, 1)
+        assert txn.get(B('000')) == B('x')
+
+    def test_db_dupsort(self):
+        _, env = testlib.temp_env()
+        txn = env.begin(write=True)
+        db = env.open_db(B('db1'), txn=txn, dupsort=True)
+        items = [(B('a'), B('1')), (B('a'), B('2')), (B('b'), B('1'))]
+        assert txn.putmany(items, db=db) == (3, 3)
+        assert txn.putmany(items, db=db, dupdata=False) == (3, 0)
+        assert txn.get(B('a')) is None
+        assert list(txn.cursor(db=db)) == items
+        assert txn.putmany([(B('b'), B('2'))], db=db, append=True) == (1, 1)
+        curs = txn.cursor(db=db)
+        assert curs.set_key(B('b'))
+        assert list(curs.iternext_dup()) == [B('1'), B('2')]
+
+    def test_append(self):
+        _, env = testlib.temp_env()
+        txn = env.begin(write=True)
+        items = [(B('%03d' % i), B('v')) for i in range(50)]
+        assert txn.putmany(items, append=True) == (50, 50)
+        assert list(txn.cursor()) == items
+
+    def test_bad_items(self):
+        _, env = testlib.temp_env()
+        txn = env.begin(write=True)
+        self.assertRaises(TypeError,
+            lambda: txn.putmany([(B('a'), B('1')), [B('b'), B('2')]]))
+        self.assertRaises(TypeError,
+            lambda: txn.putmany([(B('a'), B('1'), B('2'))]))
+        # Nothing is written when an element is rejected up front.
+        assert txn.get(B('a')) is None
+        self.assertRaises(lmdb.BadValsizeError,
+            lambda: txn.putmany([(B('a'), B('1')), (B(''), B('2'))]))
+        assert txn.get(B('a')) == B('1')
+
+    def test_cursor_refresh(self):
+        _, env = testlib.temp_env()
+        txn = env.begin(write=True)
+        txn.put(B('b'), B('1'))
+        curs = txn.cursor()
+        assert curs.first()
+        txn.putmany([(B('b'), B('2'))])
+        assert curs.value() == B('2')
+
+
+class IncrTest(unittest.TestCase):
+    def tearDown(self):
+        testlib.cleanup()
+
+    def setUp(self):
+        _, self.env = testlib.temp_env()
+        self.txn = self.env.begin(write=True)
+
+    def test_incr(self):
+        txn = self.txn
+        assert txn.incr(B('a')) == 1
+        assert txn.incr(B('a'), 10) == 11
+        assert txn.incr(B('a'), -20) == -9
+        assert txn.get(B('a')) == struct.pack('q', -9)
+        assert txn.incr(B('b'), 3, width=2, signed=False) == 3
+        assert txn.get(B('b')) == struct.pack('H', 3)
+
+    def test_range(self):
+        txn = self.txn
+        assert txn.incr(B('a'), 255, width=1, signed=False) == 255
+        self.assertRaises(OverflowError,
+            lambda: txn.incr(B('a'), 1, width=1, signed=False))
+        assert txn.get(B('a')) == struct.pack('B', 255)
+        self.assertRaises(OverflowError,
+            lambda: txn.incr(B('b'), -1, signed=False))
+        assert txn.get(B('b')) is None
+        assert txn.incr(B('c'), 2 ** 63 - 1) == 2 ** 63 - 1
+        self.assertRaises(OverflowError, lambda: txn.incr(B('c')))
+        assert txn.incr(B('c'), -(2 ** 63 - 1)) == 0
+        assert txn.incr(B('d'), 2 ** 63 - 1, signed=False) == 2 ** 63 - 1
+        assert txn.incr(B('d'), 2 ** 63 - 1, signed=False) == 2 ** 64 - 2
+
+    def test_bad_args(self):
+        txn = self.txn
+        txn.put(B('a'), B('abc'))
+        self.assertRaises(lmdb.BadValsizeError, lambda: txn.incr(B('a')))
+        self.assertRaises(lmdb.BadValsizeError, lambda: txn.incr(B('')))
+        self.assertRaises(ValueError, lambda: txn.incr(B('b'), width=3))
+        self.assertRaises(TypeError, lambda: txn.incr(B('b'), 1.5))
+        db = self.env.open_db(B('dups'), txn=txn, dupsort=True)
+        self.assertRaises(lmdb.IncompatibleError,
+            lambda: txn.incr(B('b'), db=db))
+
+    def test_incrmany(self):
+        txn = self.txn
+        assert txn.incrmany([]) == []
+        pairs = [(B('b'), 1), (B('a'), 5), (B('b'), 2)]
+        assert txn.incrmany(iter(pairs)) == [1, 5, 3]
+        self.assertRaises(TypeError, lambda: txn.incrmany([B('a')]))
+        # Updates before the failing element remain.
+        txn.put(B('c'), B('bad'))
+        self.assertRaises(lmdb.BadValsizeError,
+            lambda: txn.incrmany([(B('a'), 1), (B('c'), 1)]))
+        assert txn.get(B('a')) == struct.pack('q', 6)
+
+    def test_cursor_refresh(self):
+        txn = self.txn
+        txn.incr(B('a'))
+        curs = txn.cursor()
+        assert curs.first()
+        txn.incr(B('a'))
+        assert curs.value() == struct.pack('q', 2)
+
+
+class ReserveTest(unittest.TestCase):
+    def tearDown(self):
+        testlib.cleanup()
+
+    def test_reserve(self):
+        _, env = testlib.temp_env()
+        txn = env.begin(write=True)
+        view = txn.reserve(B('a'), 5)
+        assert len(view) == 5 and not view.readonly
+        view[:] = B('hello')
+        assert txn.get(B('a')) == B('hello')
+        assert len(txn.reserve(B('b'), 0)) == 0
+        assert txn.get(B('b')) == B('')
+
+    def test_overwrite(self):
+        _, env = testlib.temp_env()
+        txn = env.begin(write=True)
+        txn.put(B('a'), B('old'))
+        assert txn.reserve(B('a'), 3, overwrite=False) is None
+        assert txn.get(B('a')) == B('old')
+        txn.reserve(B('a'), 3)[:] = B('new')
+        assert txn.get(B('a')) == B('new')
+
+    def test_released_by_mutation(self):
+        _, env = testlib.temp_env()
+        txn = env.begin(write=True)
+        view = txn.reserve(B('a'), 1)
+        txn.put(B('b'), B('b'))
+        self.assertRaises(ValueError, lambda: view[0])
+        view = txn.reserve(B('a'), 1)
+        txn.reserve(B('c'), 1)
+        self.assertRaises(ValueError, lambda: view[0])
+
+    def test_released_by_commit(self):
+        _, env = testlib.temp_env()
+        txn = env.begin(write=True)
+        view = txn.reserve(B('a'), 1)
+        view[0] = ord('x')
+        txn.commit()
+        self.assertRaises(ValueError, lambda: view[0])
+        with env.begin() as txn:
+            assert txn.get(B('a')) == B('x')
+        txn = env.begin(write=True)
+        view = txn.reserve(B('a'), 1)
+        txn.abort()
+        self.assertRaises(ValueError, lambda: view[0])
+
+    def test_released_by_child(self):
+        _, env = testlib.temp_env()
+        txn = env.begin(write=True)
+        view = txn.reserve(B('a'), 1)
+        env.begin(write=True, parent=txn).abort()
+        self.assertRaises(ValueError, lambda: view[0])
+
+    def test_derived_buffer(self):
+        _, env = testlib.temp_env()
+        txn = env.begin(write=True)
+        view = txn.reserve(B('a'), 4)
+        derived = [view[1:3], memoryview(view)]
+        self.assertRaises(BufferError, lambda: txn.put(B('b'), B('b')))
+        self.assertRaises(BufferError, txn.commit)
+        self.assertRaises(BufferError, txn.abort)
+        self.assertRaises(BufferError,
+            lambda: env.begin(write=True, parent=txn))
+        self.assertRaises(BufferError, env.close)
+        derived[0][:] = B('xy')
+        del derived[1]
+        self.assertRaises(ValueError, lambda: view[0])
+        self.assertRaises(BufferError, txn.commit)
+        del derived[0]
+        assert txn.put(B('b'), B('b'))
+        txn.commit()
+        with env.begin() as txn:
+            assert txn.get(B('a'))[1:3] == B('xy')
+            assert txn.get(B('b')) == B('b')
+
+    def test_bad_txn(self):
+        _, env = testlib.temp_env()
+        txn = env.begin()
+        self.assertRaises(lmdb.ReadonlyError,
+            lambda: txn.reserve(B('a'), 1))
+        db = env.open_db(B('dups'), dupsort=True)
+        txn = env.begin(write=True)
+        self.assertRaises(lmdb.IncompatibleError,
+            lambda: txn.reserve(B('a'), 1, db=db))
+
+
 class ReplaceTest(unittest.TestCase):
     def tearDown(self):
         testlib.cleanup()
@@ -616,6 +932,73 @@ class ReplaceTest(unittest.TestCase):
         txn.get(B('a'))
 
 
+class DeleteRangeTest(unittest.TestCase):
+    def tearDown(self):
+        testlib.cleanup()
+
+    def _env(self, **kwargs):
+        _, env = testlib.temp_env()
+        db = env.open_db(B('db1'), **kwargs)
+        with env.begin(write=True, db=db) as txn:
+            for i in range(1000):
+                txn.put(B('%04d' % i), B('v'))
+        return env, db
+
+    def _keys(self, env, db):
+        with env.begin(db=db) as txn:
+            return list(txn.cursor().iternext(values=False))
+
+    def test_range(self):
+        env, db = self._env()
+        with env.begin(write=True, db=db) as txn:
+            assert txn.delete_range(B('0100'), B('0200')) == 100
+            assert txn.delete_range(B('0100'), B('0200')) == 0
+            assert txn.delete_range(B('0300'), B('0400'),
+                                    inclusive=True) == 101
+        keys = self._keys(env, db)
+        assert len(keys) == 799
+        assert B('0099') in keys and B('0200') in keys
+        assert B('0400') not in keys and B('0401') in keys
+
+    def test_open_ended(self):
+        env, db = self._env()
+        with env.begin(write=True, db=db) as txn:
+            assert txn.delete_range(None, B('0010')) == 10
+            assert txn.delete_range(B('0990')) == 10
+            assert txn.delete_range(B('5')) == 0
+        assert self._keys(env, db)[0] == B('0010')
+        assert self._keys(env, db)[-1] == B('0989')
+        with env.begin(write=True, db=db) as txn:
+            assert txn.delete_range() == 980
+        assert self._keys(env, db) == []
+
+    def test_dupsort(self):
+        env, db = self._env(dupsort=True)
+        with env.begin(write=True, db=db) as txn:
+            txn.put(B('0005'), B('w'))
+            assert txn.delete_range(B('0000'), B('0010')) == 11
+            assert txn.get(B('0010')) == B('v')
+            assert txn.delete_range() == 990
+            assert txn.stat(db)['entries'] == 0
+
+    def test_cursor_refresh(self):
+        env, db = self._env()
+        with env.begin(write=True, db=db) as txn:
+            curs = txn.cursor()
+            assert curs.set_key(B('0500'))
+            assert txn.delete_range(B('0000'), B('0999')) == 999
+            assert curs.key() == B('0999')
+
+    def test_bad_args(self):
+        env, db = self._env()
+        with env.begin(write=True, db=db) as txn:
+            self.assertRaises(lmdb.BadValsizeError,
+                lambda: txn.delete_range(B('0'), B('x') * 1000))
+        with env.begin(db=db) as txn:
+            self.assertRaises(lmdb.ReadonlyError,
+                lambda: txn.delete_range(B('0100'), B('0200')))
+
+
 class DoubleWriteTxnTest(unittest.TestCase):
     def tearDown(self):
         testlib.cleanup()